@@ -0,0 +1,287 @@
+"""
+In-process Python binding for the Strassen and parallel engines
+Gọi trực tiếp các engine C (libstrassen.so) từ Python qua ctypes
+
+    import numpy as np
+    import strassen
+
+    A = np.random.rand(1000, 1000)
+    B = np.random.rand(1000, 1000)
+    C = strassen.multiply(A, B)                  # sequential Strassen, any m x k x n
+    ok, residual, tol = strassen.verify(A, B, C) # Freivalds' check in O(m^2)
+    out = strassen.empty_shared((1000, 1000))    # MAP_SHARED output
+    strassen.row_multiply(A, B, p=8, out=out)    # fork-based row engine, result in out
+
+    W = strassen.prepare(A, n=1000)              # fixed A against many B of width n
+    for B in batches:
+        C = W.multiply(B)
+
+Operands must be C-contiguous float64 arrays; nothing is copied or converted.
+The engines write straight into `out`. ctypes releases the GIL for the whole
+call, so other Python threads keep running while a product is computed.
+
+The parallel engines fork worker processes that write their part of C into
+shared memory, so their output must live in a MAP_SHARED mapping: pass an
+array from empty_shared() (or leave out=None to get one).
+
+Build the library with `make lib` (compiled/libstrassen.so); set
+STRASSEN_LIB to load it from somewhere else.
+"""
+
+import ctypes
+import mmap
+import os
+
+import numpy as np
+
+__all__ = [
+    'multiply', 'row_multiply', 'element_multiply', 'parallel_strassen', 'prepare', 'PreparedA',
+    'empty_shared', 'is_shared', 'set_cutoff', 'get_cutoff', 'set_block_sizes', 'verify',
+]
+
+_DEFAULT_LIB = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'compiled', 'libstrassen.so')
+_double_p = ctypes.POINTER(ctypes.c_double)
+
+
+class _Prepared(ctypes.Structure):
+    """Mirror of strassen_prepared_t (src/strassen_utils.h)"""
+    _fields_ = [('m', ctypes.c_int), ('n', ctypes.c_int), ('k', ctypes.c_int),
+                ('levels', ctypes.c_int), ('variant', ctypes.c_int),
+                ('bytes', ctypes.c_size_t), ('root', ctypes.c_void_p)]
+
+
+class _VerifyResult(ctypes.Structure):
+    """Mirror of verify_result_t (src/strassen_utils.h)"""
+    _fields_ = [('rounds', ctypes.c_int), ('max_residual', ctypes.c_double),
+                ('tolerance', ctypes.c_double), ('time_us', ctypes.c_double), ('passed', ctypes.c_int)]
+
+
+def _load_library():
+    path = os.environ.get('STRASSEN_LIB', _DEFAULT_LIB)
+    try:
+        lib = ctypes.CDLL(path)
+    except OSError as exc:
+        raise ImportError(f'cannot load {path} ({exc}); build it with `make lib`') from None
+
+    lib.strassen_multiply_rect.argtypes = [_double_p, _double_p, _double_p,
+                                           ctypes.c_int, ctypes.c_int, ctypes.c_int]
+    lib.strassen_multiply_rect.restype = None
+    for name in ('parallel_row_multiply', 'parallel_element_multiply', 'parallel_strassen_multiply'):
+        fn = getattr(lib, name)
+        fn.argtypes = [_double_p, _double_p, _double_p, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        fn.restype = ctypes.c_int
+    lib.parallel_strassen_default_levels.argtypes = [ctypes.c_int]
+    lib.parallel_strassen_default_levels.restype = ctypes.c_int
+    lib.strassen_set_cutoff.argtypes = [ctypes.c_int]
+    lib.strassen_set_cutoff.restype = None
+    lib.strassen_get_cutoff.argtypes = []
+    lib.strassen_get_cutoff.restype = ctypes.c_int
+    lib.gemm_set_block_sizes.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int]
+    lib.gemm_set_block_sizes.restype = None
+    prep_p = ctypes.POINTER(_Prepared)
+    lib.strassen_prepare.argtypes = [prep_p, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                     _double_p, ctypes.c_int, ctypes.c_int]
+    lib.strassen_prepare.restype = ctypes.c_int
+    lib.strassen_prepared_workspace_size.argtypes = [prep_p]
+    lib.strassen_prepared_workspace_size.restype = ctypes.c_size_t
+    lib.strassen_prepared_multiply.argtypes = [prep_p, _double_p, ctypes.c_int, _double_p,
+                                               ctypes.c_int, _double_p]
+    lib.strassen_prepared_multiply.restype = None
+    lib.strassen_prepared_free.argtypes = [prep_p]
+    lib.strassen_prepared_free.restype = None
+    lib.freivalds_verify.argtypes = [_double_p, _double_p, _double_p, ctypes.c_int, ctypes.c_int,
+                                     ctypes.c_int, ctypes.POINTER(_VerifyResult)]
+    lib.freivalds_verify.restype = ctypes.c_int
+    return lib
+
+
+_lib = _load_library()
+
+
+class _SharedBuffer(mmap.mmap):
+    """Anonymous MAP_SHARED mapping; marks arrays from empty_shared()"""
+
+
+def empty_shared(shape):
+    """Mảng float64 C-contiguous nằm trong vùng nhớ MAP_SHARED (khởi tạo bằng 0)"""
+    shape = tuple(shape) if np.ndim(shape) else (int(shape),)
+    count = int(np.prod(shape))
+    buf = _SharedBuffer(-1, max(count, 1) * 8, flags=mmap.MAP_SHARED,
+                        prot=mmap.PROT_READ | mmap.PROT_WRITE)
+    return np.frombuffer(buf, dtype=np.float64, count=count).reshape(shape)
+
+
+def is_shared(array):
+    """True nếu array (hoặc view của nó) nằm trong bộ nhớ từ empty_shared()"""
+    base = array
+    while isinstance(base, np.ndarray):
+        base = base.base
+    if isinstance(base, memoryview):
+        base = base.obj
+    return isinstance(base, _SharedBuffer)
+
+
+def _ptr(array):
+    return array.ctypes.data_as(_double_p)
+
+
+def _check_operand(name, array):
+    if not isinstance(array, np.ndarray) or array.ndim != 2:
+        raise TypeError(f'{name} must be a 2-D numpy array')
+    if array.dtype != np.float64:
+        raise TypeError(f'{name} must be float64, got {array.dtype}')
+    if not array.flags.c_contiguous:
+        raise ValueError(f'{name} must be C-contiguous')
+
+
+def _check_output(out, shape, shared):
+    if out is None:
+        return empty_shared(shape) if shared else np.empty(shape, dtype=np.float64)
+    _check_operand('out', out)
+    if out.shape != shape:
+        raise ValueError(f'out has shape {out.shape}, expected {shape}')
+    if not out.flags.writeable:
+        raise ValueError('out must be writeable')
+    if shared and not is_shared(out):
+        raise ValueError('the parallel engines need out from empty_shared() '
+                         '(forked workers cannot write into private memory)')
+    return out
+
+
+def _check_square(A, B):
+    _check_operand('A', A)
+    _check_operand('B', B)
+    if A.shape[0] != A.shape[1] or A.shape != B.shape:
+        raise ValueError(f'the parallel engines need two equal square matrices, '
+                         f'got {A.shape} and {B.shape}')
+    return A.shape[0]
+
+
+def multiply(A, B, out=None):
+    """C = A @ B bằng Strassen tuần tự (m x k nhân k x n, kích thước bất kỳ)"""
+    _check_operand('A', A)
+    _check_operand('B', B)
+    (m, k), (k2, n) = A.shape, B.shape
+    if k != k2:
+        raise ValueError(f'inner dimensions differ: {A.shape} @ {B.shape}')
+    out = _check_output(out, (m, n), shared=False)
+    if m and n:
+        _lib.strassen_multiply_rect(_ptr(A), _ptr(B), _ptr(out), m, n, k)
+    return out
+
+
+class PreparedA:
+    """A chuẩn bị sẵn (strassen_prepare) để nhân với nhiều B cùng kích thước k x n
+
+    The A-side Strassen sums and packed base-case panels are built once; each
+    multiply() only forms the B-side sums. A is referenced, not copied, so it
+    must not be modified while the object is alive.
+    """
+
+    def __init__(self, A, n, levels=0):
+        _check_operand('A', A)
+        m, k = A.shape
+        if m <= 0 or k <= 0 or n <= 0:
+            raise ValueError('prepare needs non-empty operands')
+        self._A = A
+        self._prep = _Prepared()
+        if _lib.strassen_prepare(ctypes.byref(self._prep), m, int(n), k, _ptr(A), k, int(levels)) != 0:
+            self._prep = None
+            raise MemoryError('strassen_prepare failed')
+        self._work = np.empty(max(_lib.strassen_prepared_workspace_size(ctypes.byref(self._prep)), 1))
+
+    @property
+    def shape(self):
+        """(m, k, n) của tích A (m x k) @ B (k x n)"""
+        return self._prep.m, self._prep.k, self._prep.n
+
+    @property
+    def nbytes(self):
+        """Bộ nhớ dùng cho cây toán hạng"""
+        return self._prep.bytes
+
+    def multiply(self, B, out=None):
+        """C = A @ B với A đã chuẩn bị"""
+        if self._prep is None:
+            raise ValueError('PreparedA is closed')
+        _check_operand('B', B)
+        m, k, n = self.shape
+        if B.shape != (k, n):
+            raise ValueError(f'B has shape {B.shape}, expected {(k, n)}')
+        out = _check_output(out, (m, n), shared=False)
+        _lib.strassen_prepared_multiply(ctypes.byref(self._prep), _ptr(B), n, _ptr(out), n,
+                                        _ptr(self._work))
+        return out
+
+    def close(self):
+        """Giải phóng cây toán hạng"""
+        if self._prep is not None:
+            _lib.strassen_prepared_free(ctypes.byref(self._prep))
+            self._prep = None
+
+    def __del__(self):
+        self.close()
+
+
+def prepare(A, n, levels=0):
+    """Chuẩn bị A một lần cho nhiều tích A @ B với B có n cột (levels=0: tới cutoff)"""
+    return PreparedA(A, n, levels)
+
+
+def _run_parallel(fn, what, A, B, p, out, grain):
+    m = _check_square(A, B)
+    if p <= 0:
+        raise ValueError('p must be positive')
+    out = _check_output(out, (m, m), shared=True)
+    if m and fn(_ptr(A), _ptr(B), _ptr(out), m, p, grain) != 0:
+        raise RuntimeError(f'{what} failed')
+    return out
+
+
+def row_multiply(A, B, p, out=None, chunk=0):
+    """Row engine: p tiến trình nhận từng khối `chunk` hàng (0 = tự chọn)"""
+    return _run_parallel(_lib.parallel_row_multiply, 'parallel row multiplication', A, B, p, out, chunk)
+
+
+def element_multiply(A, B, p, out=None, tile=0):
+    """Element engine: p tiến trình nhận từng tile `tile` x `tile` (0 = mặc định 16)"""
+    return _run_parallel(_lib.parallel_element_multiply, 'parallel element multiplication',
+                         A, B, p, out, tile)
+
+
+def parallel_strassen(A, B, p, out=None, levels=0):
+    """P1..P7 (levels=1) hoặc 49 tích (levels=2) chia cho p tiến trình (0 = tự chọn)"""
+    if levels == 0:
+        levels = _lib.parallel_strassen_default_levels(int(p))
+    return _run_parallel(_lib.parallel_strassen_multiply, 'parallel Strassen multiplication',
+                         A, B, p, out, levels)
+
+
+def verify(A, B, C, rounds=2, p=1):
+    """Kiểm tra C == A @ B bằng Freivalds (rounds vector ngẫu nhiên, O(rounds * m^2)).
+
+    Returns (passed, max_residual, tolerance); the matrix-vector products are
+    split over up to p forked workers.
+    """
+    m = _check_square(A, B)
+    _check_operand('C', C)
+    if C.shape != A.shape:
+        raise ValueError(f'C has shape {C.shape}, expected {A.shape}')
+    res = _VerifyResult()
+    if _lib.freivalds_verify(_ptr(A), _ptr(B), _ptr(C), m, int(rounds), int(p), ctypes.byref(res)) < 0:
+        raise RuntimeError('verification failed to run')
+    return bool(res.passed), res.max_residual, res.tolerance
+
+
+def set_cutoff(n):
+    """Kích thước mà Strassen chuyển sang kernel cơ sở (xem --cutoff)"""
+    _lib.strassen_set_cutoff(int(n))
+
+
+def get_cutoff():
+    return _lib.strassen_get_cutoff()
+
+
+def set_block_sizes(mc=0, kc=0, nc=0):
+    """Kích thước khối cache của kernel cơ sở; 0 giữ nguyên giá trị hiện tại"""
+    _lib.gemm_set_block_sizes(int(mc), int(kc), int(nc))
@@ -2,61 +2,36 @@
 """
 Data Extraction Script for Strassen Algorithm Analysis
 Trích xuất dữ liệu từ log và tạo file CSV để phân tích
+
+The log is streamed into the SQLite results store (tools/results_store.py),
+starting where the previous run stopped, and the CSV/JSON files are exported
+from the store's median per configuration.
 """
 
-import re
+import argparse
 import csv
 import json
-from collections import defaultdict
+import sys
+from pathlib import Path
+
+# tools/results_store.py: append-only SQLite store with resumable log ingestion
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'tools'))
+import results_store
 
-def extract_data_from_log(log_file):
-    """Trích xuất dữ liệu từ log file"""
+def extract_data_from_store(db, machine_id, commit=None):
+    """Trung vị theo cấu hình từ results store, cùng dạng với raw_data.json"""
+    stored = results_store.median_results(db, machine_id, commit)
     data = {
-        'sequential': [],
+        'sequential': [{'matrix_size': m, 'time_us': t, 'method': 'sequential'}
+                       for m, t in stored['sequential']],
         'parallel_row': [],
         'parallel_element': []
     }
-    
-    with open(log_file, 'r') as f:
-        content = f.read()
-    
-    # Extract sequential data
-    seq_pattern = r'sequentialMult \(Strassen\): m=(\d+), time=(\d+) microseconds'
-    for match in re.finditer(seq_pattern, content):
-        matrix_size = int(match.group(1))
-        time_us = int(match.group(2))
-        data['sequential'].append({
-            'matrix_size': matrix_size,
-            'time_us': time_us,
-            'method': 'sequential'
-        })
-    
-    # Extract parallel row data
-    row_pattern = r'parallelRowMult \(Strassen\): m=(\d+), p=(\d+), time=(\d+) microseconds'
-    for match in re.finditer(row_pattern, content):
-        matrix_size = int(match.group(1))
-        processes = int(match.group(2))
-        time_us = int(match.group(3))
-        data['parallel_row'].append({
-            'matrix_size': matrix_size,
-            'processes': processes,
-            'time_us': time_us,
-            'method': 'parallel_row'
-        })
-    
-    # Extract parallel element data
-    elem_pattern = r'parallelElementMult \(Strassen\): m=(\d+), p=(\d+), time=(\d+) microseconds'
-    for match in re.finditer(elem_pattern, content):
-        matrix_size = int(match.group(1))
-        processes = int(match.group(2))
-        time_us = int(match.group(3))
-        data['parallel_element'].append({
-            'matrix_size': matrix_size,
-            'processes': processes,
-            'time_us': time_us,
-            'method': 'parallel_element'
-        })
-    
+    for method in ('parallel_row', 'parallel_element'):
+        for processes, points in sorted(stored[method].items()):
+            for m, t in points:
+                data[method].append({'matrix_size': m, 'processes': processes, 'time_us': t, 'method': method})
+        data[method].sort(key=lambda row: (row['matrix_size'], row['processes']))
     return data
 
 def save_to_csv(data, output_file):
@@ -115,13 +90,28 @@ def calculate_speedup(data):
     return speedup_data
 
 def main():
-    log_file = '../../logs/strassen_comprehensive.log'
-    output_dir = '../data'
-    
+    parser = argparse.ArgumentParser(description='Ingest a benchmark log into the results store and export CSV/JSON')
+    parser.add_argument('--log', default='../../logs/strassen_comprehensive.log')
+    parser.add_argument('--output-dir', default='../data')
+    parser.add_argument('--db', default=str(results_store.DEFAULT_DB))
+    parser.add_argument('--machine', help='log was produced on this machine (default: this host)')
+    parser.add_argument('--commit', help='log was produced by this commit (default: HEAD)')
+    args = parser.parse_args()
+    output_dir = args.output_dir
+
     print("Extracting data from benchmark log...")
     
-    # Extract data
-    data = extract_data_from_log(log_file)
+    # Stream the new part of the log into the store (resumes at the saved offset)
+    db = results_store.connect(args.db)
+    machine = results_store.local_machine(args.machine)
+    if args.commit:
+        commit = results_store.resolve_commit(args.commit)
+    else:
+        commit = None if args.machine else results_store.current_commit()
+    added = results_store.ingest_log(db, args.log, machine, commit)
+    print(f"{added} new results from {args.log}")
+    data = extract_data_from_store(db, results_store.machine_id(db, machine), commit)
+    db.close()
     
     # Save raw data
     save_to_csv(data, f'{output_dir}/raw_data.csv')
@@ -134,8 +124,8 @@ def main():
     
     print(f"Data extracted successfully to {output_dir}/")
     print("Generated files:")
-    print("- raw_data.csv: Raw timing data")
-    print("- raw_data.json: Raw timing data (JSON)")
+    print("- raw_data.csv: Median timing data")
+    print("- raw_data.json: Median timing data (JSON)")
     print("- speedup_data.csv: Speedup calculations")
     print("- speedup_data.json: Speedup calculations (JSON)")
 
@@ -2,17 +2,40 @@
 """
 Advanced Chart Generation for Strassen Algorithm Performance Analysis
 Tạo các biểu đồ chi tiết từ dữ liệu benchmark
+
+The data is loaded once into a columnar ResultTable. Every chart is a stage
+keyed on a hash of the slice of the table it reads (plus its own source and
+the dpi), recorded in <output-dir>/.chart_cache.json: only stale charts are
+re-rendered, and those render in a process pool (--jobs).
 """
 
+import argparse
+import hashlib
+import inspect
 import json
+import os
+import sys
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')  # charts are only saved; also safe inside pool workers
 import matplotlib.pyplot as plt
 import numpy as np
-from collections import defaultdict
-from pathlib import Path
+
+# tools/results_store.py (SQLite results store)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'tools'))
 
 # Set style
 plt.style.use('default')
 
+METHODS = ('sequential', 'parallel_row', 'parallel_element')
+KEY_PROCS = (10, 100, 1000)                           # process counts most charts focus on
+BASELINE_SIZES = (4, 8, 16, 32, 64, 128, 256, 512, 1024)  # sizes with a sequential baseline
+CACHE_MANIFEST = '.chart_cache.json'
+CACHE_VERSION = 1  # bump when a shared helper changes what the charts draw
+
 def load_results_from_data(data_dir):
     """Load benchmark results from data JSON files (raw_data.json + extended_benchmark_data.json)."""
     data_path = Path(data_dir)
@@ -68,55 +91,178 @@ def load_results_from_data(data_dir):
 
     return results
 
-def create_speedup_vs_matrix_size_chart(results, output_dir):
+def load_results_from_bench(bench_file):
+    """Load a tools/bench_runner.py results file (schema strassen-bench/1), using median times."""
+    with open(bench_file, 'r') as f:
+        bench = json.load(f)
+    schema = bench.get('schema', '')
+    if not schema.startswith('strassen-bench/'):
+        raise ValueError(f'{bench_file}: not a bench_runner results file (schema={schema!r})')
+
+    results = {
+        'sequential': [],
+        'parallel_row': defaultdict(list),
+        'parallel_element': defaultdict(list)
+    }
+    for row in bench.get('results', []):
+        if row.get('median_us') is None:
+            continue
+        point = (row['matrix_size'], int(round(row['median_us'])))
+        if row['method'] == 'sequential':
+            results['sequential'].append(point)
+        elif row['method'] in ('parallel_row', 'parallel_element'):
+            results[row['method']][int(row['processes'])].append(point)
+
+    results['sequential'].sort()
+    for method in ('parallel_row', 'parallel_element'):
+        for procs in results[method]:
+            results[method][procs].sort()
+    return results
+
+def load_results_from_store(db_path, machine=None, commit=None):
+    """Median times per configuration from the results store (tools/results_store.py)."""
+    import results_store
+    db = results_store.connect(db_path)
+    try:
+        machine_id = results_store.select_machine(db, machine) if machine else None
+        if machine_id is None and db.execute('SELECT COUNT(DISTINCT machine_id) FROM results').fetchone()[0] > 1:
+            raise SystemExit(f'{db_path} holds several machines; pick one with --machine')
+        stored = results_store.median_results(db, machine_id, results_store.resolve_commit(commit) if commit else None)
+    finally:
+        db.close()
+    results = {
+        'sequential': stored['sequential'],
+        'parallel_row': defaultdict(list, stored['parallel_row']),
+        'parallel_element': defaultdict(list, stored['parallel_element'])
+    }
+    return results
+
+
+def _key(method, procs, size):
+    """Khóa int64 (method, processes, size), sắp xếp theo đúng thứ tự đó."""
+    return (np.asarray(method, dtype=np.int64) << 56) | (np.asarray(procs, dtype=np.int64) << 28) \
+        | np.asarray(size, dtype=np.int64)
+
+def _align(keys, values, query):
+    """values[keys == query] cho từng phần tử của query (keys đã sắp xếp), NaN nếu không có."""
+    query = np.asarray(query)
+    if len(keys) == 0:
+        return np.full(query.shape, np.nan)
+    idx = np.searchsorted(keys, query).clip(0, len(keys) - 1)
+    return np.where(keys[idx] == query, values[idx], np.nan)
+
+def _ratio(num, den):
+    """num / den, 0 where either side is missing or not positive (speedup convention of the charts)."""
+    num, den = np.broadcast_arrays(np.asarray(num, dtype=float), np.asarray(den, dtype=float))
+    ok = (num > 0) & (den > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ok, num / den, 0.0)
+
+class ResultTable:
+    """Kết quả benchmark dạng cột: method (chỉ số trong METHODS), procs, size, time (µs).
+
+    Rows are grouped by (method, procs, size) on construction, keeping the
+    fastest time, and kept sorted by that key so lookups are a searchsorted
+    instead of a scan. Sequential rows have procs == 0.
+    """
+
+    def __init__(self, method, procs, size, time):
+        method = np.asarray(method, dtype=np.int64)
+        procs = np.asarray(procs, dtype=np.int64)
+        size = np.asarray(size, dtype=np.int64)
+        time = np.asarray(time, dtype=float)
+        order = np.lexsort((time, size, procs, method))
+        key = _key(method, procs, size)[order]
+        first = np.ones(len(key), dtype=bool)
+        first[1:] = key[1:] != key[:-1]
+        self.key = key[first]
+        self.method = method[order][first]
+        self.procs = procs[order][first]
+        self.size = size[order][first]
+        self.time = time[order][first]
+
+    @classmethod
+    def from_results(cls, results):
+        """Columns from the {'sequential': [...], 'parallel_row': {p: [...]}, ...} dict of the loaders."""
+        rows = [(0, 0, s, t) for s, t in results['sequential']]
+        for code, method in enumerate(METHODS[1:], 1):
+            rows += [(code, p, s, t) for p, points in results[method].items() for s, t in points]
+        cols = np.array(rows, dtype=float).reshape(-1, 4).T
+        return cls(*cols)
+
+    def __len__(self):
+        return len(self.key)
+
+    def _mask(self, method, procs=None, sizes=None, min_size=None):
+        mask = self.method == METHODS.index(method)
+        if procs is not None:
+            mask &= np.isin(self.procs, procs)
+        if sizes is not None:
+            mask &= np.isin(self.size, sizes)
+        if min_size is not None:
+            mask &= self.size >= min_size
+        return mask
+
+    def select(self, method, procs=None, sizes=None, min_size=None):
+        """Lát cắt của bảng cho một method (tùy chọn lọc theo procs / sizes / size tối thiểu)."""
+        mask = self._mask(method, procs, sizes, min_size)
+        return ResultTable(self.method[mask], self.procs[mask], self.size[mask], self.time[mask])
+
+    @staticmethod
+    def concat(*tables):
+        return ResultTable(*(np.concatenate([getattr(t, c) for t in tables])
+                             for c in ('method', 'procs', 'size', 'time')))
+
+    def sizes(self, method, procs=None):
+        """Sorted distinct sizes measured for method (and procs)."""
+        return np.unique(self.size[self._mask(method, procs)])
+
+    def processes(self, method):
+        return np.unique(self.procs[self._mask(method)])
+
+    def lookup(self, method, procs, sizes):
+        """Thời gian của (method, procs, sizes); procs/sizes broadcast với nhau, NaN nếu thiếu."""
+        return _align(self.key, self.time, _key(METHODS.index(method), procs, sizes))
+
+    def sequential(self, sizes):
+        return self.lookup('sequential', 0, sizes)
+
+    def best(self, method, sizes):
+        """Fastest time over all process counts for each size (NaN where none)."""
+        mask = self._mask(method) & (self.time > 0)
+        size, time = self.size[mask], self.time[mask]
+        order = np.argsort(size, kind='stable')
+        size, time = size[order], time[order]
+        uniq, start = np.unique(size, return_index=True)
+        if len(uniq) == 0:
+            return np.full(np.shape(sizes), np.nan)
+        return _align(uniq, np.minimum.reduceat(time, start), sizes)
+
+    def digest(self):
+        h = hashlib.sha256()
+        h.update(self.key.tobytes())
+        h.update(self.time.tobytes())
+        return h.hexdigest()
+
+def create_speedup_vs_matrix_size_chart(table, output_dir, dpi=300):
     """Biểu đồ 1: Speedup vs Matrix Size"""
     fig, ax = plt.subplots(figsize=(12, 8))
-    
-    matrix_sizes = [size for size, _ in results['sequential']]
-    seq_times = [time for _, time in results['sequential']]
-    
-    # Calculate speedup for each configuration
+
     colors = ['red', 'green', 'blue', 'orange', 'purple', 'brown']
     markers = ['o', 's', '^', 'D', 'v', '<']
-    
-    row_keys = [p for p in sorted(results['parallel_row'].keys()) if p in (10, 100, 1000)]
-    for idx, processes in enumerate(row_keys):
-        times = results['parallel_row'][processes]
-        sizes = [size for size, _ in times]
-        times_list = [time for _, time in times]
-        speedup = []
-        
-        for j, size in enumerate(sizes):
-            seq_time = next((time for s, time in results['sequential'] if s == size), None)
-            if seq_time and times_list[j] > 0:
-                speedup.append(seq_time / times_list[j])
-            else:
-                speedup.append(0)
-        
-        ax.plot(sizes, speedup, f'{markers[idx % len(markers)]}-', 
-                label=f'Parallel Row (p={processes})', 
-                color=colors[idx % len(colors)], linewidth=2, markersize=6)
-    
-    elem_keys = [p for p in sorted(results['parallel_element'].keys()) if p in (10, 100, 1000)]
-    for idx, processes in enumerate(elem_keys):
-        times = results['parallel_element'][processes]
-        sizes = [size for size, _ in times]
-        times_list = [time for _, time in times]
-        speedup = []
-        
-        for j, size in enumerate(sizes):
-            seq_time = next((time for s, time in results['sequential'] if s == size), None)
-            if seq_time and times_list[j] > 0:
-                speedup.append(seq_time / times_list[j])
-            else:
-                speedup.append(0)
-        
-        marker_style = markers[(idx + 3) % len(markers)]
-        color_style = colors[(idx + 3) % len(colors)]
-        ax.plot(sizes, speedup, f'{marker_style}--', 
-                label=f'Parallel Element (p={processes})', 
-                color=color_style, linewidth=2, markersize=6)
-    
+
+    # Row series take the first three styles, Element series the last three
+    for offset, method, label, line in ((0, 'parallel_row', 'Parallel Row', '-'),
+                                        (3, 'parallel_element', 'Parallel Element', '--')):
+        keys = [p for p in table.processes(method) if p in KEY_PROCS]
+        for idx, processes in enumerate(keys):
+            sizes = table.sizes(method, processes)
+            speedup = _ratio(table.sequential(sizes), table.lookup(method, processes, sizes))
+            style = (idx + offset) % len(markers)
+            ax.plot(sizes, speedup, f'{markers[style]}{line}',
+                    label=f'{label} (p={processes})',
+                    color=colors[style % len(colors)], linewidth=2, markersize=6)
+
     ax.set_xlabel('Matrix Size (n×n)', fontsize=12)
     ax.set_ylabel('Speedup', fontsize=12)
     ax.set_title('Strassen Algorithm: Speedup vs Matrix Size', fontsize=14, fontweight='bold')
@@ -124,88 +270,57 @@ def create_speedup_vs_matrix_size_chart(results, output_dir):
     ax.grid(True, alpha=0.3)
     ax.set_xscale('log')
     ax.set_yscale('log')
-    
+
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/01_speedup_vs_matrix_size.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'{output_dir}/01_speedup_vs_matrix_size.png', dpi=dpi, bbox_inches='tight')
     plt.close()
 
-def create_speedup_vs_process_count_chart(results, output_dir):
+def create_speedup_vs_process_count_chart(table, output_dir, dpi=300):
     """Biểu đồ 2: Speedup vs Process Count"""
     fig, ax = plt.subplots(figsize=(12, 8))
-    
+
     # Focus on key matrix sizes
     key_sizes = [256, 512, 1024]
     colors = ['red', 'green', 'blue']
-    
+    seq_sizes = table.sizes('sequential')
+    processes = np.array(KEY_PROCS)
+
     for i, size in enumerate(key_sizes):
-        if size in [s for s, _ in results['sequential']]:
-            seq_time = next(time for s, time in results['sequential'] if s == size)
-            
-            # Parallel Row data
-            row_speedup = []
-            processes = [10, 100, 1000]
-            
-            for p in processes:
-                if p in results['parallel_row']:
-                    time = next((t for s, t in results['parallel_row'][p] if s == size), None)
-                    if time and time > 0:
-                        row_speedup.append(seq_time / time)
-                    else:
-                        row_speedup.append(0)
-                else:
-                    row_speedup.append(0)
-            
-            ax.plot(processes, row_speedup, f'o-', 
-                    label=f'Parallel Row (n={size})', 
+        if size in seq_sizes:
+            row_speedup = _ratio(table.sequential(size), table.lookup('parallel_row', processes, size))
+            ax.plot(processes, row_speedup, f'o-',
+                    label=f'Parallel Row (n={size})',
                     color=colors[i], linewidth=2, markersize=8)
-    
+
     ax.set_xlabel('Process Count', fontsize=12)
     ax.set_ylabel('Speedup', fontsize=12)
     ax.set_title('Strassen Algorithm: Speedup vs Process Count', fontsize=14, fontweight='bold')
     ax.legend()
     ax.grid(True, alpha=0.3)
     ax.set_xscale('log')
-    
+
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/02_speedup_vs_process_count.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'{output_dir}/02_speedup_vs_process_count.png', dpi=dpi, bbox_inches='tight')
     plt.close()
 
-def create_row_vs_element_comparison_chart(results, output_dir):
+def create_row_vs_element_comparison_chart(table, output_dir, dpi=300):
     """Biểu đồ 3: Row vs Element Comparison"""
     fig, ax = plt.subplots(figsize=(14, 8))
-    
-    matrix_sizes = [size for size, _ in results['sequential']]
-    seq_times = [time for _, time in results['sequential']]
-    
-    # Get best parallel times for each matrix size
-    row_times = []
-    elem_times = []
-    
-    for size in matrix_sizes:
-        # Find best parallel row time
-        best_row_time = float('inf')
-        for processes, times in results['parallel_row'].items():
-            time = next((t for s, t in times if s == size), None)
-            if time and time < best_row_time:
-                best_row_time = time
-        
-        # Find best parallel element time
-        best_elem_time = float('inf')
-        for processes, times in results['parallel_element'].items():
-            time = next((t for s, t in times if s == size), None)
-            if time and time < best_elem_time:
-                best_elem_time = time
-        
-        row_times.append(best_row_time if best_row_time != float('inf') else 0)
-        elem_times.append(best_elem_time if best_elem_time != float('inf') else 0)
-    
+
+    matrix_sizes = table.sizes('sequential')
+    seq_times = table.sequential(matrix_sizes)
+
+    # Best parallel time for each matrix size over all process counts (0 if none)
+    row_times = np.nan_to_num(table.best('parallel_row', matrix_sizes))
+    elem_times = np.nan_to_num(table.best('parallel_element', matrix_sizes))
+
     x = np.arange(len(matrix_sizes))
     width = 0.25
-    
+
     ax.bar(x - width, seq_times, width, label='Sequential', alpha=0.8)
     ax.bar(x, row_times, width, label='Parallel Row (Best)', alpha=0.8)
     ax.bar(x + width, elem_times, width, label='Parallel Element (Best)', alpha=0.8)
-    
+
     ax.set_xlabel('Matrix Size (n×n)', fontsize=12)
     ax.set_ylabel('Execution Time (microseconds)', fontsize=12)
     ax.set_title('Strassen Algorithm: Performance Comparison', fontsize=14, fontweight='bold')
@@ -214,36 +329,27 @@ def create_row_vs_element_comparison_chart(results, output_dir):
     ax.legend()
     ax.grid(True, alpha=0.3)
     ax.set_yscale('log')
-    
+
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/03_row_vs_element_comparison.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'{output_dir}/03_row_vs_element_comparison.png', dpi=dpi, bbox_inches='tight')
     plt.close()
 
-def create_best_time_large_chart(results, output_dir):
+def create_best_time_large_chart(table, output_dir, dpi=300):
     """Biểu đồ 06: Best time for large sizes (>=1536), chọn tốt nhất giữa Row/Element."""
     fig, ax = plt.subplots(figsize=(12, 8))
 
-    # Build best time per size for sizes >= 1536
-    sizes = sorted({s for plist in list(results['parallel_row'].values()) + list(results['parallel_element'].values()) for (s, _) in plist if s >= 1536})
-    best_times = []
-    best_methods = []
-
-    for size in sizes:
-        # best row
-        best_row = min([t for p, lst in results['parallel_row'].items() for (s, t) in lst if s == size], default=None)
-        # best element
-        best_elem = min([t for p, lst in results['parallel_element'].items() for (s, t) in lst if s == size], default=None)
-        if best_row is None and best_elem is None:
-            continue
-        if best_elem is None or (best_row is not None and best_row < best_elem):
-            best_times.append(best_row)
-            best_methods.append('Row')
-        else:
-            best_times.append(best_elem)
-            best_methods.append('Element')
+    # Best time per size for sizes >= 1536, Row winning ties as before
+    sizes = np.union1d(table.sizes('parallel_row'), table.sizes('parallel_element'))
+    sizes = sizes[sizes >= 1536]
+    best_row = table.best('parallel_row', sizes)
+    best_elem = table.best('parallel_element', sizes)
+    use_row = ~np.isnan(best_row) & (np.isnan(best_elem) | (best_row < best_elem))
+    best_times = np.where(use_row, best_row, best_elem)
+    found = ~np.isnan(best_times)
+    sizes, best_times, best_methods = sizes[found], best_times[found], np.where(use_row, 'Row', 'Element')[found]
 
-    if sizes and best_times:
-        ax.plot(sizes, [t/1e6 for t in best_times], 'o-', linewidth=2, markersize=6, label='Best Time (s)')
+    if len(sizes):
+        ax.plot(sizes, best_times / 1e6, 'o-', linewidth=2, markersize=6, label='Best Time (s)')
         for i, m in enumerate(best_methods):
             ax.annotate(m, (sizes[i], best_times[i]/1e6), textcoords="offset points", xytext=(0,6), ha='center', fontsize=8)
 
@@ -255,260 +361,200 @@ def create_best_time_large_chart(results, output_dir):
     ax.set_yscale('log')
 
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/05_best_time_large.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'{output_dir}/05_best_time_large.png', dpi=dpi, bbox_inches='tight')
     plt.close()
 
-def create_algorithm_complexity_chart(results, output_dir):
+def create_algorithm_complexity_chart(table, output_dir, dpi=300):
     """Biểu đồ 9: Algorithm Complexity Comparison (theoretical vs actual)."""
-    if not results['sequential']:
+    matrix_sizes = table.sizes('sequential').astype(float)
+    if not len(matrix_sizes):
         return
     fig, ax = plt.subplots(figsize=(12, 8))
-    matrix_sizes = [size for size, _ in results['sequential']]
-    naive_ops = [size**3 for size in matrix_sizes]
-    strassen_ops = [size**(np.log2(7)) for size in matrix_sizes]
+    naive_ops = matrix_sizes**3
+    strassen_ops = matrix_sizes**(np.log2(7))
     ax.plot(matrix_sizes, naive_ops, 'r-o', linewidth=2, label='Naive O(n³)')
     ax.plot(matrix_sizes, strassen_ops, 'b-s', linewidth=2, label='Strassen O(n^log₂7)')
-    seq_times = [time for _, time in results['sequential']]
-    max_ops = max(max(naive_ops), max(strassen_ops))
-    max_time = max(seq_times)
-    scaled_times = [time * max_ops / max_time for time in seq_times]
+    seq_times = table.sequential(matrix_sizes)
+    max_ops = max(naive_ops.max(), strassen_ops.max())
+    scaled_times = seq_times * max_ops / seq_times.max()
     ax.plot(matrix_sizes, scaled_times, 'g-^', linewidth=2, label='Actual (scaled)')
     ax.set_xlabel('Matrix Size (n×n)')
     ax.set_ylabel('Operations Count (log scale)')
     ax.set_title('Theoretical vs Actual Complexity')
     ax.legend(); ax.grid(True, alpha=0.3); ax.set_xscale('log'); ax.set_yscale('log')
-    plt.tight_layout(); plt.savefig(f'{output_dir}/06_algorithm_complexity.png', dpi=300, bbox_inches='tight'); plt.close()
+    plt.tight_layout(); plt.savefig(f'{output_dir}/06_algorithm_complexity.png', dpi=dpi, bbox_inches='tight'); plt.close()
 
-def create_scalability_analysis_chart(results, output_dir):
+def create_scalability_analysis_chart(table, output_dir, dpi=300):
     """Biểu đồ 11: Scalability Analysis (speedup, efficiency, throughput)."""
-    if not results['sequential']:
+    matrix_sizes = table.sizes('sequential')
+    if not len(matrix_sizes):
         return
-    import math
     fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(18, 6))
-    matrix_sizes = [size for size, _ in results['sequential']]
-    seq_times = [time for _, time in results['sequential']]
-    for processes in sorted(results['parallel_row'].keys()):
-        if processes not in [10, 100, 1000]:
+    seq_times = table.sequential(matrix_sizes)
+    ops = matrix_sizes.astype(float)**3
+    for processes in table.processes('parallel_row'):
+        if processes not in KEY_PROCS:
             continue
-        times = results['parallel_row'][processes]
+        par_times = table.lookup('parallel_row', processes, matrix_sizes)
         # speedup
-        speedup = []
-        for i, size in enumerate(matrix_sizes):
-            seq_time = seq_times[i]
-            par_time = next((t for s, t in times if s == size), None)
-            speedup.append((seq_time / par_time) if par_time and par_time > 0 else 0)
+        speedup = _ratio(seq_times, par_times)
         ax1.plot(matrix_sizes, speedup, 'o-', label=f'p={processes}', linewidth=2, markersize=4)
         # efficiency
-        efficiency = [ (sp / processes) * 100 if processes > 0 else 0 for sp in speedup ]
+        efficiency = speedup / processes * 100
         ax2.plot(matrix_sizes, efficiency, 's-', label=f'p={processes}', linewidth=2, markersize=4)
         # throughput (approx ops/sec)
-        throughput = []
-        for i, size in enumerate(matrix_sizes):
-            par_time = next((t for s, t in times if s == size), None)
-            if par_time and par_time > 0:
-                ops = size**3
-                throughput.append(ops / (par_time / 1_000_000))
-            else:
-                throughput.append(0)
+        throughput = _ratio(ops, par_times / 1_000_000)
         ax3.plot(matrix_sizes, throughput, '^-', label=f'p={processes}', linewidth=2, markersize=4)
     ax1.set_xlabel('Matrix Size (n×n)'); ax1.set_ylabel('Speedup'); ax1.set_title('Speedup vs Matrix Size'); ax1.legend(); ax1.grid(True, alpha=0.3); ax1.set_xscale('log')
     ax2.set_xlabel('Matrix Size (n×n)'); ax2.set_ylabel('Efficiency (%)'); ax2.set_title('Efficiency vs Matrix Size'); ax2.legend(); ax2.grid(True, alpha=0.3); ax2.set_xscale('log')
     ax3.set_xlabel('Matrix Size (n×n)'); ax3.set_ylabel('Throughput (ops/sec)'); ax3.set_title('Throughput vs Matrix Size'); ax3.legend(); ax3.grid(True, alpha=0.3); ax3.set_xscale('log'); ax3.set_yscale('log')
-    plt.tight_layout(); plt.savefig(f'{output_dir}/07_scalability_analysis.png', dpi=300, bbox_inches='tight'); plt.close()
+    plt.tight_layout(); plt.savefig(f'{output_dir}/07_scalability_analysis.png', dpi=dpi, bbox_inches='tight'); plt.close()
 
-def create_3d_performance_surface_chart(results, output_dir):
+def create_3d_performance_surface_chart(table, output_dir, dpi=300):
     """Biểu đồ 13: 3D Performance Surface (speedup over size/process)."""
     from mpl_toolkits.mplot3d import Axes3D  # noqa: F401
-    import matplotlib.pyplot as plt
-    import numpy as np
-    if not results['sequential']:
+    matrix_sizes = table.sizes('sequential')
+    matrix_sizes = matrix_sizes[np.isin(matrix_sizes, BASELINE_SIZES)]
+    process_counts = np.array([p for p in KEY_PROCS if p in table.processes('parallel_row')])
+    if not len(matrix_sizes) or not len(process_counts):
         return
     fig = plt.figure(figsize=(14, 10))
     ax = fig.add_subplot(111, projection='3d')
-    matrix_sizes = sorted({s for s, _ in results['sequential'] if s in [4,8,16,32,64,128,256,512,1024]})
-    process_counts = [p for p in [10, 100, 1000] if p in results['parallel_row']]
-    if not matrix_sizes or not process_counts:
-        plt.close(fig); return
     X, Y = np.meshgrid(matrix_sizes, process_counts)
-    Z = np.zeros_like(X, dtype=float)
-    for i, p in enumerate(process_counts):
-        times = results['parallel_row'][p]
-        for j, size in enumerate(matrix_sizes):
-            seq_time = next((t for s, t in results['sequential'] if s == size), None)
-            par_time = next((t for s, t in times if s == size), None)
-            Z[i, j] = (seq_time / par_time) if seq_time and par_time and par_time > 0 else 0
+    Z = _ratio(table.sequential(X), table.lookup('parallel_row', Y, X))
     surf = ax.plot_surface(X, Y, Z, cmap='viridis', alpha=0.85)
     ax.set_xlabel('Matrix Size (n×n)'); ax.set_ylabel('Process Count'); ax.set_zlabel('Speedup'); ax.set_title('3D Performance Surface')
     fig.colorbar(surf, ax=ax, shrink=0.5, aspect=5)
-    plt.tight_layout(); plt.savefig(f'{output_dir}/08_3d_performance_surface.png', dpi=300, bbox_inches='tight'); plt.close()
+    plt.tight_layout(); plt.savefig(f'{output_dir}/08_3d_performance_surface.png', dpi=dpi, bbox_inches='tight'); plt.close()
 
-def create_efficiency_heatmap(results, output_dir):
+def create_efficiency_heatmap(table, output_dir, dpi=300):
     """Biểu đồ 4: Efficiency Heatmap"""
     fig, ax = plt.subplots(figsize=(12, 8))
-    
-    # Create efficiency matrix
-    matrix_sizes = [4, 8, 16, 32, 64, 128, 256, 512, 1024]
-    process_counts = [10, 100, 1000]
-    
-    efficiency_matrix = np.zeros((len(matrix_sizes), len(process_counts)))
-    
-    for i, size in enumerate(matrix_sizes):
-        seq_time = next((time for s, time in results['sequential'] if s == size), None)
-        if seq_time:
-            for j, processes in enumerate(process_counts):
-                if processes in results['parallel_row']:
-                    time = next((t for s, t in results['parallel_row'][processes] if s == size), None)
-                    if time and time > 0:
-                        efficiency_matrix[i][j] = seq_time / time
-                    else:
-                        efficiency_matrix[i][j] = 0
-    
+
+    # Speedup matrix: one row per size, one column per process count
+    matrix_sizes = np.array(BASELINE_SIZES)
+    process_counts = np.array(KEY_PROCS)
+    efficiency_matrix = _ratio(table.sequential(matrix_sizes)[:, None],
+                               table.lookup('parallel_row', process_counts[None, :], matrix_sizes[:, None]))
+
     # Create heatmap
     im = ax.imshow(efficiency_matrix, cmap='RdYlGn', aspect='auto')
-    
+
     # Set labels
     ax.set_xticks(range(len(process_counts)))
     ax.set_xticklabels(process_counts)
     ax.set_yticks(range(len(matrix_sizes)))
     ax.set_yticklabels(matrix_sizes)
-    
+
     ax.set_xlabel('Process Count', fontsize=12)
     ax.set_ylabel('Matrix Size', fontsize=12)
     ax.set_title('Strassen Algorithm: Efficiency Heatmap', fontsize=14, fontweight='bold')
-    
+
     # Add colorbar
     cbar = plt.colorbar(im, ax=ax)
     cbar.set_label('Speedup', fontsize=12)
-    
+
     # Add text annotations
     for i in range(len(matrix_sizes)):
         for j in range(len(process_counts)):
             text = ax.text(j, i, f'{efficiency_matrix[i, j]:.1f}',
                           ha="center", va="center", color="black", fontsize=8)
-    
+
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/04_efficiency_heatmap.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'{output_dir}/04_efficiency_heatmap.png', dpi=dpi, bbox_inches='tight')
     plt.close()
 
-def create_optimal_process_analysis(results, output_dir):
+def create_optimal_process_analysis(table, output_dir, dpi=300):
     """Biểu đồ 5: Optimal Process Count Analysis"""
     fig, ax = plt.subplots(figsize=(12, 8))
-    
-    matrix_sizes = []
-    optimal_processes = []
-    
-    for size, seq_time in results['sequential']:
-        if seq_time > 0:
-            best_speedup = 0
-            best_processes = 10
-            
-            for processes in [10, 100, 1000]:
-                if processes in results['parallel_row']:
-                    time = next((t for s, t in results['parallel_row'][processes] if s == size), None)
-                    if time and time > 0:
-                        speedup = seq_time / time
-                        if speedup > best_speedup:
-                            best_speedup = speedup
-                            best_processes = processes
-            
-            matrix_sizes.append(size)
-            optimal_processes.append(best_processes)
-    
-    if len(matrix_sizes) > 0 and len(optimal_processes) > 0:
+
+    matrix_sizes = table.sizes('sequential')
+    seq_times = table.sequential(matrix_sizes)
+    matrix_sizes, seq_times = matrix_sizes[seq_times > 0], seq_times[seq_times > 0]
+
+    # Process count with the best speedup per size (10 when none beats zero)
+    process_counts = np.array(KEY_PROCS)
+    speedup = _ratio(seq_times[:, None], table.lookup('parallel_row', process_counts[None, :], matrix_sizes[:, None]))
+    optimal_processes = np.where(speedup.max(axis=1, initial=0) > 0, process_counts[speedup.argmax(axis=1)], 10)
+
+    if len(matrix_sizes) > 0:
         # Create scatter plot
         ax.scatter(matrix_sizes, optimal_processes, s=100, alpha=0.7, c='red')
-        
+
         # Add trend line if we have enough points
         if len(matrix_sizes) > 1:
             z = np.polyfit(matrix_sizes, optimal_processes, 1)
             p = np.poly1d(z)
             ax.plot(matrix_sizes, p(matrix_sizes), "r--", alpha=0.8, linewidth=2)
-    
+
     ax.set_xlabel('Matrix Size (n×n)', fontsize=12)
     ax.set_ylabel('Optimal Process Count', fontsize=12)
     ax.set_title('Strassen Algorithm: Optimal Process Count Analysis', fontsize=14, fontweight='bold')
     ax.grid(True, alpha=0.3)
     ax.set_xscale('log')
     ax.set_yscale('log')
-    
+
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/05_optimal_process_analysis.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'{output_dir}/05_optimal_process_analysis.png', dpi=dpi, bbox_inches='tight')
     plt.close()
 
-def create_memory_usage_analysis(results, output_dir):
+def create_memory_usage_analysis(table, output_dir, dpi=300):
     """Biểu đồ 7: Memory Usage Analysis"""
     fig, ax = plt.subplots(figsize=(12, 8))
-    
-    matrix_sizes = [size for size, _ in results['sequential']]
-    
-    # Calculate memory usage (assuming double precision)
-    memory_usage = []
-    for size in matrix_sizes:
-        # 3 matrices (A, B, C) * size^2 * 8 bytes (double)
-        memory = 3 * size * size * 8 / (1024 * 1024)  # Convert to MB
-        memory_usage.append(memory)
-    
+
+    matrix_sizes = table.sizes('sequential')
+
+    # 3 matrices (A, B, C) * size^2 * 8 bytes (double), in MB
+    memory_usage = 3 * matrix_sizes.astype(float)**2 * 8 / (1024 * 1024)
+
     ax.plot(matrix_sizes, memory_usage, 'o-', linewidth=2, markersize=6, color='blue')
     ax.fill_between(matrix_sizes, memory_usage, alpha=0.3, color='blue')
-    
+
     ax.set_xlabel('Matrix Size (n×n)', fontsize=12)
     ax.set_ylabel('Memory Usage (MB)', fontsize=12)
     ax.set_title('Strassen Algorithm: Memory Usage Analysis', fontsize=14, fontweight='bold')
     ax.grid(True, alpha=0.3)
     ax.set_xscale('log')
     ax.set_yscale('log')
-    
+
     # Add memory threshold line
     ax.axhline(y=100, color='red', linestyle='--', alpha=0.7, label='100MB threshold')
     ax.axhline(y=1000, color='orange', linestyle='--', alpha=0.7, label='1GB threshold')
     ax.legend()
-    
+
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/07_memory_usage_analysis.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'{output_dir}/07_memory_usage_analysis.png', dpi=dpi, bbox_inches='tight')
     plt.close()
 
-def create_overhead_analysis(results, output_dir):
+def create_overhead_analysis(table, output_dir, dpi=300):
     """Biểu đồ 8: Overhead Analysis"""
     fig, ax = plt.subplots(figsize=(14, 8))
-    
-    matrix_sizes = [size for size, _ in results['sequential']]
-    seq_times = [time for _, time in results['sequential']]
-    
+
+    matrix_sizes = table.sizes('sequential')
+    seq_times = table.sequential(matrix_sizes)
+
     # Calculate overhead for different process counts
-    process_counts = [10, 100, 1000]
     colors = ['red', 'green', 'blue']
-    
-    for i, processes in enumerate(process_counts):
-        if processes in results['parallel_row']:
-            times = results['parallel_row'][processes]
-            parallel_times = []
-            overhead_times = []
-            
-            for size in matrix_sizes:
-                seq_time = next((time for s, time in results['sequential'] if s == size), None)
-                par_time = next((time for s, time in times if s == size), None)
-                
-                if seq_time and par_time:
-                    parallel_times.append(par_time)
-                    # Estimate overhead as difference between parallel and theoretical minimum
-                    theoretical_min = seq_time / processes  # Ideal speedup
-                    overhead = max(0, par_time - theoretical_min)
-                    overhead_times.append(overhead)
-                else:
-                    parallel_times.append(0)
-                    overhead_times.append(0)
-            
+    row_procs = table.processes('parallel_row')
+
+    for i, processes in enumerate(KEY_PROCS):
+        if processes in row_procs:
+            par_times = table.lookup('parallel_row', processes, matrix_sizes)
+            found = (seq_times > 0) & (par_times > 0)
+            parallel_times = np.where(found, par_times, 0)
+            # Estimate overhead as difference between parallel and theoretical minimum (ideal speedup)
+            overhead_times = np.where(found, np.maximum(0, par_times - seq_times / processes), 0)
+
             # Create stacked bar chart
-            ax.bar([x + i*0.25 for x in range(len(matrix_sizes))], 
-                   parallel_times, 0.25, 
-                   label=f'Parallel Time (p={processes})', 
+            x = np.arange(len(matrix_sizes)) + i*0.25
+            ax.bar(x, parallel_times, 0.25,
+                   label=f'Parallel Time (p={processes})',
                    color=colors[i], alpha=0.7)
-            ax.bar([x + i*0.25 for x in range(len(matrix_sizes))], 
-                   overhead_times, 0.25, 
+            ax.bar(x, overhead_times, 0.25,
                    bottom=parallel_times,
-                   label=f'Overhead (p={processes})', 
+                   label=f'Overhead (p={processes})',
                    color=colors[i], alpha=0.3)
-    
+
     ax.set_xlabel('Matrix Size (n×n)', fontsize=12)
     ax.set_ylabel('Time (microseconds)', fontsize=12)
     ax.set_title('Strassen Algorithm: Overhead Analysis', fontsize=14, fontweight='bold')
@@ -517,55 +563,183 @@ def create_overhead_analysis(results, output_dir):
     ax.legend()
     ax.grid(True, alpha=0.3)
     ax.set_yscale('log')
-    
+
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/08_overhead_analysis.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'{output_dir}/08_overhead_analysis.png', dpi=dpi, bbox_inches='tight')
     plt.close()
 
+# A chart stage: the file it writes, the function drawing it and the slice of
+# the table it reads. The slice (not the whole table) keys the cache, so new
+# rows for, say, p=64 leave the charts that only show p=10/100/1000 alone.
+ChartStage = namedtuple('ChartStage', 'filename title render inputs')
+
+def _seq_and_key_rows(t):
+    return ResultTable.concat(t.select('sequential'), t.select('parallel_row', KEY_PROCS))
+
+STAGES = [
+    ChartStage('01_speedup_vs_matrix_size.png', 'speedup vs matrix size chart',
+               create_speedup_vs_matrix_size_chart,
+               lambda t: ResultTable.concat(t.select('sequential'), t.select('parallel_row', KEY_PROCS),
+                                            t.select('parallel_element', KEY_PROCS))),
+    ChartStage('02_speedup_vs_process_count.png', 'speedup vs process count chart',
+               create_speedup_vs_process_count_chart,
+               lambda t: ResultTable.concat(t.select('sequential', sizes=(256, 512, 1024)),
+                                            t.select('parallel_row', KEY_PROCS, (256, 512, 1024)))),
+    ChartStage('03_row_vs_element_comparison.png', 'row vs element comparison chart (<=1024 baseline sizes)',
+               create_row_vs_element_comparison_chart,
+               lambda t: ResultTable.concat(t.select('sequential'),
+                                            t.select('parallel_row', sizes=t.sizes('sequential')),
+                                            t.select('parallel_element', sizes=t.sizes('sequential')))),
+    ChartStage('04_efficiency_heatmap.png', 'efficiency heatmap',
+               create_efficiency_heatmap,
+               lambda t: ResultTable.concat(t.select('sequential', sizes=BASELINE_SIZES),
+                                            t.select('parallel_row', KEY_PROCS, BASELINE_SIZES))),
+    ChartStage('05_best_time_large.png', 'best-time chart for large sizes (>=1536)',
+               create_best_time_large_chart,
+               lambda t: ResultTable.concat(t.select('parallel_row', min_size=1536),
+                                            t.select('parallel_element', min_size=1536))),
+    ChartStage('06_algorithm_complexity.png', 'algorithm complexity comparison chart',
+               create_algorithm_complexity_chart, lambda t: t.select('sequential')),
+    ChartStage('07_scalability_analysis.png', 'scalability analysis',
+               create_scalability_analysis_chart, _seq_and_key_rows),
+    ChartStage('08_3d_performance_surface.png', '3D performance surface',
+               create_3d_performance_surface_chart, _seq_and_key_rows),
+]
+
+def stage_key(stage, inputs, dpi):
+    """Hash of everything a chart depends on: its input slice, its drawing code and the dpi."""
+    h = hashlib.sha256()
+    h.update(f'{CACHE_VERSION}:{stage.filename}:{dpi}'.encode())
+    h.update(inspect.getsource(stage.render).encode())
+    h.update(inputs.digest().encode())
+    return h.hexdigest()
+
+def render_stage(index, inputs, output_dir, dpi):
+    """Vẽ một stage (chạy trong process pool nên chỉ nhận dữ liệu picklable)."""
+    STAGES[index].render(inputs, output_dir, dpi)
+    return index
+
+def load_manifest(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(path, manifest):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+def _mtime(path):
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def run_pipeline(table, output_dir, jobs=1, force=False, dpi=300):
+    """Re-render the stale charts (all with force).
+
+    Returns (failed, files): the number of charts that failed and the names of
+    the chart files that are current after the run (up to date or written now).
+    """
+    out = Path(output_dir)
+    manifest_path = out / CACHE_MANIFEST
+    manifest = load_manifest(manifest_path)
+
+    stale = []
+    current = []
+    before = {}
+    for i, stage in enumerate(STAGES):
+        inputs = stage.inputs(table)
+        key = stage_key(stage, inputs, dpi)
+        if not force and manifest.get(stage.filename) == key and (out / stage.filename).exists():
+            print(f"{i + 1}. {stage.title[0].upper()}{stage.title[1:]} is up to date")
+            current.append(i)
+            continue
+        print(f"{i + 1}. Creating {stage.title}...")
+        manifest.pop(stage.filename, None)
+        before[i] = _mtime(out / stage.filename)
+        stale.append((i, inputs, key))
+
+    failed = 0
+    done = []
+    if jobs > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(stale))) as pool:
+            futures = {pool.submit(render_stage, i, inputs, output_dir, dpi): (i, key)
+                       for i, inputs, key in stale}
+            for future in as_completed(futures):
+                i, key = futures[future]
+                try:
+                    future.result()
+                    done.append((i, key))
+                except Exception as e:
+                    print(f"Error: {STAGES[i].filename}: {e}", file=sys.stderr)
+                    failed += 1
+    else:
+        for i, inputs, key in stale:
+            try:
+                render_stage(i, inputs, output_dir, dpi)
+                done.append((i, key))
+            except Exception as e:
+                print(f"Error: {STAGES[i].filename}: {e}", file=sys.stderr)
+                failed += 1
+
+    # Charts that had nothing to draw (e.g. no sequential rows) return without
+    # saving: their file is missing or left over from an earlier run, and they stay stale
+    written, skipped = [], []
+    for i, key in done:
+        mtime = _mtime(out / STAGES[i].filename)
+        if mtime is not None and mtime != before[i]:
+            manifest[STAGES[i].filename] = key
+            written.append(i)
+        else:
+            skipped.append(STAGES[i].filename)
+    save_manifest(manifest_path, manifest)
+    print(f"{len(written)} rendered, {len(current)} up to date, {failed} failed")
+    if skipped:
+        print(f"Skipped (nothing to draw from this data): {', '.join(skipped)}")
+    return failed, [STAGES[i].filename for i in sorted(current + written)]
+
 def main():
-    data_dir = '../data'
-    output_dir = '../../charts'
-    
-    print("Generating charts from data files (no logs required)...")
-    
-    # Load results from data
-    results = load_results_from_data(data_dir)
-    
-    # Create all charts
-    print("1. Creating speedup vs matrix size chart...")
-    create_speedup_vs_matrix_size_chart(results, output_dir)
-    
-    print("2. Creating speedup vs process count chart...")
-    create_speedup_vs_process_count_chart(results, output_dir)
-    
-    print("3. Creating row vs element comparison chart (<=1024 baseline sizes)...")
-    create_row_vs_element_comparison_chart(results, output_dir)
-    
-    print("4. Creating efficiency heatmap...")
-    create_efficiency_heatmap(results, output_dir)
-    
-    print("5. Creating best-time chart for large sizes (>=1536)...")
-    create_best_time_large_chart(results, output_dir)
-    
-    print("6. Creating algorithm complexity comparison chart...")
-    create_algorithm_complexity_chart(results, output_dir)
-
-    print("7. Creating scalability analysis...")
-    create_scalability_analysis_chart(results, output_dir)
-
-    print("8. Creating 3D performance surface...")
-    create_3d_performance_surface_chart(results, output_dir)
-
-    print(f"All charts generated successfully in {output_dir}/")
+    parser = argparse.ArgumentParser(description='Generate performance charts')
+    parser.add_argument('--bench', help='results JSON from tools/bench_runner.py (instead of the data dir)')
+    parser.add_argument('--db', help='results store from tools/results_store.py (instead of the data dir)')
+    parser.add_argument('--machine', help='with --db: hostname or fingerprint prefix')
+    parser.add_argument('--commit', help='with --db: only results of this commit')
+    parser.add_argument('--data-dir', default='../data')
+    parser.add_argument('--output-dir', default='../../charts')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help='charts rendered in parallel (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='re-render every chart, ignoring the cache')
+    parser.add_argument('--dpi', type=int, default=300, help='output resolution (default: 300)')
+    args = parser.parse_args()
+    output_dir = args.output_dir
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    if args.bench:
+        print(f"Generating charts from benchmark results {args.bench} (median times)...")
+        results = load_results_from_bench(args.bench)
+    elif args.db:
+        print(f"Generating charts from the results store {args.db} (median times)...")
+        results = load_results_from_store(args.db, args.machine, args.commit)
+    else:
+        print("Generating charts from data files (no logs required)...")
+        results = load_results_from_data(args.data_dir)
+    table = ResultTable.from_results(results)
+
+    failed, files = run_pipeline(table, output_dir, args.jobs, args.force, args.dpi)
+    if failed:
+        sys.exit(1)
+
+    if len(files) == len(STAGES):
+        print(f"All charts generated successfully in {output_dir}/")
+    else:
+        print(f"{len(files)} of {len(STAGES)} charts generated in {output_dir}/")
     print("Generated files:")
-    print("- 01_speedup_vs_matrix_size.png")
-    print("- 02_speedup_vs_process_count.png") 
-    print("- 03_row_vs_element_comparison.png")
-    print("- 04_efficiency_heatmap.png")
-    print("- 05_best_time_large.png")
-    print("- 06_algorithm_complexity.png")
-    print("- 07_scalability_analysis.png")
-    print("- 08_3d_performance_surface.png")
+    for filename in files:
+        print(f"- {filename}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,318 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include <fcntl.h>
+#include <errno.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <sys/wait.h>
+#include "strassen_utils.h"
+#include "work_queue.h"
+#include "batch.h"
+
+#define HEADER_BYTES (8 + sizeof(uint64_t))
+
+static int alloc_index(batch_t *batch, size_t count) {
+    batch->count = count;
+    batch->sizes = calloc(count ? count : 1, sizeof(int));
+    batch->A = calloc(count ? count : 1, sizeof(double *));
+    batch->B = calloc(count ? count : 1, sizeof(double *));
+    batch->C = calloc(count ? count : 1, sizeof(double *));
+    if (!batch->sizes || !batch->A || !batch->B || !batch->C) {
+        perror("calloc");
+        return -1;
+    }
+    return 0;
+}
+
+int batch_map_file(const char *path, batch_t *batch) {
+    memset(batch, 0, sizeof(*batch));
+
+    int fd = open(path, O_RDONLY);
+    if (fd == -1) {
+        perror(path);
+        return -1;
+    }
+    struct stat st;
+    if (fstat(fd, &st) == -1 || (size_t)st.st_size < HEADER_BYTES) {
+        fprintf(stderr, "%s: not a batch file\n", path);
+        close(fd);
+        return -1;
+    }
+    void *map = mmap(NULL, (size_t)st.st_size, PROT_READ, MAP_SHARED, fd, 0);
+    close(fd);
+    if (map == MAP_FAILED) {
+        perror("mmap");
+        return -1;
+    }
+    batch->in_map = map;
+    batch->in_bytes = (size_t)st.st_size;
+
+    const char *base = map;
+    uint64_t count;
+    memcpy(&count, base + 8, sizeof(count));
+    if (memcmp(base, BATCH_INPUT_MAGIC, 8) != 0 || alloc_index(batch, (size_t)count) != 0) {
+        fprintf(stderr, "%s: bad batch header\n", path);
+        batch_release(batch);
+        return -1;
+    }
+
+    size_t off = HEADER_BYTES;
+    for (size_t i = 0; i < batch->count; i++) {
+        uint64_t n;
+        if (off + sizeof(n) > batch->in_bytes) goto truncated;
+        memcpy(&n, base + off, sizeof(n));
+        off += sizeof(n);
+        size_t bytes = (size_t)n * n * sizeof(double);
+        if (n == 0 || n > 1u << 20 || off + 2 * bytes > batch->in_bytes) goto truncated;
+        batch->sizes[i] = (int)n;
+        batch->A[i] = (const double *)(base + off);
+        batch->B[i] = (const double *)(base + off + bytes);
+        off += 2 * bytes;
+    }
+    return 0;
+
+truncated:
+    fprintf(stderr, "%s: truncated batch file\n", path);
+    batch_release(batch);
+    return -1;
+}
+
+// count pairs in anonymous shared memory; with shared_a one A is stored and
+// generated first, then the B matrices
+static int generate(batch_t *batch, size_t count, int n, int shared_a) {
+    memset(batch, 0, sizeof(*batch));
+    if (alloc_index(batch, count) != 0) return -1;
+    if (count == 0) return 0;
+
+    size_t per = (size_t)n * n;
+    size_t matrices = shared_a ? count + 1 : 2 * count;
+    batch->in_bytes = matrices * per * sizeof(double);
+    void *map = mmap(NULL, batch->in_bytes, PROT_READ | PROT_WRITE,
+                     MAP_SHARED | MAP_ANONYMOUS, -1, 0);
+    if (map == MAP_FAILED) {
+        perror("mmap");
+        batch->in_bytes = 0;
+        batch_release(batch);
+        return -1;
+    }
+    batch->in_map = map;
+
+    double *data = map;
+    if (shared_a) {
+        for (size_t j = 0; j < per; j++) data[j] = (double)(rand() % 100);
+    }
+    for (size_t i = 0; i < count; i++) {
+        double *A, *B;
+        if (shared_a) {
+            A = data;
+            B = data + (i + 1) * per;
+            for (size_t j = 0; j < per; j++) B[j] = (double)(rand() % 100);
+        } else {
+            A = data + 2 * i * per;
+            B = A + per;
+            for (size_t j = 0; j < per; j++) {
+                A[j] = (double)(rand() % 100);
+                B[j] = (double)(rand() % 100);
+            }
+        }
+        batch->sizes[i] = n;
+        batch->A[i] = A;
+        batch->B[i] = B;
+    }
+    return 0;
+}
+
+int batch_generate(batch_t *batch, size_t count, int n) {
+    return generate(batch, count, n, 0);
+}
+
+int batch_generate_shared_a(batch_t *batch, size_t count, int n) {
+    return generate(batch, count, n, 1);
+}
+
+int batch_map_output(batch_t *batch, const char *path) {
+    size_t bytes = HEADER_BYTES;
+    for (size_t i = 0; i < batch->count; i++) {
+        bytes += sizeof(uint64_t) + (size_t)batch->sizes[i] * batch->sizes[i] * sizeof(double);
+    }
+
+    void *map;
+    if (path) {
+        int fd = open(path, O_RDWR | O_CREAT | O_TRUNC, 0644);
+        if (fd == -1) {
+            perror(path);
+            return -1;
+        }
+        if (ftruncate(fd, (off_t)bytes) == -1) {
+            perror("ftruncate");
+            close(fd);
+            return -1;
+        }
+        map = mmap(NULL, bytes, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+        close(fd);
+    } else {
+        map = mmap(NULL, bytes, PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
+    }
+    if (map == MAP_FAILED) {
+        perror("mmap");
+        return -1;
+    }
+    batch->out_map = map;
+    batch->out_bytes = bytes;
+
+    char *base = map;
+    uint64_t count = batch->count;
+    memcpy(base, BATCH_RESULT_MAGIC, 8);
+    memcpy(base + 8, &count, sizeof(count));
+    size_t off = HEADER_BYTES;
+    for (size_t i = 0; i < batch->count; i++) {
+        uint64_t n = (uint64_t)batch->sizes[i];
+        memcpy(base + off, &n, sizeof(n));
+        off += sizeof(n);
+        batch->C[i] = (double *)(base + off);
+        off += (size_t)n * n * sizeof(double);
+    }
+    return 0;
+}
+
+int batch_write_input(const char *path, const batch_t *batch) {
+    FILE *f = fopen(path, "wb");
+    if (!f) {
+        perror(path);
+        return -1;
+    }
+    uint64_t count = batch->count;
+    int ok = fwrite(BATCH_INPUT_MAGIC, 1, 8, f) == 8 && fwrite(&count, sizeof(count), 1, f) == 1;
+    for (size_t i = 0; ok && i < batch->count; i++) {
+        uint64_t n = (uint64_t)batch->sizes[i];
+        size_t per = (size_t)n * n;
+        ok = fwrite(&n, sizeof(n), 1, f) == 1
+            && fwrite(batch->A[i], sizeof(double), per, f) == per
+            && fwrite(batch->B[i], sizeof(double), per, f) == per;
+    }
+    if (fclose(f) != 0) ok = 0;
+    if (!ok) {
+        fprintf(stderr, "%s: write failed\n", path);
+        return -1;
+    }
+    return 0;
+}
+
+static int by_size_desc(const void *a, const void *b, void *ctx) {
+    const int *sizes = ctx;
+    return sizes[*(const size_t *)b] - sizes[*(const size_t *)a];
+}
+
+// Child: claim products (largest first) until the queue is exhausted. With
+// prep set every product is A * B_i for the prepared A.
+static void batch_worker(batch_t *batch, const size_t *order, work_queue_t *queue, int max_n,
+                         const strassen_prepared_t *prep) {
+    size_t ws = prep ? strassen_prepared_workspace_size(prep) : strassen_workspace_size(max_n);
+    double *work = ws > 0 ? malloc(ws * sizeof(double)) : NULL;
+    if (ws > 0 && !work) {
+        perror("malloc");
+        _exit(1);
+    }
+
+    size_t slot;
+    while (work_queue_claim(queue, 1, batch->count, &slot) > 0) {
+        size_t i = order[slot];
+        int n = batch->sizes[i];
+        if (prep) strassen_prepared_multiply(prep, batch->B[i], n, batch->C[i], n, work);
+        else strassen_multiply_ws(batch->A[i], n, batch->B[i], n, batch->C[i], n, n, work);
+    }
+    free(work);
+}
+
+int batch_multiply(batch_t *batch, int p) {
+    if (batch->count == 0) return 0;
+
+    size_t *order = malloc(batch->count * sizeof(size_t));
+    work_queue_t *queue = mmap(NULL, sizeof(work_queue_t), PROT_READ | PROT_WRITE,
+                               MAP_SHARED | MAP_ANONYMOUS, -1, 0);
+    if (!order) {
+        perror("malloc");
+        if (queue != MAP_FAILED) munmap(queue, sizeof(work_queue_t));
+        return -1;
+    }
+    if (queue == MAP_FAILED) {
+        perror("mmap");
+        free(order);
+        return -1;
+    }
+
+    int max_n = 0, shared_a = 1;
+    for (size_t i = 0; i < batch->count; i++) {
+        order[i] = i;
+        if (batch->sizes[i] > max_n) max_n = batch->sizes[i];
+        if (batch->A[i] != batch->A[0] || batch->sizes[i] != batch->sizes[0]) shared_a = 0;
+    }
+    // One A for every product: build its operand tree once, before the fork,
+    // so the workers read it copy-on-write instead of each preparing it
+    strassen_prepared_t prep;
+    int prepared = 0;
+    if (shared_a && batch->count > 1) {
+        int n = batch->sizes[0];
+        if (strassen_prepare(&prep, n, n, n, batch->A[0], n, 0) != 0) {
+            free(order);
+            munmap(queue, sizeof(work_queue_t));
+            return -1;
+        }
+        prepared = 1;
+        batch->prepared_bytes = prep.bytes;
+    }
+    // Largest products first so the last claims are the cheap ones
+    qsort_r(order, batch->count, sizeof(size_t), by_size_desc, batch->sizes);
+    work_queue_init(queue);
+
+    // More workers than products would only sit idle
+    int workers = (size_t)p < batch->count ? p : (int)batch->count;
+    pid_t *pids = calloc((size_t)workers, sizeof(pid_t));
+    if (!pids) {
+        perror("calloc");
+        free(order);
+        munmap(queue, sizeof(work_queue_t));
+        if (prepared) strassen_prepared_free(&prep);
+        return -1;
+    }
+    int spawned = 0;
+    for (int w = 0; w < workers; w++) {
+        pid_t pid = fork();
+        if (pid < 0) {
+            perror("fork");
+            fprintf(stderr, "Failed to create process %d\n", w);
+            continue;
+        }
+        if (pid == 0) {
+            batch_worker(batch, order, queue, max_n, prepared ? &prep : NULL);
+            _exit(0);
+        }
+        pids[spawned++] = pid;
+    }
+
+    int failed = spawned == 0;
+    for (int w = 0; w < spawned; w++) {
+        int status, wrc;
+        while ((wrc = waitpid(pids[w], &status, 0)) == -1 && errno == EINTR) {}
+        if (wrc == -1 || !WIFEXITED(status) || WEXITSTATUS(status) != 0) failed = 1;
+    }
+
+    free(pids);
+    free(order);
+    munmap(queue, sizeof(work_queue_t));
+    if (prepared) strassen_prepared_free(&prep);
+    return failed ? -1 : 0;
+}
+
+void batch_release(batch_t *batch) {
+    if (batch->in_map) munmap(batch->in_map, batch->in_bytes);
+    if (batch->out_map) munmap(batch->out_map, batch->out_bytes);
+    free(batch->sizes);
+    free(batch->A);
+    free(batch->B);
+    free(batch->C);
+    memset(batch, 0, sizeof(*batch));
+}
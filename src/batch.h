@@ -0,0 +1,59 @@
+#ifndef BATCH_H
+#define BATCH_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+// Batch file layout (native endianness):
+//   char magic[8]        "MMBATCH1" for inputs, "MMRESLT1" for results
+//   uint64_t count
+//   count records of:    uint64_t n, then n*n doubles of A and n*n of B
+//                        (results: uint64_t n, then n*n doubles of C)
+#define BATCH_INPUT_MAGIC "MMBATCH1"
+#define BATCH_RESULT_MAGIC "MMRESLT1"
+
+// N independent square products A_i * B_i = C_i. All pointers refer to
+// MAP_SHARED memory (a mapped batch file or an anonymous shared region)
+// so forked workers can read the inputs and write the results in place.
+typedef struct {
+    size_t count;
+    int *sizes;
+    const double **A;
+    const double **B;
+    double **C;
+    void *in_map;       // mapping backing A/B
+    size_t in_bytes;
+    void *out_map;      // mapping backing C
+    size_t out_bytes;
+    size_t prepared_bytes;  // tree built for a shared A by batch_multiply, else 0
+} batch_t;
+
+// Map a batch input file read-only and index its pairs. Returns 0 on success.
+int batch_map_file(const char *path, batch_t *batch);
+
+// Allocate `count` random pairs of size n in anonymous shared memory
+// (values rand() % 100, seeded by the caller). Returns 0 on success.
+int batch_generate(batch_t *batch, size_t count, int n);
+
+// Like batch_generate, but all pairs share one A (a fixed weight matrix
+// multiplied by `count` different B). Returns 0 on success.
+int batch_generate_shared_a(batch_t *batch, size_t count, int n);
+
+// Map storage for the results: a result file at `path` (written in place
+// through MAP_SHARED) or anonymous shared memory when path is NULL.
+int batch_map_output(batch_t *batch, const char *path);
+
+// Write the input pairs of a batch to a batch input file
+int batch_write_input(const char *path, const batch_t *batch);
+
+// Multiply every pair with p forked workers. Workers claim whole products,
+// largest first, from a lock-free queue, and run sequential Strassen on each
+// (any size). When every pair uses the same A (same pointer and size), A is
+// prepared once with strassen_prepare before the fork and the workers share
+// the tree. Returns 0 on success.
+int batch_multiply(batch_t *batch, int p);
+
+// Unmap everything and free the index
+void batch_release(batch_t *batch);
+
+#endif
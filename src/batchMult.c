@@ -0,0 +1,148 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/time.h>
+#include <getopt.h>
+#include "common.h"
+#include "batch.h"
+#include "strassen_utils.h"
+
+static void usage(const char *prog) {
+    fprintf(stderr, "Usage: %s <num_processes> (--in pairs.bin | --count N --size m) "
+                    "[--shared-a] [--out results.bin] [--save-input pairs.bin] [--cutoff N] [--verify[=k]]\n"
+                    "--shared-a generates one A for all --count products (prepared once).\n"
+                    "--verify checks every product with k (default %d) rounds of Freivalds' test;\n"
+                    "exit status %d if one fails\n", prog, VERIFY_DEFAULT_ROUNDS, VERIFY_EXIT_FAILED);
+}
+
+int main(int argc, char *argv[]) {
+    const char *in_path = NULL;
+    const char *out_path = NULL;
+    const char *save_path = NULL;
+    long count = 0;
+    int size = 0;
+    int shared_a = 0;
+    int verify = 0;
+    static struct option long_options[] = {
+        {"in", required_argument, NULL, 'i'},
+        {"out", required_argument, NULL, 'o'},
+        {"save-input", required_argument, NULL, 's'},
+        {"count", required_argument, NULL, 'n'},
+        {"size", required_argument, NULL, 'm'},
+        {"cutoff", required_argument, NULL, 'C'},
+        {"shared-a", no_argument, NULL, 'S'},
+        {"verify", optional_argument, NULL, 'V'},
+        {NULL, 0, NULL, 0}
+    };
+    int opt;
+    while ((opt = getopt_long(argc, argv, "", long_options, NULL)) != -1) {
+        switch (opt) {
+        case 'i': in_path = optarg; break;
+        case 'o': out_path = optarg; break;
+        case 's': save_path = optarg; break;
+        case 'n': count = atol(optarg); break;
+        case 'm': size = atoi(optarg); break;
+        case 'S': shared_a = 1; break;
+        case 'C':
+            if (atoi(optarg) <= 0) {
+                fprintf(stderr, "--cutoff must be positive\n");
+                return 1;
+            }
+            strassen_set_cutoff(atoi(optarg));
+            break;
+        case 'V':
+            verify = parse_verify_rounds(optarg);
+            if (verify < 0) {
+                fprintf(stderr, "--verify takes a number of rounds between 1 and %d\n", FREIVALDS_MAX_ROUNDS);
+                return 1;
+            }
+            break;
+        default:
+            usage(argv[0]);
+            return 1;
+        }
+    }
+    if (argc - optind < 1 || (!in_path && (count <= 0 || size <= 0)) || (shared_a && in_path)) {
+        usage(argv[0]);
+        return 1;
+    }
+
+    int p = atoi(argv[optind]);
+    if (p <= 0) {
+        fprintf(stderr, "num_processes must be positive\n");
+        return 1;
+    }
+
+    batch_t batch;
+    if (in_path) {
+        if (batch_map_file(in_path, &batch) != 0) return 1;
+    } else {
+        // Use fixed seed for testing consistency across implementations
+        srand(12345);
+        int rc = shared_a ? batch_generate_shared_a(&batch, (size_t)count, size)
+                          : batch_generate(&batch, (size_t)count, size);
+        if (rc != 0) return 1;
+    }
+    if (save_path && batch_write_input(save_path, &batch) != 0) {
+        batch_release(&batch);
+        return 1;
+    }
+    if (batch_map_output(&batch, out_path) != 0) {
+        batch_release(&batch);
+        return 1;
+    }
+
+    struct timeval start, end;
+    gettimeofday(&start, NULL);
+
+    // Batch-level parallelism: each worker computes whole products
+    if (batch_multiply(&batch, p) != 0) {
+        fprintf(stderr, "Batch multiplication failed\n");
+        batch_release(&batch);
+        return 1;
+    }
+
+    gettimeofday(&end, NULL);
+    double time_taken = (end.tv_sec - start.tv_sec) * 1e6 + (end.tv_usec - start.tv_usec);
+    printf("batchMult: count=%zu, p=%d, time=%.0f microseconds\n", batch.count, p, time_taken);
+    if (batch.prepared_bytes) {
+        printf("  shared A prepared once: %.1f MB\n", batch.prepared_bytes / 1048576.0);
+    }
+
+    // --verify: every product is checked; the line shows the worst residual
+    // (relative to its tolerance) and the total verification time
+    int status = 0;
+    if (verify) {
+        verify_result_t worst = {0};
+        size_t failed = 0;
+        double total_us = 0.0;
+        for (size_t i = 0; i < batch.count && status == 0; i++) {
+            verify_result_t vr;
+            int vrc = freivalds_verify(batch.A[i], batch.B[i], batch.C[i], batch.sizes[i], verify, p, &vr);
+            if (vrc < 0) {
+                status = 1;
+                break;
+            }
+            if (vrc > 0) failed++;
+            total_us += vr.time_us;
+            if (i == 0 || !(vr.max_residual / vr.tolerance <= worst.max_residual / worst.tolerance)) worst = vr;
+        }
+        if (status == 0) {
+            worst.time_us = total_us;
+            worst.passed = failed == 0;
+            freivalds_print(stdout, &worst);
+            if (failed) {
+                printf("  %zu of %zu products failed verification\n", failed, batch.count);
+                status = VERIFY_EXIT_FAILED;
+            }
+        }
+    }
+
+    if (batch.count == 1 && batch.sizes[0] <= 10) {
+        printf("Result C:\n");
+        printm(batch.sizes[0], batch.C[0]);
+    }
+
+    batch_release(&batch);
+    return status;
+}
@@ -0,0 +1,191 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <signal.h>
+#include <unistd.h>
+#include <sys/time.h>
+#include <sys/wait.h>
+#include <getopt.h>
+#include "strassen_utils.h"
+#include "gemm_kernel.h"
+#include "simd_kernels.h"
+
+// Candidate cutoffs, roughly half-octave steps
+static const int candidates[] = {16, 24, 32, 48, 64, 96, 128, 192, 256, 384, 512, 768, 1024, 1536, 2048};
+#define NUM_CANDIDATES ((int)(sizeof(candidates) / sizeof(candidates[0])))
+
+static void usage(const char *prog) {
+    fprintf(stderr, "Usage: %s [--min N] [--max N] [--reps R] [--procs P] [--save[=path]]\n"
+                    "Times the base kernel against one Strassen level for sizes min..max and\n"
+                    "reports the best cutoff; --save writes it to the profile read at startup\n"
+                    "(default: $STRASSEN_PROFILE or ~/%s).\n", prog, STRASSEN_PROFILE_NAME);
+}
+
+static double now_us(void) {
+    struct timeval tv;
+    gettimeofday(&tv, NULL);
+    return tv.tv_sec * 1e6 + tv.tv_usec;
+}
+
+// Best of `reps` runs (after one warm-up) of the blocked kernel on n x n
+static double time_base(const double *A, const double *B, double *C, int n, int reps) {
+    double best = 0.0;
+    for (int r = 0; r <= reps; r++) {
+        double t0 = now_us();
+        gemm_blocked(n, n, n, 1.0, A, n, B, n, 0.0, C, n);
+        double t = now_us() - t0;
+        if (r > 0 && (best == 0.0 || t < best)) best = t;
+    }
+    return best;
+}
+
+// Best of `reps` runs of exactly one Strassen level over the base kernel
+static double time_one_level(const double *A, const double *B, double *C, int n, int reps) {
+    strassen_set_cutoff(n / 2);
+    size_t ws = strassen_workspace_size(n);
+    double *work = malloc(ws * sizeof(double));
+    if (!work) {
+        perror("malloc");
+        exit(1);
+    }
+    double best = 0.0;
+    for (int r = 0; r <= reps; r++) {
+        double t0 = now_us();
+        strassen_multiply_ws(A, n, B, n, C, n, n, work);
+        double t = now_us() - t0;
+        if (r > 0 && (best == 0.0 || t < best)) best = t;
+    }
+    free(work);
+    return best;
+}
+
+// Keep the other cores busy with the same kernel so the timing sees the
+// cache and memory-bandwidth contention of a parallel run
+static void start_load(pid_t *pids, int count, const double *A, const double *B, int n) {
+    for (int i = 0; i < count; i++) {
+        pids[i] = fork();
+        if (pids[i] == 0) {
+            double *C = malloc((size_t)n * n * sizeof(double));
+            if (!C) _exit(1);
+            while (1) gemm_blocked(n, n, n, 1.0, A, n, B, n, 0.0, C, n);
+        }
+    }
+}
+
+static void stop_load(pid_t *pids, int count) {
+    for (int i = 0; i < count; i++) {
+        if (pids[i] > 0) {
+            kill(pids[i], SIGTERM);
+            waitpid(pids[i], NULL, 0);
+        }
+    }
+}
+
+int main(int argc, char *argv[]) {
+    int min_n = 32, max_n = 1024, reps = 3, procs = 1;
+    int save = 0;
+    const char *save_path = NULL;
+    static struct option long_options[] = {
+        {"min", required_argument, NULL, 'm'},
+        {"max", required_argument, NULL, 'M'},
+        {"reps", required_argument, NULL, 'r'},
+        {"procs", required_argument, NULL, 'p'},
+        {"save", optional_argument, NULL, 's'},
+        {NULL, 0, NULL, 0}
+    };
+    int opt;
+    while ((opt = getopt_long(argc, argv, "", long_options, NULL)) != -1) {
+        switch (opt) {
+        case 'm': min_n = atoi(optarg); break;
+        case 'M': max_n = atoi(optarg); break;
+        case 'r': reps = atoi(optarg); break;
+        case 'p': procs = atoi(optarg); break;
+        case 's':
+            save = 1;
+            save_path = optarg;
+            break;
+        default:
+            usage(argv[0]);
+            return 1;
+        }
+    }
+    if (optind != argc || min_n <= 0 || max_n < min_n || reps <= 0 || procs <= 0) {
+        usage(argv[0]);
+        return 1;
+    }
+    if (save && !save_path) {
+        save_path = strassen_profile_path();
+        if (!save_path) {
+            fprintf(stderr, "No profile path: set STRASSEN_PROFILE or HOME, or pass --save=path\n");
+            return 1;
+        }
+    }
+
+    // Sizes where one level is tested: a level at n has children of n / 2
+    int sizes[NUM_CANDIDATES], count = 0;
+    for (int i = 0; i < NUM_CANDIDATES; i++) {
+        if (candidates[i] >= min_n && candidates[i] <= max_n) sizes[count++] = candidates[i];
+    }
+    if (count == 0) {
+        fprintf(stderr, "No candidate sizes between %d and %d\n", min_n, max_n);
+        return 1;
+    }
+
+    int largest = sizes[count - 1];
+    double *A = malloc((size_t)largest * largest * sizeof(double));
+    double *B = malloc((size_t)largest * largest * sizeof(double));
+    double *C = malloc((size_t)largest * largest * sizeof(double));
+    pid_t *load = calloc((size_t)procs, sizeof(pid_t));
+    int *strassen_wins = calloc((size_t)count, sizeof(int));
+    if (!A || !B || !C || !load || !strassen_wins) {
+        perror("malloc");
+        return 1;
+    }
+    srand(12345);
+    for (size_t i = 0; i < (size_t)largest * largest; i++) {
+        A[i] = (double)(rand() % 100);
+        B[i] = (double)(rand() % 100);
+    }
+
+    // The crossover depends on how fast the base kernel is, so name the variant
+    printf("Kernels: %s (STRASSEN_SIMD to override)\n", simd_kernels()->name);
+    printf("%8s %14s %14s %8s\n", "n", "base (us)", "1 level (us)", "ratio");
+    for (int i = 0; i < count; i++) {
+        int n = sizes[i];
+        start_load(load, procs - 1, A, B, n);
+        double base = time_base(A, B, C, n, reps);
+        double level = time_one_level(A, B, C, n, reps);
+        stop_load(load, procs - 1);
+        strassen_wins[i] = level < base;
+        printf("%8d %14.0f %14.0f %8.3f\n", n, base, level, level / base);
+    }
+
+    // Recurse from the smallest size where one level wins and keeps winning at
+    // most larger sizes (at least half of them), so one noisy loss near the top
+    // does not throw away a clear crossover; below that the base kernel runs
+    int first_win = count, wins = 0;
+    for (int i = count - 1; i >= 0; i--) {
+        wins += strassen_wins[i];
+        if (strassen_wins[i] && 2 * wins >= count - i) first_win = i;
+    }
+    int cutoff;
+    if (first_win == count) {
+        cutoff = sizes[count - 1];
+        printf("One Strassen level did not win at the largest size (n=%d); cutoff = %d\n", cutoff, cutoff);
+    } else {
+        int later_wins = 0;
+        for (int i = first_win; i < count; i++) later_wins += strassen_wins[i];
+        cutoff = first_win > 0 ? sizes[first_win - 1] : sizes[0] - 1;
+        printf("One Strassen level wins from n=%d (%d of %d sizes up to n=%d); best cutoff = %d\n",
+               sizes[first_win], later_wins, count - first_win, sizes[count - 1], cutoff);
+    }
+
+    int rc = 0;
+    if (save) {
+        rc = strassen_save_profile(save_path, cutoff) == 0 ? 0 : 1;
+        if (rc == 0) printf("Saved cutoff=%d to %s\n", cutoff, save_path);
+    }
+
+    free(A); free(B); free(C); free(load); free(strassen_wins);
+    return rc;
+}
@@ -16,6 +16,19 @@ static inline void populate(int size, double *A, double *B) {
     }
 }
 
+// Sparse test inputs: each entry of A and B is nonzero (1..99) with
+// probability `density`, at uniformly random positions (see src/sparse.h)
+static inline void populate_sparse(int size, double *A, double *B, double density) {
+    srand((unsigned)time(NULL) ^ (unsigned)getpid());
+    double cut = density * ((double)RAND_MAX + 1.0);
+    for (int i = 0; i < size; i++) {
+        for (int j = 0; j < size; j++) {
+            A[i * size + j] = rand() < cut ? (double)(1 + rand() % 99) : 0.0;
+            B[i * size + j] = rand() < cut ? (double)(1 + rand() % 99) : 0.0;
+        }
+    }
+}
+
 static inline void printm(int size, double *M) {
     for (int i = 0; i < size; i++) {
         for (int j = 0; j < size; j++)
@@ -24,4 +37,36 @@ static inline void printm(int size, double *M) {
     }
 }
 
+static inline void printm_f32(int size, const float *M) {
+    for (int i = 0; i < size; i++) {
+        for (int j = 0; j < size; j++)
+            printf("%6.1f ", M[i * size + j]);
+        printf("\n");
+    }
+}
+
+// Rows of a float32 result that are checked against a float64 recomputation
+#define PRECISION_CHECK_ROWS 16
+
+// --verify[=k]: k rounds of Freivalds' check on C after the timed multiply
+// (freivalds_verify in strassen_utils.h); a failed check exits with this code
+#define VERIFY_DEFAULT_ROUNDS 2
+#define VERIFY_EXIT_FAILED 2
+
+// Rounds asked for by --verify's optional argument, -1 if it is not a count
+static inline int parse_verify_rounds(const char *arg) {
+    if (!arg) return VERIFY_DEFAULT_ROUNDS;
+    int rounds = atoi(arg);
+    return rounds > 0 && rounds <= 64 ? rounds : -1;  // 64 = FREIVALDS_MAX_ROUNDS
+}
+
+// Machine-readable result line (--json), one object per run, read by
+// tools/bench_runner.py; p is 1 for the sequential program. variant is the
+// label of the text line ("sequentialMult (<variant>): ..."), NULL for none
+static inline void print_json_result(const char *program, const char *variant, int m, int p, double time_us) {
+    printf("{\"program\": \"%s\", ", program);
+    if (variant) printf("\"variant\": \"%s\", ", variant);
+    printf("\"matrix_size\": %d, \"processes\": %d, \"time_us\": %.0f}\n", m, p, time_us);
+}
+
 #endif // COMMON_H
@@ -0,0 +1,244 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <signal.h>
+#include <unistd.h>
+#include <sys/time.h>
+#include <sys/wait.h>
+#include <getopt.h>
+#include "common.h"
+#include "summa.h"
+#include "matrix_io.h"
+#include "strassen_utils.h"
+
+static void usage(const char *prog) {
+    fprintf(stderr, "Usage: %s <matrix_size> <num_processes> [--grid RxC] [--panel W] [--cutoff N] [--out C.mtx] [--json]\n"
+                    "       [--verify[=k]]\n"
+                    "       %s --a A.mtx --b B.mtx <num_processes> [options]\n"
+                    "       %s --listen PORT <matrix_size> <num_processes> [options]   (coordinator only)\n"
+                    "       %s --join HOST:PORT                                         (one worker)\n"
+                    "Without --listen the workers are local processes talking over loopback TCP.\n"
+                    "--grid defaults to the most square factorisation of num_processes.\n"
+                    "--verify gathers C (or maps --out) and checks it with k (default %d) rounds of\n"
+                    "Freivalds' test in num_processes local workers; exit status %d if it fails\n",
+            prog, prog, prog, prog, VERIFY_DEFAULT_ROUNDS, VERIFY_EXIT_FAILED);
+}
+
+// Local mode: the workers are forked once the coordinator is listening
+typedef struct {
+    int count;
+    pid_t *pids;
+} local_workers_t;
+
+static int spawn_local_workers(void *arg, int port) {
+    local_workers_t *lw = arg;
+    fflush(stdout);
+    for (int w = 0; w < lw->count; w++) {
+        pid_t pid = fork();
+        if (pid < 0) {
+            perror("fork");
+            return -1;
+        }
+        if (pid == 0) _exit(summa_work("127.0.0.1", port) == 0 ? 0 : 1);
+        lw->pids[w] = pid;
+    }
+    return 0;
+}
+
+// Reap the local workers; after a failure the survivors are killed first
+static int reap_local_workers(local_workers_t *lw, int failed) {
+    int rc = 0;
+    for (int w = 0; w < lw->count; w++) {
+        if (lw->pids[w] <= 0) continue;
+        if (failed) kill(lw->pids[w], SIGTERM);
+        int status;
+        if (waitpid(lw->pids[w], &status, 0) < 0 || !WIFEXITED(status) || WEXITSTATUS(status) != 0) rc = -1;
+    }
+    return rc;
+}
+
+int main(int argc, char *argv[]) {
+    summa_job_t job;
+    memset(&job, 0, sizeof(job));
+    const char *join = NULL;
+    int listen_port = -1;
+    int json = 0;
+    int verify = 0;
+    static struct option long_options[] = {
+        {"grid", required_argument, NULL, 'g'},
+        {"panel", required_argument, NULL, 'w'},
+        {"cutoff", required_argument, NULL, 'C'},
+        {"a", required_argument, NULL, 'a'},
+        {"b", required_argument, NULL, 'b'},
+        {"out", required_argument, NULL, 'o'},
+        {"listen", required_argument, NULL, 'l'},
+        {"join", required_argument, NULL, 'J'},
+        {"json", no_argument, NULL, 'j'},
+        {"verify", optional_argument, NULL, 'V'},
+        {NULL, 0, NULL, 0}
+    };
+    int opt;
+    while ((opt = getopt_long(argc, argv, "", long_options, NULL)) != -1) {
+        switch (opt) {
+        case 'g':
+            if (sscanf(optarg, "%dx%d", &job.grid_rows, &job.grid_cols) != 2 ||
+                job.grid_rows <= 0 || job.grid_cols <= 0) {
+                fprintf(stderr, "--grid must look like 2x3\n");
+                return 1;
+            }
+            break;
+        case 'w':
+            job.panel = atoi(optarg);
+            if (job.panel <= 0) {
+                fprintf(stderr, "--panel must be positive\n");
+                return 1;
+            }
+            break;
+        case 'C':
+            job.cutoff = atoi(optarg);
+            if (job.cutoff <= 0) {
+                fprintf(stderr, "--cutoff must be positive\n");
+                return 1;
+            }
+            break;
+        case 'a': job.a_path = optarg; break;
+        case 'b': job.b_path = optarg; break;
+        case 'o': job.out_path = optarg; break;
+        case 'l': listen_port = atoi(optarg); break;
+        case 'J': join = optarg; break;
+        case 'j': json = 1; break;
+        case 'V':
+            verify = parse_verify_rounds(optarg);
+            if (verify < 0) {
+                fprintf(stderr, "--verify takes a number of rounds between 1 and %d\n", FREIVALDS_MAX_ROUNDS);
+                return 1;
+            }
+            break;
+        default:
+            usage(argv[0]);
+            return 1;
+        }
+    }
+
+    if (join) {
+        char host[256];
+        int port;
+        const char *colon = strrchr(join, ':');
+        if (!colon || colon == join || (size_t)(colon - join) >= sizeof(host) || (port = atoi(colon + 1)) <= 0) {
+            fprintf(stderr, "--join must look like HOST:PORT\n");
+            return 1;
+        }
+        memcpy(host, join, (size_t)(colon - join));
+        host[colon - join] = '\0';
+        return summa_work(host, port) == 0 ? 0 : 1;
+    }
+
+    int from_files = job.a_path || job.b_path;
+    if ((from_files && (!job.a_path || !job.b_path || argc - optind != 1)) ||
+        (!from_files && argc - optind != 2)) {
+        usage(argv[0]);
+        return 1;
+    }
+    int p = atoi(argv[argc - 1]);
+    if (from_files) {
+        matrix_stream_t probe;
+        if (matrix_stream_open(job.a_path, &probe) != 0) return 1;
+        job.m = (int)probe.rows;
+        matrix_stream_close(&probe);
+    } else {
+        job.m = atoi(argv[optind]);
+    }
+    if (job.m <= 0 || p <= 0) {
+        fprintf(stderr, "matrix_size and num_processes must be positive\n");
+        return 1;
+    }
+    if (job.grid_rows == 0) summa_grid_for(p, &job.grid_rows, &job.grid_cols);
+    if (job.grid_rows * job.grid_cols != p) {
+        fprintf(stderr, "--grid %dx%d does not match %d processes\n", job.grid_rows, job.grid_cols, p);
+        return 1;
+    }
+    if (job.grid_rows > job.m || job.grid_cols > job.m) {
+        fprintf(stderr, "The %dx%d grid is larger than the %dx%d matrix\n", job.grid_rows, job.grid_cols,
+                job.m, job.m);
+        return 1;
+    }
+
+    // Small results are kept in memory and printed like the other programs do;
+    // --verify without --out gathers C in memory too
+    int print_c = job.m <= 10 && !json;
+    if (print_c || (verify && !job.out_path)) {
+        job.c_small = calloc((size_t)job.m * job.m, sizeof(double));
+        if (!job.c_small) {
+            perror("calloc");
+            return 1;
+        }
+    }
+
+    local_workers_t local = { p, NULL };
+    int local_mode = listen_port < 0;
+    if (local_mode) {
+        local.pids = calloc((size_t)p, sizeof(pid_t));
+        if (!local.pids) {
+            perror("calloc");
+            return 1;
+        }
+    } else {
+        fprintf(stderr, "distMult: waiting for %d workers on port %d\n", p,
+                listen_port ? listen_port : SUMMA_DEFAULT_PORT);
+    }
+
+    summa_stats_t stats;
+    struct timeval start, end;
+    gettimeofday(&start, NULL);
+    int rc = summa_coordinate(&job, local_mode ? 0 : (listen_port ? listen_port : SUMMA_DEFAULT_PORT),
+                              local_mode ? spawn_local_workers : NULL, &local, &stats);
+    gettimeofday(&end, NULL);
+    if (local_mode && reap_local_workers(&local, rc != 0) != 0 && rc == 0) {
+        fprintf(stderr, "A local worker exited with an error\n");
+        rc = -1;
+    }
+    free(local.pids);
+    if (rc != 0) {
+        free(job.c_small);
+        return 1;
+    }
+
+    double time_taken = (end.tv_sec - start.tv_sec) * 1e6 + (end.tv_usec - start.tv_usec);
+    if (json) {
+        print_json_result("distMult", NULL, job.m, p, time_taken);
+    } else {
+        printf("distMult: m=%d, p=%d, time=%.0f microseconds\n", job.m, p, time_taken);
+        printf("  grid=%dx%d, panels=%d, scatter=%.0f, compute=%.0f, gather=%.0f microseconds, "
+               "max_wait=%.0f, max_local=%.0f microseconds, exchanged=%.1f MB\n",
+               job.grid_rows, job.grid_cols, stats.panels, stats.scatter_us, stats.compute_us,
+               stats.gather_us, stats.max_wait_us, stats.max_local_us, stats.bytes_exchanged / 1048576.0);
+    }
+
+    // --verify: A and B again from the files or the same fixed-seed data
+    int status = 0;
+    if (verify) {
+        matrix_operands_t ops;
+        matrix_file_t fc = {0};
+        if (matrix_operands_open(&ops, job.m, job.a_path, job.b_path, NULL) != 0) {
+            status = 1;
+        } else {
+            const double *C = job.c_small;
+            if (!C && matrix_file_open(job.out_path, &fc) == 0) C = fc.data;
+            verify_result_t vr;
+            int vrc = C ? freivalds_verify(ops.A, ops.B, C, job.m, verify, p, &vr) : -1;
+            if (vrc < 0) status = 1;
+            else freivalds_print(json ? stderr : stdout, &vr);
+            if (vrc > 0) status = VERIFY_EXIT_FAILED;
+            if (fc.map) matrix_file_close(&fc);
+            matrix_operands_close(&ops);
+        }
+    }
+
+    if (print_c) {
+        printf("Result C:\n");
+        printm(job.m, job.c_small);
+    }
+    free(job.c_small);
+    return status;
+}
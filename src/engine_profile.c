@@ -0,0 +1,132 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <string.h>
+#include <time.h>
+#include <unistd.h>
+#include "engine_profile.h"
+
+#ifdef __linux__
+#include <linux/perf_event.h>
+#include <sys/ioctl.h>
+#include <sys/syscall.h>
+#endif
+
+double profile_now_us(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec * 1e6 + ts.tv_nsec / 1e3;
+}
+
+#ifdef __linux__
+static const unsigned long long perf_configs[3] = {
+    PERF_COUNT_HW_CPU_CYCLES, PERF_COUNT_HW_INSTRUCTIONS, PERF_COUNT_HW_CACHE_MISSES
+};
+
+// User-space only, so it also works with perf_event_paranoid = 2
+static int open_counter(unsigned long long config) {
+    struct perf_event_attr attr;
+    memset(&attr, 0, sizeof(attr));
+    attr.size = sizeof(attr);
+    attr.type = PERF_TYPE_HARDWARE;
+    attr.config = config;
+    attr.disabled = 1;
+    attr.exclude_kernel = 1;
+    attr.exclude_hv = 1;
+    int fd = (int)syscall(SYS_perf_event_open, &attr, 0, -1, -1, 0);
+    if (fd < 0) return -1;
+    ioctl(fd, PERF_EVENT_IOC_RESET, 0);
+    ioctl(fd, PERF_EVENT_IOC_ENABLE, 0);
+    return fd;
+}
+#endif
+
+void perf_counters_start(perf_counters_t *pc) {
+    for (int i = 0; i < 3; i++) {
+#ifdef __linux__
+        pc->fd[i] = open_counter(perf_configs[i]);
+#else
+        pc->fd[i] = -1;
+#endif
+    }
+}
+
+void perf_counters_stop(perf_counters_t *pc, worker_stats_t *st) {
+    long long values[3];
+    for (int i = 0; i < 3; i++) {
+        values[i] = -1;
+        if (pc->fd[i] < 0) continue;
+#ifdef __linux__
+        ioctl(pc->fd[i], PERF_EVENT_IOC_DISABLE, 0);
+#endif
+        long long v;
+        if (read(pc->fd[i], &v, sizeof(v)) == (ssize_t)sizeof(v)) values[i] = v;
+        close(pc->fd[i]);
+        pc->fd[i] = -1;
+    }
+    st->cycles = values[0];
+    st->instructions = values[1];
+    st->llc_misses = values[2];
+}
+
+// Counter value or null when it could not be read
+static void print_counter(FILE *out, const char *name, long long value) {
+    if (value < 0) fprintf(out, "\"%s\": null", name);
+    else fprintf(out, "\"%s\": %lld", name, value);
+}
+
+void engine_profile_print_json(FILE *out, const char *program, int m, int p, double time_us,
+                               const engine_profile_t *prof) {
+    int n = prof->workers;
+    double compute_sum = 0.0, compute_max = 0.0, compute_min = 0.0;
+    double finish_max = 0.0, finish_min = 0.0, spawn_max = 0.0, spawn_sum = 0.0, queue_sum = 0.0;
+    long items_min = 0, items_max = 0;
+    int slowest = -1;
+    for (int w = 0; w < n; w++) {
+        const worker_stats_t *st = &prof->stats[w];
+        compute_sum += st->compute_us;
+        spawn_sum += st->spawn_us;
+        queue_sum += st->queue_us;
+        if (w == 0 || st->compute_us < compute_min) compute_min = st->compute_us;
+        if (w == 0 || st->compute_us > compute_max) compute_max = st->compute_us;
+        if (w == 0 || st->finish_us < finish_min) finish_min = st->finish_us;
+        if (w == 0 || st->finish_us > finish_max) {
+            finish_max = st->finish_us;
+            slowest = w;
+        }
+        if (w == 0 || st->items < items_min) items_min = st->items;
+        if (w == 0 || st->items > items_max) items_max = st->items;
+        if (st->spawn_us > spawn_max) spawn_max = st->spawn_us;
+    }
+    double compute_mean = n > 0 ? compute_sum / n : 0.0;
+
+    fprintf(out, "{\"program\": \"%s\", \"matrix_size\": %d, \"processes\": %d, \"time_us\": %.0f, ",
+            program, m, p, time_us);
+    fprintf(out, "\"workers_spawned\": %d, \"fork_us\": %.1f, \"reap_us\": %.1f, \"total_us\": %.1f, ",
+            n, prof->fork_us, prof->reap_us, prof->total_us);
+    fprintf(out, "\"workers\": [");
+    for (int w = 0; w < n; w++) {
+        const worker_stats_t *st = &prof->stats[w];
+        fprintf(out, "%s{\"worker\": %d, \"spawn_us\": %.1f, \"start_us\": %.1f, \"finish_us\": %.1f, "
+                     "\"queue_us\": %.1f, \"compute_us\": %.1f, \"claims\": %ld, \"items\": %ld, ",
+                w ? ", " : "", w, st->spawn_us, st->start_us, st->finish_us,
+                st->queue_us, st->compute_us, st->claims, st->items);
+        print_counter(out, "cycles", st->cycles);
+        fprintf(out, ", ");
+        print_counter(out, "instructions", st->instructions);
+        fprintf(out, ", ");
+        print_counter(out, "llc_misses", st->llc_misses);
+        fprintf(out, "}");
+    }
+    fprintf(out, "], ");
+
+    // imbalance = slowest worker's compute time over the mean (1.0 is perfect);
+    // reap_tail is the wait()/exit cost after the last worker finished
+    fprintf(out, "\"summary\": {\"compute_mean_us\": %.1f, \"compute_min_us\": %.1f, "
+                 "\"compute_max_us\": %.1f, \"imbalance\": %.3f, \"items_min\": %ld, \"items_max\": %ld, "
+                 "\"finish_spread_us\": %.1f, \"last_worker\": %d, \"spawn_mean_us\": %.1f, "
+                 "\"spawn_max_us\": %.1f, \"queue_total_us\": %.1f, \"reap_tail_us\": %.1f}}\n",
+            compute_mean, compute_min, compute_max,
+            compute_mean > 0.0 ? compute_max / compute_mean : 1.0, items_min, items_max,
+            finish_max - finish_min, slowest, n > 0 ? spawn_sum / n : 0.0,
+            spawn_max, queue_sum, n > 0 ? prof->total_us - finish_max : 0.0);
+}
@@ -0,0 +1,50 @@
+#ifndef ENGINE_PROFILE_H
+#define ENGINE_PROFILE_H
+
+#include <stdio.h>
+
+// What one forked worker did, recorded by the worker itself into shared memory.
+// All times are microseconds on CLOCK_MONOTONIC; start/finish are relative to
+// the moment the engine started forking.
+typedef struct {
+    double spawn_us;        // parent's fork() call -> first instruction in the child
+    double start_us;        // child started
+    double finish_us;       // child finished its last item
+    double queue_us;        // time spent claiming work from the shared queue
+    double compute_us;      // time inside the multiplication kernel
+    long claims;            // successful claims
+    long items;             // rows (row engine) or tiles (element engine) computed
+    long long cycles;       // perf counters over the whole worker; -1 if unavailable
+    long long instructions;
+    long long llc_misses;
+} worker_stats_t;
+
+// Parent-side view of one profiled run. The caller provides `stats` with room
+// for p entries; the engine fills the first `workers` of them.
+typedef struct {
+    int workers;            // workers actually spawned
+    double fork_us;         // parent: whole fork loop
+    double reap_us;         // parent: end of fork loop -> last child reaped
+    double total_us;
+    worker_stats_t *stats;
+} engine_profile_t;
+
+// CLOCK_MONOTONIC in microseconds (comparable between parent and children)
+double profile_now_us(void);
+
+// Hardware counters of the calling process (cycles, instructions, LLC misses)
+typedef struct {
+    int fd[3];
+} perf_counters_t;
+
+// Open and start the counters; any that perf_event_open refuses stay at -1
+void perf_counters_start(perf_counters_t *pc);
+
+// Stop the counters, store them in st and close them
+void perf_counters_stop(perf_counters_t *pc, worker_stats_t *st);
+
+// One JSON object: the run, every worker and a load-imbalance summary
+void engine_profile_print_json(FILE *out, const char *program, int m, int p, double time_us,
+                               const engine_profile_t *prof);
+
+#endif // ENGINE_PROFILE_H
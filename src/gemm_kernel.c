@@ -0,0 +1,429 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "gemm_kernel.h"
+#include "simd_kernels.h"
+
+static int block_mc = GEMM_DEFAULT_MC;
+static int block_kc = GEMM_DEFAULT_KC;
+static int block_nc = GEMM_DEFAULT_NC;
+static int block_env_loaded = 0;
+
+// Packing buffers are per thread so concurrent callers never share them
+static __thread double *pack_a = NULL;
+static __thread double *pack_b = NULL;
+static __thread size_t pack_a_cap = 0;
+static __thread size_t pack_b_cap = 0;
+static __thread float *pack_a_f32 = NULL;
+static __thread float *pack_b_f32 = NULL;
+static __thread size_t pack_a_f32_cap = 0;
+static __thread size_t pack_b_f32_cap = 0;
+
+static int round_up(int x, int multiple) {
+    return ((x + multiple - 1) / multiple) * multiple;
+}
+
+static void load_block_env(void) {
+    if (block_env_loaded) return;
+    block_env_loaded = 1;
+
+    const char *env = getenv("STRASSEN_BLOCK");
+    if (!env || !*env) return;
+
+    int mc = 0, kc = 0, nc = 0;
+    if (sscanf(env, "%d,%d,%d", &mc, &kc, &nc) < 1) {
+        fprintf(stderr, "Warning: ignoring malformed STRASSEN_BLOCK=\"%s\"\n", env);
+        return;
+    }
+    gemm_set_block_sizes(mc, kc, nc);
+}
+
+void gemm_set_block_sizes(int mc, int kc, int nc) {
+    block_env_loaded = 1;
+    // MC and NC must be multiples of the register tile so panels pack evenly
+    if (mc > 0) block_mc = round_up(mc, GEMM_MR);
+    if (kc > 0) block_kc = kc;
+    if (nc > 0) block_nc = round_up(nc, GEMM_NR);
+}
+
+void gemm_get_block_sizes(int *mc, int *kc, int *nc) {
+    load_block_env();
+    if (mc) *mc = block_mc;
+    if (kc) *kc = block_kc;
+    if (nc) *nc = block_nc;
+}
+
+int precision_parse(const char *name, precision_t *prec) {
+    if (strcmp(name, "fp64") == 0) *prec = PRECISION_FP64;
+    else if (strcmp(name, "fp32") == 0) *prec = PRECISION_FP32;
+    else if (strcmp(name, "mixed") == 0) *prec = PRECISION_MIXED;
+    else return -1;
+    return 0;
+}
+
+const char *precision_name(precision_t prec) {
+    switch (prec) {
+    case PRECISION_FP32: return "fp32";
+    case PRECISION_MIXED: return "mixed";
+    default: return "fp64";
+    }
+}
+
+// Grow a 64-byte aligned per-thread buffer to at least bytes
+static void *reserve_bytes(void **buf, size_t *cap, size_t bytes) {
+    if (bytes <= *cap) return *buf;
+    free(*buf);
+    *buf = NULL;
+    *cap = 0;
+    if (posix_memalign(buf, 64, bytes) != 0) {
+        *buf = NULL;
+        return NULL;
+    }
+    *cap = bytes;
+    return *buf;
+}
+
+static double *reserve(double **buf, size_t *cap, size_t count) {
+    size_t bytes = *cap * sizeof(double);
+    double *p = reserve_bytes((void **)buf, &bytes, count * sizeof(double));
+    *cap = bytes / sizeof(double);
+    return p;
+}
+
+// Pack an mc x kc block of A into MR-row micro-panels: panel[p][i] = A[i][p].
+// Rows past mc are zero-filled so the micro-kernel never needs a row guard.
+static void pack_a_block(int mc, int kc, const double *A, int lda, double *dst) {
+    for (int i0 = 0; i0 < mc; i0 += GEMM_MR) {
+        int rows = mc - i0 < GEMM_MR ? mc - i0 : GEMM_MR;
+        for (int p = 0; p < kc; p++) {
+            for (int i = 0; i < rows; i++) {
+                dst[i] = A[(size_t)(i0 + i) * lda + p];
+            }
+            for (int i = rows; i < GEMM_MR; i++) {
+                dst[i] = 0.0;
+            }
+            dst += GEMM_MR;
+        }
+    }
+}
+
+// Pack a kc x nc panel of B (scaled by alpha) into NR-column micro-panels:
+// panel[p][j] = alpha * B[p][j], zero-filled past nc.
+static void pack_b_panel(int kc, int nc, double alpha, const double *B, int ldb, double *dst) {
+    for (int j0 = 0; j0 < nc; j0 += GEMM_NR) {
+        int cols = nc - j0 < GEMM_NR ? nc - j0 : GEMM_NR;
+        for (int p = 0; p < kc; p++) {
+            const double *row = B + (size_t)p * ldb + j0;
+            for (int j = 0; j < cols; j++) {
+                dst[j] = alpha * row[j];
+            }
+            for (int j = cols; j < GEMM_NR; j++) {
+                dst[j] = 0.0;
+            }
+            dst += GEMM_NR;
+        }
+    }
+}
+
+// Write back an mr x nr (possibly partial) tile: C = beta * C + ab
+static void store_tile(int mr, int nr, const double *ab, double beta, double *C, int ldc) {
+    for (int i = 0; i < mr; i++) {
+        double *c = C + (size_t)i * ldc;
+        const double *t = ab + i * GEMM_NR;
+        if (beta == 0.0) {
+            for (int j = 0; j < nr; j++) c[j] = t[j];
+        } else if (beta == 1.0) {
+            for (int j = 0; j < nr; j++) c[j] += t[j];
+        } else {
+            for (int j = 0; j < nr; j++) c[j] = beta * c[j] + t[j];
+        }
+    }
+}
+
+static void scale_c(int m, int n, double beta, double *C, int ldc) {
+    for (int i = 0; i < m; i++) {
+        double *c = C + (size_t)i * ldc;
+        if (beta == 0.0) {
+            memset(c, 0, (size_t)n * sizeof(double));
+        } else {
+            for (int j = 0; j < n; j++) c[j] *= beta;
+        }
+    }
+}
+
+// Blocked GEMM: loops over NC column panels, KC depth slices and MC row blocks,
+// packing B and A once per block and running the MR x NR micro-kernel on them.
+// With pre set, A comes already packed (gemm_pack_a) and is never read.
+static void gemm_run(int m, int n, int k, double alpha, const double *A, int lda,
+                     const gemm_packed_t *pre, const double *B, int ldb,
+                     double beta, double *C, int ldc) {
+    if (m <= 0 || n <= 0) return;
+    if (k <= 0 || alpha == 0.0) {
+        if (beta != 1.0) scale_c(m, n, beta, C, ldc);
+        return;
+    }
+
+    load_block_env();
+    int mc_max = pre ? pre->mc : block_mc, kc_max = pre ? pre->kc : block_kc, nc_max = block_nc;
+    size_t m_padded = (size_t)round_up(m, GEMM_MR);
+
+    double *pa = pre ? NULL : reserve(&pack_a, &pack_a_cap, (size_t)mc_max * kc_max);
+    double *pb = reserve(&pack_b, &pack_b_cap, (size_t)kc_max * nc_max);
+    if ((!pre && !pa) || !pb) {
+        perror("posix_memalign");
+        fprintf(stderr, "Failed to allocate GEMM packing buffers\n");
+        exit(1);
+    }
+
+    // MR x NR register tile: ab = sum_p a[p][:] (outer) b[p][:], per-ISA variant
+    void (*micro_kernel)(int, const double *, const double *, double *) = simd_kernels()->micro;
+    double ab[GEMM_MR * GEMM_NR];
+
+    for (int jc = 0; jc < n; jc += nc_max) {
+        int nc = n - jc < nc_max ? n - jc : nc_max;
+
+        for (int pc = 0; pc < k; pc += kc_max) {
+            int kc = k - pc < kc_max ? k - pc : kc_max;
+            // Only the first depth slice applies beta; later slices accumulate
+            double beta_eff = pc == 0 ? beta : 1.0;
+
+            pack_b_panel(kc, nc, alpha, B + (size_t)pc * ldb + jc, ldb, pb);
+
+            for (int ic = 0; ic < m; ic += mc_max) {
+                int mc = m - ic < mc_max ? m - ic : mc_max;
+
+                const double *a_block;
+                if (pre) {
+                    a_block = pre->panels + (size_t)pc * m_padded + (size_t)ic * kc;
+                } else {
+                    pack_a_block(mc, kc, A + (size_t)ic * lda + pc, lda, pa);
+                    a_block = pa;
+                }
+
+                for (int jr = 0; jr < nc; jr += GEMM_NR) {
+                    int nr = nc - jr < GEMM_NR ? nc - jr : GEMM_NR;
+                    const double *b_sliver = pb + (size_t)jr * kc;
+
+                    for (int ir = 0; ir < mc; ir += GEMM_MR) {
+                        int mr = mc - ir < GEMM_MR ? mc - ir : GEMM_MR;
+                        const double *a_sliver = a_block + (size_t)ir * kc;
+
+                        micro_kernel(kc, a_sliver, b_sliver, ab);
+                        store_tile(mr, nr, ab, beta_eff,
+                                   C + (size_t)(ic + ir) * ldc + jc + jr, ldc);
+                    }
+                }
+            }
+        }
+    }
+}
+
+void gemm_blocked(int m, int n, int k, double alpha,
+                  const double *A, int lda, const double *B, int ldb,
+                  double beta, double *C, int ldc) {
+    gemm_run(m, n, k, alpha, A, lda, NULL, B, ldb, beta, C, ldc);
+}
+
+// Every KC slice holds the MC blocks of that slice back to back, so block
+// (pc, ic) starts at pc * round_up(m, MR) + ic * kc
+int gemm_pack_a(int m, int k, const double *A, int lda, gemm_packed_t *pa) {
+    memset(pa, 0, sizeof(*pa));
+    load_block_env();
+    pa->m = m;
+    pa->k = k;
+    pa->mc = block_mc;
+    pa->kc = block_kc;
+    size_t m_padded = (size_t)round_up(m, GEMM_MR);
+    size_t count = m_padded * (size_t)k;
+    if (count == 0) return 0;
+    if (posix_memalign((void **)&pa->panels, 64, count * sizeof(double)) != 0) {
+        pa->panels = NULL;
+        perror("posix_memalign");
+        fprintf(stderr, "Failed to allocate %zu packed doubles\n", count);
+        return -1;
+    }
+
+    for (int pc = 0; pc < k; pc += pa->kc) {
+        int kc = k - pc < pa->kc ? k - pc : pa->kc;
+        for (int ic = 0; ic < m; ic += pa->mc) {
+            int mc = m - ic < pa->mc ? m - ic : pa->mc;
+            pack_a_block(mc, kc, A + (size_t)ic * lda + pc, lda,
+                         pa->panels + (size_t)pc * m_padded + (size_t)ic * kc);
+        }
+    }
+    return 0;
+}
+
+size_t gemm_packed_bytes(const gemm_packed_t *pa) {
+    return (size_t)round_up(pa->m, GEMM_MR) * (size_t)pa->k * sizeof(double);
+}
+
+void gemm_packed_free(gemm_packed_t *pa) {
+    free(pa->panels);
+    memset(pa, 0, sizeof(*pa));
+}
+
+void gemm_blocked_packed(int n, const gemm_packed_t *A, const double *B, int ldb,
+                         double beta, double *C, int ldc) {
+    gemm_run(A->m, n, A->k, 1.0, NULL, 0, A, B, ldb, beta, C, ldc);
+}
+
+// float32 packing: the same layouts as above with GEMM_NR_F32-wide B micro-panels
+static void pack_a_block_f32(int mc, int kc, const float *A, int lda, float *dst) {
+    for (int i0 = 0; i0 < mc; i0 += GEMM_MR) {
+        int rows = mc - i0 < GEMM_MR ? mc - i0 : GEMM_MR;
+        for (int p = 0; p < kc; p++) {
+            for (int i = 0; i < rows; i++) {
+                dst[i] = A[(size_t)(i0 + i) * lda + p];
+            }
+            for (int i = rows; i < GEMM_MR; i++) {
+                dst[i] = 0.0f;
+            }
+            dst += GEMM_MR;
+        }
+    }
+}
+
+static void pack_b_panel_f32(int kc, int nc, float alpha, const float *B, int ldb, float *dst) {
+    for (int j0 = 0; j0 < nc; j0 += GEMM_NR_F32) {
+        int cols = nc - j0 < GEMM_NR_F32 ? nc - j0 : GEMM_NR_F32;
+        for (int p = 0; p < kc; p++) {
+            const float *row = B + (size_t)p * ldb + j0;
+            for (int j = 0; j < cols; j++) {
+                dst[j] = alpha * row[j];
+            }
+            for (int j = cols; j < GEMM_NR_F32; j++) {
+                dst[j] = 0.0f;
+            }
+            dst += GEMM_NR_F32;
+        }
+    }
+}
+
+// Mixed precision packing: float32 operands widened to double, in the
+// layouts the double micro-kernel expects. Each element is converted once per
+// block, so the conversion is O(1/n) of the multiply work.
+static void pack_a_block_mixed(int mc, int kc, const float *A, int lda, double *dst) {
+    for (int i0 = 0; i0 < mc; i0 += GEMM_MR) {
+        int rows = mc - i0 < GEMM_MR ? mc - i0 : GEMM_MR;
+        for (int p = 0; p < kc; p++) {
+            for (int i = 0; i < rows; i++) {
+                dst[i] = A[(size_t)(i0 + i) * lda + p];
+            }
+            for (int i = rows; i < GEMM_MR; i++) {
+                dst[i] = 0.0;
+            }
+            dst += GEMM_MR;
+        }
+    }
+}
+
+static void pack_b_panel_mixed(int kc, int nc, double alpha, const float *B, int ldb, double *dst) {
+    for (int j0 = 0; j0 < nc; j0 += GEMM_NR) {
+        int cols = nc - j0 < GEMM_NR ? nc - j0 : GEMM_NR;
+        for (int p = 0; p < kc; p++) {
+            const float *row = B + (size_t)p * ldb + j0;
+            for (int j = 0; j < cols; j++) {
+                dst[j] = alpha * row[j];
+            }
+            for (int j = cols; j < GEMM_NR; j++) {
+                dst[j] = 0.0;
+            }
+            dst += GEMM_NR;
+        }
+    }
+}
+
+// C = beta * C + ab for a float tile (ab_f) or a double tile (ab_d, mixed)
+static void store_tile_f32(int mr, int nr, int ld_ab, const float *ab_f, const double *ab_d,
+                           float beta, float *C, int ldc) {
+    for (int i = 0; i < mr; i++) {
+        float *c = C + (size_t)i * ldc;
+        for (int j = 0; j < nr; j++) {
+            double t = ab_f ? (double)ab_f[i * ld_ab + j] : ab_d[i * ld_ab + j];
+            if (beta == 0.0f) c[j] = (float)t;
+            else if (beta == 1.0f) c[j] = (float)((double)c[j] + t);
+            else c[j] = (float)((double)beta * c[j] + t);
+        }
+    }
+}
+
+void gemm_blocked_f32(int m, int n, int k, float alpha,
+                      const float *A, int lda, const float *B, int ldb,
+                      float beta, float *C, int ldc, precision_t prec) {
+    if (m <= 0 || n <= 0) return;
+    if (k <= 0 || alpha == 0.0f) {
+        if (beta == 1.0f) return;
+        for (int i = 0; i < m; i++) {
+            float *c = C + (size_t)i * ldc;
+            for (int j = 0; j < n; j++) c[j] = beta == 0.0f ? 0.0f : beta * c[j];
+        }
+        return;
+    }
+
+    int mixed = prec == PRECISION_MIXED;
+    int nr_tile = mixed ? GEMM_NR : GEMM_NR_F32;
+    load_block_env();
+    int mc_max = block_mc, kc_max = block_kc;
+    int nc_max = round_up(block_nc, GEMM_NR_F32);
+
+    // Mixed packs doubles into the fp64 buffers, fp32 packs floats into its own
+    float *pa = NULL, *pb = NULL;
+    double *pa_d = NULL, *pb_d = NULL;
+    if (mixed) {
+        pa_d = reserve(&pack_a, &pack_a_cap, (size_t)mc_max * kc_max);
+        pb_d = reserve(&pack_b, &pack_b_cap, (size_t)kc_max * nc_max);
+    } else {
+        size_t a_bytes = pack_a_f32_cap * sizeof(float), b_bytes = pack_b_f32_cap * sizeof(float);
+        pa = reserve_bytes((void **)&pack_a_f32, &a_bytes, (size_t)mc_max * kc_max * sizeof(float));
+        pb = reserve_bytes((void **)&pack_b_f32, &b_bytes, (size_t)kc_max * nc_max * sizeof(float));
+        pack_a_f32_cap = a_bytes / sizeof(float);
+        pack_b_f32_cap = b_bytes / sizeof(float);
+    }
+    if (mixed ? (!pa_d || !pb_d) : (!pa || !pb)) {
+        perror("posix_memalign");
+        fprintf(stderr, "Failed to allocate GEMM packing buffers\n");
+        exit(1);
+    }
+
+    const simd_kernels_t *kern = simd_kernels();
+    float ab_f[GEMM_MR * GEMM_NR_F32];
+    double ab_d[GEMM_MR * GEMM_NR];
+
+    for (int jc = 0; jc < n; jc += nc_max) {
+        int nc = n - jc < nc_max ? n - jc : nc_max;
+
+        for (int pc = 0; pc < k; pc += kc_max) {
+            int kc = k - pc < kc_max ? k - pc : kc_max;
+            float beta_eff = pc == 0 ? beta : 1.0f;
+
+            if (mixed) pack_b_panel_mixed(kc, nc, alpha, B + (size_t)pc * ldb + jc, ldb, pb_d);
+            else pack_b_panel_f32(kc, nc, alpha, B + (size_t)pc * ldb + jc, ldb, pb);
+
+            for (int ic = 0; ic < m; ic += mc_max) {
+                int mc = m - ic < mc_max ? m - ic : mc_max;
+
+                if (mixed) pack_a_block_mixed(mc, kc, A + (size_t)ic * lda + pc, lda, pa_d);
+                else pack_a_block_f32(mc, kc, A + (size_t)ic * lda + pc, lda, pa);
+
+                for (int jr = 0; jr < nc; jr += nr_tile) {
+                    int nr = nc - jr < nr_tile ? nc - jr : nr_tile;
+
+                    for (int ir = 0; ir < mc; ir += GEMM_MR) {
+                        int mr = mc - ir < GEMM_MR ? mc - ir : GEMM_MR;
+                        float *c = C + (size_t)(ic + ir) * ldc + jc + jr;
+
+                        if (mixed) {
+                            kern->micro(kc, pa_d + (size_t)ir * kc, pb_d + (size_t)jr * kc, ab_d);
+                            store_tile_f32(mr, nr, GEMM_NR, NULL, ab_d, beta_eff, c, ldc);
+                        } else {
+                            kern->micro_f32(kc, pa + (size_t)ir * kc, pb + (size_t)jr * kc, ab_f);
+                            store_tile_f32(mr, nr, GEMM_NR_F32, ab_f, NULL, beta_eff, c, ldc);
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,74 @@
+#ifndef GEMM_KERNEL_H
+#define GEMM_KERNEL_H
+
+#include <stddef.h>
+
+// Register tile computed by the micro-kernel (rows x columns of C)
+#define GEMM_MR 4
+#define GEMM_NR 8
+
+// float32 tile: twice as many columns, the same register bytes
+#define GEMM_NR_F32 16
+
+// Default cache blocking:
+//   MC x KC block of A is packed to stay resident in L2
+//   KC x NC panel of B is packed to stay resident in L3 (a KC x NR sliver in L1)
+#define GEMM_DEFAULT_MC 128
+#define GEMM_DEFAULT_KC 256
+#define GEMM_DEFAULT_NC 2048
+
+// Blocked GEMM on row-major strided operands:
+//   C[m x n] = alpha * A[m x k] * B[k x n] + beta * C
+// With beta == 0, C is write-only (its previous contents are never read).
+void gemm_blocked(int m, int n, int k, double alpha,
+                  const double *A, int lda, const double *B, int ldb,
+                  double beta, double *C, int ldc);
+
+// A operand packed once for many products with different B (prepared
+// Strassen leaves): the MR-row micro-panels gemm_blocked would build for every
+// KC slice and MC block, with the block sizes in effect when it was packed
+typedef struct {
+    int m, k;
+    int mc, kc;
+    double *panels;
+} gemm_packed_t;
+
+// Pack A (m x k, leading dimension lda). Returns 0 on success.
+int gemm_pack_a(int m, int k, const double *A, int lda, gemm_packed_t *pa);
+
+// Memory held by a packed operand
+size_t gemm_packed_bytes(const gemm_packed_t *pa);
+
+void gemm_packed_free(gemm_packed_t *pa);
+
+// gemm_blocked with alpha = 1 and a packed A: C[m x n] = A * B + beta * C
+void gemm_blocked_packed(int n, const gemm_packed_t *A, const double *B, int ldb,
+                         double beta, double *C, int ldc);
+
+// Element type / accumulation of a product (--precision)
+typedef enum {
+    PRECISION_FP64,     // double everywhere
+    PRECISION_FP32,     // float operands, float arithmetic
+    PRECISION_MIXED     // float operands and additions, double sums in the base kernel
+} precision_t;
+
+// "fp64", "fp32" or "mixed" -> *prec; returns 0 on success, -1 if unknown
+int precision_parse(const char *name, precision_t *prec);
+const char *precision_name(precision_t prec);
+
+// gemm_blocked on float32 operands. prec is PRECISION_FP32 (float tiles of
+// GEMM_MR x GEMM_NR_F32) or PRECISION_MIXED (panels widened to double while
+// packing, each KC-deep slice summed by the double micro-kernel and rounded
+// once when it is added to C).
+void gemm_blocked_f32(int m, int n, int k, float alpha,
+                      const float *A, int lda, const float *B, int ldb,
+                      float beta, float *C, int ldc, precision_t prec);
+
+// Override the cache block sizes; values <= 0 keep the current setting.
+// The initial values come from STRASSEN_BLOCK="mc[,kc[,nc]]" if it is set.
+void gemm_set_block_sizes(int mc, int kc, int nc);
+
+// Read the cache block sizes currently in effect
+void gemm_get_block_sizes(int *mc, int *kc, int *nc);
+
+#endif
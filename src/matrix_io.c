@@ -0,0 +1,422 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <errno.h>
+#include <unistd.h>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include "matrix_io.h"
+#include "placement.h"
+
+size_t matrix_dtype_size(uint32_t dtype) {
+    switch (dtype) {
+    case MATRIX_DTYPE_F64: return sizeof(double);
+    case MATRIX_DTYPE_F32: return sizeof(float);
+    default: return 0;
+    }
+}
+
+// Validate a header against the size of the file it was read from
+static int check_header(const char *path, const matrix_header_t *hdr, size_t file_bytes) {
+    size_t expected = 0;
+    int valid = memcmp(hdr->magic, MATRIX_FILE_MAGIC, 4) == 0 && hdr->version == MATRIX_FILE_VERSION;
+    if (valid && matrix_dtype_size(hdr->dtype) == 0) {
+        fprintf(stderr, "%s: unsupported dtype %u\n", path, hdr->dtype);
+        return -1;
+    }
+    if (valid) {
+        expected = sizeof(matrix_header_t) + (size_t)(hdr->rows * hdr->cols) * matrix_dtype_size(hdr->dtype);
+        valid = hdr->rows > 0 && hdr->cols > 0 && file_bytes >= expected;
+    }
+    if (!valid) {
+        fprintf(stderr, "%s: bad or truncated matrix file\n", path);
+        return -1;
+    }
+    return 0;
+}
+
+static void fill_header(matrix_header_t *hdr, uint64_t rows, uint64_t cols, uint32_t dtype) {
+    memset(hdr, 0, sizeof(*hdr));
+    memcpy(hdr->magic, MATRIX_FILE_MAGIC, 4);
+    hdr->version = MATRIX_FILE_VERSION;
+    hdr->dtype = dtype;
+    hdr->rows = rows;
+    hdr->cols = cols;
+}
+
+int matrix_file_open(const char *path, matrix_file_t *mf) {
+    memset(mf, 0, sizeof(*mf));
+
+    int fd = open(path, O_RDONLY);
+    if (fd == -1) {
+        perror(path);
+        return -1;
+    }
+    struct stat st;
+    if (fstat(fd, &st) == -1) {
+        perror(path);
+        close(fd);
+        return -1;
+    }
+    if ((size_t)st.st_size < sizeof(matrix_header_t)) {
+        fprintf(stderr, "%s: not a matrix file\n", path);
+        close(fd);
+        return -1;
+    }
+
+    void *map = mmap(NULL, (size_t)st.st_size, PROT_READ, MAP_SHARED, fd, 0);
+    close(fd);
+    if (map == MAP_FAILED) {
+        perror("mmap");
+        return -1;
+    }
+
+    const matrix_header_t *hdr = map;
+    if (check_header(path, hdr, (size_t)st.st_size) != 0) {
+        munmap(map, (size_t)st.st_size);
+        return -1;
+    }
+
+    mf->map = map;
+    mf->map_bytes = (size_t)st.st_size;
+    mf->data = (char *)map + sizeof(matrix_header_t);
+    mf->dtype = hdr->dtype;
+    mf->rows = hdr->rows;
+    mf->cols = hdr->cols;
+    return 0;
+}
+
+int matrix_file_create(const char *path, uint64_t rows, uint64_t cols, matrix_file_t *mf) {
+    return matrix_file_create_dtype(path, rows, cols, MATRIX_DTYPE_F64, mf);
+}
+
+int matrix_file_create_dtype(const char *path, uint64_t rows, uint64_t cols, uint32_t dtype,
+                             matrix_file_t *mf) {
+    memset(mf, 0, sizeof(*mf));
+    size_t bytes = sizeof(matrix_header_t) + (size_t)(rows * cols) * matrix_dtype_size(dtype);
+
+    int fd = open(path, O_RDWR | O_CREAT | O_TRUNC, 0644);
+    if (fd == -1) {
+        perror(path);
+        return -1;
+    }
+    if (ftruncate(fd, (off_t)bytes) == -1) {
+        perror("ftruncate");
+        close(fd);
+        return -1;
+    }
+    void *map = mmap(NULL, bytes, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    close(fd);
+    if (map == MAP_FAILED) {
+        perror("mmap");
+        return -1;
+    }
+
+    fill_header(map, rows, cols, dtype);
+
+    mf->map = map;
+    mf->map_bytes = bytes;
+    mf->data = (char *)map + sizeof(matrix_header_t);
+    mf->dtype = dtype;
+    mf->rows = rows;
+    mf->cols = cols;
+    return 0;
+}
+
+void matrix_file_close(matrix_file_t *mf) {
+    if (!mf->map) return;
+    munmap(mf->map, mf->map_bytes);
+    memset(mf, 0, sizeof(*mf));
+}
+
+// pread/pwrite move at most ~2 GB per call and may stop short; loop until done
+static int full_pread(int fd, void *buf, size_t bytes, off_t offset) {
+    char *dst = buf;
+    while (bytes > 0) {
+        ssize_t got = pread(fd, dst, bytes, offset);
+        if (got < 0 && errno == EINTR) continue;
+        if (got <= 0) return -1;
+        dst += got;
+        bytes -= (size_t)got;
+        offset += got;
+    }
+    return 0;
+}
+
+static int full_pwrite(int fd, const void *buf, size_t bytes, off_t offset) {
+    const char *src = buf;
+    while (bytes > 0) {
+        ssize_t put = pwrite(fd, src, bytes, offset);
+        if (put < 0 && errno == EINTR) continue;
+        if (put <= 0) return -1;
+        src += put;
+        bytes -= (size_t)put;
+        offset += put;
+    }
+    return 0;
+}
+
+int matrix_stream_open(const char *path, matrix_stream_t *ms) {
+    memset(ms, 0, sizeof(*ms));
+    ms->fd = -1;
+
+    int fd = open(path, O_RDONLY);
+    if (fd == -1) {
+        perror(path);
+        return -1;
+    }
+    struct stat st;
+    matrix_header_t hdr;
+    if (fstat(fd, &st) == -1 || full_pread(fd, &hdr, sizeof(hdr), 0) != 0) {
+        fprintf(stderr, "%s: cannot read matrix header\n", path);
+        close(fd);
+        return -1;
+    }
+    if (check_header(path, &hdr, (size_t)st.st_size) != 0) {
+        close(fd);
+        return -1;
+    }
+    if (hdr.dtype != MATRIX_DTYPE_F64) {
+        fprintf(stderr, "%s: tile streaming needs a float64 matrix file\n", path);
+        close(fd);
+        return -1;
+    }
+    ms->fd = fd;
+    ms->rows = hdr.rows;
+    ms->cols = hdr.cols;
+    return 0;
+}
+
+int matrix_stream_create(const char *path, uint64_t rows, uint64_t cols, matrix_stream_t *ms) {
+    memset(ms, 0, sizeof(*ms));
+    ms->fd = -1;
+
+    int fd = open(path, O_RDWR | O_CREAT | O_TRUNC, 0644);
+    if (fd == -1) {
+        perror(path);
+        return -1;
+    }
+    matrix_header_t hdr;
+    fill_header(&hdr, rows, cols, MATRIX_DTYPE_F64);
+    off_t bytes = (off_t)(sizeof(hdr) + (size_t)(rows * cols) * sizeof(double));
+    if (full_pwrite(fd, &hdr, sizeof(hdr), 0) != 0 || ftruncate(fd, bytes) == -1) {
+        perror(path);
+        close(fd);
+        return -1;
+    }
+    ms->fd = fd;
+    ms->rows = rows;
+    ms->cols = cols;
+    return 0;
+}
+
+static off_t element_offset(const matrix_stream_t *ms, uint64_t r, uint64_t c) {
+    return (off_t)(sizeof(matrix_header_t) + (size_t)(r * ms->cols + c) * sizeof(double));
+}
+
+int matrix_stream_read_tile(const matrix_stream_t *ms, uint64_t r0, uint64_t c0, int rows, int cols,
+                            double *dst, int ld) {
+    if (r0 + (uint64_t)rows > ms->rows || c0 + (uint64_t)cols > ms->cols) return -1;
+    for (int i = 0; i < rows; i++) {
+        if (full_pread(ms->fd, dst + (size_t)i * ld, (size_t)cols * sizeof(double),
+                       element_offset(ms, r0 + (uint64_t)i, c0)) != 0) {
+            return -1;
+        }
+    }
+    return 0;
+}
+
+int matrix_stream_write_tile(const matrix_stream_t *ms, uint64_t r0, uint64_t c0, int rows, int cols,
+                             const double *src, int ld) {
+    if (r0 + (uint64_t)rows > ms->rows || c0 + (uint64_t)cols > ms->cols) return -1;
+    for (int i = 0; i < rows; i++) {
+        if (full_pwrite(ms->fd, src + (size_t)i * ld, (size_t)cols * sizeof(double),
+                        element_offset(ms, r0 + (uint64_t)i, c0)) != 0) {
+            return -1;
+        }
+    }
+    return 0;
+}
+
+void matrix_stream_close(matrix_stream_t *ms) {
+    if (ms->fd >= 0) close(ms->fd);
+    ms->fd = -1;
+}
+
+int matrix_generate_operand_files(int m, const char *a_path, const char *b_path) {
+    matrix_stream_t sa, sb;
+    if (matrix_stream_create(a_path, (uint64_t)m, (uint64_t)m, &sa) != 0) return -1;
+    if (matrix_stream_create(b_path, (uint64_t)m, (uint64_t)m, &sb) != 0) {
+        matrix_stream_close(&sa);
+        return -1;
+    }
+
+    double *row_a = malloc((size_t)m * sizeof(double));
+    double *row_b = malloc((size_t)m * sizeof(double));
+    int rc = row_a && row_b ? 0 : -1;
+
+    // Same fixed-seed sequence as matrix_operands_open, one row at a time
+    srand(12345);
+    for (int i = 0; i < m && rc == 0; i++) {
+        for (int j = 0; j < m; j++) {
+            row_a[j] = (double)(rand() % 100);
+            row_b[j] = (double)(rand() % 100);
+        }
+        if (matrix_stream_write_tile(&sa, (uint64_t)i, 0, 1, m, row_a, m) != 0 ||
+            matrix_stream_write_tile(&sb, (uint64_t)i, 0, 1, m, row_b, m) != 0) {
+            perror("pwrite");
+            rc = -1;
+        }
+    }
+
+    free(row_a);
+    free(row_b);
+    matrix_stream_close(&sa);
+    matrix_stream_close(&sb);
+    return rc;
+}
+
+static int interleave_inputs = 0;
+
+void matrix_operands_set_interleave(int enable) {
+    interleave_inputs = enable;
+}
+
+static void *anon_shared(size_t bytes) {
+    void *ptr = mmap(NULL, bytes, PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
+    return ptr == MAP_FAILED ? NULL : ptr;
+}
+
+static int open_square(const char *path, int *m, uint32_t dtype, matrix_file_t *mf) {
+    if (matrix_file_open(path, mf) != 0) return -1;
+    if (mf->dtype != dtype) {
+        fprintf(stderr, "%s: holds %s elements, expected %s\n", path,
+                mf->dtype == MATRIX_DTYPE_F32 ? "float32" : "float64",
+                dtype == MATRIX_DTYPE_F32 ? "float32" : "float64");
+        return -1;
+    }
+    if (mf->rows != mf->cols || mf->rows > 1u << 30) {
+        fprintf(stderr, "%s: expected a square matrix, got %llux%llu\n", path,
+                (unsigned long long)mf->rows, (unsigned long long)mf->cols);
+        return -1;
+    }
+    if (*m > 0 && (uint64_t)*m != mf->rows) {
+        fprintf(stderr, "%s: matrix is %llux%llu, expected %dx%d\n", path,
+                (unsigned long long)mf->rows, (unsigned long long)mf->cols, *m, *m);
+        return -1;
+    }
+    *m = (int)mf->rows;
+    return 0;
+}
+
+int matrix_operands_open(matrix_operands_t *ops, int m, const char *a_path, const char *b_path,
+                         const char *out_path) {
+    return matrix_operands_open_dtype(ops, m, a_path, b_path, out_path, MATRIX_DTYPE_F64);
+}
+
+int matrix_operands_open_dtype(matrix_operands_t *ops, int m, const char *a_path, const char *b_path,
+                               const char *out_path, uint32_t dtype) {
+    memset(ops, 0, sizeof(*ops));
+    ops->dtype = dtype;
+    size_t elem = matrix_dtype_size(dtype);
+    void *a = NULL, *b = NULL, *c = NULL;
+
+    if (a_path || b_path) {
+        if (!a_path || !b_path) {
+            fprintf(stderr, "--a and --b must be given together\n");
+            return -1;
+        }
+        if (open_square(a_path, &m, dtype, &ops->fa) != 0 || open_square(b_path, &m, dtype, &ops->fb) != 0) {
+            matrix_operands_close(ops);
+            return -1;
+        }
+        a = ops->fa.data;
+        b = ops->fb.data;
+    }
+    if (m <= 0) {
+        fprintf(stderr, "matrix_size must be positive\n");
+        return -1;
+    }
+    ops->m = m;
+    ops->bytes = (size_t)m * m * elem;
+
+    if (!a) {
+        a = anon_shared(ops->bytes);
+        b = anon_shared(ops->bytes);
+        if (!a || !b) {
+            perror("mmap");
+            fprintf(stderr, "Failed to allocate shared memory for matrices\n");
+            if (a) munmap(a, ops->bytes);
+            if (b) munmap(b, ops->bytes);
+            return -1;
+        }
+        // Set the policy before the fill below faults the pages in
+        if (interleave_inputs) {
+            numa_interleave(a, ops->bytes);
+            numa_interleave(b, ops->bytes);
+        }
+        // Use fixed seed for testing consistency across implementations
+        srand(12345);
+        for (size_t i = 0; i < (size_t)m * m; i++) {
+            double va = (double)(rand() % 100), vb = (double)(rand() % 100);
+            if (dtype == MATRIX_DTYPE_F32) {
+                ((float *)a)[i] = (float)va;
+                ((float *)b)[i] = (float)vb;
+            } else {
+                ((double *)a)[i] = va;
+                ((double *)b)[i] = vb;
+            }
+        }
+    }
+
+    if (out_path) {
+        if (matrix_file_create_dtype(out_path, (uint64_t)m, (uint64_t)m, dtype, &ops->fc) != 0) {
+            c = NULL;
+        } else {
+            c = ops->fc.data;
+        }
+    } else {
+        // anonymous mappings start zero-filled
+        c = anon_shared(ops->bytes);
+        if (!c) {
+            perror("mmap");
+            fprintf(stderr, "Failed to allocate shared memory for matrices\n");
+        }
+    }
+
+    if (dtype == MATRIX_DTYPE_F32) {
+        ops->Af = a;
+        ops->Bf = b;
+        ops->Cf = c;
+    } else {
+        ops->A = a;
+        ops->B = b;
+        ops->C = c;
+    }
+    if (!c) {
+        matrix_operands_close(ops);
+        return -1;
+    }
+    return 0;
+}
+
+void matrix_operands_close(matrix_operands_t *ops) {
+    void *a = ops->A ? (void *)ops->A : (void *)ops->Af;
+    void *b = ops->B ? (void *)ops->B : (void *)ops->Bf;
+    void *c = ops->C ? (void *)ops->C : (void *)ops->Cf;
+    if (ops->fa.map || ops->fb.map) {
+        matrix_file_close(&ops->fa);
+        matrix_file_close(&ops->fb);
+    } else {
+        if (a) munmap(a, ops->bytes);
+        if (b) munmap(b, ops->bytes);
+    }
+    if (ops->fc.map) {
+        matrix_file_close(&ops->fc);
+    } else if (c) {
+        munmap(c, ops->bytes);
+    }
+    memset(ops, 0, sizeof(*ops));
+}
@@ -0,0 +1,117 @@
+#ifndef MATRIX_IO_H
+#define MATRIX_IO_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+// Binary matrix file: a 64-byte header followed by rows*cols row-major
+// elements, so the payload can be mmap'd and used in place.
+#define MATRIX_FILE_MAGIC "MTXF"
+#define MATRIX_FILE_VERSION 1
+#define MATRIX_DTYPE_F64 1
+#define MATRIX_DTYPE_F32 2
+
+typedef struct {
+    char magic[4];       // "MTXF"
+    uint32_t version;    // MATRIX_FILE_VERSION
+    uint32_t dtype;      // MATRIX_DTYPE_F64 or MATRIX_DTYPE_F32
+    uint32_t reserved;
+    uint64_t rows;
+    uint64_t cols;
+    uint8_t pad[32];     // header is 64 bytes: payload starts cache-line aligned
+} matrix_header_t;
+
+// Bytes per element of a dtype, 0 if the dtype is unknown
+size_t matrix_dtype_size(uint32_t dtype);
+
+// A matrix file mapped with MAP_SHARED; data points just past the header and
+// holds doubles or floats according to dtype
+typedef struct {
+    void *map;
+    size_t map_bytes;
+    void *data;
+    uint32_t dtype;
+    uint64_t rows;
+    uint64_t cols;
+} matrix_file_t;
+
+// Map an existing matrix file read-only. Returns 0 on success.
+int matrix_file_open(const char *path, matrix_file_t *mf);
+
+// Create (or truncate) a rows x cols matrix file and map it read-write;
+// writes through data land directly in the file. Returns 0 on success.
+int matrix_file_create(const char *path, uint64_t rows, uint64_t cols, matrix_file_t *mf);
+
+// The same with an explicit element type (MATRIX_DTYPE_F64 / MATRIX_DTYPE_F32)
+int matrix_file_create_dtype(const char *path, uint64_t rows, uint64_t cols, uint32_t dtype,
+                             matrix_file_t *mf);
+
+// Unmap; dirty pages of a writable map are written back to the file
+void matrix_file_close(matrix_file_t *mf);
+
+// A matrix file accessed with pread/pwrite, for data that does not fit in memory
+typedef struct {
+    int fd;
+    uint64_t rows;
+    uint64_t cols;
+} matrix_stream_t;
+
+// Open an existing float64 matrix file for tile reads. Returns 0 on success.
+int matrix_stream_open(const char *path, matrix_stream_t *ms);
+
+// Create (or truncate) a rows x cols matrix file for tile writes. Returns 0 on success.
+int matrix_stream_create(const char *path, uint64_t rows, uint64_t cols, matrix_stream_t *ms);
+
+// Copy the rows x cols tile at (r0, c0) between the file and a buffer with
+// leading dimension ld. Returns 0 on success, -1 on an I/O error or a tile
+// that does not fit inside the matrix.
+int matrix_stream_read_tile(const matrix_stream_t *ms, uint64_t r0, uint64_t c0, int rows, int cols,
+                            double *dst, int ld);
+int matrix_stream_write_tile(const matrix_stream_t *ms, uint64_t r0, uint64_t c0, int rows, int cols,
+                             const double *src, int ld);
+
+void matrix_stream_close(matrix_stream_t *ms);
+
+// Write the fixed-seed m x m test operands to files, row by row, so sizes
+// larger than memory get the same data matrix_operands_open would generate
+int matrix_generate_operand_files(int m, const char *a_path, const char *b_path);
+
+// A, B and C of one m x m product as the executables use them. Every region is
+// MAP_SHARED (file-backed or anonymous) so forked workers see the same pages.
+// float64 operands are in A/B/C; float32 ones (dtype MATRIX_DTYPE_F32) in
+// Af/Bf/Cf, with A/B/C left NULL.
+typedef struct {
+    double *A;
+    double *B;
+    double *C;
+    float *Af;
+    float *Bf;
+    float *Cf;
+    uint32_t dtype;
+    int m;
+    matrix_file_t fa, fb, fc;   // file mappings; map == NULL when anonymous
+    size_t bytes;               // size of one anonymous region
+} matrix_operands_t;
+
+// With enable != 0, anonymous A and B regions opened afterwards are interleaved
+// over all NUMA nodes before the parent fills them (--numa). C is never touched
+// by the parent, so its pages are placed by the worker that first writes them.
+void matrix_operands_set_interleave(int enable);
+
+// Set up the operands of a product. With a_path/b_path, A and B are mapped
+// from those files and m is taken from them (pass m <= 0, or the same size);
+// otherwise they are anonymous shared regions filled with the fixed-seed test
+// data. C is mapped from a newly created out_path file when given, or is an
+// anonymous shared region. Returns 0 on success.
+int matrix_operands_open(matrix_operands_t *ops, int m, const char *a_path, const char *b_path,
+                         const char *out_path);
+
+// The same with an explicit element type: input files must hold that dtype,
+// the fixed-seed data is generated in it and an output file is written in it
+int matrix_operands_open_dtype(matrix_operands_t *ops, int m, const char *a_path, const char *b_path,
+                               const char *out_path, uint32_t dtype);
+
+// Unmap everything (flushing a C output file)
+void matrix_operands_close(matrix_operands_t *ops);
+
+#endif
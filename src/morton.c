@@ -0,0 +1,203 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "morton.h"
+#include "strassen_utils.h"
+#include "gemm_kernel.h"
+#include "simd_kernels.h"
+
+void morton_layout_init(morton_layout_t *layout, int n, int leaf_max) {
+    if (leaf_max <= 0) leaf_max = strassen_get_cutoff();
+    int levels = 0;
+    while (n > 0 && ((n + (1 << levels) - 1) >> levels) > leaf_max) levels++;
+    layout->n = n;
+    layout->levels = levels;
+    layout->leaf = n > 0 ? (n + (1 << levels) - 1) >> levels : 0;
+    layout->padded = layout->leaf << levels;
+}
+
+size_t morton_size(const morton_layout_t *layout) {
+    return (size_t)layout->padded * layout->padded;
+}
+
+// Number of rows / columns of the logical matrix inside [start, start + size)
+static int clip(int n, int start, int size) {
+    if (start >= n) return 0;
+    return n - start < size ? n - start : size;
+}
+
+// Block of edge `size` at (r0, c0): leaves are copied row by row, larger
+// blocks recurse into their quadrants in 11, 12, 21, 22 order
+static void from_rowmajor(const morton_layout_t *layout, const double *src, int ld, double *dst,
+                          int r0, int c0, int size) {
+    int rows = clip(layout->n, r0, size), cols = clip(layout->n, c0, size);
+    if (rows == 0 || cols == 0) {
+        memset(dst, 0, (size_t)size * size * sizeof(double));
+        return;
+    }
+    if (size == layout->leaf) {
+        for (int i = 0; i < size; i++) {
+            double *d = dst + (size_t)i * size;
+            if (i < rows) {
+                memcpy(d, src + (size_t)(r0 + i) * ld + c0, (size_t)cols * sizeof(double));
+                memset(d + cols, 0, (size_t)(size - cols) * sizeof(double));
+            } else {
+                memset(d, 0, (size_t)size * sizeof(double));
+            }
+        }
+        return;
+    }
+    int h = size / 2;
+    size_t q = (size_t)h * h;
+    from_rowmajor(layout, src, ld, dst, r0, c0, h);
+    from_rowmajor(layout, src, ld, dst + q, r0, c0 + h, h);
+    from_rowmajor(layout, src, ld, dst + 2 * q, r0 + h, c0, h);
+    from_rowmajor(layout, src, ld, dst + 3 * q, r0 + h, c0 + h, h);
+}
+
+static void to_rowmajor(const morton_layout_t *layout, const double *src, double *dst, int ld,
+                        int r0, int c0, int size) {
+    int rows = clip(layout->n, r0, size), cols = clip(layout->n, c0, size);
+    if (rows == 0 || cols == 0) return;
+    if (size == layout->leaf) {
+        for (int i = 0; i < rows; i++) {
+            memcpy(dst + (size_t)(r0 + i) * ld + c0, src + (size_t)i * size, (size_t)cols * sizeof(double));
+        }
+        return;
+    }
+    int h = size / 2;
+    size_t q = (size_t)h * h;
+    to_rowmajor(layout, src, dst, ld, r0, c0, h);
+    to_rowmajor(layout, src + q, dst, ld, r0, c0 + h, h);
+    to_rowmajor(layout, src + 2 * q, dst, ld, r0 + h, c0, h);
+    to_rowmajor(layout, src + 3 * q, dst, ld, r0 + h, c0 + h, h);
+}
+
+void morton_from_rowmajor(const morton_layout_t *layout, const double *src, int ld, double *dst) {
+    if (layout->padded > 0) from_rowmajor(layout, src, ld, dst, 0, 0, layout->padded);
+}
+
+void morton_to_rowmajor(const morton_layout_t *layout, const double *src, double *dst, int ld) {
+    if (layout->padded > 0) to_rowmajor(layout, src, dst, ld, 0, 0, layout->padded);
+}
+
+// Quadrants are contiguous, so the operand sums are single SIMD kernel calls
+// over len doubles
+
+// z = x + y
+static void vec_add(const double *x, const double *y, double *z, size_t len) {
+    simd_kernels()->add(len, x, y, z);
+}
+
+// z = x - y
+static void vec_sub(const double *x, const double *y, double *z, size_t len) {
+    simd_kernels()->sub(len, x, y, z);
+}
+
+// z += x
+static void vec_acc(const double *x, double *z, size_t len) {
+    simd_kernels()->acc(len, x, z);
+}
+
+// z -= x
+static void vec_dec(const double *x, double *z, size_t len) {
+    simd_kernels()->dec(len, x, z);
+}
+
+// z = -x
+static void vec_neg(const double *x, double *z, size_t len) {
+    for (size_t i = 0; i < len; i++) z[i] = -x[i];
+}
+
+// One temporary for A, one for B and one product per level
+size_t morton_workspace_size(const morton_layout_t *layout) {
+    size_t total = 0;
+    for (int size = layout->padded; size > layout->leaf; size /= 2) {
+        total += 3 * (size_t)(size / 2) * (size / 2);
+    }
+    return total;
+}
+
+// Same schedule as strassen_multiply_mnk, on contiguous quadrants
+static void multiply_rec(int size, int leaf, const double *A, const double *B, double *C, double *work) {
+    if (size == leaf) {
+        gemm_blocked(leaf, leaf, leaf, 1.0, A, leaf, B, leaf, 0.0, C, leaf);
+        return;
+    }
+
+    int h = size / 2;
+    size_t q = (size_t)h * h;
+    const double *A11 = A, *A12 = A + q, *A21 = A + 2 * q, *A22 = A + 3 * q;
+    const double *B11 = B, *B12 = B + q, *B21 = B + 2 * q, *B22 = B + 3 * q;
+    double *C11 = C, *C12 = C + q, *C21 = C + 2 * q, *C22 = C + 3 * q;
+
+    double *T1 = work;
+    double *T2 = T1 + q;
+    double *P = T2 + q;
+    double *next = P + q;
+
+    // P1 = A11 * (B12 - B22)            -> C12 = P1, C22 = P1
+    vec_sub(B12, B22, T2, q);
+    multiply_rec(h, leaf, A11, T2, C12, next);
+    memcpy(C22, C12, q * sizeof(double));
+
+    // P3 = (A21 + A22) * B11            -> C21 = P3, C22 -= P3
+    vec_add(A21, A22, T1, q);
+    multiply_rec(h, leaf, T1, B11, C21, next);
+    vec_dec(C21, C22, q);
+
+    // P2 = (A11 + A12) * B22            -> C12 += P2, C11 = -P2
+    vec_add(A11, A12, T1, q);
+    multiply_rec(h, leaf, T1, B22, P, next);
+    vec_acc(P, C12, q);
+    vec_neg(P, C11, q);
+
+    // P4 = A22 * (B21 - B11)            -> C21 += P4, C11 += P4
+    vec_sub(B21, B11, T2, q);
+    multiply_rec(h, leaf, A22, T2, P, next);
+    vec_acc(P, C21, q);
+    vec_acc(P, C11, q);
+
+    // P5 = (A11 + A22) * (B11 + B22)    -> C11 += P5, C22 += P5
+    vec_add(A11, A22, T1, q);
+    vec_add(B11, B22, T2, q);
+    multiply_rec(h, leaf, T1, T2, P, next);
+    vec_acc(P, C11, q);
+    vec_acc(P, C22, q);
+
+    // P6 = (A12 - A22) * (B21 + B22)    -> C11 += P6
+    vec_sub(A12, A22, T1, q);
+    vec_add(B21, B22, T2, q);
+    multiply_rec(h, leaf, T1, T2, P, next);
+    vec_acc(P, C11, q);
+
+    // P7 = (A11 - A21) * (B11 + B12)    -> C22 -= P7
+    vec_sub(A11, A21, T1, q);
+    vec_add(B11, B12, T2, q);
+    multiply_rec(h, leaf, T1, T2, P, next);
+    vec_dec(P, C22, q);
+}
+
+void strassen_multiply_morton(const morton_layout_t *layout, const double *A, const double *B,
+                              double *C, double *work) {
+    if (layout->padded > 0) multiply_rec(layout->padded, layout->leaf, A, B, C, work);
+}
+
+int strassen_multiply_via_morton(const double *A, const double *B, double *C, int n) {
+    morton_layout_t layout;
+    morton_layout_init(&layout, n, 0);
+    size_t size = morton_size(&layout);
+    double *buf = malloc((3 * size + morton_workspace_size(&layout) + 1) * sizeof(double));
+    if (!buf) {
+        perror("malloc");
+        fprintf(stderr, "Failed to allocate recursive-block buffers for n=%d\n", n);
+        return -1;
+    }
+    double *Am = buf, *Bm = Am + size, *Cm = Bm + size, *work = Cm + size;
+    morton_from_rowmajor(&layout, A, n, Am);
+    morton_from_rowmajor(&layout, B, n, Bm);
+    strassen_multiply_morton(&layout, Am, Bm, Cm, work);
+    morton_to_rowmajor(&layout, Cm, C, n);
+    free(buf);
+    return 0;
+}
@@ -0,0 +1,46 @@
+#ifndef MORTON_H
+#define MORTON_H
+
+#include <stddef.h>
+
+// Recursive block (Morton / Z-order) layout of an n x n matrix: the matrix is
+// stored as its four quadrants 11, 12, 21, 22 one after the other, each laid
+// out the same way, down to leaf x leaf row-major tiles. Every quadrant at
+// every level is one contiguous sub-array, so Strassen's operand sums are flat
+// vector loops and the leaves are contiguous cache-resident tiles.
+//
+// n is padded with zeros to leaf << levels, where leaf is the smallest edge
+// <= the Strassen cutoff that covers n in `levels` halvings.
+typedef struct {
+    int n;          // logical size
+    int levels;     // recursion levels above the leaves
+    int leaf;       // leaf tile edge
+    int padded;     // leaf << levels
+} morton_layout_t;
+
+// Layout for n x n operands with leaves of at most leaf_max (the Strassen
+// cutoff when leaf_max <= 0)
+void morton_layout_init(morton_layout_t *layout, int n, int leaf_max);
+
+// Number of doubles one matrix occupies in the layout (padded^2)
+size_t morton_size(const morton_layout_t *layout);
+
+// Row-major (leading dimension ld) -> recursive blocks; the padding is zeroed
+void morton_from_rowmajor(const morton_layout_t *layout, const double *src, int ld, double *dst);
+
+// Recursive blocks -> row-major (leading dimension ld); the padding is dropped
+void morton_to_rowmajor(const morton_layout_t *layout, const double *src, double *dst, int ld);
+
+// Workspace (in doubles) needed by strassen_multiply_morton
+size_t morton_workspace_size(const morton_layout_t *layout);
+
+// C = A * B with all three already in the layout; work holds
+// morton_workspace_size(layout) doubles
+void strassen_multiply_morton(const morton_layout_t *layout, const double *A, const double *B,
+                              double *C, double *work);
+
+// Convenience for row-major n x n operands: convert, multiply, convert back.
+// Returns 0 on success, -1 if the buffers cannot be allocated.
+int strassen_multiply_via_morton(const double *A, const double *B, double *C, int n);
+
+#endif // MORTON_H
@@ -0,0 +1,392 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <errno.h>
+#include <math.h>
+#include <time.h>
+#include <unistd.h>
+#include <pthread.h>
+#include <semaphore.h>
+#include <sys/mman.h>
+#include <sys/time.h>
+#include <sys/wait.h>
+#include "ooc.h"
+#include "gemm_kernel.h"
+#include "matrix_io.h"
+#include "work_queue.h"
+
+// Step descriptor shared with the compute workers (MAP_SHARED)
+typedef struct {
+    sem_t start;            // posted once per worker per step
+    sem_t done;             // posted by each worker when its share is finished
+    work_queue_t queue;     // row blocks of the current C tile
+    int quit;
+    int rows, cols, depth;  // C tile is rows x cols, inner dimension depth
+    int chunk;              // rows per claim
+    double beta;            // 0 on the first depth step of a tile, then 1
+    size_t a_off, b_off, c_off;  // operand buffers, in doubles from the tile base
+} ooc_ctl_t;
+
+// One rectangular tile of a matrix file and the buffer it moves through
+typedef struct {
+    uint64_t r0, c0;
+    int rows, cols;
+    double *buf;
+} tile_ref_t;
+
+typedef struct {
+    int load;               // read a and b
+    tile_ref_t a, b;
+    int store;              // write c
+    tile_ref_t c;
+} io_request_t;
+
+// Background I/O thread: serves one request at a time while the caller computes
+typedef struct {
+    pthread_mutex_t lock;
+    pthread_cond_t cond;
+    int pending;            // a request is queued or running
+    int quit;
+    int error;
+    io_request_t req;
+    const matrix_stream_t *sa, *sb, *sc;
+    size_t bytes_read, bytes_written;
+} io_ctx_t;
+
+static double elapsed_us(struct timeval *start, struct timeval *end) {
+    return (end->tv_sec - start->tv_sec) * 1e6 + (end->tv_usec - start->tv_usec);
+}
+
+static void sem_wait_retry(sem_t *sem) {
+    while (sem_wait(sem) == -1 && errno == EINTR) {}
+}
+
+int ooc_tile_for_budget(int m, size_t mem_budget) {
+    double edge = sqrt((double)mem_budget / (OOC_TILE_BUFFERS * sizeof(double)));
+    if (edge >= m) return m;
+    int tile = ((int)edge / OOC_TILE_ALIGN) * OOC_TILE_ALIGN;
+    if (tile == 0 && m < OOC_TILE_ALIGN && edge >= 1) tile = (int)edge;
+    return tile;
+}
+
+static void *io_main(void *arg) {
+    io_ctx_t *io = arg;
+    pthread_mutex_lock(&io->lock);
+    while (1) {
+        while (!io->pending && !io->quit) pthread_cond_wait(&io->cond, &io->lock);
+        if (io->quit) break;
+        io_request_t req = io->req;
+        pthread_mutex_unlock(&io->lock);
+
+        int rc = 0;
+        size_t read = 0, written = 0;
+        if (req.store) {
+            rc |= matrix_stream_write_tile(io->sc, req.c.r0, req.c.c0, req.c.rows, req.c.cols,
+                                           req.c.buf, req.c.cols);
+            written += (size_t)req.c.rows * req.c.cols * sizeof(double);
+        }
+        if (req.load) {
+            rc |= matrix_stream_read_tile(io->sa, req.a.r0, req.a.c0, req.a.rows, req.a.cols,
+                                          req.a.buf, req.a.cols);
+            rc |= matrix_stream_read_tile(io->sb, req.b.r0, req.b.c0, req.b.rows, req.b.cols,
+                                          req.b.buf, req.b.cols);
+            read += ((size_t)req.a.rows * req.a.cols + (size_t)req.b.rows * req.b.cols) * sizeof(double);
+        }
+
+        pthread_mutex_lock(&io->lock);
+        if (rc != 0) io->error = 1;
+        io->bytes_read += read;
+        io->bytes_written += written;
+        io->pending = 0;
+        pthread_cond_broadcast(&io->cond);
+    }
+    pthread_mutex_unlock(&io->lock);
+    return NULL;
+}
+
+static void io_submit(io_ctx_t *io, const io_request_t *req) {
+    pthread_mutex_lock(&io->lock);
+    while (io->pending) pthread_cond_wait(&io->cond, &io->lock);
+    io->req = *req;
+    io->pending = 1;
+    pthread_cond_broadcast(&io->cond);
+    pthread_mutex_unlock(&io->lock);
+}
+
+// Wait for the outstanding request; returns -1 if any request has failed
+static int io_wait(io_ctx_t *io) {
+    pthread_mutex_lock(&io->lock);
+    while (io->pending) pthread_cond_wait(&io->cond, &io->lock);
+    int rc = io->error ? -1 : 0;
+    pthread_mutex_unlock(&io->lock);
+    return rc;
+}
+
+static void compute_rows(ooc_ctl_t *ctl, const double *tiles) {
+    const double *a = tiles + ctl->a_off;
+    const double *b = tiles + ctl->b_off;
+    double *c = (double *)tiles + ctl->c_off;
+    size_t first, count;
+    while ((count = work_queue_claim(&ctl->queue, (size_t)ctl->chunk,
+                                     (size_t)ctl->rows, &first)) > 0) {
+        gemm_blocked((int)count, ctl->cols, ctl->depth, 1.0,
+                     a + first * ctl->depth, ctl->depth, b, ctl->cols,
+                     ctl->beta, c + first * ctl->cols, ctl->cols);
+    }
+}
+
+static void worker_main(ooc_ctl_t *ctl, const double *tiles) {
+    while (1) {
+        sem_wait_retry(&ctl->start);
+        if (ctl->quit) break;
+        compute_rows(ctl, tiles);
+        sem_post(&ctl->done);
+    }
+    _exit(0);
+}
+
+// Wait for every worker to finish the step, noticing workers that died
+static int wait_step(ooc_ctl_t *ctl, pid_t *pids, int p) {
+    for (int finished = 0; finished < p;) {
+        struct timespec deadline;
+        clock_gettime(CLOCK_REALTIME, &deadline);
+        deadline.tv_nsec += 100 * 1000 * 1000;
+        if (deadline.tv_nsec >= 1000000000L) {
+            deadline.tv_sec++;
+            deadline.tv_nsec -= 1000000000L;
+        }
+        if (sem_timedwait(&ctl->done, &deadline) == 0) {
+            finished++;
+            continue;
+        }
+        if (errno != ETIMEDOUT) continue;
+        for (int w = 0; w < p; w++) {
+            int status;
+            if (pids[w] > 0 && waitpid(pids[w], &status, WNOHANG) == pids[w]) {
+                fprintf(stderr, "Out-of-core worker %d (pid %d) exited unexpectedly\n", w, (int)pids[w]);
+                pids[w] = 0;
+                return -1;
+            }
+        }
+    }
+    return 0;
+}
+
+static int run_step(ooc_ctl_t *ctl, const double *tiles, pid_t *pids, int p) {
+    work_queue_init(&ctl->queue);
+    if (p == 1) {
+        compute_rows(ctl, tiles);
+        return 0;
+    }
+    for (int w = 0; w < p; w++) sem_post(&ctl->start);
+    return wait_step(ctl, pids, p);
+}
+
+static void stop_workers(ooc_ctl_t *ctl, pid_t *pids, int p) {
+    ctl->quit = 1;
+    for (int w = 0; w < p; w++) sem_post(&ctl->start);
+    for (int w = 0; w < p; w++) {
+        if (pids[w] > 0) waitpid(pids[w], NULL, 0);
+    }
+}
+
+static tile_ref_t tile_at(int m, int tile, int ti, int tj, double *buf) {
+    tile_ref_t t;
+    t.r0 = (uint64_t)ti * tile;
+    t.c0 = (uint64_t)tj * tile;
+    t.rows = m - ti * tile < tile ? m - ti * tile : tile;
+    t.cols = m - tj * tile < tile ? m - tj * tile : tile;
+    t.buf = buf;
+    return t;
+}
+
+int ooc_multiply(const char *a_path, const char *b_path, const char *c_path, int p, int tile,
+                 ooc_stats_t *stats) {
+    matrix_stream_t sa, sb, sc;
+    if (matrix_stream_open(a_path, &sa) != 0) return -1;
+    if (matrix_stream_open(b_path, &sb) != 0) {
+        matrix_stream_close(&sa);
+        return -1;
+    }
+    if (sa.rows != sa.cols || sb.rows != sb.cols || sa.rows != sb.rows || sa.rows > 1u << 30) {
+        fprintf(stderr, "Out-of-core mode needs two square matrices of the same size\n");
+        matrix_stream_close(&sa);
+        matrix_stream_close(&sb);
+        return -1;
+    }
+    int m = (int)sa.rows;
+    if (tile > m) tile = m;
+    if (p <= 0 || tile <= 0 || matrix_stream_create(c_path, sa.rows, sa.cols, &sc) != 0) {
+        matrix_stream_close(&sa);
+        matrix_stream_close(&sb);
+        return -1;
+    }
+
+    size_t tile_count = (size_t)tile * tile;
+    size_t region = OOC_TILE_BUFFERS * tile_count * sizeof(double);
+    double *tiles = mmap(NULL, region, PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
+    ooc_ctl_t *ctl = mmap(NULL, sizeof(ooc_ctl_t), PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
+    pid_t *pids = calloc((size_t)p, sizeof(pid_t));
+    if (tiles == MAP_FAILED || ctl == MAP_FAILED || !pids) {
+        perror("mmap");
+        fprintf(stderr, "Failed to allocate %zu bytes of tile buffers\n", region);
+        if (tiles != MAP_FAILED) munmap(tiles, region);
+        if (ctl != MAP_FAILED) munmap(ctl, sizeof(ooc_ctl_t));
+        free(pids);
+        matrix_stream_close(&sa);
+        matrix_stream_close(&sb);
+        matrix_stream_close(&sc);
+        return -1;
+    }
+    double *a_buf[2] = {tiles, tiles + tile_count};
+    double *b_buf[2] = {tiles + 2 * tile_count, tiles + 3 * tile_count};
+    double *c_buf[2] = {tiles + 4 * tile_count, tiles + 5 * tile_count};
+
+    sem_init(&ctl->start, 1, 0);
+    sem_init(&ctl->done, 1, 0);
+    int rc = 0;
+
+    // Workers are forked before the I/O thread exists, so they inherit a
+    // single-threaded image
+    if (p > 1) {
+        for (int w = 0; w < p; w++) {
+            pids[w] = fork();
+            if (pids[w] == 0) {
+                worker_main(ctl, tiles);
+            } else if (pids[w] < 0) {
+                perror("fork");
+                pids[w] = 0;
+                rc = -1;
+                break;
+            }
+        }
+    }
+
+    io_ctx_t io;
+    memset(&io, 0, sizeof(io));
+    pthread_mutex_init(&io.lock, NULL);
+    pthread_cond_init(&io.cond, NULL);
+    io.sa = &sa;
+    io.sb = &sb;
+    io.sc = &sc;
+    pthread_t io_thread;
+    if (rc == 0 && pthread_create(&io_thread, NULL, io_main, &io) != 0) {
+        fprintf(stderr, "Failed to start the I/O thread\n");
+        rc = -1;
+    }
+    if (rc != 0) {
+        stop_workers(ctl, pids, p);
+        goto cleanup;
+    }
+
+    int nt = (m + tile - 1) / tile;
+    size_t steps = (size_t)nt * nt * nt;
+    double stall_us = 0.0;
+    struct timeval t0, t1;
+
+    // Step s computes C(ti, tj) += A(ti, tk) * B(tk, tj); its operands sit in
+    // buffer set s % 2 while set (s + 1) % 2 is being filled for the next step
+    io_request_t req;
+    memset(&req, 0, sizeof(req));
+    req.load = 1;
+    req.a = tile_at(m, tile, 0, 0, a_buf[0]);
+    req.b = tile_at(m, tile, 0, 0, b_buf[0]);
+    gettimeofday(&t0, NULL);
+    io_submit(&io, &req);
+    rc = io_wait(&io);
+    gettimeofday(&t1, NULL);
+    stall_us += elapsed_us(&t0, &t1);
+
+    int have_store = 0, cur_c = 0;
+    tile_ref_t store_tile = {0, 0, 0, 0, NULL};
+
+    for (size_t s = 0; s < steps && rc == 0; s++) {
+        int ti = (int)(s / ((size_t)nt * nt));
+        int tj = (int)(s / nt % nt);
+        int tk = (int)(s % nt);
+
+        memset(&req, 0, sizeof(req));
+        if (s + 1 < steps) {
+            size_t n1 = s + 1;
+            int ni = (int)(n1 / ((size_t)nt * nt)), nj = (int)(n1 / nt % nt), nk = (int)(n1 % nt);
+            req.load = 1;
+            req.a = tile_at(m, tile, ni, nk, a_buf[n1 & 1]);
+            req.b = tile_at(m, tile, nk, nj, b_buf[n1 & 1]);
+        }
+        if (have_store) {
+            req.store = 1;
+            req.c = store_tile;
+            have_store = 0;
+        }
+        if (req.load || req.store) io_submit(&io, &req);
+
+        tile_ref_t a = tile_at(m, tile, ti, tk, a_buf[s & 1]);
+        tile_ref_t b = tile_at(m, tile, tk, tj, b_buf[s & 1]);
+        ctl->rows = a.rows;
+        ctl->depth = a.cols;
+        ctl->cols = b.cols;
+        ctl->beta = tk == 0 ? 0.0 : 1.0;
+        ctl->a_off = (size_t)(a_buf[s & 1] - tiles);
+        ctl->b_off = (size_t)(b_buf[s & 1] - tiles);
+        ctl->c_off = (size_t)(c_buf[cur_c] - tiles);
+        ctl->chunk = a.rows / (4 * p);
+        ctl->chunk = ctl->chunk < GEMM_MR ? GEMM_MR : ctl->chunk - ctl->chunk % GEMM_MR;
+        if (run_step(ctl, tiles, pids, p) != 0) {
+            rc = -1;
+            io_wait(&io);
+            break;
+        }
+
+        gettimeofday(&t0, NULL);
+        rc = io_wait(&io);
+        gettimeofday(&t1, NULL);
+        stall_us += elapsed_us(&t0, &t1);
+
+        if (tk == nt - 1) {
+            // C(ti, tj) is complete: write it back during the next step and
+            // accumulate the next tile in the other C buffer
+            store_tile = tile_at(m, tile, ti, tj, c_buf[cur_c]);
+            have_store = 1;
+            cur_c ^= 1;
+        }
+    }
+    if (rc == 0 && have_store) {
+        memset(&req, 0, sizeof(req));
+        req.store = 1;
+        req.c = store_tile;
+        gettimeofday(&t0, NULL);
+        io_submit(&io, &req);
+        rc = io_wait(&io);
+        gettimeofday(&t1, NULL);
+        stall_us += elapsed_us(&t0, &t1);
+    }
+    if (rc != 0) fprintf(stderr, "Out-of-core multiplication failed\n");
+
+    pthread_mutex_lock(&io.lock);
+    io.quit = 1;
+    pthread_cond_broadcast(&io.cond);
+    pthread_mutex_unlock(&io.lock);
+    pthread_join(io_thread, NULL);
+    stop_workers(ctl, pids, p);
+
+    if (stats) {
+        stats->tile = tile;
+        stats->bytes_read = io.bytes_read;
+        stats->bytes_written = io.bytes_written;
+        stats->io_stall_us = stall_us;
+    }
+
+cleanup:
+    pthread_mutex_destroy(&io.lock);
+    pthread_cond_destroy(&io.cond);
+    sem_destroy(&ctl->start);
+    sem_destroy(&ctl->done);
+    munmap(tiles, region);
+    munmap(ctl, sizeof(ooc_ctl_t));
+    free(pids);
+    matrix_stream_close(&sa);
+    matrix_stream_close(&sb);
+    matrix_stream_close(&sc);
+    return rc;
+}
@@ -0,0 +1,32 @@
+#ifndef OOC_H
+#define OOC_H
+
+#include <stddef.h>
+
+// Out-of-core multiplication: C = A * B for square matrix files that need not
+// fit in memory. C is produced one T x T tile at a time; the A and B tiles of
+// each step are streamed from disk into one of two buffer sets while the
+// workers compute on the other, and finished C tiles are written back behind
+// the computation. Memory in use is six T x T tiles (2 A, 2 B, 2 C).
+#define OOC_TILE_BUFFERS 6
+
+// Smallest tile edge; tiles chosen from a budget are multiples of this
+#define OOC_TILE_ALIGN 64
+
+typedef struct {
+    int tile;               // tile edge actually used
+    size_t bytes_read;
+    size_t bytes_written;
+    double io_stall_us;     // time compute waited on I/O that did not overlap
+} ooc_stats_t;
+
+// Largest tile edge whose buffers fit in mem_budget bytes (at most m, never
+// below OOC_TILE_ALIGN unless m is smaller). Returns 0 if not even that fits.
+int ooc_tile_for_budget(int m, size_t mem_budget);
+
+// Multiply the matrix files at a_path and b_path into a new file at c_path
+// using p compute processes and tile x tile blocks. Returns 0 on success.
+int ooc_multiply(const char *a_path, const char *b_path, const char *c_path, int p, int tile,
+                 ooc_stats_t *stats);
+
+#endif
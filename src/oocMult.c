@@ -0,0 +1,194 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include <sys/time.h>
+#include <getopt.h>
+#include "common.h"
+#include "ooc.h"
+#include "matrix_io.h"
+#include "strassen_utils.h"
+
+#define DEFAULT_MEM_BUDGET (1024UL * 1024 * 1024)
+
+static void usage(const char *prog) {
+    fprintf(stderr, "Usage: %s --a A.mtx --b B.mtx --out C.mtx <num_processes> [--mem-budget SIZE] [--tile T]\n"
+                    "       [--verify[=k]]\n"
+                    "       %s <matrix_size> <num_processes> [--scratch DIR] [--keep] [--out C.mtx] "
+                    "[--mem-budget SIZE] [--tile T]\n"
+                    "       [--verify[=k]]\n"
+                    "SIZE accepts K, M and G suffixes (default 1G)\n"
+                    "--verify[=k] checks C with k (default %d) rounds of Freivalds' test, reading A,\n"
+                    "B and C once more through the page cache; exit status %d if it fails\n",
+            prog, prog, VERIFY_DEFAULT_ROUNDS, VERIFY_EXIT_FAILED);
+}
+
+static double elapsed_us(struct timeval *start, struct timeval *end) {
+    return (end->tv_sec - start->tv_sec) * 1e6 + (end->tv_usec - start->tv_usec);
+}
+
+// "512M", "16G", "65536" -> bytes; 0 on a malformed value
+static size_t parse_size(const char *text) {
+    char *end;
+    double value = strtod(text, &end);
+    if (end == text || value <= 0) return 0;
+    switch (*end) {
+    case 'k': case 'K': value *= 1024.0; end++; break;
+    case 'm': case 'M': value *= 1024.0 * 1024; end++; break;
+    case 'g': case 'G': value *= 1024.0 * 1024 * 1024; end++; break;
+    default: break;
+    }
+    return *end == '\0' ? (size_t)value : 0;
+}
+
+int main(int argc, char *argv[]) {
+    const char *a_path = NULL;
+    const char *b_path = NULL;
+    const char *out_path = NULL;
+    const char *scratch = ".";
+    size_t mem_budget = DEFAULT_MEM_BUDGET;
+    int tile = 0;
+    int keep = 0;
+    int verify = 0;
+    static struct option long_options[] = {
+        {"a", required_argument, NULL, 'a'},
+        {"b", required_argument, NULL, 'b'},
+        {"out", required_argument, NULL, 'o'},
+        {"mem-budget", required_argument, NULL, 'M'},
+        {"tile", required_argument, NULL, 't'},
+        {"scratch", required_argument, NULL, 's'},
+        {"keep", no_argument, NULL, 'k'},
+        {"verify", optional_argument, NULL, 'V'},
+        {NULL, 0, NULL, 0}
+    };
+    int opt;
+    while ((opt = getopt_long(argc, argv, "", long_options, NULL)) != -1) {
+        switch (opt) {
+        case 'a': a_path = optarg; break;
+        case 'b': b_path = optarg; break;
+        case 'o': out_path = optarg; break;
+        case 'M':
+            mem_budget = parse_size(optarg);
+            if (mem_budget == 0) {
+                fprintf(stderr, "Invalid --mem-budget \"%s\"\n", optarg);
+                return 1;
+            }
+            break;
+        case 't': tile = atoi(optarg); break;
+        case 's': scratch = optarg; break;
+        case 'k': keep = 1; break;
+        case 'V':
+            verify = parse_verify_rounds(optarg);
+            if (verify < 0) {
+                fprintf(stderr, "--verify takes a number of rounds between 1 and %d\n", FREIVALDS_MAX_ROUNDS);
+                return 1;
+            }
+            break;
+        default:
+            usage(argv[0]);
+            return 1;
+        }
+    }
+
+    int from_files = a_path || b_path;
+    if (from_files && (!a_path || !b_path || !out_path || argc - optind != 1)) {
+        usage(argv[0]);
+        return 1;
+    }
+    if (!from_files && argc - optind != 2) {
+        usage(argv[0]);
+        return 1;
+    }
+    int m = from_files ? 0 : atoi(argv[optind]);
+    int p = atoi(argv[argc - 1]);
+    if (p <= 0 || (!from_files && m <= 0) || tile < 0) {
+        fprintf(stderr, "matrix_size, num_processes and --tile must be positive\n");
+        return 1;
+    }
+
+    if (from_files) {
+        matrix_stream_t probe;
+        if (matrix_stream_open(a_path, &probe) != 0) return 1;
+        m = (int)probe.rows;
+        matrix_stream_close(&probe);
+    }
+
+    // Settle the tile before writing anything, so a bad --tile / --mem-budget
+    // does not leave generated operand files behind
+    if (tile == 0) {
+        tile = ooc_tile_for_budget(m, mem_budget);
+        if (tile == 0) {
+            fprintf(stderr, "--mem-budget is too small for even one %dx%d tile set\n",
+                    OOC_TILE_ALIGN, OOC_TILE_ALIGN);
+            return 1;
+        }
+    } else if ((size_t)OOC_TILE_BUFFERS * tile * tile * sizeof(double) > mem_budget) {
+        fprintf(stderr, "--tile %d needs %zu MB of buffers, over the --mem-budget\n", tile,
+                (size_t)OOC_TILE_BUFFERS * tile * tile * sizeof(double) >> 20);
+        return 1;
+    }
+
+    // Without input files, write the fixed-seed operands to the scratch directory
+    char gen_a[4096], gen_b[4096], gen_c[4096];
+    if (!from_files) {
+        snprintf(gen_a, sizeof(gen_a), "%s/ooc_A_%d.mtx", scratch, m);
+        snprintf(gen_b, sizeof(gen_b), "%s/ooc_B_%d.mtx", scratch, m);
+        snprintf(gen_c, sizeof(gen_c), "%s/ooc_C_%d.mtx", scratch, m);
+        if (matrix_generate_operand_files(m, gen_a, gen_b) != 0) {
+            fprintf(stderr, "Failed to write operand files to %s\n", scratch);
+            // a partly written operand is of no use, even with --keep
+            unlink(gen_a);
+            unlink(gen_b);
+            return 1;
+        }
+        a_path = gen_a;
+        b_path = gen_b;
+        if (!out_path) out_path = gen_c;
+    }
+
+    ooc_stats_t stats;
+    struct timeval start, end;
+    gettimeofday(&start, NULL);
+    int rc = ooc_multiply(a_path, b_path, out_path, p, tile, &stats);
+    gettimeofday(&end, NULL);
+
+    // --verify: map the three files (the page cache, not the budget, holds them)
+    int status = 0;
+    verify_result_t vr;
+    if (rc == 0 && verify) {
+        matrix_file_t fa, fb, fc;
+        if (matrix_file_open(a_path, &fa) != 0) {
+            status = 1;
+        } else {
+            if (matrix_file_open(b_path, &fb) != 0) {
+                status = 1;
+            } else {
+                if (matrix_file_open(out_path, &fc) != 0) {
+                    status = 1;
+                } else {
+                    int vrc = freivalds_verify(fa.data, fb.data, fc.data, m, verify, p, &vr);
+                    if (vrc < 0) status = 1;
+                    if (vrc > 0) status = VERIFY_EXIT_FAILED;
+                    matrix_file_close(&fc);
+                }
+                matrix_file_close(&fb);
+            }
+            matrix_file_close(&fa);
+        }
+    }
+
+    if (!from_files && !keep) {
+        unlink(gen_a);
+        unlink(gen_b);
+        if (out_path == gen_c) unlink(gen_c);
+    }
+    if (rc != 0) return 1;
+
+    printf("oocMult: m=%d, p=%d, time=%.0f microseconds\n", m, p, elapsed_us(&start, &end));
+    printf("  tile=%d, buffers=%.1f MB, read=%.2f GB, written=%.2f GB, io_stall=%.0f microseconds\n",
+           stats.tile, (double)OOC_TILE_BUFFERS * stats.tile * stats.tile * sizeof(double) / (1 << 20),
+           stats.bytes_read / 1e9, stats.bytes_written / 1e9, stats.io_stall_us);
+    if (verify && status != 1) freivalds_print(stdout, &vr);
+    return status;
+}
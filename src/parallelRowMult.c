@@ -2,155 +2,191 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <unistd.h>
-#include <sys/mman.h>
-#include <sys/wait.h>
 #include <sys/time.h>
-#include <semaphore.h>
-#include <errno.h>
+#include <getopt.h>
 #include <math.h>
 #include "common.h"
 #include "strassen_utils.h"
-
-typedef struct {
-    int l;        // next row index to compute (0 .. m-1)
-    sem_t mutex;  // semaphore protecting l
-} shared_row_t;
+#include "parallel_engines.h"
+#include "matrix_io.h"
+
+static void usage(const char *prog) {
+    fprintf(stderr, "Usage: %s <matrix_size> <num_processes> [--chunk rows] [--out C.mtx] [--json] [--profile]\n"
+                    "       [--pin compact|scatter|cpu-list] [--numa] [--precision fp64|fp32|mixed] [--verify[=k]]\n"
+                    "       %s --a A.mtx --b B.mtx <num_processes> [--chunk rows] [--out C.mtx] [--json] [--profile]\n"
+                    "       [--pin compact|scatter|cpu-list] [--numa] [--precision fp64|fp32|mixed] [--verify[=k]]\n"
+                    "--pin pins worker i to the i-th CPU of that order; --numa interleaves A and B\n"
+                    "over the NUMA nodes and leaves C to be first-touched by the workers\n"
+                    "--profile prints per-worker spawn/queue/compute times and perf counters as JSON\n"
+                    "--precision fp32 keeps A, B and C in float32 (half the memory); mixed also\n"
+                    "stores float32 but sums the base kernel in double\n"
+                    "--verify checks C with k (default %d) rounds of Freivalds' test, split over the\n"
+                    "same number of workers, after the timed run; exit status %d if it fails\n",
+            prog, prog, VERIFY_DEFAULT_ROUNDS, VERIFY_EXIT_FAILED);
+}
 
 int main(int argc, char *argv[]) {
-    if (argc < 3) {
-        fprintf(stderr, "Usage: %s <matrix_size> <num_processes>\n", argv[0]);
+    int chunk = PARALLEL_GRAIN_AUTO;
+    const char *a_path = NULL, *b_path = NULL, *out_path = NULL;
+    int json = 0;
+    int profile = 0;
+    const char *pin_spec = NULL;
+    int numa = 0;
+    precision_t prec = PRECISION_FP64;
+    int verify = 0;
+    static struct option long_options[] = {
+        {"chunk", required_argument, NULL, 'g'},
+        {"a", required_argument, NULL, 'a'},
+        {"b", required_argument, NULL, 'b'},
+        {"out", required_argument, NULL, 'o'},
+        {"json", no_argument, NULL, 'j'},
+        {"profile", no_argument, NULL, 'P'},
+        {"pin", required_argument, NULL, 'p'},
+        {"numa", no_argument, NULL, 'N'},
+        {"precision", required_argument, NULL, 'x'},
+        {"verify", optional_argument, NULL, 'V'},
+        {NULL, 0, NULL, 0}
+    };
+    int opt;
+    while ((opt = getopt_long(argc, argv, "", long_options, NULL)) != -1) {
+        switch (opt) {
+        case 'g':
+            chunk = atoi(optarg);
+            if (chunk <= 0) {
+                fprintf(stderr, "--chunk must be positive\n");
+                return 1;
+            }
+            break;
+        case 'a': a_path = optarg; break;
+        case 'b': b_path = optarg; break;
+        case 'o': out_path = optarg; break;
+        case 'j': json = 1; break;
+        case 'P': profile = 1; break;
+        case 'p': pin_spec = optarg; break;
+        case 'N': numa = 1; break;
+        case 'x':
+            if (precision_parse(optarg, &prec) != 0) {
+                fprintf(stderr, "--precision must be fp64, fp32 or mixed\n");
+                return 1;
+            }
+            break;
+        case 'V':
+            verify = parse_verify_rounds(optarg);
+            if (verify < 0) {
+                fprintf(stderr, "--verify takes a number of rounds between 1 and %d\n", FREIVALDS_MAX_ROUNDS);
+                return 1;
+            }
+            break;
+        default:
+            usage(argv[0]);
+            return 1;
+        }
+    }
+    int from_files = a_path || b_path;
+    // <matrix_size> <num_processes>, or only <num_processes> with input files
+    if (argc - optind != (from_files ? 1 : 2)) {
+        usage(argv[0]);
         return 1;
     }
 
-    int m = atoi(argv[1]);
-    int p = atoi(argv[2]);
-    if (m <= 0 || p <= 0) {
+    int m = from_files ? 0 : atoi(argv[optind]);
+    int p = atoi(argv[argc - 1]);
+    if ((!from_files && m <= 0) || p <= 0) {
         fprintf(stderr, "matrix_size and num_processes must be positive\n");
         return 1;
     }
+
+    // --pin / --numa: read the topology and report the placement chosen
+    placement_t placement;
+    int placed = pin_spec || numa;
+    if (placed) {
+        if (placement_init(&placement, pin_spec) != 0) {
+            placement_free(&placement);
+            return 1;
+        }
+        placement.interleave = numa;
+        placement_describe(&placement, p, json ? stderr : stdout);
+        parallel_engines_set_placement(&placement);
+        matrix_operands_set_interleave(numa);
+    }
+
+    // A, B and C are MAP_SHARED: mapped straight from the --a/--b/--out files
+    // or anonymous regions filled with the fixed-seed test data
+    matrix_operands_t ops;
+    uint32_t dtype = prec == PRECISION_FP64 ? MATRIX_DTYPE_F64 : MATRIX_DTYPE_F32;
+    if (matrix_operands_open_dtype(&ops, m, a_path, b_path, out_path, dtype) != 0) return 1;
+    m = ops.m;
+    double *A = ops.A, *B = ops.B, *C = ops.C;
+
     if (m > 10000) {
         fprintf(stderr, "Warning: matrix_size %d is very large, may cause memory issues\n", m);
     }
     if (p > 1000) {
         fprintf(stderr, "Warning: num_processes %d is very high, may cause system overload\n", p);
     }
-    
-    // Check if matrix size is power of 2 for Strassen algorithm
-    int padded_size = next_power_of_2(m);
-    if (!is_power_of_2(m)) {
-        printf("Warning: matrix_size %d is not power of 2, padding to %d for Strassen algorithm\n", m, padded_size);
-    }
-
-    size_t n = (size_t)m * m;
-    size_t bytes = n * sizeof(double);
-
-    double *A = mmap(NULL, bytes, PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
-    double *B = mmap(NULL, bytes, PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
-    double *C = mmap(NULL, bytes, PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
-    shared_row_t *shared = mmap(NULL, sizeof(shared_row_t), PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
-
-    if (A == MAP_FAILED || B == MAP_FAILED || C == MAP_FAILED || shared == MAP_FAILED) {
-        perror("mmap");
-        fprintf(stderr, "Failed to allocate shared memory for matrices or control block\n");
-        return 1;
-    }
 
-    // initialize C to zeros
-    for (size_t i = 0; i < n; i++) C[i] = 0.0;
-
-    // Use fixed seed for testing consistency
-    srand(12345);
-    for (int i = 0; i < m; i++) {
-        for (int j = 0; j < m; j++) {
-            A[i * m + j] = (double)(rand() % 100);
-            B[i * m + j] = (double)(rand() % 100);
+    // --profile: each worker records into shared memory, copied out into prof
+    engine_profile_t prof = {0};
+    if (profile) {
+        prof.stats = calloc((size_t)p, sizeof(worker_stats_t));
+        if (!prof.stats) {
+            perror("calloc");
+            matrix_operands_close(&ops);
+            return 1;
         }
     }
 
-    // initialize shared row index and semaphore
-    shared->l = 0;
-    if (sem_init(&shared->mutex, 1, 1) == -1) {
-        perror("sem_init");
-        fprintf(stderr, "Failed to initialize semaphore for shared row index\n");
-        return 1;
-    }
-
     struct timeval start, end;
     gettimeofday(&start, NULL);
 
-    for (int proc = 0; proc < p; proc++) {
-        pid_t pid = fork();
-        if (pid < 0) {
-            perror("fork");
-            fprintf(stderr, "Failed to create process %d\n", proc);
-            // continue creating others or exit
-            continue;
-        }
-        if (pid == 0) {
-            // child: work-stealing approach with shared row index
-            while (1) {
-                if (sem_wait(&shared->mutex) == -1) continue;
-                int my_row = shared->l;
-                if (my_row >= m) {
-                    // no more work
-                    sem_post(&shared->mutex);
-                    break;
-                }
-                shared->l = my_row + 1;
-                sem_post(&shared->mutex);
+    // workers claim blocks of `chunk` rows from a lock-free shared queue
+    int rc = prec == PRECISION_FP64
+                 ? parallel_row_multiply_profiled(A, B, C, m, p, chunk, profile ? &prof : NULL)
+                 : parallel_row_multiply_f32(ops.Af, ops.Bf, ops.Cf, m, p, chunk, prec, profile ? &prof : NULL);
+    if (rc != 0) {
+        fprintf(stderr, "Parallel row multiplication failed\n");
+        free(prof.stats);
+        matrix_operands_close(&ops);
+        return 1;
+    }
 
-                // compute row my_row using Strassen approach
-                // For parallel row implementation, we'll use a hybrid approach:
-                // - If matrix is small, use naive multiplication
-                // - If matrix is large, use Strassen but only for the specific row
-                if (m <= 64) {
-                    // Use naive multiplication for small matrices
-                    for (int j = 0; j < m; j++) {
-                        double sum = 0.0;
-                        for (int k = 0; k < m; k++) {
-                            sum += A[my_row * m + k] * B[k * m + j];
-                        }
-                        C[my_row * m + j] = sum;
-                    }
-                } else {
-                    // For larger matrices, we need to implement a row-based Strassen
-                    // This is a simplified version - in practice, you'd need more complex logic
-                    for (int j = 0; j < m; j++) {
-                        double sum = 0.0;
-                        for (int k = 0; k < m; k++) {
-                            sum += A[my_row * m + k] * B[k * m + j];
-                        }
-                        C[my_row * m + j] = sum;
-                    }
-                }
-            }
-            _exit(0);
+    gettimeofday(&end, NULL);
+    double time_taken = (end.tv_sec - start.tv_sec) * 1e6 + (end.tv_usec - start.tv_usec);
+    if (json) {
+        print_json_result("parallelRowMult", "Strassen", m, p, time_taken);
+    } else {
+        printf("parallelRowMult (Strassen): m=%d, p=%d, time=%.0f microseconds\n", m, p, time_taken);
+        if (prec != PRECISION_FP64) {
+            printf("  precision=%s, max relative error vs float64 = %.2e (%d sampled rows)\n",
+                   precision_name(prec), strassen_f32_sampled_error(ops.Af, ops.Bf, ops.Cf, m, PRECISION_CHECK_ROWS),
+                   m < PRECISION_CHECK_ROWS ? m : PRECISION_CHECK_ROWS);
         }
-        // parent continues to spawn
     }
 
-    // parent waits for children
-    for (int i = 0; i < p; i++) {
-        int status;
-        if (wait(&status) == -1) {
-            if (errno == ECHILD) break;
-        }
+    if (profile) {
+        engine_profile_print_json(stdout, "parallelRowMult", m, p, time_taken, &prof);
     }
 
-    gettimeofday(&end, NULL);
-    double time_taken = (end.tv_sec - start.tv_sec) * 1e6 + (end.tv_usec - start.tv_usec);
-    printf("parallelRowMult (Strassen): m=%d, p=%d, time=%.0f microseconds\n", m, p, time_taken);
+    // --verify: Freivalds' check over p workers, printed to stderr with --json
+    int status = 0;
+    if (verify) {
+        verify_result_t vr;
+        int vrc = prec == PRECISION_FP64 ? freivalds_verify(A, B, C, m, verify, p, &vr)
+                                         : freivalds_verify_f32(ops.Af, ops.Bf, ops.Cf, m, verify, p, &vr);
+        if (vrc < 0) status = 1;
+        else freivalds_print(json ? stderr : stdout, &vr);
+        if (vrc > 0) status = VERIFY_EXIT_FAILED;
+    }
 
-    if (m <= 10) {
+    if (m <= 10 && !json) {
         printf("Result C:\n");
-        printm(m, C);
+        if (prec == PRECISION_FP64) printm(m, C);
+        else printm_f32(m, ops.Cf);
     }
 
     // cleanup
-    sem_destroy(&shared->mutex);
-    munmap(A, bytes);
-    munmap(B, bytes);
-    munmap(C, bytes);
-    munmap(shared, sizeof(shared_row_t));
-    return 0;
+    free(prof.stats);
+    matrix_operands_close(&ops);
+    if (placed) placement_free(&placement);
+    return status;
 }
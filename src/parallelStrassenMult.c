@@ -0,0 +1,132 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/time.h>
+#include <getopt.h>
+#include <math.h>
+#include "common.h"
+#include "strassen_utils.h"
+#include "parallel_strassen.h"
+#include "matrix_io.h"
+
+static void usage(const char *prog) {
+    fprintf(stderr, "Usage: %s <matrix_size> <num_processes> [--levels 1|2] [--out C.mtx] [--cutoff N] [--json] [--verify[=k]]\n"
+                    "       %s --a A.mtx --b B.mtx <num_processes> [--levels 1|2] [--out C.mtx] [--cutoff N] [--json] [--verify[=k]]\n"
+                    "--verify checks C with k (default %d) rounds of Freivalds' test; exit status %d if it fails\n",
+            prog, prog, VERIFY_DEFAULT_ROUNDS, VERIFY_EXIT_FAILED);
+}
+
+int main(int argc, char *argv[]) {
+    const char *a_path = NULL, *b_path = NULL, *out_path = NULL;
+    int json = 0;
+    int levels = 0;
+    int verify = 0;
+    static struct option long_options[] = {
+        {"levels", required_argument, NULL, 'l'},
+        {"a", required_argument, NULL, 'a'},
+        {"b", required_argument, NULL, 'b'},
+        {"out", required_argument, NULL, 'o'},
+        {"json", no_argument, NULL, 'j'},
+        {"cutoff", required_argument, NULL, 'C'},
+        {"verify", optional_argument, NULL, 'V'},
+        {NULL, 0, NULL, 0}
+    };
+    int opt;
+    while ((opt = getopt_long(argc, argv, "", long_options, NULL)) != -1) {
+        switch (opt) {
+        case 'l':
+            levels = atoi(optarg);
+            if (levels < 1 || levels > PARALLEL_STRASSEN_MAX_LEVELS) {
+                fprintf(stderr, "--levels must be between 1 and %d\n", PARALLEL_STRASSEN_MAX_LEVELS);
+                return 1;
+            }
+            break;
+        case 'a': a_path = optarg; break;
+        case 'b': b_path = optarg; break;
+        case 'o': out_path = optarg; break;
+        case 'j': json = 1; break;
+        case 'C':
+            if (atoi(optarg) <= 0) {
+                fprintf(stderr, "--cutoff must be positive\n");
+                return 1;
+            }
+            strassen_set_cutoff(atoi(optarg));
+            break;
+        case 'V':
+            verify = parse_verify_rounds(optarg);
+            if (verify < 0) {
+                fprintf(stderr, "--verify takes a number of rounds between 1 and %d\n", FREIVALDS_MAX_ROUNDS);
+                return 1;
+            }
+            break;
+        default:
+            usage(argv[0]);
+            return 1;
+        }
+    }
+    int from_files = a_path || b_path;
+    // <matrix_size> <num_processes>, or only <num_processes> with input files
+    if (argc - optind != (from_files ? 1 : 2)) {
+        usage(argv[0]);
+        return 1;
+    }
+
+    int m = from_files ? 0 : atoi(argv[optind]);
+    int p = atoi(argv[argc - 1]);
+    if ((!from_files && m <= 0) || p <= 0) {
+        fprintf(stderr, "matrix_size and num_processes must be positive\n");
+        return 1;
+    }
+    if (levels == 0) levels = parallel_strassen_default_levels(p);
+
+    // A and B come from the input files or the fixed-seed test data
+    matrix_operands_t ops;
+    if (matrix_operands_open(&ops, m, a_path, b_path, out_path) != 0) return 1;
+    m = ops.m;
+    double *A = ops.A, *B = ops.B, *C = ops.C;
+
+    if (m > 10000) {
+        fprintf(stderr, "Warning: matrix_size %d is very large, may cause memory issues\n", m);
+    }
+    if (p > 1000) {
+        fprintf(stderr, "Warning: num_processes %d is very high, may cause system overload\n", p);
+    }
+
+    struct timeval start, end;
+    gettimeofday(&start, NULL);
+
+    // Distribute P1..P7 of the top recursion level(s) across the workers
+    int rc = parallel_strassen_multiply(A, B, C, m, p, levels);
+    if (rc != 0) {
+        fprintf(stderr, "Parallel Strassen multiplication failed\n");
+        matrix_operands_close(&ops);
+        return 1;
+    }
+
+    gettimeofday(&end, NULL);
+    double time_taken = (end.tv_sec - start.tv_sec) * 1e6 + (end.tv_usec - start.tv_usec);
+
+    if (json) {
+        print_json_result("parallelStrassenMult", "Strassen", m, p, time_taken);
+    } else {
+        printf("parallelStrassenMult (Strassen): m=%d, p=%d, time=%.0f microseconds\n", m, p, time_taken);
+    }
+
+    // --verify: Freivalds' check over p workers, printed to stderr with --json
+    int status = 0;
+    if (verify) {
+        verify_result_t vr;
+        int vrc = freivalds_verify(A, B, C, m, verify, p, &vr);
+        if (vrc < 0) status = 1;
+        else freivalds_print(json ? stderr : stdout, &vr);
+        if (vrc > 0) status = VERIFY_EXIT_FAILED;
+    }
+
+    if (m <= 10 && !json) {
+        printf("Result C:\n");
+        printm(m, C);
+    }
+
+    matrix_operands_close(&ops);
+    return status;
+}
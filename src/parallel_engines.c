@@ -0,0 +1,263 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/wait.h>
+#include <errno.h>
+#include "gemm_kernel.h"
+#include "simd_kernels.h"
+#include "work_queue.h"
+#include "engine_profile.h"
+#include "parallel_engines.h"
+
+// Blocks at least this large in both dimensions go through the packed GEMM
+// kernel; smaller ones would spend more time packing B than computing
+#define BLOCK_GEMM_MIN 16
+
+typedef struct {
+    const double *A;
+    const double *B;
+    double *C;
+    const float *Af;     // float32 operands instead of A / B / C (prec != PRECISION_FP64)
+    const float *Bf;
+    float *Cf;
+    precision_t prec;
+    int m;
+    size_t grain;        // rows per claim (row engine) or tile edge (element engine)
+    size_t total;        // number of claimable items
+    work_queue_t *queue; // shared, MAP_SHARED
+    worker_stats_t *stats; // shared per-worker stats with --profile, else NULL
+    double t0;           // profile clock when the engine started
+} engine_job_t;
+
+static const placement_t *engine_placement = NULL;
+
+void parallel_engines_set_placement(const placement_t *pl) {
+    engine_placement = pl;
+}
+
+int parallel_row_default_chunk(int m, int p) {
+    int chunk = m / (4 * p);
+    return chunk > 0 ? chunk : 1;
+}
+
+// C[r0.., c0..] (rows x cols) = A[r0.., :] * B[:, c0..]
+void parallel_compute_block(const double *A, const double *B, double *C, int m,
+                            int r0, int rows, int c0, int cols) {
+    if (rows >= BLOCK_GEMM_MIN && cols >= BLOCK_GEMM_MIN) {
+        gemm_blocked(rows, cols, m, 1.0, A + (size_t)r0 * m, m, B + c0, m,
+                     0.0, C + (size_t)r0 * m + c0, m);
+        return;
+    }
+
+    // i-k-j order: stream contiguous rows of B instead of striding down a column
+    void (*axpy)(size_t, double, const double *, double *) = simd_kernels()->axpy;
+    for (int i = r0; i < r0 + rows; i++) {
+        double *c = C + (size_t)i * m + c0;
+        const double *a = A + (size_t)i * m;
+        memset(c, 0, (size_t)cols * sizeof(double));
+        for (int k = 0; k < m; k++) {
+            axpy((size_t)cols, a[k], B + (size_t)k * m + c0, c);
+        }
+    }
+}
+
+void parallel_compute_block_f32(const float *A, const float *B, float *C, int m,
+                                int r0, int rows, int c0, int cols, precision_t prec) {
+    // Mixed precision always goes through the kernel that sums in double
+    if (prec == PRECISION_MIXED || (rows >= BLOCK_GEMM_MIN && cols >= BLOCK_GEMM_MIN)) {
+        gemm_blocked_f32(rows, cols, m, 1.0f, A + (size_t)r0 * m, m, B + c0, m,
+                         0.0f, C + (size_t)r0 * m + c0, m, prec);
+        return;
+    }
+
+    void (*axpy)(size_t, float, const float *, float *) = simd_kernels()->axpy_f32;
+    for (int i = r0; i < r0 + rows; i++) {
+        float *c = C + (size_t)i * m + c0;
+        const float *a = A + (size_t)i * m;
+        memset(c, 0, (size_t)cols * sizeof(float));
+        for (int k = 0; k < m; k++) {
+            axpy((size_t)cols, a[k], B + (size_t)k * m + c0, c);
+        }
+    }
+}
+
+static void compute_block(engine_job_t *job, int r0, int rows, int c0, int cols) {
+    if (job->prec == PRECISION_FP64) {
+        parallel_compute_block(job->A, job->B, job->C, job->m, r0, rows, c0, cols);
+    } else {
+        parallel_compute_block_f32(job->Af, job->Bf, job->Cf, job->m, r0, rows, c0, cols, job->prec);
+    }
+}
+
+// work_queue_claim, timed when the worker is being profiled (st != NULL)
+static size_t claim_work(engine_job_t *job, size_t chunk, worker_stats_t *st, size_t *first) {
+    if (!st) return work_queue_claim(job->queue, chunk, job->total, first);
+    double t0 = profile_now_us();
+    size_t count = work_queue_claim(job->queue, chunk, job->total, first);
+    st->queue_us += profile_now_us() - t0;
+    if (count > 0) st->claims++;
+    return count;
+}
+
+static void row_worker(engine_job_t *job, worker_stats_t *st) {
+    size_t first, count;
+    while ((count = claim_work(job, job->grain, st, &first)) > 0) {
+        double t0 = st ? profile_now_us() : 0.0;
+        compute_block(job, (int)first, (int)count, 0, job->m);
+        if (st) {
+            st->compute_us += profile_now_us() - t0;
+            st->items += (long)count;
+        }
+    }
+}
+
+static void element_worker(engine_job_t *job, worker_stats_t *st) {
+    int tile = (int)job->grain;
+    size_t tiles_per_row = ((size_t)job->m + tile - 1) / tile;
+    size_t first, count;
+    while ((count = claim_work(job, 1, st, &first)) > 0) {
+        int r0 = (int)(first / tiles_per_row) * tile;
+        int c0 = (int)(first % tiles_per_row) * tile;
+        int rows = job->m - r0 < tile ? job->m - r0 : tile;
+        int cols = job->m - c0 < tile ? job->m - c0 : tile;
+        double t0 = st ? profile_now_us() : 0.0;
+        compute_block(job, r0, rows, c0, cols);
+        if (st) {
+            st->compute_us += profile_now_us() - t0;
+            st->items++;
+        }
+    }
+}
+
+// Child side of a profiled worker: spawn latency, counters, finish time
+static void run_profiled(void (*fn)(engine_job_t *, worker_stats_t *), engine_job_t *job,
+                         worker_stats_t *st) {
+    double started = profile_now_us();
+    st->spawn_us = started - st->spawn_us;  // the parent stored its fork() time here
+    st->start_us = started - job->t0;
+    perf_counters_t pc;
+    perf_counters_start(&pc);
+    fn(job, st);
+    perf_counters_stop(&pc, st);
+    st->finish_us = profile_now_us() - job->t0;
+}
+
+// Fork p workers running fn(job) and reap them. Returns 0 if all succeeded.
+// With job->stats set, worker i records into job->stats[i] and prof gets the
+// parent-side phases.
+static int run_workers(int p, void (*fn)(engine_job_t *, worker_stats_t *), engine_job_t *job,
+                       engine_profile_t *prof) {
+    pid_t *pids = calloc((size_t)p, sizeof(pid_t));
+    if (!pids) {
+        perror("calloc");
+        return -1;
+    }
+
+    int spawned = 0;
+    job->t0 = profile_now_us();
+    for (int w = 0; w < p; w++) {
+        if (job->stats) job->stats[spawned].spawn_us = profile_now_us();
+        pid_t pid = fork();
+        if (pid < 0) {
+            perror("fork");
+            fprintf(stderr, "Failed to create process %d\n", w);
+            // continue creating others; the queue balances the work over them
+            continue;
+        }
+        if (pid == 0) {
+            placement_pin_worker(engine_placement, spawned);
+            if (job->stats) run_profiled(fn, job, &job->stats[spawned]);
+            else fn(job, NULL);
+            _exit(0);
+        }
+        pids[spawned++] = pid;
+    }
+    double forked = profile_now_us();
+
+    int failed = spawned == 0;
+    for (int w = 0; w < spawned; w++) {
+        int status;
+        while (waitpid(pids[w], &status, 0) == -1) {
+            if (errno != EINTR) {
+                failed = 1;
+                break;
+            }
+        }
+        if (failed) continue;
+        if (!WIFEXITED(status) || WEXITSTATUS(status) != 0) failed = 1;
+    }
+    free(pids);
+
+    if (prof) {
+        double done = profile_now_us();
+        prof->workers = spawned;
+        prof->fork_us = forked - job->t0;
+        prof->reap_us = done - forked;
+        prof->total_us = done - job->t0;
+        memcpy(prof->stats, job->stats, (size_t)spawned * sizeof(worker_stats_t));
+    }
+    return failed ? -1 : 0;
+}
+
+// The queue and, when profiling, the p worker stats share one MAP_SHARED region
+static int run_engine(engine_job_t *job, int p, void (*fn)(engine_job_t *, worker_stats_t *),
+                      engine_profile_t *prof) {
+    size_t bytes = sizeof(work_queue_t) + (prof ? (size_t)p * sizeof(worker_stats_t) : 0);
+    void *shared = mmap(NULL, bytes, PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
+    if (shared == MAP_FAILED) {
+        perror("mmap");
+        fprintf(stderr, "Failed to allocate shared work queue\n");
+        return -1;
+    }
+    work_queue_t *queue = shared;
+    work_queue_init(queue);
+    job->queue = queue;
+    job->stats = prof ? (worker_stats_t *)(queue + 1) : NULL;
+
+    int rc = run_workers(p, fn, job, prof);
+    munmap(shared, bytes);
+    return rc;
+}
+
+int parallel_row_multiply_profiled(const double *A, const double *B, double *C, int m, int p, int chunk,
+                                   engine_profile_t *prof) {
+    if (chunk <= 0) chunk = parallel_row_default_chunk(m, p);
+    engine_job_t job = { A, B, C, NULL, NULL, NULL, PRECISION_FP64, m, (size_t)chunk, (size_t)m, NULL, NULL, 0.0 };
+    return run_engine(&job, p, row_worker, prof);
+}
+
+int parallel_row_multiply(const double *A, const double *B, double *C, int m, int p, int chunk) {
+    return parallel_row_multiply_profiled(A, B, C, m, p, chunk, NULL);
+}
+
+int parallel_element_multiply_profiled(const double *A, const double *B, double *C, int m, int p, int tile,
+                                       engine_profile_t *prof) {
+    if (tile <= 0) tile = PARALLEL_DEFAULT_TILE;
+    size_t tiles_per_row = ((size_t)m + tile - 1) / tile;
+    engine_job_t job = { A, B, C, NULL, NULL, NULL, PRECISION_FP64, m, (size_t)tile,
+                         tiles_per_row * tiles_per_row, NULL, NULL, 0.0 };
+    return run_engine(&job, p, element_worker, prof);
+}
+
+int parallel_element_multiply(const double *A, const double *B, double *C, int m, int p, int tile) {
+    return parallel_element_multiply_profiled(A, B, C, m, p, tile, NULL);
+}
+
+int parallel_row_multiply_f32(const float *A, const float *B, float *C, int m, int p, int chunk,
+                              precision_t prec, engine_profile_t *prof) {
+    if (chunk <= 0) chunk = parallel_row_default_chunk(m, p);
+    engine_job_t job = { NULL, NULL, NULL, A, B, C, prec, m, (size_t)chunk, (size_t)m, NULL, NULL, 0.0 };
+    return run_engine(&job, p, row_worker, prof);
+}
+
+int parallel_element_multiply_f32(const float *A, const float *B, float *C, int m, int p, int tile,
+                                  precision_t prec, engine_profile_t *prof) {
+    if (tile <= 0) tile = PARALLEL_DEFAULT_TILE;
+    size_t tiles_per_row = ((size_t)m + tile - 1) / tile;
+    engine_job_t job = { NULL, NULL, NULL, A, B, C, prec, m, (size_t)tile,
+                         tiles_per_row * tiles_per_row, NULL, NULL, 0.0 };
+    return run_engine(&job, p, element_worker, prof);
+}
@@ -0,0 +1,56 @@
+#ifndef PARALLEL_ENGINES_H
+#define PARALLEL_ENGINES_H
+
+#include "engine_profile.h"
+#include "placement.h"
+#include "gemm_kernel.h"
+
+// Pass as chunk/tile to let the engine pick a granularity from m and p
+#define PARALLEL_GRAIN_AUTO 0
+
+// Default tile edge for the element engine
+#define PARALLEL_DEFAULT_TILE 16
+
+// Compute one output block C[r0.., c0..] (rows x cols) = A[r0.., :] * B[:, c0..]
+// for m x m row-major operands; shared by every engine that hands out blocks
+void parallel_compute_block(const double *A, const double *B, double *C, int m,
+                            int r0, int rows, int c0, int cols);
+
+// float32 block (prec PRECISION_FP32 or PRECISION_MIXED, see gemm_blocked_f32)
+void parallel_compute_block_f32(const float *A, const float *B, float *C, int m,
+                                int r0, int rows, int c0, int cols, precision_t prec);
+
+// Rows per claim used by the row engine when chunk is PARALLEL_GRAIN_AUTO:
+// about four claims per worker so late finishers can still balance the load
+int parallel_row_default_chunk(int m, int p);
+
+// Row engine: p forked workers claim blocks of `chunk` consecutive rows of C
+// from a lock-free work queue. C must live in MAP_SHARED memory.
+// Returns 0 on success, -1 on failure.
+int parallel_row_multiply(const double *A, const double *B, double *C, int m, int p, int chunk);
+
+// Element engine: p forked workers claim `tile` x `tile` output tiles of C
+// from a lock-free work queue. C must live in MAP_SHARED memory.
+// Returns 0 on success, -1 on failure.
+int parallel_element_multiply(const double *A, const double *B, double *C, int m, int p, int tile);
+
+// Pin the workers of every later row / element run according to pl (--pin);
+// NULL turns pinning off. pl must stay valid while the engines are used.
+void parallel_engines_set_placement(const placement_t *pl);
+
+// The same engines with per-worker instrumentation (--profile): prof->stats must
+// hold p entries. Spawn latency, queue and compute time, finish time and perf
+// counters are recorded by each worker into shared memory and copied out.
+int parallel_row_multiply_profiled(const double *A, const double *B, double *C, int m, int p, int chunk,
+                                   engine_profile_t *prof);
+int parallel_element_multiply_profiled(const double *A, const double *B, double *C, int m, int p, int tile,
+                                       engine_profile_t *prof);
+
+// Row / element engines on float32 operands (--precision fp32|mixed); prof
+// may be NULL
+int parallel_row_multiply_f32(const float *A, const float *B, float *C, int m, int p, int chunk,
+                              precision_t prec, engine_profile_t *prof);
+int parallel_element_multiply_f32(const float *A, const float *B, float *C, int m, int p, int tile,
+                                  precision_t prec, engine_profile_t *prof);
+
+#endif
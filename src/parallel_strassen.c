@@ -0,0 +1,195 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/wait.h>
+#include <errno.h>
+#include "strassen_utils.h"
+#include "work_queue.h"
+#include "parallel_strassen.h"
+
+int parallel_strassen_default_levels(int p) {
+    return p <= 7 ? 1 : 2;
+}
+
+static size_t task_count(int levels) {
+    size_t tasks = 1;
+    for (int l = 0; l < levels; l++) tasks *= 7;
+    return tasks;
+}
+
+static void *shared_alloc(size_t bytes) {
+    void *ptr = mmap(NULL, bytes, PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
+    return ptr == MAP_FAILED ? NULL : ptr;
+}
+
+static void copy_view(const double *X, int ldx, double *Z, int n) {
+    for (int i = 0; i < n; i++) {
+        memcpy(Z + (size_t)i * n, X + (size_t)i * ldx, (size_t)n * sizeof(double));
+    }
+}
+
+// Expand the top `levels` Strassen levels of A * B into contiguous operand
+// pairs opA[t], opB[t] (each task_size doubles), in P1..P7 order per level
+static int expand_tasks(const double *A, int lda, const double *B, int ldb, int n, int levels,
+                        double *opA, double *opB, size_t task_size, size_t *next) {
+    if (levels == 0) {
+        copy_view(A, lda, opA + *next * task_size, n);
+        copy_view(B, ldb, opB + *next * task_size, n);
+        (*next)++;
+        return 0;
+    }
+
+    int h = n / 2;
+    if (levels == 1) {
+        for (int idx = 0; idx < 7; idx++) {
+            strassen_form_operands(idx, A, lda, B, ldb, h,
+                                   opA + *next * task_size, opB + *next * task_size);
+            (*next)++;
+        }
+        return 0;
+    }
+
+    double *Ta = malloc((size_t)h * h * sizeof(double));
+    double *Tb = malloc((size_t)h * h * sizeof(double));
+    if (!Ta || !Tb) {
+        perror("malloc");
+        free(Ta); free(Tb);
+        return -1;
+    }
+    int rc = 0;
+    for (int idx = 0; idx < 7 && rc == 0; idx++) {
+        strassen_form_operands(idx, A, lda, B, ldb, h, Ta, Tb);
+        rc = expand_tasks(Ta, h, Tb, h, h, levels - 1, opA, opB, task_size, next);
+    }
+    free(Ta); free(Tb);
+    return rc;
+}
+
+// Fold the 7^levels task products P (each s x s) back into the n x n view C
+static int combine_tasks(double *P, size_t task_size, int s, int levels, double *C, int ldc) {
+    double *parts[7];
+
+    if (levels == 1) {
+        for (int idx = 0; idx < 7; idx++) parts[idx] = P + idx * task_size;
+        strassen_combine(parts, s, C, ldc);
+        return 0;
+    }
+
+    int h = s << (levels - 1);
+    size_t group = task_count(levels - 1) * task_size;
+    double *Q = malloc(7 * (size_t)h * h * sizeof(double));
+    if (!Q) {
+        perror("malloc");
+        return -1;
+    }
+    int rc = 0;
+    for (int idx = 0; idx < 7 && rc == 0; idx++) {
+        parts[idx] = Q + idx * (size_t)h * h;
+        rc = combine_tasks(P + idx * group, task_size, s, levels - 1, parts[idx], h);
+    }
+    if (rc == 0) strassen_combine(parts, h, C, ldc);
+    free(Q);
+    return rc;
+}
+
+// Child: claim tasks until none are left, computing each with sequential Strassen
+static void worker_loop(work_queue_t *queue, int tasks, const double *opA, const double *opB,
+                        double *P, size_t task_size, int s) {
+    size_t ws = strassen_workspace_size(s);
+    double *work = ws > 0 ? malloc(ws * sizeof(double)) : NULL;
+    if (ws > 0 && !work) {
+        perror("malloc");
+        _exit(1);
+    }
+
+    size_t t;
+    while (work_queue_claim(queue, 1, (size_t)tasks, &t) > 0) {
+        strassen_multiply_ws(opA + t * task_size, s, opB + t * task_size, s,
+                             P + t * task_size, s, s, work);
+    }
+    free(work);
+}
+
+int parallel_strassen_multiply(const double *A, const double *B, double *C, int n, int p, int levels) {
+    if (levels < 1) levels = 1;
+    if (levels > PARALLEL_STRASSEN_MAX_LEVELS) levels = PARALLEL_STRASSEN_MAX_LEVELS;
+    // Not enough size to split: nothing to distribute
+    while (levels > 0 && (n >> levels) < 1) levels--;
+    if (levels == 0 || p <= 1) {
+        strassen_multiply((double *)A, (double *)B, C, n);
+        return 0;
+    }
+
+    // The tasks cover the leading ne x ne block (ne divisible by 2^levels);
+    // the last n - ne rows / columns are peeled and fixed up afterwards
+    int ne = n - n % (1 << levels);
+    int tasks = (int)task_count(levels);
+    int s = ne >> levels;
+    size_t task_size = (size_t)s * s;
+    size_t bytes = (size_t)tasks * task_size * sizeof(double);
+
+    double *opA = shared_alloc(bytes);
+    double *opB = shared_alloc(bytes);
+    double *P = shared_alloc(bytes);
+    work_queue_t *queue = shared_alloc(sizeof(work_queue_t));
+    pid_t *pids = calloc((size_t)p, sizeof(pid_t));
+    int rc = -1;
+
+    if (!opA || !opB || !P || !queue) {
+        perror("mmap");
+        fprintf(stderr, "Failed to allocate shared memory for Strassen tasks\n");
+        goto cleanup;
+    }
+    if (!pids) {
+        perror("calloc");
+        goto cleanup;
+    }
+
+    size_t filled = 0;
+    if (expand_tasks(A, n, B, n, ne, levels, opA, opB, task_size, &filled) != 0) goto cleanup;
+
+    work_queue_init(queue);
+
+    // More workers than tasks would only sit idle
+    int workers = p < tasks ? p : tasks;
+    int spawned = 0;
+    for (int w = 0; w < workers; w++) {
+        pid_t pid = fork();
+        if (pid < 0) {
+            perror("fork");
+            fprintf(stderr, "Failed to create process %d\n", w);
+            continue;
+        }
+        if (pid == 0) {
+            worker_loop(queue, tasks, opA, opB, P, task_size, s);
+            _exit(0);
+        }
+        pids[spawned++] = pid;
+    }
+
+    int failed = spawned == 0;
+    for (int w = 0; w < spawned; w++) {
+        int status, wrc;
+        while ((wrc = waitpid(pids[w], &status, 0)) == -1 && errno == EINTR) {}
+        if (wrc == -1 || !WIFEXITED(status) || WEXITSTATUS(status) != 0) failed = 1;
+    }
+
+    if (failed) {
+        fprintf(stderr, "Strassen worker failed\n");
+        goto cleanup;
+    }
+
+    rc = combine_tasks(P, task_size, s, levels, C, n);
+    if (rc == 0 && ne < n) strassen_peel_fixup(n, n, n, ne, ne, ne, A, n, B, n, C, n);
+
+cleanup:
+    if (opA) munmap(opA, bytes);
+    if (opB) munmap(opB, bytes);
+    if (P) munmap(P, bytes);
+    if (queue) munmap(queue, sizeof(work_queue_t));
+    free(pids);
+    return rc;
+}
@@ -0,0 +1,19 @@
+#ifndef PARALLEL_STRASSEN_H
+#define PARALLEL_STRASSEN_H
+
+// Maximum number of Strassen levels distributed across workers (7^2 = 49 tasks)
+#define PARALLEL_STRASSEN_MAX_LEVELS 2
+
+// Default number of distributed levels for p worker processes:
+// one level (7 tasks) for up to 7 workers, two levels (49 tasks) beyond that
+int parallel_strassen_default_levels(int p);
+
+// Parallel Strassen: C = A * B for n x n row-major matrices.
+// The top `levels` recursion levels are expanded into 7^levels independent
+// sub-products, which p forked workers claim from a lock-free queue and compute with strassen_multiply_ws into
+// shared memory; the parent then assembles C from them.
+// Any n: when n is not divisible by 2^levels the last rows / columns are
+// peeled off and fixed up by the parent. Returns 0 on success, -1 on failure.
+int parallel_strassen_multiply(const double *A, const double *B, double *C, int n, int p, int levels);
+
+#endif
@@ -0,0 +1,268 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include <sched.h>
+#include <dirent.h>
+#include <errno.h>
+#include <sys/syscall.h>
+#include <linux/mempolicy.h>
+#include "placement.h"
+
+#define MAX_NUMA_NODES 1024
+
+// Parse a kernel-style CPU / node list ("0,2,4-7") into a new array.
+// Returns the number of entries, or -1 on a malformed list.
+static int parse_list(const char *text, int **out) {
+    int cap = 16, count = 0;
+    int *items = malloc((size_t)cap * sizeof(int));
+    if (!items) return -1;
+    const char *s = text;
+    while (*s && *s != '\n') {
+        char *end;
+        long lo = strtol(s, &end, 10), hi;
+        if (end == s || lo < 0) goto bad;
+        hi = lo;
+        if (*end == '-') {
+            s = end + 1;
+            hi = strtol(s, &end, 10);
+            if (end == s || hi < lo) goto bad;
+        }
+        for (long v = lo; v <= hi; v++) {
+            if (count == cap) {
+                int *grown = realloc(items, (size_t)(cap *= 2) * sizeof(int));
+                if (!grown) goto bad;
+                items = grown;
+            }
+            items[count++] = (int)v;
+        }
+        s = end;
+        if (*s == ',') s++;
+        else if (*s && *s != '\n') goto bad;
+    }
+    *out = items;
+    return count;
+bad:
+    free(items);
+    return -1;
+}
+
+static int read_int_file(const char *path, int fallback) {
+    FILE *f = fopen(path, "r");
+    if (!f) return fallback;
+    int value;
+    if (fscanf(f, "%d", &value) != 1) value = fallback;
+    fclose(f);
+    return value;
+}
+
+// Nodes listed in /sys/devices/system/node/has_memory; NULL / 0 without NUMA info
+static int numa_nodes(int **nodes) {
+    char line[4096];
+    FILE *f = fopen("/sys/devices/system/node/has_memory", "r");
+    if (!f) return 0;
+    int count = fgets(line, sizeof(line), f) ? parse_list(line, nodes) : -1;
+    fclose(f);
+    return count > 0 ? count : 0;
+}
+
+int numa_node_count(void) {
+    int *nodes = NULL;
+    int count = numa_nodes(&nodes);
+    free(nodes);
+    return count > 0 ? count : 1;
+}
+
+// The cpuN directory has a nodeM link for the node the CPU belongs to
+static int cpu_node(int cpu) {
+    char path[64];
+    snprintf(path, sizeof(path), "/sys/devices/system/cpu/cpu%d", cpu);
+    DIR *dir = opendir(path);
+    if (!dir) return 0;
+    int node = 0;
+    struct dirent *entry;
+    while ((entry = readdir(dir)) != NULL) {
+        if (strncmp(entry->d_name, "node", 4) == 0 && sscanf(entry->d_name + 4, "%d", &node) == 1) break;
+    }
+    closedir(dir);
+    return node;
+}
+
+static int topology_init(cpu_topology_t *t) {
+    memset(t, 0, sizeof(*t));
+    cpu_set_t set;
+    if (sched_getaffinity(0, sizeof(set), &set) == -1) {
+        perror("sched_getaffinity");
+        return -1;
+    }
+    int n = CPU_COUNT(&set);
+    t->cpu = malloc((size_t)n * sizeof(int));
+    t->package = malloc((size_t)n * sizeof(int));
+    t->core = malloc((size_t)n * sizeof(int));
+    t->node = malloc((size_t)n * sizeof(int));
+    if (!t->cpu || !t->package || !t->core || !t->node) {
+        perror("malloc");
+        return -1;
+    }
+    for (int c = 0; c < CPU_SETSIZE && t->count < n; c++) {
+        if (!CPU_ISSET(c, &set)) continue;
+        char path[128];
+        int i = t->count++;
+        t->cpu[i] = c;
+        snprintf(path, sizeof(path), "/sys/devices/system/cpu/cpu%d/topology/physical_package_id", c);
+        t->package[i] = read_int_file(path, 0);
+        snprintf(path, sizeof(path), "/sys/devices/system/cpu/cpu%d/topology/core_id", c);
+        t->core[i] = read_int_file(path, c);
+        t->node[i] = cpu_node(c);
+    }
+
+    for (int i = 0; i < t->count; i++) {
+        int new_package = 1, new_core = 1;
+        for (int j = 0; j < i; j++) {
+            if (t->package[j] == t->package[i]) {
+                new_package = 0;
+                if (t->core[j] == t->core[i]) new_core = 0;
+            }
+        }
+        t->packages += new_package;
+        t->cores += new_core;
+    }
+    t->nodes = numa_node_count();
+    return 0;
+}
+
+// Sort keys of available CPU i: compact = (socket, core, sibling),
+// scatter = (sibling, core, socket)
+static void sort_key(const cpu_topology_t *t, int i, pin_mode_t mode, int key[3]) {
+    int sibling = 0;
+    for (int j = 0; j < i; j++) {
+        if (t->package[j] == t->package[i] && t->core[j] == t->core[i]) sibling++;
+    }
+    if (mode == PIN_COMPACT) {
+        key[0] = t->package[i]; key[1] = t->core[i]; key[2] = sibling;
+    } else {
+        key[0] = sibling; key[1] = t->core[i]; key[2] = t->package[i];
+    }
+}
+
+static int key_less(const int a[3], const int b[3]) {
+    for (int i = 0; i < 3; i++) {
+        if (a[i] != b[i]) return a[i] < b[i];
+    }
+    return 0;
+}
+
+int placement_init(placement_t *pl, const char *spec) {
+    memset(pl, 0, sizeof(*pl));
+    if (topology_init(&pl->topo) != 0) return -1;
+    const cpu_topology_t *t = &pl->topo;
+
+    if (!spec || strcmp(spec, "none") == 0) {
+        pl->mode = PIN_NONE;
+        return 0;
+    }
+    if (strcmp(spec, "compact") == 0 || strcmp(spec, "scatter") == 0) {
+        pl->mode = spec[0] == 'c' ? PIN_COMPACT : PIN_SCATTER;
+        pl->count = t->count;
+        pl->cpus = malloc((size_t)t->count * sizeof(int));
+        int (*keys)[3] = malloc((size_t)t->count * sizeof(*keys));
+        if (!pl->cpus || !keys) {
+            perror("malloc");
+            free(keys);
+            return -1;
+        }
+        // insertion sort: a few hundred CPUs at most
+        for (int i = 0; i < t->count; i++) {
+            int key[3];
+            sort_key(t, i, pl->mode, key);
+            int j = i;
+            while (j > 0 && key_less(key, keys[j - 1])) {
+                memcpy(keys[j], keys[j - 1], sizeof(key));
+                pl->cpus[j] = pl->cpus[j - 1];
+                j--;
+            }
+            memcpy(keys[j], key, sizeof(key));
+            pl->cpus[j] = t->cpu[i];
+        }
+        free(keys);
+        return 0;
+    }
+
+    pl->mode = PIN_LIST;
+    pl->count = parse_list(spec, &pl->cpus);
+    if (pl->count <= 0) {
+        fprintf(stderr, "--pin: expected none, compact, scatter or a CPU list like 0,2,4-7, got \"%s\"\n", spec);
+        return -1;
+    }
+    for (int i = 0; i < pl->count; i++) {
+        int allowed = 0;
+        for (int j = 0; j < t->count; j++) allowed |= t->cpu[j] == pl->cpus[i];
+        if (!allowed) {
+            fprintf(stderr, "--pin: CPU %d is not available to this process\n", pl->cpus[i]);
+            return -1;
+        }
+    }
+    return 0;
+}
+
+void placement_free(placement_t *pl) {
+    free(pl->cpus);
+    free(pl->topo.cpu);
+    free(pl->topo.package);
+    free(pl->topo.core);
+    free(pl->topo.node);
+    memset(pl, 0, sizeof(*pl));
+}
+
+void placement_pin_worker(const placement_t *pl, int worker) {
+    if (!pl || pl->mode == PIN_NONE || pl->count == 0) return;
+    cpu_set_t set;
+    CPU_ZERO(&set);
+    CPU_SET(pl->cpus[worker % pl->count], &set);
+    if (sched_setaffinity(0, sizeof(set), &set) == -1) {
+        perror("sched_setaffinity");
+    }
+}
+
+void placement_describe(const placement_t *pl, int workers, FILE *out) {
+    static const char *names[] = {"none", "compact", "scatter", "list"};
+    const cpu_topology_t *t = &pl->topo;
+    fprintf(out, "placement: %d socket%s, %d NUMA node%s, %d core%s, %d CPU%s available; pin=%s",
+            t->packages, t->packages == 1 ? "" : "s", t->nodes, t->nodes == 1 ? "" : "s",
+            t->cores, t->cores == 1 ? "" : "s", t->count, t->count == 1 ? "" : "s", names[pl->mode]);
+    if (pl->mode != PIN_NONE) {
+        int shown = workers < pl->count ? workers : pl->count;
+        fprintf(out, " (workers -> CPUs");
+        for (int w = 0; w < shown && w < 16; w++) fprintf(out, "%s%d", w ? "," : " ", pl->cpus[w]);
+        if (shown > 16) fprintf(out, ",...");
+        if (workers > pl->count) fprintf(out, ", %d workers share %d CPUs", workers, pl->count);
+        fprintf(out, ")");
+    }
+    if (pl->interleave) {
+        fprintf(out, "; numa=interleave A,B%s, first-touch C", t->nodes > 1 ? "" : " (single node: no effect)");
+    }
+    fprintf(out, "\n");
+}
+
+int numa_interleave(void *addr, size_t bytes) {
+    int *nodes = NULL;
+    int count = numa_nodes(&nodes);
+    if (count <= 1) {
+        free(nodes);
+        return -1;
+    }
+    unsigned long mask[MAX_NUMA_NODES / (8 * sizeof(unsigned long))];
+    memset(mask, 0, sizeof(mask));
+    for (int i = 0; i < count; i++) {
+        if (nodes[i] < MAX_NUMA_NODES) {
+            mask[nodes[i] / (8 * sizeof(unsigned long))] |= 1UL << (nodes[i] % (8 * sizeof(unsigned long)));
+        }
+    }
+    free(nodes);
+    if (syscall(SYS_mbind, addr, bytes, MPOL_INTERLEAVE, mask, (unsigned long)MAX_NUMA_NODES, 0) == -1) {
+        if (errno != ENOSYS && errno != EPERM) perror("mbind");
+        return -1;
+    }
+    return 0;
+}
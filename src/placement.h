@@ -0,0 +1,57 @@
+#ifndef PLACEMENT_H
+#define PLACEMENT_H
+
+#include <stddef.h>
+#include <stdio.h>
+
+// How forked workers are pinned (--pin)
+typedef enum {
+    PIN_NONE = 0,   // let the scheduler move workers freely
+    PIN_COMPACT,    // fill one socket (core by core, SMT siblings together) before the next
+    PIN_SCATTER,    // round-robin over sockets, then cores, SMT siblings last
+    PIN_LIST        // explicit CPU list, e.g. "0,2,4-7"
+} pin_mode_t;
+
+// CPUs this process may run on (sched_getaffinity), with their place in the
+// machine read from /sys/devices/system/cpu/cpuN/topology
+typedef struct {
+    int count;          // available CPUs
+    int *cpu;           // CPU ids, ascending
+    int *package;       // socket of each CPU
+    int *core;          // core id of each CPU (unique within its socket)
+    int *node;          // NUMA node of each CPU
+    int packages;       // distinct sockets among the available CPUs
+    int cores;          // distinct (socket, core) pairs
+    int nodes;          // NUMA nodes with memory
+} cpu_topology_t;
+
+// Worker w runs on cpus[w % count]
+typedef struct {
+    pin_mode_t mode;
+    int count;
+    int *cpus;
+    int interleave;     // --numa: spread A and B over all NUMA nodes
+    cpu_topology_t topo;
+} placement_t;
+
+// Parse a --pin value ("none", "compact", "scatter" or a CPU list) and order
+// the available CPUs accordingly. Returns 0 on success, -1 on a bad spec.
+int placement_init(placement_t *pl, const char *spec);
+
+void placement_free(placement_t *pl);
+
+// Pin the calling process (worker w) according to pl; no-op for PIN_NONE or NULL
+void placement_pin_worker(const placement_t *pl, int worker);
+
+// One line describing the topology and the chosen placement
+void placement_describe(const placement_t *pl, int workers, FILE *out);
+
+// Number of NUMA nodes with memory (1 when the system has no NUMA information)
+int numa_node_count(void);
+
+// Interleave the pages of [addr, addr + bytes) over every NUMA node with memory
+// (mbind MPOL_INTERLEAVE, no libnuma needed). Must be called before the pages
+// are first touched. Returns 0 on success, -1 when the policy was not applied.
+int numa_interleave(void *addr, size_t bytes);
+
+#endif // PLACEMENT_H
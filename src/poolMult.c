@@ -0,0 +1,157 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/time.h>
+#include <getopt.h>
+#include "common.h"
+#include "parallel_engines.h"
+#include "worker_pool.h"
+#include "strassen_utils.h"
+
+static void usage(const char *prog) {
+    fprintf(stderr, "Usage: %s <num_processes> <matrix_size> [matrix_size ...] "
+                    "[--repeat N] [--chunk rows] [--pin compact|scatter|none|cpu-list] [--no-pin] [--verify[=k]]\n"
+                    "Workers are pinned compactly by default; --no-pin is --pin none\n"
+                    "--verify checks each size's C with k (default %d) rounds of Freivalds' test;\n"
+                    "exit status %d if one fails\n", prog, VERIFY_DEFAULT_ROUNDS, VERIFY_EXIT_FAILED);
+}
+
+static double elapsed_us(struct timeval *start, struct timeval *end) {
+    return (end->tv_sec - start->tv_sec) * 1e6 + (end->tv_usec - start->tv_usec);
+}
+
+int main(int argc, char *argv[]) {
+    int repeat = 1;
+    int chunk = PARALLEL_GRAIN_AUTO;
+    const char *pin_spec = "compact";
+    int verify = 0;
+    static struct option long_options[] = {
+        {"repeat", required_argument, NULL, 'r'},
+        {"chunk", required_argument, NULL, 'c'},
+        {"pin", required_argument, NULL, 'P'},
+        {"no-pin", no_argument, NULL, 'n'},
+        {"verify", optional_argument, NULL, 'V'},
+        {NULL, 0, NULL, 0}
+    };
+    int opt;
+    while ((opt = getopt_long(argc, argv, "", long_options, NULL)) != -1) {
+        switch (opt) {
+        case 'r':
+            repeat = atoi(optarg);
+            break;
+        case 'c':
+            chunk = atoi(optarg);
+            break;
+        case 'P':
+            pin_spec = optarg;
+            break;
+        case 'n':
+            pin_spec = "none";
+            break;
+        case 'V':
+            verify = parse_verify_rounds(optarg);
+            if (verify < 0) {
+                fprintf(stderr, "--verify takes a number of rounds between 1 and %d\n", FREIVALDS_MAX_ROUNDS);
+                return 1;
+            }
+            break;
+        default:
+            usage(argv[0]);
+            return 1;
+        }
+    }
+    if (argc - optind < 2) {
+        usage(argv[0]);
+        return 1;
+    }
+    if (repeat <= 0 || chunk < 0) {
+        fprintf(stderr, "--repeat and --chunk must be positive\n");
+        return 1;
+    }
+
+    int p = atoi(argv[optind]);
+    int num_sizes = argc - optind - 1;
+    int *sizes = malloc((size_t)num_sizes * sizeof(int));
+    if (p <= 0 || !sizes) {
+        fprintf(stderr, "num_processes must be positive\n");
+        return 1;
+    }
+    int max_m = 0;
+    for (int i = 0; i < num_sizes; i++) {
+        sizes[i] = atoi(argv[optind + 1 + i]);
+        if (sizes[i] <= 0) {
+            fprintf(stderr, "matrix_size must be positive\n");
+            return 1;
+        }
+        if (sizes[i] > max_m) max_m = sizes[i];
+    }
+
+    // The arena holds A, B and C of the largest size; it is reset between sizes
+    size_t arena_bytes = 3 * ((size_t)max_m * max_m + 8) * sizeof(double);
+
+    placement_t placement;
+    if (placement_init(&placement, pin_spec) != 0) {
+        placement_free(&placement);
+        return 1;
+    }
+    placement_describe(&placement, p, stdout);
+
+    struct timeval start, end;
+    gettimeofday(&start, NULL);
+    worker_pool_t *pool = worker_pool_create(p, arena_bytes, &placement);
+    gettimeofday(&end, NULL);
+    if (!pool) {
+        fprintf(stderr, "Failed to start worker pool\n");
+        return 1;
+    }
+    printf("poolMult: started %d workers in %.0f microseconds\n", p, elapsed_us(&start, &end));
+
+    // Use fixed seed for testing consistency across implementations
+    srand(12345);
+    int status = 0;
+    for (int s = 0; s < num_sizes; s++) {
+        int m = sizes[s];
+        size_t n = (size_t)m * m;
+
+        worker_pool_reset(pool);
+        double *A = worker_pool_alloc(pool, n);
+        double *B = worker_pool_alloc(pool, n);
+        double *C = worker_pool_alloc(pool, n);
+        for (int i = 0; i < m; i++) {
+            for (int j = 0; j < m; j++) {
+                A[i * m + j] = (double)(rand() % 100);
+                B[i * m + j] = (double)(rand() % 100);
+            }
+        }
+
+        for (int r = 0; r < repeat; r++) {
+            gettimeofday(&start, NULL);
+            if (worker_pool_multiply(pool, A, B, C, m, chunk) != 0) {
+                fprintf(stderr, "Pool multiplication failed\n");
+                worker_pool_destroy(pool);
+                return 1;
+            }
+            gettimeofday(&end, NULL);
+            printf("poolMult: m=%d, p=%d, time=%.0f microseconds\n", m, p, elapsed_us(&start, &end));
+        }
+
+        // --verify: the last repeat's C, checked with the same number of workers
+        if (verify) {
+            verify_result_t vr;
+            int vrc = freivalds_verify(A, B, C, m, verify, p, &vr);
+            if (vrc < 0) status = 1;
+            else freivalds_print(stdout, &vr);
+            if (vrc > 0) status = VERIFY_EXIT_FAILED;
+        }
+
+        if (m <= 10) {
+            printf("Result C:\n");
+            printm(m, C);
+        }
+    }
+
+    worker_pool_destroy(pool);
+    placement_free(&placement);
+    free(sizes);
+    return status;
+}
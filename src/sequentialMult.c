@@ -1,80 +1,193 @@
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 #include <sys/time.h>
+#include <getopt.h>
 #include <math.h>
 #include "common.h"
 #include "strassen_utils.h"
+#include "matrix_io.h"
+#include "morton.h"
+
+static void usage(const char *prog) {
+    fprintf(stderr, "Usage: %s <matrix_size> [--out C.mtx] [--cutoff N] [--algo ALGO] [--precision P] [--layout rowmajor|morton] [--json]\n"
+                    "       %s --a A.mtx --b B.mtx [--out C.mtx] [--cutoff N] [--algo ALGO] [--precision P] [--layout rowmajor|morton] [--json]\n"
+                    "       [--verify[=k]]\n"
+                    "--algo strassen (default), winograd, naive or blocked (the base kernel alone)\n"
+                    "--precision fp32 keeps A, B and C in float32; mixed also sums the base kernel in\n"
+                    "double (both with --algo strassen or blocked)\n"
+                    "--layout morton converts A and B to the recursive block layout, multiplies there\n"
+                    "and converts C back (conversion included in the time; Strassen only)\n"
+                    "--verify checks C with k (default %d) rounds of Freivalds' test after the timed\n"
+                    "run; exit status %d if it fails\n", prog, prog, VERIFY_DEFAULT_ROUNDS, VERIFY_EXIT_FAILED);
+}
+
+// Name shown on the result line
+static const char *algo_label(const char *algo) {
+    if (strcmp(algo, "winograd") == 0) return "Strassen-Winograd";
+    if (strcmp(algo, "naive") == 0) return "naive";
+    if (strcmp(algo, "blocked") == 0) return "blocked";
+    return "Strassen";
+}
 
 int main(int argc, char *argv[]) {
-    if (argc < 2) {
-        fprintf(stderr, "Usage: %s <matrix_size>\n", argv[0]);
-        return 1;
+    const char *a_path = NULL, *b_path = NULL, *out_path = NULL;
+    int json = 0;
+    int morton = 0;
+    int verify = 0;
+    const char *algo = "strassen";
+    precision_t prec = PRECISION_FP64;
+    static struct option long_options[] = {
+        {"a", required_argument, NULL, 'a'},
+        {"b", required_argument, NULL, 'b'},
+        {"out", required_argument, NULL, 'o'},
+        {"json", no_argument, NULL, 'j'},
+        {"cutoff", required_argument, NULL, 'C'},
+        {"layout", required_argument, NULL, 'L'},
+        {"algo", required_argument, NULL, 'A'},
+        {"precision", required_argument, NULL, 'x'},
+        {"verify", optional_argument, NULL, 'V'},
+        {NULL, 0, NULL, 0}
+    };
+    int opt;
+    while ((opt = getopt_long(argc, argv, "", long_options, NULL)) != -1) {
+        switch (opt) {
+        case 'a': a_path = optarg; break;
+        case 'b': b_path = optarg; break;
+        case 'o': out_path = optarg; break;
+        case 'j': json = 1; break;
+        case 'C':
+            if (atoi(optarg) <= 0) {
+                fprintf(stderr, "--cutoff must be positive\n");
+                return 1;
+            }
+            strassen_set_cutoff(atoi(optarg));
+            break;
+        case 'L':
+            if (strcmp(optarg, "morton") == 0) {
+                morton = 1;
+            } else if (strcmp(optarg, "rowmajor") != 0) {
+                fprintf(stderr, "--layout must be rowmajor or morton\n");
+                return 1;
+            }
+            break;
+        case 'A':
+            algo = optarg;
+            if (strcmp(algo, "winograd") == 0) {
+                strassen_set_variant(STRASSEN_WINOGRAD);
+            } else if (strcmp(algo, "strassen") != 0 && strcmp(algo, "naive") != 0 &&
+                       strcmp(algo, "blocked") != 0) {
+                fprintf(stderr, "--algo must be strassen, winograd, naive or blocked\n");
+                return 1;
+            }
+            break;
+        case 'x':
+            if (precision_parse(optarg, &prec) != 0) {
+                fprintf(stderr, "--precision must be fp64, fp32 or mixed\n");
+                return 1;
+            }
+            break;
+        case 'V':
+            verify = parse_verify_rounds(optarg);
+            if (verify < 0) {
+                fprintf(stderr, "--verify takes a number of rounds between 1 and %d\n", FREIVALDS_MAX_ROUNDS);
+                return 1;
+            }
+            break;
+        default:
+            usage(argv[0]);
+            return 1;
+        }
     }
-
-    int m = atoi(argv[1]);
-    if (m <= 0) {
-        fprintf(stderr, "matrix_size must be positive\n");
+    if (morton && strcmp(algo, "strassen") != 0) {
+        fprintf(stderr, "--layout morton is only available with --algo strassen\n");
         return 1;
     }
-    if (m > 10000) {
-        fprintf(stderr, "Warning: matrix_size %d is very large, may cause memory issues\n", m);
+    if (prec != PRECISION_FP64 && (morton || (strcmp(algo, "strassen") != 0 && strcmp(algo, "blocked") != 0))) {
+        fprintf(stderr, "--precision %s supports --algo strassen or blocked in the row-major layout\n",
+                precision_name(prec));
+        return 1;
     }
-    
-    // Check if matrix size is power of 2 for Strassen algorithm
-    int padded_size = next_power_of_2(m);
-    if (!is_power_of_2(m)) {
-        printf("Warning: matrix_size %d is not power of 2, padding to %d for Strassen algorithm\n", m, padded_size);
+    int from_files = a_path || b_path;
+    if (argc - optind != (from_files ? 0 : 1)) {
+        usage(argv[0]);
+        return 1;
     }
-    size_t n = (size_t)m * m;
 
-    double *A = malloc(n * sizeof(double));
-    double *B = malloc(n * sizeof(double));
-    double *C = calloc(n, sizeof(double));
-    if (!A || !B || !C) {
-        perror("malloc");
+    int m = from_files ? 0 : atoi(argv[optind]);
+    if (!from_files && m <= 0) {
+        fprintf(stderr, "matrix_size must be positive\n");
         return 1;
     }
 
-    // Use fixed seed for testing consistency across implementations
-    srand(12345);
-    for (int i = 0; i < m; i++) {
-        for (int j = 0; j < m; j++) {
-            A[i * m + j] = (double)(rand() % 100);
-            B[i * m + j] = (double)(rand() % 100);
-        }
+    // A and B come from the input files or the fixed-seed test data
+    matrix_operands_t ops;
+    uint32_t dtype = prec == PRECISION_FP64 ? MATRIX_DTYPE_F64 : MATRIX_DTYPE_F32;
+    if (matrix_operands_open_dtype(&ops, m, a_path, b_path, out_path, dtype) != 0) return 1;
+    m = ops.m;
+    double *A = ops.A, *B = ops.B, *C = ops.C;
+
+    if (m > 10000) {
+        fprintf(stderr, "Warning: matrix_size %d is very large, may cause memory issues\n", m);
     }
 
     struct timeval start, end;
     gettimeofday(&start, NULL);
 
-    // Use Strassen algorithm for matrix multiplication
-    if (is_power_of_2(m)) {
-        // Direct Strassen multiplication
-        strassen_multiply(A, B, C, m);
+    if (prec != PRECISION_FP64) {
+        // float32 storage: Strassen additions in float, base kernel per prec
+        if (strcmp(algo, "blocked") == 0) {
+            gemm_blocked_f32(m, m, m, 1.0f, ops.Af, m, ops.Bf, m, 0.0f, ops.Cf, m, prec);
+        } else {
+            strassen_multiply_f32(ops.Af, ops.Bf, ops.Cf, m, prec);
+        }
+    } else if (morton) {
+        // Recursive block layout: contiguous quadrants and leaves (zero-padded)
+        if (strassen_multiply_via_morton(A, B, C, m) != 0) {
+            matrix_operands_close(&ops);
+            return 1;
+        }
+    } else if (strcmp(algo, "naive") == 0) {
+        naive_multiply(A, B, C, m);
+    } else if (strcmp(algo, "blocked") == 0) {
+        blocked_multiply(A, B, C, m);
     } else {
-        // Pad matrices to power of 2 and use Strassen
-        double *A_padded = pad_matrix(A, m, padded_size);
-        double *B_padded = pad_matrix(B, m, padded_size);
-        double *C_padded = calloc(padded_size * padded_size, sizeof(double));
-        
-        strassen_multiply(A_padded, B_padded, C_padded, padded_size);
-        
-        // Unpad result
-        unpad_matrix(C_padded, C, padded_size, m);
-        
-        free(A_padded); free(B_padded); free(C_padded);
+        // Strassen or Strassen-Winograd for any m: odd dimensions are peeled at
+        // each level, never padded
+        strassen_multiply(A, B, C, m);
     }
 
     gettimeofday(&end, NULL);
     double time_taken = (end.tv_sec - start.tv_sec) * 1e6 + (end.tv_usec - start.tv_usec);
 
-    printf("sequentialMult (Strassen): m=%d, time=%.0f microseconds\n", m, time_taken);
+    if (json) {
+        print_json_result("sequentialMult", algo_label(algo), m, 1, time_taken);
+    } else {
+        printf("sequentialMult (%s): m=%d, time=%.0f microseconds\n", algo_label(algo), m, time_taken);
+        if (prec != PRECISION_FP64) {
+            printf("  precision=%s, max relative error vs float64 = %.2e (%d sampled rows)\n",
+                   precision_name(prec), strassen_f32_sampled_error(ops.Af, ops.Bf, ops.Cf, m, PRECISION_CHECK_ROWS),
+                   m < PRECISION_CHECK_ROWS ? m : PRECISION_CHECK_ROWS);
+        }
+    }
+
+    // --verify: Freivalds' check, printed to stderr with --json
+    int status = 0;
+    if (verify) {
+        verify_result_t vr;
+        int vrc = prec == PRECISION_FP64 ? freivalds_verify(A, B, C, m, verify, 1, &vr)
+                                         : freivalds_verify_f32(ops.Af, ops.Bf, ops.Cf, m, verify, 1, &vr);
+        if (vrc < 0) status = 1;
+        else freivalds_print(json ? stderr : stdout, &vr);
+        if (vrc > 0) status = VERIFY_EXIT_FAILED;
+    }
 
-    if (m <= 10) {
+    if (m <= 10 && !json) {
         printf("Result C:\n");
-        printm(m, C);
+        if (prec == PRECISION_FP64) printm(m, C);
+        else printm_f32(m, ops.Cf);
     }
 
-    free(A); free(B); free(C);
-    return 0;
+    matrix_operands_close(&ops);
+    return status;
 }
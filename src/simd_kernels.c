@@ -0,0 +1,561 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "simd_kernels.h"
+#include "gemm_kernel.h"
+
+#if defined(__x86_64__) || defined(__i386__)
+#define SIMD_X86 1
+#include <immintrin.h>
+#endif
+
+// ---- generic: plain C, whatever the compiler makes of it for the baseline ISA
+
+static void add_generic(size_t n, const double *x, const double *y, double *z) {
+    for (size_t i = 0; i < n; i++) z[i] = x[i] + y[i];
+}
+
+static void sub_generic(size_t n, const double *x, const double *y, double *z) {
+    for (size_t i = 0; i < n; i++) z[i] = x[i] - y[i];
+}
+
+static void acc_generic(size_t n, const double *x, double *z) {
+    for (size_t i = 0; i < n; i++) z[i] += x[i];
+}
+
+static void dec_generic(size_t n, const double *x, double *z) {
+    for (size_t i = 0; i < n; i++) z[i] -= x[i];
+}
+
+static void axpy_generic(size_t n, double a, const double *x, double *z) {
+    for (size_t i = 0; i < n; i++) z[i] += a * x[i];
+}
+
+static void micro_generic(int kc, const double *a, const double *b, double *ab) {
+    double acc[GEMM_MR][GEMM_NR] = {{0.0}};
+    for (int p = 0; p < kc; p++) {
+        for (int i = 0; i < GEMM_MR; i++) {
+            double a_ip = a[i];
+            for (int j = 0; j < GEMM_NR; j++) {
+                acc[i][j] += a_ip * b[j];
+            }
+        }
+        a += GEMM_MR;
+        b += GEMM_NR;
+    }
+    memcpy(ab, acc, sizeof(acc));
+}
+
+static void add_f32_generic(size_t n, const float *x, const float *y, float *z) {
+    for (size_t i = 0; i < n; i++) z[i] = x[i] + y[i];
+}
+
+static void sub_f32_generic(size_t n, const float *x, const float *y, float *z) {
+    for (size_t i = 0; i < n; i++) z[i] = x[i] - y[i];
+}
+
+static void acc_f32_generic(size_t n, const float *x, float *z) {
+    for (size_t i = 0; i < n; i++) z[i] += x[i];
+}
+
+static void dec_f32_generic(size_t n, const float *x, float *z) {
+    for (size_t i = 0; i < n; i++) z[i] -= x[i];
+}
+
+static void axpy_f32_generic(size_t n, float a, const float *x, float *z) {
+    for (size_t i = 0; i < n; i++) z[i] += a * x[i];
+}
+
+static void micro_f32_generic(int kc, const float *a, const float *b, float *ab) {
+    float acc[GEMM_MR][GEMM_NR_F32] = {{0.0f}};
+    for (int p = 0; p < kc; p++) {
+        for (int i = 0; i < GEMM_MR; i++) {
+            float a_ip = a[i];
+            for (int j = 0; j < GEMM_NR_F32; j++) {
+                acc[i][j] += a_ip * b[j];
+            }
+        }
+        a += GEMM_MR;
+        b += GEMM_NR_F32;
+    }
+    memcpy(ab, acc, sizeof(acc));
+}
+
+#ifdef SIMD_X86
+
+// The elementwise kernels are memory-bound: one vector per operand per step,
+// unaligned loads (views start anywhere in a row), scalar tail
+
+// ---- SSE2: 2 doubles per register, no FMA
+
+__attribute__((target("sse2")))
+static void add_sse2(size_t n, const double *x, const double *y, double *z) {
+    size_t i = 0;
+    for (; i + 2 <= n; i += 2) _mm_storeu_pd(z + i, _mm_add_pd(_mm_loadu_pd(x + i), _mm_loadu_pd(y + i)));
+    for (; i < n; i++) z[i] = x[i] + y[i];
+}
+
+__attribute__((target("sse2")))
+static void sub_sse2(size_t n, const double *x, const double *y, double *z) {
+    size_t i = 0;
+    for (; i + 2 <= n; i += 2) _mm_storeu_pd(z + i, _mm_sub_pd(_mm_loadu_pd(x + i), _mm_loadu_pd(y + i)));
+    for (; i < n; i++) z[i] = x[i] - y[i];
+}
+
+__attribute__((target("sse2")))
+static void acc_sse2(size_t n, const double *x, double *z) {
+    add_sse2(n, z, x, z);
+}
+
+__attribute__((target("sse2")))
+static void dec_sse2(size_t n, const double *x, double *z) {
+    sub_sse2(n, z, x, z);
+}
+
+__attribute__((target("sse2")))
+static void axpy_sse2(size_t n, double a, const double *x, double *z) {
+    __m128d va = _mm_set1_pd(a);
+    size_t i = 0;
+    for (; i + 2 <= n; i += 2) {
+        _mm_storeu_pd(z + i, _mm_add_pd(_mm_loadu_pd(z + i), _mm_mul_pd(va, _mm_loadu_pd(x + i))));
+    }
+    for (; i < n; i++) z[i] += a * x[i];
+}
+
+// 4 x 8 tile as two 4 x 4 halves so the 8 accumulators fit the 16 XMM registers
+__attribute__((target("sse2")))
+static void micro_sse2(int kc, const double *a, const double *b, double *ab) {
+    for (int half = 0; half < GEMM_NR; half += 4) {
+        __m128d c00 = _mm_setzero_pd(), c01 = _mm_setzero_pd(), c10 = _mm_setzero_pd(), c11 = _mm_setzero_pd();
+        __m128d c20 = _mm_setzero_pd(), c21 = _mm_setzero_pd(), c30 = _mm_setzero_pd(), c31 = _mm_setzero_pd();
+        const double *pa = a, *pb = b + half;
+        for (int p = 0; p < kc; p++) {
+            __m128d b0 = _mm_loadu_pd(pb), b1 = _mm_loadu_pd(pb + 2);
+            __m128d a0 = _mm_set1_pd(pa[0]), a1 = _mm_set1_pd(pa[1]);
+            __m128d a2 = _mm_set1_pd(pa[2]), a3 = _mm_set1_pd(pa[3]);
+            c00 = _mm_add_pd(c00, _mm_mul_pd(a0, b0)); c01 = _mm_add_pd(c01, _mm_mul_pd(a0, b1));
+            c10 = _mm_add_pd(c10, _mm_mul_pd(a1, b0)); c11 = _mm_add_pd(c11, _mm_mul_pd(a1, b1));
+            c20 = _mm_add_pd(c20, _mm_mul_pd(a2, b0)); c21 = _mm_add_pd(c21, _mm_mul_pd(a2, b1));
+            c30 = _mm_add_pd(c30, _mm_mul_pd(a3, b0)); c31 = _mm_add_pd(c31, _mm_mul_pd(a3, b1));
+            pa += GEMM_MR;
+            pb += GEMM_NR;
+        }
+        _mm_storeu_pd(ab + 0 * GEMM_NR + half, c00); _mm_storeu_pd(ab + 0 * GEMM_NR + half + 2, c01);
+        _mm_storeu_pd(ab + 1 * GEMM_NR + half, c10); _mm_storeu_pd(ab + 1 * GEMM_NR + half + 2, c11);
+        _mm_storeu_pd(ab + 2 * GEMM_NR + half, c20); _mm_storeu_pd(ab + 2 * GEMM_NR + half + 2, c21);
+        _mm_storeu_pd(ab + 3 * GEMM_NR + half, c30); _mm_storeu_pd(ab + 3 * GEMM_NR + half + 2, c31);
+    }
+}
+
+__attribute__((target("sse2")))
+static void add_f32_sse2(size_t n, const float *x, const float *y, float *z) {
+    size_t i = 0;
+    for (; i + 4 <= n; i += 4) _mm_storeu_ps(z + i, _mm_add_ps(_mm_loadu_ps(x + i), _mm_loadu_ps(y + i)));
+    for (; i < n; i++) z[i] = x[i] + y[i];
+}
+
+__attribute__((target("sse2")))
+static void sub_f32_sse2(size_t n, const float *x, const float *y, float *z) {
+    size_t i = 0;
+    for (; i + 4 <= n; i += 4) _mm_storeu_ps(z + i, _mm_sub_ps(_mm_loadu_ps(x + i), _mm_loadu_ps(y + i)));
+    for (; i < n; i++) z[i] = x[i] - y[i];
+}
+
+__attribute__((target("sse2")))
+static void acc_f32_sse2(size_t n, const float *x, float *z) {
+    add_f32_sse2(n, z, x, z);
+}
+
+__attribute__((target("sse2")))
+static void dec_f32_sse2(size_t n, const float *x, float *z) {
+    sub_f32_sse2(n, z, x, z);
+}
+
+__attribute__((target("sse2")))
+static void axpy_f32_sse2(size_t n, float a, const float *x, float *z) {
+    __m128 va = _mm_set1_ps(a);
+    size_t i = 0;
+    for (; i + 4 <= n; i += 4) {
+        _mm_storeu_ps(z + i, _mm_add_ps(_mm_loadu_ps(z + i), _mm_mul_ps(va, _mm_loadu_ps(x + i))));
+    }
+    for (; i < n; i++) z[i] += a * x[i];
+}
+
+// 4 x 16 float tile as two 4 x 8 halves, 8 XMM accumulators each
+__attribute__((target("sse2")))
+static void micro_f32_sse2(int kc, const float *a, const float *b, float *ab) {
+    for (int half = 0; half < GEMM_NR_F32; half += 8) {
+        __m128 c00 = _mm_setzero_ps(), c01 = _mm_setzero_ps(), c10 = _mm_setzero_ps(), c11 = _mm_setzero_ps();
+        __m128 c20 = _mm_setzero_ps(), c21 = _mm_setzero_ps(), c30 = _mm_setzero_ps(), c31 = _mm_setzero_ps();
+        const float *pa = a, *pb = b + half;
+        for (int p = 0; p < kc; p++) {
+            __m128 b0 = _mm_loadu_ps(pb), b1 = _mm_loadu_ps(pb + 4);
+            __m128 a0 = _mm_set1_ps(pa[0]), a1 = _mm_set1_ps(pa[1]);
+            __m128 a2 = _mm_set1_ps(pa[2]), a3 = _mm_set1_ps(pa[3]);
+            c00 = _mm_add_ps(c00, _mm_mul_ps(a0, b0)); c01 = _mm_add_ps(c01, _mm_mul_ps(a0, b1));
+            c10 = _mm_add_ps(c10, _mm_mul_ps(a1, b0)); c11 = _mm_add_ps(c11, _mm_mul_ps(a1, b1));
+            c20 = _mm_add_ps(c20, _mm_mul_ps(a2, b0)); c21 = _mm_add_ps(c21, _mm_mul_ps(a2, b1));
+            c30 = _mm_add_ps(c30, _mm_mul_ps(a3, b0)); c31 = _mm_add_ps(c31, _mm_mul_ps(a3, b1));
+            pa += GEMM_MR;
+            pb += GEMM_NR_F32;
+        }
+        _mm_storeu_ps(ab + 0 * GEMM_NR_F32 + half, c00); _mm_storeu_ps(ab + 0 * GEMM_NR_F32 + half + 4, c01);
+        _mm_storeu_ps(ab + 1 * GEMM_NR_F32 + half, c10); _mm_storeu_ps(ab + 1 * GEMM_NR_F32 + half + 4, c11);
+        _mm_storeu_ps(ab + 2 * GEMM_NR_F32 + half, c20); _mm_storeu_ps(ab + 2 * GEMM_NR_F32 + half + 4, c21);
+        _mm_storeu_ps(ab + 3 * GEMM_NR_F32 + half, c30); _mm_storeu_ps(ab + 3 * GEMM_NR_F32 + half + 4, c31);
+    }
+}
+
+// ---- AVX2 + FMA: 4 doubles per register
+
+__attribute__((target("avx2,fma")))
+static void add_avx2(size_t n, const double *x, const double *y, double *z) {
+    size_t i = 0;
+    for (; i + 4 <= n; i += 4) {
+        _mm256_storeu_pd(z + i, _mm256_add_pd(_mm256_loadu_pd(x + i), _mm256_loadu_pd(y + i)));
+    }
+    for (; i < n; i++) z[i] = x[i] + y[i];
+}
+
+__attribute__((target("avx2,fma")))
+static void sub_avx2(size_t n, const double *x, const double *y, double *z) {
+    size_t i = 0;
+    for (; i + 4 <= n; i += 4) {
+        _mm256_storeu_pd(z + i, _mm256_sub_pd(_mm256_loadu_pd(x + i), _mm256_loadu_pd(y + i)));
+    }
+    for (; i < n; i++) z[i] = x[i] - y[i];
+}
+
+__attribute__((target("avx2,fma")))
+static void acc_avx2(size_t n, const double *x, double *z) {
+    add_avx2(n, z, x, z);
+}
+
+__attribute__((target("avx2,fma")))
+static void dec_avx2(size_t n, const double *x, double *z) {
+    sub_avx2(n, z, x, z);
+}
+
+__attribute__((target("avx2,fma")))
+static void axpy_avx2(size_t n, double a, const double *x, double *z) {
+    __m256d va = _mm256_set1_pd(a);
+    size_t i = 0;
+    for (; i + 4 <= n; i += 4) {
+        _mm256_storeu_pd(z + i, _mm256_fmadd_pd(va, _mm256_loadu_pd(x + i), _mm256_loadu_pd(z + i)));
+    }
+    for (; i < n; i++) z[i] += a * x[i];
+}
+
+// 4 x 8 tile in 8 YMM accumulators: 8 independent FMA chains per k step
+__attribute__((target("avx2,fma")))
+static void micro_avx2(int kc, const double *a, const double *b, double *ab) {
+    __m256d c00 = _mm256_setzero_pd(), c01 = _mm256_setzero_pd();
+    __m256d c10 = _mm256_setzero_pd(), c11 = _mm256_setzero_pd();
+    __m256d c20 = _mm256_setzero_pd(), c21 = _mm256_setzero_pd();
+    __m256d c30 = _mm256_setzero_pd(), c31 = _mm256_setzero_pd();
+    for (int p = 0; p < kc; p++) {
+        __m256d b0 = _mm256_loadu_pd(b), b1 = _mm256_loadu_pd(b + 4);
+        __m256d a0 = _mm256_broadcast_sd(a), a1 = _mm256_broadcast_sd(a + 1);
+        c00 = _mm256_fmadd_pd(a0, b0, c00); c01 = _mm256_fmadd_pd(a0, b1, c01);
+        c10 = _mm256_fmadd_pd(a1, b0, c10); c11 = _mm256_fmadd_pd(a1, b1, c11);
+        __m256d a2 = _mm256_broadcast_sd(a + 2), a3 = _mm256_broadcast_sd(a + 3);
+        c20 = _mm256_fmadd_pd(a2, b0, c20); c21 = _mm256_fmadd_pd(a2, b1, c21);
+        c30 = _mm256_fmadd_pd(a3, b0, c30); c31 = _mm256_fmadd_pd(a3, b1, c31);
+        a += GEMM_MR;
+        b += GEMM_NR;
+    }
+    _mm256_storeu_pd(ab + 0 * GEMM_NR, c00); _mm256_storeu_pd(ab + 0 * GEMM_NR + 4, c01);
+    _mm256_storeu_pd(ab + 1 * GEMM_NR, c10); _mm256_storeu_pd(ab + 1 * GEMM_NR + 4, c11);
+    _mm256_storeu_pd(ab + 2 * GEMM_NR, c20); _mm256_storeu_pd(ab + 2 * GEMM_NR + 4, c21);
+    _mm256_storeu_pd(ab + 3 * GEMM_NR, c30); _mm256_storeu_pd(ab + 3 * GEMM_NR + 4, c31);
+}
+
+__attribute__((target("avx2,fma")))
+static void add_f32_avx2(size_t n, const float *x, const float *y, float *z) {
+    size_t i = 0;
+    for (; i + 8 <= n; i += 8) {
+        _mm256_storeu_ps(z + i, _mm256_add_ps(_mm256_loadu_ps(x + i), _mm256_loadu_ps(y + i)));
+    }
+    for (; i < n; i++) z[i] = x[i] + y[i];
+}
+
+__attribute__((target("avx2,fma")))
+static void sub_f32_avx2(size_t n, const float *x, const float *y, float *z) {
+    size_t i = 0;
+    for (; i + 8 <= n; i += 8) {
+        _mm256_storeu_ps(z + i, _mm256_sub_ps(_mm256_loadu_ps(x + i), _mm256_loadu_ps(y + i)));
+    }
+    for (; i < n; i++) z[i] = x[i] - y[i];
+}
+
+__attribute__((target("avx2,fma")))
+static void acc_f32_avx2(size_t n, const float *x, float *z) {
+    add_f32_avx2(n, z, x, z);
+}
+
+__attribute__((target("avx2,fma")))
+static void dec_f32_avx2(size_t n, const float *x, float *z) {
+    sub_f32_avx2(n, z, x, z);
+}
+
+__attribute__((target("avx2,fma")))
+static void axpy_f32_avx2(size_t n, float a, const float *x, float *z) {
+    __m256 va = _mm256_set1_ps(a);
+    size_t i = 0;
+    for (; i + 8 <= n; i += 8) {
+        _mm256_storeu_ps(z + i, _mm256_fmadd_ps(va, _mm256_loadu_ps(x + i), _mm256_loadu_ps(z + i)));
+    }
+    for (; i < n; i++) z[i] += a * x[i];
+}
+
+// 4 x 16 float tile in 8 YMM accumulators, same shape as the double kernel
+__attribute__((target("avx2,fma")))
+static void micro_f32_avx2(int kc, const float *a, const float *b, float *ab) {
+    __m256 c00 = _mm256_setzero_ps(), c01 = _mm256_setzero_ps();
+    __m256 c10 = _mm256_setzero_ps(), c11 = _mm256_setzero_ps();
+    __m256 c20 = _mm256_setzero_ps(), c21 = _mm256_setzero_ps();
+    __m256 c30 = _mm256_setzero_ps(), c31 = _mm256_setzero_ps();
+    for (int p = 0; p < kc; p++) {
+        __m256 b0 = _mm256_loadu_ps(b), b1 = _mm256_loadu_ps(b + 8);
+        __m256 a0 = _mm256_broadcast_ss(a), a1 = _mm256_broadcast_ss(a + 1);
+        c00 = _mm256_fmadd_ps(a0, b0, c00); c01 = _mm256_fmadd_ps(a0, b1, c01);
+        c10 = _mm256_fmadd_ps(a1, b0, c10); c11 = _mm256_fmadd_ps(a1, b1, c11);
+        __m256 a2 = _mm256_broadcast_ss(a + 2), a3 = _mm256_broadcast_ss(a + 3);
+        c20 = _mm256_fmadd_ps(a2, b0, c20); c21 = _mm256_fmadd_ps(a2, b1, c21);
+        c30 = _mm256_fmadd_ps(a3, b0, c30); c31 = _mm256_fmadd_ps(a3, b1, c31);
+        a += GEMM_MR;
+        b += GEMM_NR_F32;
+    }
+    _mm256_storeu_ps(ab + 0 * GEMM_NR_F32, c00); _mm256_storeu_ps(ab + 0 * GEMM_NR_F32 + 8, c01);
+    _mm256_storeu_ps(ab + 1 * GEMM_NR_F32, c10); _mm256_storeu_ps(ab + 1 * GEMM_NR_F32 + 8, c11);
+    _mm256_storeu_ps(ab + 2 * GEMM_NR_F32, c20); _mm256_storeu_ps(ab + 2 * GEMM_NR_F32 + 8, c21);
+    _mm256_storeu_ps(ab + 3 * GEMM_NR_F32, c30); _mm256_storeu_ps(ab + 3 * GEMM_NR_F32 + 8, c31);
+}
+
+// ---- AVX-512F: 8 doubles per register, masked tails
+
+__attribute__((target("avx512f")))
+static void add_avx512(size_t n, const double *x, const double *y, double *z) {
+    size_t i = 0;
+    for (; i + 8 <= n; i += 8) {
+        _mm512_storeu_pd(z + i, _mm512_add_pd(_mm512_loadu_pd(x + i), _mm512_loadu_pd(y + i)));
+    }
+    if (i < n) {
+        __mmask8 m = (__mmask8)((1u << (n - i)) - 1);
+        _mm512_mask_storeu_pd(z + i, m, _mm512_add_pd(_mm512_maskz_loadu_pd(m, x + i),
+                                                      _mm512_maskz_loadu_pd(m, y + i)));
+    }
+}
+
+__attribute__((target("avx512f")))
+static void sub_avx512(size_t n, const double *x, const double *y, double *z) {
+    size_t i = 0;
+    for (; i + 8 <= n; i += 8) {
+        _mm512_storeu_pd(z + i, _mm512_sub_pd(_mm512_loadu_pd(x + i), _mm512_loadu_pd(y + i)));
+    }
+    if (i < n) {
+        __mmask8 m = (__mmask8)((1u << (n - i)) - 1);
+        _mm512_mask_storeu_pd(z + i, m, _mm512_sub_pd(_mm512_maskz_loadu_pd(m, x + i),
+                                                      _mm512_maskz_loadu_pd(m, y + i)));
+    }
+}
+
+__attribute__((target("avx512f")))
+static void acc_avx512(size_t n, const double *x, double *z) {
+    add_avx512(n, z, x, z);
+}
+
+__attribute__((target("avx512f")))
+static void dec_avx512(size_t n, const double *x, double *z) {
+    sub_avx512(n, z, x, z);
+}
+
+__attribute__((target("avx512f")))
+static void axpy_avx512(size_t n, double a, const double *x, double *z) {
+    __m512d va = _mm512_set1_pd(a);
+    size_t i = 0;
+    for (; i + 8 <= n; i += 8) {
+        _mm512_storeu_pd(z + i, _mm512_fmadd_pd(va, _mm512_loadu_pd(x + i), _mm512_loadu_pd(z + i)));
+    }
+    if (i < n) {
+        __mmask8 m = (__mmask8)((1u << (n - i)) - 1);
+        _mm512_mask_storeu_pd(z + i, m, _mm512_fmadd_pd(va, _mm512_maskz_loadu_pd(m, x + i),
+                                                        _mm512_maskz_loadu_pd(m, z + i)));
+    }
+}
+
+// 4 x 8 tile: one ZMM per row. Even and odd k steps go to separate
+// accumulator sets so 8 FMA chains are in flight, then the sets are summed.
+__attribute__((target("avx512f")))
+static void micro_avx512(int kc, const double *a, const double *b, double *ab) {
+    __m512d c0 = _mm512_setzero_pd(), c1 = _mm512_setzero_pd();
+    __m512d c2 = _mm512_setzero_pd(), c3 = _mm512_setzero_pd();
+    __m512d d0 = _mm512_setzero_pd(), d1 = _mm512_setzero_pd();
+    __m512d d2 = _mm512_setzero_pd(), d3 = _mm512_setzero_pd();
+    int p = 0;
+    for (; p + 2 <= kc; p += 2) {
+        __m512d b0 = _mm512_loadu_pd(b), b1 = _mm512_loadu_pd(b + GEMM_NR);
+        c0 = _mm512_fmadd_pd(_mm512_set1_pd(a[0]), b0, c0);
+        c1 = _mm512_fmadd_pd(_mm512_set1_pd(a[1]), b0, c1);
+        c2 = _mm512_fmadd_pd(_mm512_set1_pd(a[2]), b0, c2);
+        c3 = _mm512_fmadd_pd(_mm512_set1_pd(a[3]), b0, c3);
+        d0 = _mm512_fmadd_pd(_mm512_set1_pd(a[4]), b1, d0);
+        d1 = _mm512_fmadd_pd(_mm512_set1_pd(a[5]), b1, d1);
+        d2 = _mm512_fmadd_pd(_mm512_set1_pd(a[6]), b1, d2);
+        d3 = _mm512_fmadd_pd(_mm512_set1_pd(a[7]), b1, d3);
+        a += 2 * GEMM_MR;
+        b += 2 * GEMM_NR;
+    }
+    if (p < kc) {
+        __m512d b0 = _mm512_loadu_pd(b);
+        c0 = _mm512_fmadd_pd(_mm512_set1_pd(a[0]), b0, c0);
+        c1 = _mm512_fmadd_pd(_mm512_set1_pd(a[1]), b0, c1);
+        c2 = _mm512_fmadd_pd(_mm512_set1_pd(a[2]), b0, c2);
+        c3 = _mm512_fmadd_pd(_mm512_set1_pd(a[3]), b0, c3);
+    }
+    _mm512_storeu_pd(ab + 0 * GEMM_NR, _mm512_add_pd(c0, d0));
+    _mm512_storeu_pd(ab + 1 * GEMM_NR, _mm512_add_pd(c1, d1));
+    _mm512_storeu_pd(ab + 2 * GEMM_NR, _mm512_add_pd(c2, d2));
+    _mm512_storeu_pd(ab + 3 * GEMM_NR, _mm512_add_pd(c3, d3));
+}
+
+__attribute__((target("avx512f")))
+static void add_f32_avx512(size_t n, const float *x, const float *y, float *z) {
+    size_t i = 0;
+    for (; i + 16 <= n; i += 16) {
+        _mm512_storeu_ps(z + i, _mm512_add_ps(_mm512_loadu_ps(x + i), _mm512_loadu_ps(y + i)));
+    }
+    if (i < n) {
+        __mmask16 m = (__mmask16)((1u << (n - i)) - 1);
+        _mm512_mask_storeu_ps(z + i, m, _mm512_add_ps(_mm512_maskz_loadu_ps(m, x + i),
+                                                      _mm512_maskz_loadu_ps(m, y + i)));
+    }
+}
+
+__attribute__((target("avx512f")))
+static void sub_f32_avx512(size_t n, const float *x, const float *y, float *z) {
+    size_t i = 0;
+    for (; i + 16 <= n; i += 16) {
+        _mm512_storeu_ps(z + i, _mm512_sub_ps(_mm512_loadu_ps(x + i), _mm512_loadu_ps(y + i)));
+    }
+    if (i < n) {
+        __mmask16 m = (__mmask16)((1u << (n - i)) - 1);
+        _mm512_mask_storeu_ps(z + i, m, _mm512_sub_ps(_mm512_maskz_loadu_ps(m, x + i),
+                                                      _mm512_maskz_loadu_ps(m, y + i)));
+    }
+}
+
+__attribute__((target("avx512f")))
+static void acc_f32_avx512(size_t n, const float *x, float *z) {
+    add_f32_avx512(n, z, x, z);
+}
+
+__attribute__((target("avx512f")))
+static void dec_f32_avx512(size_t n, const float *x, float *z) {
+    sub_f32_avx512(n, z, x, z);
+}
+
+__attribute__((target("avx512f")))
+static void axpy_f32_avx512(size_t n, float a, const float *x, float *z) {
+    __m512 va = _mm512_set1_ps(a);
+    size_t i = 0;
+    for (; i + 16 <= n; i += 16) {
+        _mm512_storeu_ps(z + i, _mm512_fmadd_ps(va, _mm512_loadu_ps(x + i), _mm512_loadu_ps(z + i)));
+    }
+    if (i < n) {
+        __mmask16 m = (__mmask16)((1u << (n - i)) - 1);
+        _mm512_mask_storeu_ps(z + i, m, _mm512_fmadd_ps(va, _mm512_maskz_loadu_ps(m, x + i),
+                                                        _mm512_maskz_loadu_ps(m, z + i)));
+    }
+}
+
+// 4 x 16 float tile: one ZMM per row, even / odd k steps in separate sets
+__attribute__((target("avx512f")))
+static void micro_f32_avx512(int kc, const float *a, const float *b, float *ab) {
+    __m512 c0 = _mm512_setzero_ps(), c1 = _mm512_setzero_ps();
+    __m512 c2 = _mm512_setzero_ps(), c3 = _mm512_setzero_ps();
+    __m512 d0 = _mm512_setzero_ps(), d1 = _mm512_setzero_ps();
+    __m512 d2 = _mm512_setzero_ps(), d3 = _mm512_setzero_ps();
+    int p = 0;
+    for (; p + 2 <= kc; p += 2) {
+        __m512 b0 = _mm512_loadu_ps(b), b1 = _mm512_loadu_ps(b + GEMM_NR_F32);
+        c0 = _mm512_fmadd_ps(_mm512_set1_ps(a[0]), b0, c0);
+        c1 = _mm512_fmadd_ps(_mm512_set1_ps(a[1]), b0, c1);
+        c2 = _mm512_fmadd_ps(_mm512_set1_ps(a[2]), b0, c2);
+        c3 = _mm512_fmadd_ps(_mm512_set1_ps(a[3]), b0, c3);
+        d0 = _mm512_fmadd_ps(_mm512_set1_ps(a[4]), b1, d0);
+        d1 = _mm512_fmadd_ps(_mm512_set1_ps(a[5]), b1, d1);
+        d2 = _mm512_fmadd_ps(_mm512_set1_ps(a[6]), b1, d2);
+        d3 = _mm512_fmadd_ps(_mm512_set1_ps(a[7]), b1, d3);
+        a += 2 * GEMM_MR;
+        b += 2 * GEMM_NR_F32;
+    }
+    if (p < kc) {
+        __m512 b0 = _mm512_loadu_ps(b);
+        c0 = _mm512_fmadd_ps(_mm512_set1_ps(a[0]), b0, c0);
+        c1 = _mm512_fmadd_ps(_mm512_set1_ps(a[1]), b0, c1);
+        c2 = _mm512_fmadd_ps(_mm512_set1_ps(a[2]), b0, c2);
+        c3 = _mm512_fmadd_ps(_mm512_set1_ps(a[3]), b0, c3);
+    }
+    _mm512_storeu_ps(ab + 0 * GEMM_NR_F32, _mm512_add_ps(c0, d0));
+    _mm512_storeu_ps(ab + 1 * GEMM_NR_F32, _mm512_add_ps(c1, d1));
+    _mm512_storeu_ps(ab + 2 * GEMM_NR_F32, _mm512_add_ps(c2, d2));
+    _mm512_storeu_ps(ab + 3 * GEMM_NR_F32, _mm512_add_ps(c3, d3));
+}
+
+#endif // SIMD_X86
+
+// Best first; the first entry the CPU supports is the default
+static const simd_kernels_t variants[] = {
+#ifdef SIMD_X86
+    {"avx512", add_avx512, sub_avx512, acc_avx512, dec_avx512, axpy_avx512, micro_avx512,
+     add_f32_avx512, sub_f32_avx512, acc_f32_avx512, dec_f32_avx512, axpy_f32_avx512,
+     micro_f32_avx512},
+    {"avx2", add_avx2, sub_avx2, acc_avx2, dec_avx2, axpy_avx2, micro_avx2,
+     add_f32_avx2, sub_f32_avx2, acc_f32_avx2, dec_f32_avx2, axpy_f32_avx2,
+     micro_f32_avx2},
+    {"sse2", add_sse2, sub_sse2, acc_sse2, dec_sse2, axpy_sse2, micro_sse2,
+     add_f32_sse2, sub_f32_sse2, acc_f32_sse2, dec_f32_sse2, axpy_f32_sse2,
+     micro_f32_sse2},
+#endif
+    {"generic", add_generic, sub_generic, acc_generic, dec_generic, axpy_generic, micro_generic,
+     add_f32_generic, sub_f32_generic, acc_f32_generic, dec_f32_generic, axpy_f32_generic,
+     micro_f32_generic},
+};
+#define NUM_VARIANTS ((int)(sizeof(variants) / sizeof(variants[0])))
+
+static const simd_kernels_t *selected = NULL;
+
+static int cpu_supports(const simd_kernels_t *v) {
+#ifdef SIMD_X86
+    __builtin_cpu_init();
+    if (strcmp(v->name, "avx512") == 0) return __builtin_cpu_supports("avx512f");
+    if (strcmp(v->name, "avx2") == 0) return __builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma");
+    if (strcmp(v->name, "sse2") == 0) return __builtin_cpu_supports("sse2");
+#endif
+    (void)v;
+    return 1;
+}
+
+int simd_select(const char *name) {
+    for (int i = 0; i < NUM_VARIANTS; i++) {
+        if (strcmp(variants[i].name, name) != 0) continue;
+        if (!cpu_supports(&variants[i])) return -1;
+        selected = &variants[i];
+        return 0;
+    }
+    return -1;
+}
+
+const simd_kernels_t *simd_kernels(void) {
+    if (selected) return selected;
+    const char *env = getenv("STRASSEN_SIMD");
+    if (env && *env && simd_select(env) != 0) {
+        fprintf(stderr, "Warning: STRASSEN_SIMD=\"%s\" is unknown or unsupported on this CPU, "
+                        "using the best available kernels\n", env);
+    }
+    for (int i = 0; !selected && i < NUM_VARIANTS; i++) {
+        if (cpu_supports(&variants[i])) selected = &variants[i];
+    }
+    return selected;
+}
@@ -0,0 +1,40 @@
+#ifndef SIMD_KERNELS_H
+#define SIMD_KERNELS_H
+
+#include <stddef.h>
+
+// Inner kernels with one implementation per instruction set. The binaries are
+// built for the baseline ISA; the variant is picked once at startup from cpuid
+// (__builtin_cpu_supports), or forced with STRASSEN_SIMD=generic|sse2|avx2|avx512.
+typedef struct {
+    const char *name;
+    // z = x + y, z = x - y over n contiguous doubles (z may alias x or y)
+    void (*add)(size_t n, const double *x, const double *y, double *z);
+    void (*sub)(size_t n, const double *x, const double *y, double *z);
+    // z += x, z -= x
+    void (*acc)(size_t n, const double *x, double *z);
+    void (*dec)(size_t n, const double *x, double *z);
+    // z += a * x
+    void (*axpy)(size_t n, double a, const double *x, double *z);
+    // GEMM register tile: ab (GEMM_MR x GEMM_NR, row-major) = sum over kc of
+    // the packed A column a[p][0..MR) times the packed B row b[p][0..NR)
+    void (*micro)(int kc, const double *a, const double *b, double *ab);
+
+    // float32 counterparts of the elementwise kernels
+    void (*add_f32)(size_t n, const float *x, const float *y, float *z);
+    void (*sub_f32)(size_t n, const float *x, const float *y, float *z);
+    void (*acc_f32)(size_t n, const float *x, float *z);
+    void (*dec_f32)(size_t n, const float *x, float *z);
+    void (*axpy_f32)(size_t n, float a, const float *x, float *z);
+    // float32 register tile: ab is GEMM_MR x GEMM_NR_F32, summed in float
+    void (*micro_f32)(int kc, const float *a, const float *b, float *ab);
+} simd_kernels_t;
+
+// The kernels in use (selected on first call)
+const simd_kernels_t *simd_kernels(void);
+
+// Force a variant by name; returns 0 on success, -1 if it is unknown or the
+// CPU does not support it (the current selection is kept)
+int simd_select(const char *name);
+
+#endif // SIMD_KERNELS_H
@@ -0,0 +1,164 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include <errno.h>
+#include <sys/wait.h>
+#include "simd_kernels.h"
+#include "sparse.h"
+
+static double sparse_threshold = SPARSE_DEFAULT_THRESHOLD;
+
+void sparse_set_threshold(double threshold) {
+    if (threshold > 0.0 && threshold <= 1.0) sparse_threshold = threshold;
+}
+
+double sparse_get_threshold(void) {
+    return sparse_threshold;
+}
+
+int csr_from_dense(const double *A, int rows, int cols, int lda, csr_matrix_t *csr) {
+    memset(csr, 0, sizeof(*csr));
+    csr->rows = rows;
+    csr->cols = cols;
+    csr->row_ptr = malloc(((size_t)rows + 1) * sizeof(size_t));
+    if (!csr->row_ptr) {
+        perror("malloc");
+        return -1;
+    }
+
+    // First pass counts, second fills
+    csr->row_ptr[0] = 0;
+    for (int i = 0; i < rows; i++) {
+        const double *a = A + (size_t)i * lda;
+        size_t count = 0;
+        for (int j = 0; j < cols; j++) count += a[j] != 0.0;
+        csr->row_ptr[i + 1] = csr->row_ptr[i] + count;
+    }
+    csr->nnz = csr->row_ptr[rows];
+    csr->col_idx = malloc((csr->nnz ? csr->nnz : 1) * sizeof(int));
+    csr->values = malloc((csr->nnz ? csr->nnz : 1) * sizeof(double));
+    if (!csr->col_idx || !csr->values) {
+        perror("malloc");
+        csr_free(csr);
+        return -1;
+    }
+    for (int i = 0; i < rows; i++) {
+        const double *a = A + (size_t)i * lda;
+        size_t k = csr->row_ptr[i];
+        for (int j = 0; j < cols; j++) {
+            if (a[j] != 0.0) {
+                csr->col_idx[k] = j;
+                csr->values[k++] = a[j];
+            }
+        }
+    }
+    return 0;
+}
+
+void csr_free(csr_matrix_t *csr) {
+    free(csr->row_ptr);
+    free(csr->col_idx);
+    free(csr->values);
+    memset(csr, 0, sizeof(*csr));
+}
+
+double sparse_density(const double *A, int rows, int cols, int lda, double stop_above) {
+    double total = (double)rows * cols;
+    if (total == 0.0) return 0.0;
+    double limit = stop_above * total;
+    size_t count = 0;
+    for (int i = 0; i < rows; i++) {
+        const double *a = A + (size_t)i * lda;
+        for (int j = 0; j < cols; j++) count += a[j] != 0.0;
+        if ((double)count > limit) break;
+    }
+    return count / total;
+}
+
+int sparse_route(const double *A, int m, double *density) {
+    double d = sparse_density(A, m, m, m, sparse_threshold);
+    if (density) *density = d;
+    return d < sparse_threshold;
+}
+
+void sparse_partition(const csr_matrix_t *A, int parts, int *bounds) {
+    // Work before row i is row_ptr[i] + i; each boundary is the first row
+    // whose prefix reaches its share, found by binary search
+    double total = (double)A->nnz + A->rows;
+    bounds[0] = 0;
+    for (int w = 1; w < parts; w++) {
+        double target = total * w / parts;
+        int lo = bounds[w - 1], hi = A->rows;
+        while (lo < hi) {
+            int mid = lo + (hi - lo) / 2;
+            if ((double)A->row_ptr[mid] + mid < target) lo = mid + 1;
+            else hi = mid;
+        }
+        bounds[w] = lo;
+    }
+    bounds[parts] = A->rows;
+}
+
+void csr_multiply_rows(const csr_matrix_t *A, const double *B, int n, int ldb, double *C, int ldc,
+                       int r0, int r1) {
+    void (*axpy)(size_t, double, const double *, double *) = simd_kernels()->axpy;
+    for (int i = r0; i < r1; i++) {
+        double *c = C + (size_t)i * ldc;
+        size_t first = A->row_ptr[i], last = A->row_ptr[i + 1];
+        memset(c, 0, (size_t)n * sizeof(double));
+        for (int j0 = 0; j0 < n; j0 += SPARSE_COL_BLOCK) {
+            size_t width = (size_t)(n - j0 < SPARSE_COL_BLOCK ? n - j0 : SPARSE_COL_BLOCK);
+            for (size_t k = first; k < last; k++) {
+                axpy(width, A->values[k], B + (size_t)A->col_idx[k] * ldb + j0, c + j0);
+            }
+        }
+    }
+}
+
+int csr_parallel_multiply(const csr_matrix_t *A, const double *B, double *C, int n, int p,
+                          double *max_share) {
+    if (p > A->rows) p = A->rows > 0 ? A->rows : 1;
+    int *bounds = malloc(((size_t)p + 1) * sizeof(int));
+    pid_t *pids = calloc((size_t)p, sizeof(pid_t));
+    if (!bounds || !pids) {
+        perror("malloc");
+        free(bounds);
+        free(pids);
+        return -1;
+    }
+    sparse_partition(A, p, bounds);
+
+    if (max_share) {
+        double mean = ((double)A->nnz + A->rows) / p, worst = 0.0;
+        for (int w = 0; w < p; w++) {
+            double work = (double)(A->row_ptr[bounds[w + 1]] - A->row_ptr[bounds[w]]) + (bounds[w + 1] - bounds[w]);
+            if (work > worst) worst = work;
+        }
+        *max_share = mean > 0.0 ? worst / mean : 1.0;
+    }
+
+    int failed = 0;
+    for (int w = 0; w < p; w++) {
+        pids[w] = fork();
+        if (pids[w] < 0) {
+            perror("fork");
+            fprintf(stderr, "Failed to create process %d\n", w);
+            // this range is computed here instead; the others keep running
+            csr_multiply_rows(A, B, n, n, C, n, bounds[w], bounds[w + 1]);
+        } else if (pids[w] == 0) {
+            csr_multiply_rows(A, B, n, n, C, n, bounds[w], bounds[w + 1]);
+            _exit(0);
+        }
+    }
+    for (int w = 0; w < p; w++) {
+        if (pids[w] <= 0) continue;
+        int status, wrc;
+        while ((wrc = waitpid(pids[w], &status, 0)) == -1 && errno == EINTR) {}
+        if (wrc == -1 || !WIFEXITED(status) || WEXITSTATUS(status) != 0) failed = 1;
+    }
+    free(bounds);
+    free(pids);
+    return failed ? -1 : 0;
+}
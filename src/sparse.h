@@ -0,0 +1,58 @@
+#ifndef SPARSE_H
+#define SPARSE_H
+
+#include <stddef.h>
+
+// Density below which sparse_route sends A to the CSR kernel; see
+// sparse_set_threshold / --threshold
+#define SPARSE_DEFAULT_THRESHOLD 0.10
+
+// Columns of C (and B) one pass of the CSR kernel works on, so the C segment
+// being accumulated stays in L1 while the row's nonzeros stream over it
+#define SPARSE_COL_BLOCK 512
+
+// Compressed sparse row matrix: the nonzeros of row i are
+// values[row_ptr[i] .. row_ptr[i+1]-1] in columns col_idx[...], ascending
+typedef struct {
+    int rows, cols;
+    size_t nnz;
+    size_t *row_ptr;    // rows + 1 offsets
+    int *col_idx;
+    double *values;
+} csr_matrix_t;
+
+// Convert a dense rows x cols matrix (leading dimension lda) to CSR.
+// Returns 0 on success.
+int csr_from_dense(const double *A, int rows, int cols, int lda, csr_matrix_t *csr);
+
+void csr_free(csr_matrix_t *csr);
+
+// Fraction of nonzero entries of A. The scan stops at the end of the first row
+// where the fraction is known to exceed stop_above (pass 1.0 for an exact
+// count), so sniffing a dense matrix only reads its first rows.
+double sparse_density(const double *A, int rows, int cols, int lda, double stop_above);
+
+// Override the routing threshold (values outside (0, 1] are ignored)
+void sparse_set_threshold(double threshold);
+double sparse_get_threshold(void);
+
+// 1 if A (m x m) is sparse enough for the CSR kernel, with its density (exact
+// below the threshold, a lower bound above it) stored in *density when not NULL
+int sparse_route(const double *A, int m, double *density);
+
+// Split the rows of A into `parts` ranges [bounds[w], bounds[w+1]) of about
+// equal work, counting one unit per nonzero and one per row (the zeroing of
+// its C row), instead of equal row counts. bounds holds parts + 1 entries.
+void sparse_partition(const csr_matrix_t *A, int parts, int *bounds);
+
+// Rows r0..r1-1 of C (ldc) = A * B, with B A.cols x n (ldb)
+void csr_multiply_rows(const csr_matrix_t *A, const double *B, int n, int ldb, double *C, int ldc,
+                       int r0, int r1);
+
+// C (A.rows x n, row-major, MAP_SHARED) = A * B with p forked workers over the
+// nonzero-balanced ranges of sparse_partition; max_share, when not NULL,
+// receives the largest worker share over the mean. Returns 0 on success.
+int csr_parallel_multiply(const csr_matrix_t *A, const double *B, double *C, int n, int p,
+                          double *max_share);
+
+#endif
@@ -1,17 +1,103 @@
+#define _GNU_SOURCE
+#include <float.h>
+#include <stdint.h>
+#include <time.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/time.h>
+#include <sys/wait.h>
 #include "strassen_utils.h"
+#include "gemm_kernel.h"
+#include "simd_kernels.h"
+
+static int strassen_cutoff = STRASSEN_CUTOFF;
+static int cutoff_loaded = 0;
+static strassen_variant_t strassen_variant = STRASSEN_CLASSIC;
+
+const char *strassen_profile_path(void) {
+    static char path[4096];
+    const char *env = getenv("STRASSEN_PROFILE");
+    if (env && *env) return env;
+    const char *home = getenv("HOME");
+    if (!home || !*home) return NULL;
+    snprintf(path, sizeof(path), "%s/%s", home, STRASSEN_PROFILE_NAME);
+    return path;
+}
+
+// Profile format: "key=value" lines, '#' comments; only "cutoff" is used here
+static int read_profile_cutoff(const char *path) {
+    FILE *fp = fopen(path, "r");
+    if (!fp) return 0;
+    char line[256];
+    int cutoff = 0;
+    while (fgets(line, sizeof(line), fp)) {
+        int value;
+        if (sscanf(line, " cutoff = %d", &value) == 1 && value > 0) cutoff = value;
+    }
+    fclose(fp);
+    return cutoff;
+}
+
+static void load_cutoff(void) {
+    if (cutoff_loaded) return;
+    cutoff_loaded = 1;
+
+    const char *env = getenv("STRASSEN_CUTOFF");
+    if (env && *env) {
+        int value = atoi(env);
+        if (value > 0) {
+            strassen_cutoff = value;
+            return;
+        }
+        fprintf(stderr, "Warning: ignoring malformed STRASSEN_CUTOFF=\"%s\"\n", env);
+    }
+
+    const char *path = strassen_profile_path();
+    int value = path ? read_profile_cutoff(path) : 0;
+    if (value > 0) strassen_cutoff = value;
+}
+
+void strassen_set_cutoff(int cutoff) {
+    cutoff_loaded = 1;
+    if (cutoff > 0) strassen_cutoff = cutoff;
+}
+
+int strassen_get_cutoff(void) {
+    load_cutoff();
+    return strassen_cutoff;
+}
+
+void strassen_set_variant(strassen_variant_t variant) {
+    strassen_variant = variant;
+}
+
+strassen_variant_t strassen_get_variant(void) {
+    return strassen_variant;
+}
+
+int strassen_save_profile(const char *path, int cutoff) {
+    FILE *fp = fopen(path, "w");
+    if (!fp) {
+        perror(path);
+        return -1;
+    }
+    fprintf(fp, "# Strassen profile written by calibrateCutoff\n");
+    fprintf(fp, "cutoff=%d\n", cutoff);
+    if (fclose(fp) != 0) {
+        perror(path);
+        return -1;
+    }
+    return 0;
+}
 
 // Matrix addition: C = A + B
 void matrix_add(double *A, double *B, double *C, int n) {
-    for (int i = 0; i < n * n; i++) {
-        C[i] = A[i] + B[i];
-    }
+    simd_kernels()->add((size_t)n * n, A, B, C);
 }
 
 // Matrix subtraction: C = A - B
 void matrix_sub(double *A, double *B, double *C, int n) {
-    for (int i = 0; i < n * n; i++) {
-        C[i] = A[i] - B[i];
-    }
+    simd_kernels()->sub((size_t)n * n, A, B, C);
 }
 
 // Get submatrix from parent matrix
@@ -32,147 +118,943 @@ void set_submatrix(double *parent, double *sub, int parent_size, int sub_size, i
     }
 }
 
-// Naive matrix multiplication for small matrices (fallback)
+// Naive matrix multiplication for small matrices (fallback): i-k-j order so
+// the inner loop is a vector axpy over a row of B
 void naive_multiply(double *A, double *B, double *C, int n) {
+    void (*axpy)(size_t, double, const double *, double *) = simd_kernels()->axpy;
     for (int i = 0; i < n; i++) {
-        for (int j = 0; j < n; j++) {
-            double sum = 0.0;
-            for (int k = 0; k < n; k++) {
-                sum += A[i * n + k] * B[k * n + j];
-            }
-            C[i * n + j] = sum;
+        double *c = C + (size_t)i * n;
+        memset(c, 0, (size_t)n * sizeof(double));
+        for (int k = 0; k < n; k++) {
+            axpy((size_t)n, A[(size_t)i * n + k], B + (size_t)k * n, c);
         }
     }
 }
 
-// Strassen matrix multiplication: C = A * B
-void strassen_multiply(double *A, double *B, double *C, int n) {
-    // Base case: use naive multiplication for small matrices
-    if (n <= 64) {
-        naive_multiply(A, B, C, n);
-        return;
+// Cache-blocked matrix multiplication (packed panels + register-tiled micro-kernel)
+void blocked_multiply(double *A, double *B, double *C, int n) {
+    gemm_blocked(n, n, n, 1.0, A, n, B, n, 0.0, C, n);
+}
+
+// Strided view helpers: every operand is (pointer, leading dimension), rows x cols.
+// Each row goes through the SIMD kernels selected at startup.
+
+// Z = X + Y
+static void view_add(const double *X, int ldx, const double *Y, int ldy, double *Z, int ldz,
+                     int rows, int cols) {
+    void (*add)(size_t, const double *, const double *, double *) = simd_kernels()->add;
+    for (int i = 0; i < rows; i++) {
+        add((size_t)cols, X + (size_t)i * ldx, Y + (size_t)i * ldy, Z + (size_t)i * ldz);
     }
-    
-    int half = n / 2;
-    int size = half * half;
-    
-    // Allocate submatrices
-    double *A11 = malloc(size * sizeof(double));
-    double *A12 = malloc(size * sizeof(double));
-    double *A21 = malloc(size * sizeof(double));
-    double *A22 = malloc(size * sizeof(double));
-    
-    double *B11 = malloc(size * sizeof(double));
-    double *B12 = malloc(size * sizeof(double));
-    double *B21 = malloc(size * sizeof(double));
-    double *B22 = malloc(size * sizeof(double));
-    
-    double *C11 = malloc(size * sizeof(double));
-    double *C12 = malloc(size * sizeof(double));
-    double *C21 = malloc(size * sizeof(double));
-    double *C22 = malloc(size * sizeof(double));
-    
-    // Extract submatrices
-    get_submatrix(A, A11, n, half, 0, 0);
-    get_submatrix(A, A12, n, half, 0, half);
-    get_submatrix(A, A21, n, half, half, 0);
-    get_submatrix(A, A22, n, half, half, half);
-    
-    get_submatrix(B, B11, n, half, 0, 0);
-    get_submatrix(B, B12, n, half, 0, half);
-    get_submatrix(B, B21, n, half, half, 0);
-    get_submatrix(B, B22, n, half, half, half);
-    
-    // Allocate temporary matrices for Strassen's algorithm
-    double *temp1 = malloc(size * sizeof(double));
-    double *temp2 = malloc(size * sizeof(double));
-    double *P1 = malloc(size * sizeof(double));
-    double *P2 = malloc(size * sizeof(double));
-    double *P3 = malloc(size * sizeof(double));
-    double *P4 = malloc(size * sizeof(double));
-    double *P5 = malloc(size * sizeof(double));
-    double *P6 = malloc(size * sizeof(double));
-    double *P7 = malloc(size * sizeof(double));
-    
-    // Strassen's 7 multiplications
-    // P1 = A11 * (B12 - B22)
-    matrix_sub(B12, B22, temp1, half);
-    strassen_multiply(A11, temp1, P1, half);
-    
-    // P2 = (A11 + A12) * B22
-    matrix_add(A11, A12, temp1, half);
-    strassen_multiply(temp1, B22, P2, half);
-    
-    // P3 = (A21 + A22) * B11
-    matrix_add(A21, A22, temp1, half);
-    strassen_multiply(temp1, B11, P3, half);
-    
-    // P4 = A22 * (B21 - B11)
-    matrix_sub(B21, B11, temp1, half);
-    strassen_multiply(A22, temp1, P4, half);
-    
-    // P5 = (A11 + A22) * (B11 + B22)
-    matrix_add(A11, A22, temp1, half);
-    matrix_add(B11, B22, temp2, half);
-    strassen_multiply(temp1, temp2, P5, half);
-    
-    // P6 = (A12 - A22) * (B21 + B22)
-    matrix_sub(A12, A22, temp1, half);
-    matrix_add(B21, B22, temp2, half);
-    strassen_multiply(temp1, temp2, P6, half);
-    
-    // P7 = (A11 - A21) * (B11 + B12)
-    matrix_sub(A11, A21, temp1, half);
-    matrix_add(B11, B12, temp2, half);
-    strassen_multiply(temp1, temp2, P7, half);
-    
-    // Calculate result submatrices
+}
+
+// Z = X - Y
+static void view_sub(const double *X, int ldx, const double *Y, int ldy, double *Z, int ldz,
+                     int rows, int cols) {
+    void (*sub)(size_t, const double *, const double *, double *) = simd_kernels()->sub;
+    for (int i = 0; i < rows; i++) {
+        sub((size_t)cols, X + (size_t)i * ldx, Y + (size_t)i * ldy, Z + (size_t)i * ldz);
+    }
+}
+
+// Z += X
+static void view_acc(const double *X, int ldx, double *Z, int ldz, int rows, int cols) {
+    void (*acc)(size_t, const double *, double *) = simd_kernels()->acc;
+    for (int i = 0; i < rows; i++) {
+        acc((size_t)cols, X + (size_t)i * ldx, Z + (size_t)i * ldz);
+    }
+}
+
+// Z -= X
+static void view_dec(const double *X, int ldx, double *Z, int ldz, int rows, int cols) {
+    void (*dec)(size_t, const double *, double *) = simd_kernels()->dec;
+    for (int i = 0; i < rows; i++) {
+        dec((size_t)cols, X + (size_t)i * ldx, Z + (size_t)i * ldz);
+    }
+}
+
+// Z = X (sign = 1) or Z = -X (sign = -1)
+static void view_copy(const double *X, int ldx, double *Z, int ldz, int rows, int cols, int sign) {
+    for (int i = 0; i < rows; i++) {
+        const double *x = X + (size_t)i * ldx;
+        double *z = Z + (size_t)i * ldz;
+        if (sign > 0) {
+            memcpy(z, x, (size_t)cols * sizeof(double));
+        } else {
+            for (int j = 0; j < cols; j++) z[j] = -x[j];
+        }
+    }
+}
+
+// Form the operands of Strassen product P<idx+1> (idx = 0..6) from the
+// quadrants of A and B, written as contiguous h x h matrices Ta and Tb
+void strassen_form_operands(int idx, const double *A, int lda, const double *B, int ldb,
+                            int h, double *Ta, double *Tb) {
+    const double *A11 = A, *A12 = A + h, *A21 = A + (size_t)h * lda, *A22 = A21 + h;
+    const double *B11 = B, *B12 = B + h, *B21 = B + (size_t)h * ldb, *B22 = B21 + h;
+
+    switch (idx) {
+    case 0: // P1 = A11 * (B12 - B22)
+        view_copy(A11, lda, Ta, h, h, h, 1);
+        view_sub(B12, ldb, B22, ldb, Tb, h, h, h);
+        break;
+    case 1: // P2 = (A11 + A12) * B22
+        view_add(A11, lda, A12, lda, Ta, h, h, h);
+        view_copy(B22, ldb, Tb, h, h, h, 1);
+        break;
+    case 2: // P3 = (A21 + A22) * B11
+        view_add(A21, lda, A22, lda, Ta, h, h, h);
+        view_copy(B11, ldb, Tb, h, h, h, 1);
+        break;
+    case 3: // P4 = A22 * (B21 - B11)
+        view_copy(A22, lda, Ta, h, h, h, 1);
+        view_sub(B21, ldb, B11, ldb, Tb, h, h, h);
+        break;
+    case 4: // P5 = (A11 + A22) * (B11 + B22)
+        view_add(A11, lda, A22, lda, Ta, h, h, h);
+        view_add(B11, ldb, B22, ldb, Tb, h, h, h);
+        break;
+    case 5: // P6 = (A12 - A22) * (B21 + B22)
+        view_sub(A12, lda, A22, lda, Ta, h, h, h);
+        view_add(B21, ldb, B22, ldb, Tb, h, h, h);
+        break;
+    default: // P7 = (A11 - A21) * (B11 + B12)
+        view_sub(A11, lda, A21, lda, Ta, h, h, h);
+        view_add(B11, ldb, B12, ldb, Tb, h, h, h);
+        break;
+    }
+}
+
+// Assemble C (2h x 2h view) from the seven contiguous h x h products P[0..6]
+void strassen_combine(double *const P[7], int h, double *C, int ldc) {
+    double *C11 = C, *C12 = C + h, *C21 = C + (size_t)h * ldc, *C22 = C21 + h;
+
     // C11 = P5 + P4 - P2 + P6
-    matrix_add(P5, P4, temp1, half);
-    matrix_sub(temp1, P2, temp2, half);
-    matrix_add(temp2, P6, C11, half);
-    
+    view_add(P[4], h, P[3], h, C11, ldc, h, h);
+    view_dec(P[1], h, C11, ldc, h, h);
+    view_acc(P[5], h, C11, ldc, h, h);
+
     // C12 = P1 + P2
-    matrix_add(P1, P2, C12, half);
-    
+    view_add(P[0], h, P[1], h, C12, ldc, h, h);
+
     // C21 = P3 + P4
-    matrix_add(P3, P4, C21, half);
-    
+    view_add(P[2], h, P[3], h, C21, ldc, h, h);
+
     // C22 = P5 + P1 - P3 - P7
-    matrix_add(P5, P1, temp1, half);
-    matrix_sub(temp1, P3, temp2, half);
-    matrix_sub(temp2, P7, C22, half);
-    
-    // Combine result submatrices
-    set_submatrix(C, C11, n, half, 0, 0);
-    set_submatrix(C, C12, n, half, 0, half);
-    set_submatrix(C, C21, n, half, half, 0);
-    set_submatrix(C, C22, n, half, half, half);
-    
-    // Free all allocated memory
-    free(A11); free(A12); free(A21); free(A22);
-    free(B11); free(B12); free(B21); free(B22);
-    free(C11); free(C12); free(C21); free(C22);
-    free(temp1); free(temp2);
-    free(P1); free(P2); free(P3); free(P4); free(P5); free(P6); free(P7);
-}
-
-// Pad matrix to power of 2 size
-double* pad_matrix(double *matrix, int original_size, int padded_size) {
-    double *padded = calloc(padded_size * padded_size, sizeof(double));
-    for (int i = 0; i < original_size; i++) {
-        for (int j = 0; j < original_size; j++) {
-            padded[i * padded_size + j] = matrix[i * original_size + j];
+    view_add(P[4], h, P[0], h, C22, ldc, h, h);
+    view_dec(P[2], h, C22, ldc, h, h);
+    view_dec(P[6], h, C22, ldc, h, h);
+}
+
+// Finish C = A * B (m x k times k x n) when only the leading me x ne block of
+// C holds A[0:me, 0:ke] * B[0:ke, 0:ne]: add the peeled inner slice and
+// compute the peeled border rows and columns of C with the blocked kernel
+void strassen_peel_fixup(int m, int n, int k, int me, int ne, int ke,
+                         const double *A, int lda, const double *B, int ldb, double *C, int ldc) {
+    // C[0:me, 0:ne] += A[0:me, ke:k] * B[ke:k, 0:ne]
+    if (ke < k) {
+        gemm_blocked(me, ne, k - ke, 1.0, A + ke, lda, B + (size_t)ke * ldb, ldb, 1.0, C, ldc);
+    }
+    // C[0:me, ne:n] = A[0:me, :] * B[:, ne:n]
+    if (ne < n) {
+        gemm_blocked(me, n - ne, k, 1.0, A, lda, B + ne, ldb, 0.0, C + ne, ldc);
+    }
+    // C[me:m, :] = A[me:m, :] * B
+    if (me < m) {
+        gemm_blocked(m - me, n, k, 1.0, A + (size_t)me * lda, lda, B, ldb, 0.0,
+                     C + (size_t)me * ldc, ldc);
+    }
+}
+
+static int strassen_base_case(int m, int n, int k) {
+    int cutoff = strassen_get_cutoff();
+    return m <= cutoff || n <= cutoff || k <= cutoff;
+}
+
+// Workspace (in elements) needed by strassen_multiply_mnk: per recursion level
+// one A-operand (hm x hk), one B-operand (hk x hn) and one product (hm x hn),
+// for either variant and for the float32 recursion
+size_t strassen_workspace_size_mnk(int m, int n, int k) {
+    size_t total = 0;
+    while (!strassen_base_case(m, n, k)) {
+        m /= 2;
+        n /= 2;
+        k /= 2;
+        total += (size_t)m * k + (size_t)k * n + (size_t)m * n;
+    }
+    return total;
+}
+
+size_t strassen_workspace_size(int n) {
+    return strassen_workspace_size_mnk(n, n, n);
+}
+
+// Classic Strassen on strided views using a preallocated workspace: C = A * B
+// with A m x k and B k x n. Odd dimensions are handled by dynamic peeling: the
+// recursion runs on the even leading block and strassen_peel_fixup adds the
+// last row / column / inner slice, so no operand is ever padded or copied.
+static void strassen_classic_mnk(int m, int n, int k, const double *A, int lda, const double *B, int ldb,
+                                 double *C, int ldc, double *work) {
+    // Base case: use the blocked kernel for small (or thin) products
+    if (strassen_base_case(m, n, k)) {
+        gemm_blocked(m, n, k, 1.0, A, lda, B, ldb, 0.0, C, ldc);
+        return;
+    }
+
+    int hm = m / 2, hn = n / 2, hk = k / 2;
+
+    const double *A11 = A, *A12 = A + hk, *A21 = A + (size_t)hm * lda, *A22 = A21 + hk;
+    const double *B11 = B, *B12 = B + hn, *B21 = B + (size_t)hk * ldb, *B22 = B21 + hn;
+    double *C11 = C, *C12 = C + hn, *C21 = C + (size_t)hm * ldc, *C22 = C21 + hn;
+
+    // Per-level temporaries: operand sums of A and B, one product buffer
+    double *T1 = work;                          // hm x hk
+    double *T2 = T1 + (size_t)hm * hk;          // hk x hn
+    double *P = T2 + (size_t)hk * hn;           // hm x hn
+    double *next = P + (size_t)hm * hn;
+
+    // P1 = A11 * (B12 - B22)            -> C12 = P1, C22 = P1
+    view_sub(B12, ldb, B22, ldb, T2, hn, hk, hn);
+    strassen_classic_mnk(hm, hn, hk, A11, lda, T2, hn, C12, ldc, next);
+    view_copy(C12, ldc, C22, ldc, hm, hn, 1);
+
+    // P3 = (A21 + A22) * B11            -> C21 = P3, C22 -= P3
+    view_add(A21, lda, A22, lda, T1, hk, hm, hk);
+    strassen_classic_mnk(hm, hn, hk, T1, hk, B11, ldb, C21, ldc, next);
+    view_dec(C21, ldc, C22, ldc, hm, hn);
+
+    // P2 = (A11 + A12) * B22            -> C12 += P2, C11 = -P2
+    view_add(A11, lda, A12, lda, T1, hk, hm, hk);
+    strassen_classic_mnk(hm, hn, hk, T1, hk, B22, ldb, P, hn, next);
+    view_acc(P, hn, C12, ldc, hm, hn);
+    view_copy(P, hn, C11, ldc, hm, hn, -1);
+
+    // P4 = A22 * (B21 - B11)            -> C21 += P4, C11 += P4
+    view_sub(B21, ldb, B11, ldb, T2, hn, hk, hn);
+    strassen_classic_mnk(hm, hn, hk, A22, lda, T2, hn, P, hn, next);
+    view_acc(P, hn, C21, ldc, hm, hn);
+    view_acc(P, hn, C11, ldc, hm, hn);
+
+    // P5 = (A11 + A22) * (B11 + B22)    -> C11 += P5, C22 += P5
+    view_add(A11, lda, A22, lda, T1, hk, hm, hk);
+    view_add(B11, ldb, B22, ldb, T2, hn, hk, hn);
+    strassen_classic_mnk(hm, hn, hk, T1, hk, T2, hn, P, hn, next);
+    view_acc(P, hn, C11, ldc, hm, hn);
+    view_acc(P, hn, C22, ldc, hm, hn);
+
+    // P6 = (A12 - A22) * (B21 + B22)    -> C11 += P6
+    view_sub(A12, lda, A22, lda, T1, hk, hm, hk);
+    view_add(B21, ldb, B22, ldb, T2, hn, hk, hn);
+    strassen_classic_mnk(hm, hn, hk, T1, hk, T2, hn, P, hn, next);
+    view_acc(P, hn, C11, ldc, hm, hn);
+
+    // P7 = (A11 - A21) * (B11 + B12)    -> C22 -= P7
+    view_sub(A11, lda, A21, lda, T1, hk, hm, hk);
+    view_add(B11, ldb, B12, ldb, T2, hn, hk, hn);
+    strassen_classic_mnk(hm, hn, hk, T1, hk, T2, hn, P, hn, next);
+    view_dec(P, hn, C22, ldc, hm, hn);
+
+    // Peeled last row / column / inner slice of odd dimensions
+    strassen_peel_fixup(m, n, k, 2 * hm, 2 * hn, 2 * hk, A, lda, B, ldb, C, ldc);
+}
+
+static void winograd_mnk(int m, int n, int k, const double *A, int lda, const double *B, int ldb,
+                         double *C, int ldc, double *work);
+
+// C += A * B for a Winograd sub-product. At the base case the blocked kernel
+// accumulates straight into C; above it the product goes through Z (hm x hn
+// slot of the parent level) and one addition pass.
+static void winograd_acc(int m, int n, int k, const double *A, int lda, const double *B, int ldb,
+                         double *C, int ldc, double *Z, double *work) {
+    if (strassen_base_case(m, n, k)) {
+        gemm_blocked(m, n, k, 1.0, A, lda, B, ldb, 1.0, C, ldc);
+        return;
+    }
+    winograd_mnk(m, n, k, A, lda, B, ldb, Z, n, work);
+    view_acc(Z, n, C, ldc, m, n);
+}
+
+// Strassen-Winograd on strided views: 7 products and 15 additions per level
+// (8 on the operands, 4 on C, 3 fused into accumulating products) instead of
+// 18. Products land directly in the C quadrants; only the A-operand X and the
+// B-operand Y are temporaries. Same workspace layout and peeling as the
+// classic recursion.
+static void winograd_mnk(int m, int n, int k, const double *A, int lda, const double *B, int ldb,
+                         double *C, int ldc, double *work) {
+    if (strassen_base_case(m, n, k)) {
+        gemm_blocked(m, n, k, 1.0, A, lda, B, ldb, 0.0, C, ldc);
+        return;
+    }
+
+    int hm = m / 2, hn = n / 2, hk = k / 2;
+
+    const double *A11 = A, *A12 = A + hk, *A21 = A + (size_t)hm * lda, *A22 = A21 + hk;
+    const double *B11 = B, *B12 = B + hn, *B21 = B + (size_t)hk * ldb, *B22 = B21 + hn;
+    double *C11 = C, *C12 = C + hn, *C21 = C + (size_t)hm * ldc, *C22 = C21 + hn;
+
+    double *X = work;                           // hm x hk
+    double *Y = X + (size_t)hm * hk;            // hk x hn
+    double *Z = Y + (size_t)hk * hn;            // hm x hn, only for accumulating products
+    double *next = Z + (size_t)hm * hn;
+
+    // P7 = (A11 - A21) * (B22 - B12)    -> C21
+    view_sub(A11, lda, A21, lda, X, hk, hm, hk);
+    view_sub(B22, ldb, B12, ldb, Y, hn, hk, hn);
+    winograd_mnk(hm, hn, hk, X, hk, Y, hn, C21, ldc, next);
+
+    // S1 = A21 + A22, T1 = B12 - B11; P5 = S1 * T1 -> C22
+    view_add(A21, lda, A22, lda, X, hk, hm, hk);
+    view_sub(B12, ldb, B11, ldb, Y, hn, hk, hn);
+    winograd_mnk(hm, hn, hk, X, hk, Y, hn, C22, ldc, next);
+
+    // S2 = S1 - A11, T2 = B22 - T1; P6 = S2 * T2 -> C12
+    view_sub(X, hk, A11, lda, X, hk, hm, hk);
+    view_sub(B22, ldb, Y, hn, Y, hn, hk, hn);
+    winograd_mnk(hm, hn, hk, X, hk, Y, hn, C12, ldc, next);
+
+    // S4 = A12 - S2
+    view_sub(A12, lda, X, hk, X, hk, hm, hk);
+
+    // P1 = A11 * B11 -> C11
+    winograd_mnk(hm, hn, hk, A11, lda, B11, ldb, C11, ldc, next);
+
+    view_acc(C11, ldc, C12, ldc, hm, hn);       // C12 = P1 + P6           (U2)
+    view_acc(C12, ldc, C21, ldc, hm, hn);       // C21 = U2 + P7           (U3)
+    view_acc(C22, ldc, C12, ldc, hm, hn);       // C12 = U2 + P5           (U4)
+    view_acc(C21, ldc, C22, ldc, hm, hn);       // C22 = U3 + P5           (U7)
+
+    // C12 += P3 = S4 * B22                                                (U5)
+    winograd_acc(hm, hn, hk, X, hk, B22, ldb, C12, ldc, Z, next);
+
+    // C21 -= P4 = A22 * T4, as C21 += A22 * (B21 - T2)                    (U6)
+    view_sub(B21, ldb, Y, hn, Y, hn, hk, hn);
+    winograd_acc(hm, hn, hk, A22, lda, Y, hn, C21, ldc, Z, next);
+
+    // C11 += P2 = A12 * B21                                               (U1)
+    winograd_acc(hm, hn, hk, A12, lda, B21, ldb, C11, ldc, Z, next);
+
+    strassen_peel_fixup(m, n, k, 2 * hm, 2 * hn, 2 * hk, A, lda, B, ldb, C, ldc);
+}
+
+void strassen_multiply_mnk(int m, int n, int k, const double *A, int lda, const double *B, int ldb,
+                           double *C, int ldc, double *work) {
+    if (strassen_variant == STRASSEN_WINOGRAD) {
+        winograd_mnk(m, n, k, A, lda, B, ldb, C, ldc, work);
+    } else {
+        strassen_classic_mnk(m, n, k, A, lda, B, ldb, C, ldc, work);
+    }
+}
+
+void strassen_multiply_ws(const double *A, int lda, const double *B, int ldb,
+                          double *C, int ldc, int n, double *work) {
+    strassen_multiply_mnk(n, n, n, A, lda, B, ldb, C, ldc, work);
+}
+
+// Rectangular Strassen: C (m x n) = A (m x k) * B (k x n), contiguous operands
+void strassen_multiply_rect(const double *A, const double *B, double *C, int m, int n, int k) {
+    size_t ws = strassen_workspace_size_mnk(m, n, k);
+    double *work = NULL;
+    if (ws > 0) {
+        work = malloc(ws * sizeof(double));
+        if (!work) {
+            perror("malloc");
+            fprintf(stderr, "Failed to allocate Strassen workspace (%zu doubles)\n", ws);
+            exit(1);
         }
     }
-    return padded;
+    strassen_multiply_mnk(m, n, k, A, k, B, n, C, n, work);
+    free(work);
+}
+
+// Strassen matrix multiplication: C = A * B (n x n, any n)
+void strassen_multiply(double *A, double *B, double *C, int n) {
+    strassen_multiply_rect(A, B, C, n, n, n);
 }
 
-// Unpad matrix from power of 2 size
-void unpad_matrix(double *padded_matrix, double *result, int padded_size, int original_size) {
-    for (int i = 0; i < original_size; i++) {
-        for (int j = 0; j < original_size; j++) {
-            result[i * original_size + j] = padded_matrix[i * padded_size + j];
+// Prepared operand tree: every inner node keeps the seven A-side operands of
+// its products as children (quadrant views or owned combinations), the
+// leaves keep only the packed panels of their operand.
+struct strassen_prep_node {
+    int m, k;
+    const double *A;                    // operand (NULL at leaves)
+    int lda;
+    double *own;                        // owned combined operand, or NULL for a view
+    gemm_packed_t packed;               // leaves
+    int leaf;
+    struct strassen_prep_node *child[7];    // operands of P1..P7
+};
+
+static void prep_free(strassen_prep_node_t *nd) {
+    if (!nd) return;
+    for (int i = 0; i < 7; i++) prep_free(nd->child[i]);
+    free(nd->own);
+    gemm_packed_free(&nd->packed);
+    free(nd);
+}
+
+// rows x cols buffer holding X + sign * Y
+static double *prep_combine(const double *X, int ldx, const double *Y, int ldy, int rows, int cols, int sign) {
+    double *Z = malloc((size_t)rows * cols * sizeof(double));
+    if (!Z) {
+        perror("malloc");
+        return NULL;
+    }
+    if (sign > 0) view_add(X, ldx, Y, ldy, Z, cols, rows, cols);
+    else view_sub(X, ldx, Y, ldy, Z, cols, rows, cols);
+    return Z;
+}
+
+// Node for operand A (m x k) against B of width n, `depth` levels below the
+// root. Takes ownership of own (A itself when it is a combination) even on
+// failure.
+static strassen_prep_node_t *prep_build(strassen_prepared_t *pa, int m, int n, int k, const double *A,
+                                        int lda, double *own, int depth) {
+    strassen_prep_node_t *nd = calloc(1, sizeof(*nd));
+    if (!nd) {
+        perror("calloc");
+        free(own);
+        return NULL;
+    }
+    nd->m = m;
+    nd->k = k;
+    nd->A = A;
+    nd->lda = lda;
+    nd->own = own;
+
+    if (strassen_base_case(m, n, k)) {
+        nd->leaf = 1;
+        if (gemm_pack_a(m, k, A, lda, &nd->packed) != 0) {
+            prep_free(nd);
+            return NULL;
         }
+        free(nd->own);
+        nd->own = NULL;
+        nd->A = NULL;
+        pa->bytes += gemm_packed_bytes(&nd->packed);
+        return nd;
+    }
+    if (own) pa->bytes += (size_t)m * k * sizeof(double);
+    // Below max_levels the node keeps its operand and runs plain Strassen
+    if (pa->levels > 0 && depth == pa->levels) return nd;
+
+    int hm = m / 2, hn = n / 2, hk = k / 2;
+    const double *A11 = A, *A12 = A + hk, *A21 = A + (size_t)hm * lda, *A22 = A21 + hk;
+    const double *view[7] = { NULL };
+    double *comb[7] = { NULL };
+    int failed = 0;
+
+    if (pa->variant == STRASSEN_WINOGRAD) {
+        // P1 = A11, P2 = A12, P3 = S4, P4 = A22, P5 = S1, P6 = S2, P7 = A11 - A21
+        view[0] = A11;
+        view[1] = A12;
+        view[3] = A22;
+        comb[4] = prep_combine(A21, lda, A22, lda, hm, hk, 1);
+        comb[5] = comb[4] ? prep_combine(comb[4], hk, A11, lda, hm, hk, -1) : NULL;
+        comb[2] = comb[5] ? prep_combine(A12, lda, comb[5], hk, hm, hk, -1) : NULL;
+        comb[6] = prep_combine(A11, lda, A21, lda, hm, hk, -1);
+        failed = !comb[2] || !comb[4] || !comb[5] || !comb[6];
+    } else {
+        // P1 = A11, P2 = A11 + A12, P3 = A21 + A22, P4 = A22,
+        // P5 = A11 + A22, P6 = A12 - A22, P7 = A11 - A21
+        view[0] = A11;
+        view[3] = A22;
+        comb[1] = prep_combine(A11, lda, A12, lda, hm, hk, 1);
+        comb[2] = prep_combine(A21, lda, A22, lda, hm, hk, 1);
+        comb[4] = prep_combine(A11, lda, A22, lda, hm, hk, 1);
+        comb[5] = prep_combine(A12, lda, A22, lda, hm, hk, -1);
+        comb[6] = prep_combine(A11, lda, A21, lda, hm, hk, -1);
+        failed = !comb[1] || !comb[2] || !comb[4] || !comb[5] || !comb[6];
     }
+    if (failed) {
+        for (int i = 0; i < 7; i++) free(comb[i]);
+        prep_free(nd);
+        return NULL;
+    }
+
+    // All operands exist before any child is built, since leaves free theirs
+    for (int i = 0; i < 7; i++) {
+        if (comb[i]) nd->child[i] = prep_build(pa, hm, hn, hk, comb[i], hk, comb[i], depth + 1);
+        else nd->child[i] = prep_build(pa, hm, hn, hk, view[i], lda, NULL, depth + 1);
+        if (!nd->child[i]) failed = 1;
+    }
+    if (failed) {
+        prep_free(nd);
+        return NULL;
+    }
+    return nd;
+}
+
+int strassen_prepare(strassen_prepared_t *pa, int m, int n, int k, const double *A, int lda, int max_levels) {
+    memset(pa, 0, sizeof(*pa));
+    pa->m = m;
+    pa->n = n;
+    pa->k = k;
+    pa->levels = max_levels > 0 ? max_levels : 0;
+    pa->variant = strassen_variant;
+    pa->root = prep_build(pa, m, n, k, A, lda, NULL, 0);
+    if (!pa->root) {
+        fprintf(stderr, "Failed to prepare the %dx%d Strassen operand\n", m, k);
+        return -1;
+    }
+    // Depth actually reached (every path has the same length)
+    int depth = 0;
+    for (const strassen_prep_node_t *nd = pa->root; nd->child[0]; nd = nd->child[0]) depth++;
+    pa->levels = depth;
+    return 0;
+}
+
+size_t strassen_prepared_workspace_size(const strassen_prepared_t *pa) {
+    int m = pa->m, n = pa->n, k = pa->k;
+    size_t total = 0;
+    for (int d = 0; d < pa->levels; d++) {
+        m /= 2;
+        n /= 2;
+        k /= 2;
+        total += (size_t)k * n + (size_t)m * n;
+    }
+    const strassen_prep_node_t *nd = pa->root;
+    while (nd->child[0]) nd = nd->child[0];
+    return total + (nd->leaf ? 0 : strassen_workspace_size_mnk(m, n, k));
+}
+
+// C = op * B for a prepared node (B is nd->k x n)
+static void prep_multiply(const strassen_prepared_t *pa, const strassen_prep_node_t *nd, int n,
+                          const double *B, int ldb, double *C, int ldc, double *work);
+
+// C += op * B; Z is an m x n slot of the parent level
+static void prep_acc(const strassen_prepared_t *pa, const strassen_prep_node_t *nd, int n,
+                     const double *B, int ldb, double *C, int ldc, double *Z, double *work) {
+    if (nd->leaf) {
+        gemm_blocked_packed(n, &nd->packed, B, ldb, 1.0, C, ldc);
+        return;
+    }
+    prep_multiply(pa, nd, n, B, ldb, Z, n, work);
+    view_acc(Z, n, C, ldc, nd->m, n);
+}
+
+// The classic and Winograd schedules of strassen_classic_mnk / winograd_mnk
+// with every A-side operand read from the tree instead of being formed
+static void prep_multiply(const strassen_prepared_t *pa, const strassen_prep_node_t *nd, int n,
+                          const double *B, int ldb, double *C, int ldc, double *work) {
+    int m = nd->m, k = nd->k;
+    if (nd->leaf) {
+        gemm_blocked_packed(n, &nd->packed, B, ldb, 0.0, C, ldc);
+        return;
+    }
+    if (!nd->child[0]) {
+        strassen_multiply_mnk(m, n, k, nd->A, nd->lda, B, ldb, C, ldc, work);
+        return;
+    }
+
+    int hm = m / 2, hn = n / 2, hk = k / 2;
+    const double *B11 = B, *B12 = B + hn, *B21 = B + (size_t)hk * ldb, *B22 = B21 + hn;
+    double *C11 = C, *C12 = C + hn, *C21 = C + (size_t)hm * ldc, *C22 = C21 + hn;
+    strassen_prep_node_t *const *P = nd->child;
+
+    double *Y = work;                           // hk x hn
+    double *Z = Y + (size_t)hk * hn;            // hm x hn
+    double *next = Z + (size_t)hm * hn;
+
+    if (pa->variant == STRASSEN_WINOGRAD) {
+        view_sub(B22, ldb, B12, ldb, Y, hn, hk, hn);
+        prep_multiply(pa, P[6], hn, Y, hn, C21, ldc, next);             // P7
+        view_sub(B12, ldb, B11, ldb, Y, hn, hk, hn);
+        prep_multiply(pa, P[4], hn, Y, hn, C22, ldc, next);             // P5 = S1 * T1
+        view_sub(B22, ldb, Y, hn, Y, hn, hk, hn);
+        prep_multiply(pa, P[5], hn, Y, hn, C12, ldc, next);             // P6 = S2 * T2
+        prep_multiply(pa, P[0], hn, B11, ldb, C11, ldc, next);          // P1
+
+        view_acc(C11, ldc, C12, ldc, hm, hn);
+        view_acc(C12, ldc, C21, ldc, hm, hn);
+        view_acc(C22, ldc, C12, ldc, hm, hn);
+        view_acc(C21, ldc, C22, ldc, hm, hn);
+
+        prep_acc(pa, P[2], hn, B22, ldb, C12, ldc, Z, next);            // P3 = S4 * B22
+        view_sub(B21, ldb, Y, hn, Y, hn, hk, hn);
+        prep_acc(pa, P[3], hn, Y, hn, C21, ldc, Z, next);               // -P4
+        prep_acc(pa, P[1], hn, B21, ldb, C11, ldc, Z, next);            // P2
+    } else {
+        view_sub(B12, ldb, B22, ldb, Y, hn, hk, hn);
+        prep_multiply(pa, P[0], hn, Y, hn, C12, ldc, next);             // P1
+        view_copy(C12, ldc, C22, ldc, hm, hn, 1);
+
+        prep_multiply(pa, P[2], hn, B11, ldb, C21, ldc, next);          // P3
+        view_dec(C21, ldc, C22, ldc, hm, hn);
+
+        prep_multiply(pa, P[1], hn, B22, ldb, Z, hn, next);             // P2
+        view_acc(Z, hn, C12, ldc, hm, hn);
+        view_copy(Z, hn, C11, ldc, hm, hn, -1);
+
+        view_sub(B21, ldb, B11, ldb, Y, hn, hk, hn);
+        prep_multiply(pa, P[3], hn, Y, hn, Z, hn, next);                // P4
+        view_acc(Z, hn, C21, ldc, hm, hn);
+        view_acc(Z, hn, C11, ldc, hm, hn);
+
+        view_add(B11, ldb, B22, ldb, Y, hn, hk, hn);
+        prep_multiply(pa, P[4], hn, Y, hn, Z, hn, next);                // P5
+        view_acc(Z, hn, C11, ldc, hm, hn);
+        view_acc(Z, hn, C22, ldc, hm, hn);
+
+        view_add(B21, ldb, B22, ldb, Y, hn, hk, hn);
+        prep_multiply(pa, P[5], hn, Y, hn, Z, hn, next);                // P6
+        view_acc(Z, hn, C11, ldc, hm, hn);
+
+        view_add(B11, ldb, B12, ldb, Y, hn, hk, hn);
+        prep_multiply(pa, P[6], hn, Y, hn, Z, hn, next);                // P7
+        view_dec(Z, hn, C22, ldc, hm, hn);
+    }
+
+    strassen_peel_fixup(m, n, k, 2 * hm, 2 * hn, 2 * hk, nd->A, nd->lda, B, ldb, C, ldc);
+}
+
+void strassen_prepared_multiply(const strassen_prepared_t *pa, const double *B, int ldb,
+                                double *C, int ldc, double *work) {
+    prep_multiply(pa, pa->root, pa->n, B, ldb, C, ldc, work);
+}
+
+void strassen_prepared_free(strassen_prepared_t *pa) {
+    prep_free(pa->root);
+    memset(pa, 0, sizeof(*pa));
+}
+
+// ---- float32: the same recursion on float views
+
+static void view_add_f32(const float *X, int ldx, const float *Y, int ldy, float *Z, int ldz,
+                         int rows, int cols) {
+    void (*add)(size_t, const float *, const float *, float *) = simd_kernels()->add_f32;
+    for (int i = 0; i < rows; i++) {
+        add((size_t)cols, X + (size_t)i * ldx, Y + (size_t)i * ldy, Z + (size_t)i * ldz);
+    }
+}
+
+static void view_sub_f32(const float *X, int ldx, const float *Y, int ldy, float *Z, int ldz,
+                         int rows, int cols) {
+    void (*sub)(size_t, const float *, const float *, float *) = simd_kernels()->sub_f32;
+    for (int i = 0; i < rows; i++) {
+        sub((size_t)cols, X + (size_t)i * ldx, Y + (size_t)i * ldy, Z + (size_t)i * ldz);
+    }
+}
+
+static void view_acc_f32(const float *X, int ldx, float *Z, int ldz, int rows, int cols) {
+    void (*acc)(size_t, const float *, float *) = simd_kernels()->acc_f32;
+    for (int i = 0; i < rows; i++) {
+        acc((size_t)cols, X + (size_t)i * ldx, Z + (size_t)i * ldz);
+    }
+}
+
+static void view_dec_f32(const float *X, int ldx, float *Z, int ldz, int rows, int cols) {
+    void (*dec)(size_t, const float *, float *) = simd_kernels()->dec_f32;
+    for (int i = 0; i < rows; i++) {
+        dec((size_t)cols, X + (size_t)i * ldx, Z + (size_t)i * ldz);
+    }
+}
+
+static void view_copy_f32(const float *X, int ldx, float *Z, int ldz, int rows, int cols, int sign) {
+    for (int i = 0; i < rows; i++) {
+        const float *x = X + (size_t)i * ldx;
+        float *z = Z + (size_t)i * ldz;
+        if (sign > 0) {
+            memcpy(z, x, (size_t)cols * sizeof(float));
+        } else {
+            for (int j = 0; j < cols; j++) z[j] = -x[j];
+        }
+    }
+}
+
+static void peel_fixup_f32(int m, int n, int k, int me, int ne, int ke, const float *A, int lda,
+                           const float *B, int ldb, float *C, int ldc, precision_t prec) {
+    if (ke < k) {
+        gemm_blocked_f32(me, ne, k - ke, 1.0f, A + ke, lda, B + (size_t)ke * ldb, ldb, 1.0f, C, ldc, prec);
+    }
+    if (ne < n) {
+        gemm_blocked_f32(me, n - ne, k, 1.0f, A, lda, B + ne, ldb, 0.0f, C + ne, ldc, prec);
+    }
+    if (me < m) {
+        gemm_blocked_f32(m - me, n, k, 1.0f, A + (size_t)me * lda, lda, B, ldb, 0.0f,
+                         C + (size_t)me * ldc, ldc, prec);
+    }
+}
+
+void strassen_multiply_mnk_f32(int m, int n, int k, const float *A, int lda, const float *B, int ldb,
+                               float *C, int ldc, float *work, precision_t prec) {
+    if (strassen_base_case(m, n, k)) {
+        gemm_blocked_f32(m, n, k, 1.0f, A, lda, B, ldb, 0.0f, C, ldc, prec);
+        return;
+    }
+
+    int hm = m / 2, hn = n / 2, hk = k / 2;
+
+    const float *A11 = A, *A12 = A + hk, *A21 = A + (size_t)hm * lda, *A22 = A21 + hk;
+    const float *B11 = B, *B12 = B + hn, *B21 = B + (size_t)hk * ldb, *B22 = B21 + hn;
+    float *C11 = C, *C12 = C + hn, *C21 = C + (size_t)hm * ldc, *C22 = C21 + hn;
+
+    float *T1 = work;
+    float *T2 = T1 + (size_t)hm * hk;
+    float *P = T2 + (size_t)hk * hn;
+    float *next = P + (size_t)hm * hn;
+
+    // P1 = A11 * (B12 - B22)            -> C12 = P1, C22 = P1
+    view_sub_f32(B12, ldb, B22, ldb, T2, hn, hk, hn);
+    strassen_multiply_mnk_f32(hm, hn, hk, A11, lda, T2, hn, C12, ldc, next, prec);
+    view_copy_f32(C12, ldc, C22, ldc, hm, hn, 1);
+
+    // P3 = (A21 + A22) * B11            -> C21 = P3, C22 -= P3
+    view_add_f32(A21, lda, A22, lda, T1, hk, hm, hk);
+    strassen_multiply_mnk_f32(hm, hn, hk, T1, hk, B11, ldb, C21, ldc, next, prec);
+    view_dec_f32(C21, ldc, C22, ldc, hm, hn);
+
+    // P2 = (A11 + A12) * B22            -> C12 += P2, C11 = -P2
+    view_add_f32(A11, lda, A12, lda, T1, hk, hm, hk);
+    strassen_multiply_mnk_f32(hm, hn, hk, T1, hk, B22, ldb, P, hn, next, prec);
+    view_acc_f32(P, hn, C12, ldc, hm, hn);
+    view_copy_f32(P, hn, C11, ldc, hm, hn, -1);
+
+    // P4 = A22 * (B21 - B11)            -> C21 += P4, C11 += P4
+    view_sub_f32(B21, ldb, B11, ldb, T2, hn, hk, hn);
+    strassen_multiply_mnk_f32(hm, hn, hk, A22, lda, T2, hn, P, hn, next, prec);
+    view_acc_f32(P, hn, C21, ldc, hm, hn);
+    view_acc_f32(P, hn, C11, ldc, hm, hn);
+
+    // P5 = (A11 + A22) * (B11 + B22)    -> C11 += P5, C22 += P5
+    view_add_f32(A11, lda, A22, lda, T1, hk, hm, hk);
+    view_add_f32(B11, ldb, B22, ldb, T2, hn, hk, hn);
+    strassen_multiply_mnk_f32(hm, hn, hk, T1, hk, T2, hn, P, hn, next, prec);
+    view_acc_f32(P, hn, C11, ldc, hm, hn);
+    view_acc_f32(P, hn, C22, ldc, hm, hn);
+
+    // P6 = (A12 - A22) * (B21 + B22)    -> C11 += P6
+    view_sub_f32(A12, lda, A22, lda, T1, hk, hm, hk);
+    view_add_f32(B21, ldb, B22, ldb, T2, hn, hk, hn);
+    strassen_multiply_mnk_f32(hm, hn, hk, T1, hk, T2, hn, P, hn, next, prec);
+    view_acc_f32(P, hn, C11, ldc, hm, hn);
+
+    // P7 = (A11 - A21) * (B11 + B12)    -> C22 -= P7
+    view_sub_f32(A11, lda, A21, lda, T1, hk, hm, hk);
+    view_add_f32(B11, ldb, B12, ldb, T2, hn, hk, hn);
+    strassen_multiply_mnk_f32(hm, hn, hk, T1, hk, T2, hn, P, hn, next, prec);
+    view_dec_f32(P, hn, C22, ldc, hm, hn);
+
+    peel_fixup_f32(m, n, k, 2 * hm, 2 * hn, 2 * hk, A, lda, B, ldb, C, ldc, prec);
+}
+
+void strassen_multiply_f32(const float *A, const float *B, float *C, int n, precision_t prec) {
+    size_t ws = strassen_workspace_size_mnk(n, n, n);
+    float *work = NULL;
+    if (ws > 0) {
+        work = malloc(ws * sizeof(float));
+        if (!work) {
+            perror("malloc");
+            fprintf(stderr, "Failed to allocate Strassen workspace (%zu floats)\n", ws);
+            exit(1);
+        }
+    }
+    strassen_multiply_mnk_f32(n, n, n, A, n, B, n, C, n, work, prec);
+    free(work);
+}
+
+double strassen_f32_sampled_error(const float *A, const float *B, const float *C, int m, int samples) {
+    if (samples > m) samples = m;
+    double *ref = malloc((size_t)m * sizeof(double));
+    if (!ref || samples <= 0) {
+        free(ref);
+        return -1.0;
+    }
+    double max_err = 0.0, max_ref = 0.0;
+    for (int s = 0; s < samples; s++) {
+        int i = (int)((long long)s * (m - 1) / (samples > 1 ? samples - 1 : 1));
+        memset(ref, 0, (size_t)m * sizeof(double));
+        for (int k = 0; k < m; k++) {
+            double a = A[(size_t)i * m + k];
+            const float *b = B + (size_t)k * m;
+            for (int j = 0; j < m; j++) ref[j] += a * (double)b[j];
+        }
+        for (int j = 0; j < m; j++) {
+            double err = fabs((double)C[(size_t)i * m + j] - ref[j]);
+            if (err > max_err) max_err = err;
+            if (fabs(ref[j]) > max_ref) max_ref = fabs(ref[j]);
+        }
+    }
+    free(ref);
+    return max_ref > 0.0 ? max_err / max_ref : max_err;
+}
+
+// Freivalds' check. Phase 1 forms B R, |B| |R| and C R for the m x k matrix R
+// of random vectors; phase 2 forms A (B R) and |A| (|B| |R|) a row at a time and
+// keeps, per worker and round, the largest |A B r - C r| and the largest scale.
+typedef struct {
+    const void *A, *B, *C;
+    int f32;
+    int m, k;
+    int workers;
+    double *R, *Rabs;         // m x k
+    double *BR, *BRabs, *CR;  // m x k
+    double *partial;          // per worker: k largest differences, then k largest scales
+} freivalds_job_t;
+
+// Rows one verification worker should at least get; smaller checks run in fewer workers
+#define FREIVALDS_MIN_ROWS 64
+
+// Accepted residual, in units of sqrt(m) times the machine epsilon of the
+// stored C: the rounding of blocked and Strassen products stays within a few
+// sqrt(m) eps of the row scale (measured up to ~3 eps for float32, cutoff 8)
+#define FREIVALDS_TOL_ULPS 8.0
+
+// Y = M[r0:r1, :] X and, with Yabs, Yabs = |M[r0:r1, :]| Xabs (k columns, row-major)
+static void freivalds_rows(const void *M, int f32, int m, int k, int r0, int r1,
+                           const double *X, const double *Xabs, double *Y, double *Yabs) {
+    for (int i = r0; i < r1; i++) {
+        double *y = Y + (size_t)(i - r0) * k;
+        double *ya = Yabs ? Yabs + (size_t)(i - r0) * k : NULL;
+        memset(y, 0, (size_t)k * sizeof(double));
+        if (ya) memset(ya, 0, (size_t)k * sizeof(double));
+        for (int c = 0; c < m; c++) {
+            double a = f32 ? (double)((const float *)M)[(size_t)i * m + c] : ((const double *)M)[(size_t)i * m + c];
+            const double *x = X + (size_t)c * k;
+            for (int j = 0; j < k; j++) y[j] += a * x[j];
+            if (ya) {
+                const double *xa = Xabs + (size_t)c * k;
+                for (int j = 0; j < k; j++) ya[j] += fabs(a) * xa[j];
+            }
+        }
+    }
+}
+
+static void freivalds_range(const freivalds_job_t *job, int w, int *r0, int *r1) {
+    *r0 = (int)((long long)job->m * w / job->workers);
+    *r1 = (int)((long long)job->m * (w + 1) / job->workers);
+}
+
+static void freivalds_phase1(freivalds_job_t *job, int w) {
+    int r0, r1;
+    freivalds_range(job, w, &r0, &r1);
+    size_t off = (size_t)r0 * job->k;
+    freivalds_rows(job->B, job->f32, job->m, job->k, r0, r1, job->R, job->Rabs, job->BR + off, job->BRabs + off);
+    freivalds_rows(job->C, job->f32, job->m, job->k, r0, r1, job->R, NULL, job->CR + off, NULL);
+}
+
+static void freivalds_phase2(freivalds_job_t *job, int w) {
+    int r0, r1, k = job->k;
+    freivalds_range(job, w, &r0, &r1);
+    double *max_diff = job->partial + (size_t)w * 2 * k, *max_scale = max_diff + k;
+    double row[2 * FREIVALDS_MAX_ROUNDS];
+    for (int i = r0; i < r1; i++) {
+        freivalds_rows(job->A, job->f32, job->m, k, i, i + 1, job->BR, job->BRabs, row, row + k);
+        for (int j = 0; j < k; j++) {
+            double d = fabs(row[j] - job->CR[(size_t)i * k + j]);
+            if (!(d <= max_diff[j])) max_diff[j] = d;  // NaN in C sticks
+            if (row[k + j] > max_scale[j]) max_scale[j] = row[k + j];
+        }
+    }
+}
+
+// Run phase over the workers: forked children, or in this process for one
+static int freivalds_run(freivalds_job_t *job, void (*phase)(freivalds_job_t *, int)) {
+    if (job->workers == 1) {
+        phase(job, 0);
+        return 0;
+    }
+    pid_t *pids = calloc((size_t)job->workers, sizeof(pid_t));
+    if (!pids) {
+        perror("calloc");
+        return -1;
+    }
+    for (int w = 0; w < job->workers; w++) {
+        pids[w] = fork();
+        if (pids[w] < 0) {
+            perror("fork");
+            phase(job, w);  // do that share here instead
+        } else if (pids[w] == 0) {
+            phase(job, w);
+            _exit(0);
+        }
+    }
+    int failed = 0;
+    for (int w = 0; w < job->workers; w++) {
+        int status;
+        if (pids[w] <= 0) continue;
+        if (waitpid(pids[w], &status, 0) < 0 || !WIFEXITED(status) || WEXITSTATUS(status) != 0) failed = 1;
+    }
+    free(pids);
+    if (failed) fprintf(stderr, "A verification worker failed\n");
+    return failed ? -1 : 0;
+}
+
+static int freivalds(const void *A, const void *B, const void *C, int f32, int m, int rounds, int p,
+                     verify_result_t *res) {
+    struct timeval start, end;
+    gettimeofday(&start, NULL);
+    if (rounds < 1) rounds = 1;
+    if (rounds > FREIVALDS_MAX_ROUNDS) rounds = FREIVALDS_MAX_ROUNDS;
+    int workers = m / FREIVALDS_MIN_ROWS;
+    if (workers > p) workers = p;
+    if (workers < 1) workers = 1;
+
+    freivalds_job_t job = { A, B, C, f32, m, rounds, workers, NULL, NULL, NULL, NULL, NULL, NULL };
+    size_t mk = (size_t)m * rounds;
+    size_t bytes = (5 * mk + (size_t)workers * 2 * rounds) * sizeof(double);
+    double *shared = mmap(NULL, bytes, PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
+    if (shared == MAP_FAILED) {
+        perror("mmap");
+        fprintf(stderr, "Failed to allocate verification buffers\n");
+        return -1;
+    }
+    job.R = shared;
+    job.Rabs = job.R + mk;
+    job.BR = job.Rabs + mk;
+    job.BRabs = job.BR + mk;
+    job.CR = job.BRabs + mk;
+    job.partial = job.CR + mk;  // zeroed by mmap
+
+    // Random vectors uniform in [-1, 1) (splitmix64, seeded per run)
+    uint64_t state = (uint64_t)time(NULL) ^ ((uint64_t)getpid() << 32);
+    for (size_t i = 0; i < mk; i++) {
+        uint64_t z = (state += 0x9e3779b97f4a7c15ULL);
+        z = (z ^ (z >> 30)) * 0xbf58476d1ce4e5b9ULL;
+        z = (z ^ (z >> 27)) * 0x94d049bb133111ebULL;
+        z ^= z >> 31;
+        job.R[i] = (double)(z >> 11) / 4503599627370496.0 - 1.0;  // 53 bits / 2^52 - 1
+        job.Rabs[i] = fabs(job.R[i]);
+    }
+
+    int rc = freivalds_run(&job, freivalds_phase1);
+    if (rc == 0) rc = freivalds_run(&job, freivalds_phase2);
+    if (rc == 0) {
+        // Per round: largest difference over the largest row scale, so the
+        // rounding of Strassen's additions (bounded normwise) is not flagged
+        res->rounds = rounds;
+        res->max_residual = 0.0;
+        for (int j = 0; j < rounds; j++) {
+            double diff = 0.0, scale = 0.0;
+            for (int w = 0; w < workers; w++) {
+                double d = job.partial[(size_t)w * 2 * rounds + j];
+                double s = job.partial[(size_t)w * 2 * rounds + rounds + j];
+                if (!(d <= diff)) diff = d;
+                if (s > scale) scale = s;
+            }
+            double r = scale > 0.0 ? diff / scale : diff;
+            if (!(r <= res->max_residual)) res->max_residual = r;
+        }
+        res->tolerance = FREIVALDS_TOL_ULPS * sqrt((double)m) * (f32 ? FLT_EPSILON : DBL_EPSILON);
+        res->passed = res->max_residual <= res->tolerance;
+    }
+    munmap(shared, bytes);
+    gettimeofday(&end, NULL);
+    res->time_us = (end.tv_sec - start.tv_sec) * 1e6 + (end.tv_usec - start.tv_usec);
+    if (rc != 0) return -1;
+    return res->passed ? 0 : 1;
+}
+
+int freivalds_verify(const double *A, const double *B, const double *C, int m, int rounds, int p,
+                     verify_result_t *res) {
+    return freivalds(A, B, C, 0, m, rounds, p, res);
+}
+
+int freivalds_verify_f32(const float *A, const float *B, const float *C, int m, int rounds, int p,
+                         verify_result_t *res) {
+    return freivalds(A, B, C, 1, m, rounds, p, res);
+}
+
+void freivalds_print(FILE *out, const verify_result_t *res) {
+    fprintf(out, "  verify: %d rounds of Freivalds, max residual=%.2e (tolerance %.2e), time=%.0f microseconds, %s\n",
+            res->rounds, res->max_residual, res->tolerance, res->time_us, res->passed ? "PASS" : "FAIL");
 }
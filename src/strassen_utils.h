@@ -5,6 +5,15 @@
 #include <stdlib.h>
 #include <string.h>
 #include <math.h>
+#include "gemm_kernel.h"
+
+// Default size at or below which strassen_multiply hands the product to the
+// blocked kernel; see strassen_set_cutoff / STRASSEN_CUTOFF / the profile file
+#define STRASSEN_CUTOFF 64
+
+// Profile written by calibrateCutoff and read on first use when
+// STRASSEN_PROFILE is not set (relative to $HOME)
+#define STRASSEN_PROFILE_NAME ".strassen_profile"
 
 // Check if n is a power of 2
 static inline int is_power_of_2(int n) {
@@ -18,6 +27,29 @@ static inline int next_power_of_2(int n) {
     return 1 << (int)ceil(log2(n));
 }
 
+// Override the Strassen cutoff (values < 1 are ignored). Without a call the
+// cutoff comes from STRASSEN_CUTOFF=<n>, else from the profile file
+// (STRASSEN_PROFILE or ~/.strassen_profile), else the default above.
+void strassen_set_cutoff(int cutoff);
+
+// Cutoff currently in effect
+int strassen_get_cutoff(void);
+
+// Recursion used by strassen_multiply_mnk and everything built on it
+typedef enum {
+    STRASSEN_CLASSIC,       // 7 products, 18 additions per level
+    STRASSEN_WINOGRAD       // Winograd form: 7 products, 15 additions, no product buffer
+} strassen_variant_t;
+
+void strassen_set_variant(strassen_variant_t variant);
+strassen_variant_t strassen_get_variant(void);
+
+// Path of the profile file (STRASSEN_PROFILE or ~/.strassen_profile), or NULL
+const char *strassen_profile_path(void);
+
+// Write a profile containing `cutoff` to path. Returns 0 on success.
+int strassen_save_profile(const char *path, int cutoff);
+
 // Matrix addition: C = A + B
 void matrix_add(double *A, double *B, double *C, int n);
 
@@ -30,16 +62,115 @@ void get_submatrix(double *parent, double *sub, int parent_size, int sub_size, i
 // Set submatrix to parent matrix
 void set_submatrix(double *parent, double *sub, int parent_size, int sub_size, int start_row, int start_col);
 
-// Strassen matrix multiplication: C = A * B
+// Strassen matrix multiplication: C = A * B (n x n, any n; odd sizes are peeled, not padded)
 void strassen_multiply(double *A, double *B, double *C, int n);
 
+// Rectangular Strassen: C (m x n) = A (m x k) * B (k x n), contiguous row-major
+void strassen_multiply_rect(const double *A, const double *B, double *C, int m, int n, int k);
+
+// Workspace size (in elements) that strassen_multiply_mnk(_f32) needs for an m x n x k product
+size_t strassen_workspace_size_mnk(int m, int n, int k);
+
+// Strassen on strided views (pointer + leading dimension) using a caller-provided
+// workspace of strassen_workspace_size_mnk(m, n, k) doubles: C = A * B with
+// A m x k and B k x n, no per-level allocation. Any sizes: odd dimensions are
+// peeled at each level and fixed up with the blocked kernel.
+void strassen_multiply_mnk(int m, int n, int k, const double *A, int lda, const double *B, int ldb,
+                           double *C, int ldc, double *work);
+
+// Square shorthands: strassen_workspace_size_mnk(n, n, n) / strassen_multiply_mnk(n, n, n, ...)
+size_t strassen_workspace_size(int n);
+void strassen_multiply_ws(const double *A, int lda, const double *B, int ldb,
+                          double *C, int ldc, int n, double *work);
+
+// Complete C = A * B after a Strassen pass over the leading me x ne x ke block:
+// adds A[0:me, ke:k] * B[ke:k, 0:ne] and computes the border rows me..m-1 and
+// columns ne..n-1 of C with the blocked kernel
+void strassen_peel_fixup(int m, int n, int k, int me, int ne, int ke,
+                         const double *A, int lda, const double *B, int ldb, double *C, int ldc);
+
+// Form the operands of Strassen product P<idx+1> (idx = 0..6) from the quadrants
+// of A and B as contiguous h x h matrices Ta and Tb (used to distribute P1..P7)
+void strassen_form_operands(int idx, const double *A, int lda, const double *B, int ldb,
+                            int h, double *Ta, double *Tb);
+
+// Assemble the 2h x 2h view C from the seven contiguous h x h products P[0..6]
+void strassen_combine(double *const P[7], int h, double *C, int ldc);
+
+// A operand prepared once for many products A * B_i with the same shapes (a
+// fixed weight matrix against a stream of B). The tree holds, for every
+// recursion level, the A-side operands of the seven products (A11 + A22,
+// A12 - A22, ... or Winograd's S1..S4) and the packed base-case panels, so
+// each product only forms the B-side sums and packs B. The tree is built for
+// the cutoff and variant in effect at strassen_prepare. Quadrants that are
+// used as is are views, so A must stay valid and unchanged until
+// strassen_prepared_free. Memory grows by about 7/4 per prepared level.
+typedef struct strassen_prep_node strassen_prep_node_t;
+
+typedef struct {
+    int m, n, k;                // A is m x k, every B is k x n
+    int levels;                 // prepared recursion levels
+    strassen_variant_t variant;
+    size_t bytes;               // memory held by the tree (packed panels and sums)
+    strassen_prep_node_t *root;
+} strassen_prepared_t;
+
+// Build the tree for A (m x k, leading dimension lda) and B of width n.
+// max_levels > 0 stops after that many levels; below them plain Strassen runs
+// on the stored operand. Returns 0 on success.
+int strassen_prepare(strassen_prepared_t *pa, int m, int n, int k, const double *A, int lda, int max_levels);
+
+// Workspace (in doubles) strassen_prepared_multiply needs
+size_t strassen_prepared_workspace_size(const strassen_prepared_t *pa);
+
+// C (m x n) = A * B with B k x n
+void strassen_prepared_multiply(const strassen_prepared_t *pa, const double *B, int ldb,
+                                double *C, int ldc, double *work);
+
+void strassen_prepared_free(strassen_prepared_t *pa);
+
+// float32 Strassen (classic schedule) on strided views: prec is PRECISION_FP32
+// or PRECISION_MIXED (float additions, base-case sums in double, see
+// gemm_blocked_f32). work holds strassen_workspace_size_mnk(m, n, k) floats.
+void strassen_multiply_mnk_f32(int m, int n, int k, const float *A, int lda, const float *B, int ldb,
+                               float *C, int ldc, float *work, precision_t prec);
+
+// Contiguous n x n float32 shorthand (allocates the workspace)
+void strassen_multiply_f32(const float *A, const float *B, float *C, int n, precision_t prec);
+
+// Error of a float32 product against float64: `samples` evenly spaced rows of
+// A * B are recomputed in double from the same float operands, and the largest
+// |C - ref| over those rows is returned relative to the largest |ref|
+double strassen_f32_sampled_error(const float *A, const float *B, const float *C, int m, int samples);
+
+// Freivalds' randomized check of a product (--verify[=k]): C = A * B is accepted
+// when A (B r) and C r agree for k random vectors r, in O(k m^2) instead of the
+// O(m^3) of a reference multiply. A wrong C passes a round with probability ~0.
+#define FREIVALDS_MAX_ROUNDS 64
+
+typedef struct {
+    int rounds;
+    double max_residual;    // max over rounds of max_i |A B r - C r|_i / max_i (|A| |B| |r|)_i
+    double tolerance;       // accepted residual: a few sqrt(m) * epsilon of the stored C
+    double time_us;
+    int passed;
+} verify_result_t;
+
+// m x m contiguous operands; the matrix-vector products are split over up to p
+// forked workers (fewer for small m). Returns 0 if C passed, 1 if it failed,
+// -1 on error. The float32 form sums in double and uses the float32 tolerance.
+int freivalds_verify(const double *A, const double *B, const double *C, int m, int rounds, int p,
+                     verify_result_t *res);
+int freivalds_verify_f32(const float *A, const float *B, const float *C, int m, int rounds, int p,
+                         verify_result_t *res);
+
+// "  verify: k rounds of Freivalds, max residual=..., PASS|FAIL"
+void freivalds_print(FILE *out, const verify_result_t *res);
+
 // Naive matrix multiplication for small matrices (fallback)
 void naive_multiply(double *A, double *B, double *C, int n);
 
-// Pad matrix to power of 2 size
-double* pad_matrix(double *matrix, int original_size, int padded_size);
-
-// Unpad matrix from power of 2 size
-void unpad_matrix(double *padded_matrix, double *result, int padded_size, int original_size);
+// Cache-blocked matrix multiplication (Strassen base case)
+void blocked_multiply(double *A, double *B, double *C, int n);
 
 #endif
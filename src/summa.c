@@ -0,0 +1,760 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <stdint.h>
+#include <errno.h>
+#include <fcntl.h>
+#include <netdb.h>
+#include <poll.h>
+#include <pthread.h>
+#include <unistd.h>
+#include <sys/socket.h>
+#include <sys/time.h>
+#include <netinet/in.h>
+#include <netinet/tcp.h>
+#include <arpa/inet.h>
+#include "summa.h"
+#include "strassen_utils.h"
+#include "simd_kernels.h"
+#include "matrix_io.h"
+
+#define SUMMA_MAGIC 0x414d4d53u   // "SMMA"
+
+// Seconds a new connection to the coordinator has to send its HELLO
+#define SUMMA_HELLO_TIMEOUT_S 10
+
+enum { MSG_HELLO = 1, MSG_ASSIGN, MSG_PEER, MSG_READY, MSG_START, MSG_DONE };
+
+typedef struct {
+    uint32_t magic, type;
+    uint32_t data_port;     // worker's peer listener
+} hello_msg_t;
+
+// Followed by grid_rows * grid_cols roster_entry_t
+typedef struct {
+    uint32_t magic, type;
+    int32_t rank, grid_rows, grid_cols, m, panel, cutoff;
+} assign_msg_t;
+
+typedef struct {
+    uint32_t addr;          // IPv4, network byte order
+    uint32_t port;
+} roster_entry_t;
+
+typedef struct {
+    uint32_t magic, type;
+    int32_t rank;           // PEER: rank of the connecting worker
+} short_msg_t;
+
+// Followed by the worker's C block, one row at a time
+typedef struct {
+    uint32_t magic, type;
+    double wait_us, local_us;
+    uint64_t bytes_sent;
+    int32_t panels;
+} done_msg_t;
+
+static double now_us(void) {
+    struct timeval tv;
+    gettimeofday(&tv, NULL);
+    return tv.tv_sec * 1e6 + tv.tv_usec;
+}
+
+// Blocking full-length send / receive on a socket; -1 on error or EOF
+static int send_all(int fd, const void *buf, size_t len) {
+    const char *p = buf;
+    while (len > 0) {
+        ssize_t n = send(fd, p, len, MSG_NOSIGNAL);
+        if (n < 0 && errno == EINTR) continue;
+        if (n <= 0) return -1;
+        p += n;
+        len -= (size_t)n;
+    }
+    return 0;
+}
+
+static int recv_all(int fd, void *buf, size_t len) {
+    char *p = buf;
+    while (len > 0) {
+        ssize_t n = recv(fd, p, len, 0);
+        if (n < 0 && errno == EINTR) continue;
+        if (n <= 0) return -1;
+        p += n;
+        len -= (size_t)n;
+    }
+    return 0;
+}
+
+static int recv_msg(int fd, void *msg, size_t len, uint32_t type) {
+    if (recv_all(fd, msg, len) != 0) return -1;
+    const uint32_t *hdr = msg;
+    if (hdr[0] != SUMMA_MAGIC || hdr[1] != type) {
+        fprintf(stderr, "summa: unexpected message (type %u, expected %u)\n", hdr[1], type);
+        return -1;
+    }
+    return 0;
+}
+
+static void set_nodelay(int fd) {
+    int one = 1;
+    setsockopt(fd, IPPROTO_TCP, TCP_NODELAY, &one, sizeof(one));
+}
+
+// Listening IPv4 socket on port (0 = any free port); the bound port goes to *bound
+static int listen_on(int port, int *bound) {
+    int fd = socket(AF_INET, SOCK_STREAM, 0);
+    if (fd < 0) {
+        perror("socket");
+        return -1;
+    }
+    int one = 1;
+    setsockopt(fd, SOL_SOCKET, SO_REUSEADDR, &one, sizeof(one));
+    struct sockaddr_in addr;
+    memset(&addr, 0, sizeof(addr));
+    addr.sin_family = AF_INET;
+    addr.sin_addr.s_addr = htonl(INADDR_ANY);
+    addr.sin_port = htons((uint16_t)port);
+    socklen_t len = sizeof(addr);
+    if (bind(fd, (struct sockaddr *)&addr, sizeof(addr)) != 0 || listen(fd, SOMAXCONN) != 0 ||
+        getsockname(fd, (struct sockaddr *)&addr, &len) != 0) {
+        perror("bind/listen");
+        close(fd);
+        return -1;
+    }
+    *bound = ntohs(addr.sin_port);
+    return fd;
+}
+
+static int connect_to(const char *host, int port) {
+    char service[16];
+    snprintf(service, sizeof(service), "%d", port);
+    struct addrinfo hints, *res;
+    memset(&hints, 0, sizeof(hints));
+    hints.ai_family = AF_INET;
+    hints.ai_socktype = SOCK_STREAM;
+    int rc = getaddrinfo(host, service, &hints, &res);
+    if (rc != 0) {
+        fprintf(stderr, "summa: cannot resolve %s: %s\n", host, gai_strerror(rc));
+        return -1;
+    }
+    int fd = socket(res->ai_family, res->ai_socktype, res->ai_protocol);
+    if (fd < 0 || connect(fd, res->ai_addr, res->ai_addrlen) != 0) {
+        fprintf(stderr, "summa: cannot connect to %s:%d: %s\n", host, port, strerror(errno));
+        if (fd >= 0) close(fd);
+        freeaddrinfo(res);
+        return -1;
+    }
+    freeaddrinfo(res);
+    set_nodelay(fd);
+    return fd;
+}
+
+// Start of block b when n is split into parts nearly equal blocks
+static int block_start(int n, int parts, int b) {
+    return (int)((long long)n * b / parts);
+}
+
+// Block that contains index x
+static int block_of(int n, int parts, int x) {
+    int b = (int)(((long long)x * parts) / n);
+    while (b + 1 < parts && block_start(n, parts, b + 1) <= x) b++;
+    while (b > 0 && block_start(n, parts, b) > x) b--;
+    return b;
+}
+
+// Panel boundaries of the inner dimension: every row- and column-block start,
+// and every `panel` columns inside those intervals. Returns the panel count;
+// *bounds gets count + 1 ascending offsets (0 .. m).
+static int panel_bounds(int m, int rows, int cols, int panel, int **bounds) {
+    int cap = rows + cols + 2 + (panel > 0 ? m / panel + rows + cols : 0);
+    int *cuts = malloc((size_t)cap * sizeof(int));
+    if (!cuts) return -1;
+    int count = 0;
+    int x = 0;
+    while (x < m) {
+        int next = m;
+        int b = block_of(m, rows, x);
+        if (b + 1 < rows && block_start(m, rows, b + 1) < next) next = block_start(m, rows, b + 1);
+        b = block_of(m, cols, x);
+        if (b + 1 < cols && block_start(m, cols, b + 1) < next) next = block_start(m, cols, b + 1);
+        if (panel > 0 && x + panel < next) next = x + panel;
+        cuts[count++] = x;
+        x = next;
+    }
+    cuts[count] = m;
+    *bounds = cuts;
+    return count;
+}
+
+void summa_grid_for(int p, int *rows, int *cols) {
+    int r = 1;
+    for (int d = 1; d * d <= p; d++) {
+        if (p % d == 0) r = d;
+    }
+    *rows = r;
+    *cols = p / r;
+}
+
+// ---------------------------------------------------------------- worker side
+
+// One pending non-blocking transfer of a panel to / from a peer
+typedef struct {
+    int fd;
+    int sending;
+    char *buf;
+    size_t len, done;
+} transfer_t;
+
+typedef struct {
+    int rank, gi, gj, R, C, m;
+    int r0, r1, c0, c1;         // my block: rows [r0, r1), cols [c0, c1)
+    int *row_fd;                // peers in my grid row, by grid column (-1 for me)
+    int *col_fd;                // peers in my grid column, by grid row
+    double *A, *B, *Cblk;       // my blocks, rows x cols, row-major
+    int npanels;
+    int *bounds;
+
+    // Double-buffered panels: slot s holds an A panel (mr x w) and a B panel (w x nc)
+    double *pa[2], *pb[2];
+    int filled[2];
+    int error, quit;
+    pthread_mutex_t lock;
+    pthread_cond_t cond;
+    uint64_t bytes_sent;
+} summa_worker_t;
+
+// Move every transfer to completion with poll(); each peer socket carries at
+// most one transfer per panel, so the set can never deadlock
+static int run_transfers(transfer_t *t, int count) {
+    struct pollfd *pfd = malloc((size_t)(count > 0 ? count : 1) * sizeof(struct pollfd));
+    int *which = malloc((size_t)(count > 0 ? count : 1) * sizeof(int));
+    if (!pfd || !which) {
+        free(pfd);
+        free(which);
+        return -1;
+    }
+    int rc = 0;
+    while (rc == 0) {
+        int active = 0;
+        for (int i = 0; i < count; i++) {
+            if (t[i].done == t[i].len) continue;
+            pfd[active].fd = t[i].fd;
+            pfd[active].events = t[i].sending ? POLLOUT : POLLIN;
+            which[active++] = i;
+        }
+        if (active == 0) break;
+        if (poll(pfd, (nfds_t)active, -1) < 0) {
+            if (errno == EINTR) continue;
+            rc = -1;
+            break;
+        }
+        for (int a = 0; a < active; a++) {
+            if (!pfd[a].revents) continue;
+            transfer_t *x = &t[which[a]];
+            ssize_t n = x->sending ? send(x->fd, x->buf + x->done, x->len - x->done, MSG_NOSIGNAL)
+                                   : recv(x->fd, x->buf + x->done, x->len - x->done, 0);
+            if (n > 0) {
+                x->done += (size_t)n;
+            } else if (n == 0 || (errno != EAGAIN && errno != EWOULDBLOCK && errno != EINTR)) {
+                rc = -1;
+            }
+        }
+    }
+    free(pfd);
+    free(which);
+    return rc;
+}
+
+// Fill slot s with panel t: pack and send what this worker owns, receive the rest
+static int exchange_panel(summa_worker_t *w, int t, int s) {
+    int k0 = w->bounds[t], k1 = w->bounds[t + 1], width = k1 - k0;
+    int mr = w->r1 - w->r0, nc = w->c1 - w->c0;
+    int owner_col = block_of(w->m, w->C, k0);   // grid column holding A[:, k0:k1]
+    int owner_row = block_of(w->m, w->R, k0);   // grid row holding B[k0:k1, :]
+    size_t a_bytes = (size_t)mr * width * sizeof(double);
+    size_t b_bytes = (size_t)width * nc * sizeof(double);
+
+    transfer_t *xfer = malloc((size_t)(w->R + w->C) * sizeof(transfer_t));
+    if (!xfer) return -1;
+    int count = 0;
+
+    if (owner_col == w->gj) {
+        int kc = w->c1 - w->c0;
+        for (int i = 0; i < mr; i++) {
+            memcpy(w->pa[s] + (size_t)i * width, w->A + (size_t)i * kc + (k0 - w->c0),
+                   (size_t)width * sizeof(double));
+        }
+        for (int j = 0; j < w->C; j++) {
+            if (j == w->gj) continue;
+            xfer[count++] = (transfer_t){ w->row_fd[j], 1, (char *)w->pa[s], a_bytes, 0 };
+            w->bytes_sent += a_bytes;
+        }
+    } else {
+        xfer[count++] = (transfer_t){ w->row_fd[owner_col], 0, (char *)w->pa[s], a_bytes, 0 };
+    }
+
+    if (owner_row == w->gi) {
+        memcpy(w->pb[s], w->B + (size_t)(k0 - w->r0) * nc, b_bytes);
+        for (int i = 0; i < w->R; i++) {
+            if (i == w->gi) continue;
+            xfer[count++] = (transfer_t){ w->col_fd[i], 1, (char *)w->pb[s], b_bytes, 0 };
+            w->bytes_sent += b_bytes;
+        }
+    } else {
+        xfer[count++] = (transfer_t){ w->col_fd[owner_row], 0, (char *)w->pb[s], b_bytes, 0 };
+    }
+
+    int rc = run_transfers(xfer, count);
+    free(xfer);
+    return rc;
+}
+
+// I/O thread: fills panel t into slot t % 2 as soon as compute has released it
+static void *panel_io_main(void *arg) {
+    summa_worker_t *w = arg;
+    for (int t = 0; t < w->npanels; t++) {
+        int s = t % 2;
+        pthread_mutex_lock(&w->lock);
+        while (w->filled[s] && !w->quit) pthread_cond_wait(&w->cond, &w->lock);
+        int quit = w->quit;
+        pthread_mutex_unlock(&w->lock);
+        if (quit) break;
+
+        int rc = exchange_panel(w, t, s);
+
+        pthread_mutex_lock(&w->lock);
+        if (rc != 0) w->error = 1;
+        else w->filled[s] = 1;
+        pthread_cond_broadcast(&w->cond);
+        pthread_mutex_unlock(&w->lock);
+        if (rc != 0) {
+            fprintf(stderr, "summa worker %d: panel exchange failed\n", w->rank);
+            break;
+        }
+    }
+    return NULL;
+}
+
+// SUMMA loop: C += A_panel(t) * B_panel(t) for every panel, overlapping the
+// exchange of panel t + 1 with the multiplication of panel t
+static int summa_compute(summa_worker_t *w, double *wait_us, double *local_us) {
+    int mr = w->r1 - w->r0, nc = w->c1 - w->c0;
+    int wmax = 0;
+    for (int t = 0; t < w->npanels; t++) {
+        if (w->bounds[t + 1] - w->bounds[t] > wmax) wmax = w->bounds[t + 1] - w->bounds[t];
+    }
+    size_t ws = strassen_workspace_size_mnk(mr, nc, wmax);
+    double *work = malloc((ws + 1) * sizeof(double));
+    double *T = malloc(((size_t)mr * nc + 1) * sizeof(double));
+    if (!work || !T) {
+        perror("malloc");
+        free(work);
+        free(T);
+        return -1;
+    }
+
+    pthread_t io;
+    if (pthread_create(&io, NULL, panel_io_main, w) != 0) {
+        perror("pthread_create");
+        free(work);
+        free(T);
+        return -1;
+    }
+
+    int rc = 0;
+    *wait_us = *local_us = 0.0;
+    for (int t = 0; t < w->npanels && rc == 0; t++) {
+        int s = t % 2, width = w->bounds[t + 1] - w->bounds[t];
+        double t0 = now_us();
+        pthread_mutex_lock(&w->lock);
+        while (!w->filled[s] && !w->error) pthread_cond_wait(&w->cond, &w->lock);
+        rc = w->error ? -1 : 0;
+        pthread_mutex_unlock(&w->lock);
+        double t1 = now_us();
+        *wait_us += t1 - t0;
+        if (rc != 0) break;
+
+        if (mr > 0 && nc > 0) {
+            // the first panel initialises C, later ones are accumulated
+            double *dst = t == 0 ? w->Cblk : T;
+            strassen_multiply_mnk(mr, nc, width, w->pa[s], width, w->pb[s], nc, dst, nc, work);
+            if (t > 0) simd_kernels()->acc((size_t)mr * nc, T, w->Cblk);
+        }
+        *local_us += now_us() - t1;
+
+        pthread_mutex_lock(&w->lock);
+        w->filled[s] = 0;
+        pthread_cond_broadcast(&w->cond);
+        pthread_mutex_unlock(&w->lock);
+    }
+
+    pthread_mutex_lock(&w->lock);
+    w->quit = 1;
+    pthread_cond_broadcast(&w->cond);
+    pthread_mutex_unlock(&w->lock);
+    pthread_join(io, NULL);
+    free(work);
+    free(T);
+    return rc;
+}
+
+// Connect to every lower-ranked peer sharing my grid row or column and accept
+// the higher-ranked ones; each connection starts with a PEER message
+static int build_mesh(summa_worker_t *w, int listen_fd, const roster_entry_t *roster) {
+    int expected = 0;
+    for (int r = 0; r < w->R * w->C; r++) {
+        int gi = r / w->C, gj = r % w->C;
+        if (r == w->rank || (gi != w->gi && gj != w->gj)) continue;
+        if (r > w->rank) {
+            expected++;
+            continue;
+        }
+        char host[INET_ADDRSTRLEN];
+        struct in_addr addr = { roster[r].addr };
+        inet_ntop(AF_INET, &addr, host, sizeof(host));
+        int fd = connect_to(host, (int)roster[r].port);
+        short_msg_t hello = { SUMMA_MAGIC, MSG_PEER, w->rank };
+        if (fd < 0 || send_all(fd, &hello, sizeof(hello)) != 0) return -1;
+        if (gi == w->gi) w->row_fd[gj] = fd;
+        else w->col_fd[gi] = fd;
+    }
+    for (int n = 0; n < expected; n++) {
+        int fd = accept(listen_fd, NULL, NULL);
+        short_msg_t hello;
+        if (fd < 0 || recv_msg(fd, &hello, sizeof(hello), MSG_PEER) != 0) return -1;
+        set_nodelay(fd);
+        int gi = hello.rank / w->C, gj = hello.rank % w->C;
+        if (gi == w->gi) w->row_fd[gj] = fd;
+        else w->col_fd[gi] = fd;
+    }
+    // Panels move through poll(), so the peer sockets become non-blocking
+    for (int j = 0; j < w->C; j++) {
+        if (w->row_fd[j] >= 0) fcntl(w->row_fd[j], F_SETFL, fcntl(w->row_fd[j], F_GETFL) | O_NONBLOCK);
+    }
+    for (int i = 0; i < w->R; i++) {
+        if (w->col_fd[i] >= 0) fcntl(w->col_fd[i], F_SETFL, fcntl(w->col_fd[i], F_GETFL) | O_NONBLOCK);
+    }
+    return 0;
+}
+
+static void worker_free(summa_worker_t *w) {
+    for (int j = 0; w->row_fd && j < w->C; j++) {
+        if (w->row_fd[j] >= 0) close(w->row_fd[j]);
+    }
+    for (int i = 0; w->col_fd && i < w->R; i++) {
+        if (w->col_fd[i] >= 0) close(w->col_fd[i]);
+    }
+    free(w->row_fd);
+    free(w->col_fd);
+    free(w->A);
+    free(w->B);
+    free(w->Cblk);
+    free(w->bounds);
+    for (int s = 0; s < 2; s++) {
+        free(w->pa[s]);
+        free(w->pb[s]);
+    }
+}
+
+int summa_work(const char *host, int port) {
+    int data_port;
+    int listen_fd = listen_on(0, &data_port);
+    if (listen_fd < 0) return -1;
+    int ctl = connect_to(host, port);
+    if (ctl < 0) {
+        close(listen_fd);
+        return -1;
+    }
+
+    summa_worker_t w;
+    memset(&w, 0, sizeof(w));
+    roster_entry_t *roster = NULL;
+    int rc = -1;
+
+    hello_msg_t hello = { SUMMA_MAGIC, MSG_HELLO, (uint32_t)data_port };
+    assign_msg_t as;
+    if (send_all(ctl, &hello, sizeof(hello)) != 0 || recv_msg(ctl, &as, sizeof(as), MSG_ASSIGN) != 0) {
+        fprintf(stderr, "summa worker: lost the coordinator during setup\n");
+        goto out;
+    }
+    int nworkers = as.grid_rows * as.grid_cols;
+    roster = malloc((size_t)nworkers * sizeof(roster_entry_t));
+    if (!roster || recv_all(ctl, roster, (size_t)nworkers * sizeof(roster_entry_t)) != 0) goto out;
+    if (as.cutoff > 0) strassen_set_cutoff(as.cutoff);
+
+    w.rank = as.rank;
+    w.R = as.grid_rows;
+    w.C = as.grid_cols;
+    w.m = as.m;
+    w.gi = w.rank / w.C;
+    w.gj = w.rank % w.C;
+    w.r0 = block_start(w.m, w.R, w.gi);
+    w.r1 = block_start(w.m, w.R, w.gi + 1);
+    w.c0 = block_start(w.m, w.C, w.gj);
+    w.c1 = block_start(w.m, w.C, w.gj + 1);
+    pthread_mutex_init(&w.lock, NULL);
+    pthread_cond_init(&w.cond, NULL);
+    w.row_fd = malloc((size_t)w.C * sizeof(int));
+    w.col_fd = malloc((size_t)w.R * sizeof(int));
+    w.npanels = panel_bounds(w.m, w.R, w.C, as.panel, &w.bounds);
+    if (!w.row_fd || !w.col_fd || w.npanels < 0) goto out;
+    for (int j = 0; j < w.C; j++) w.row_fd[j] = -1;
+    for (int i = 0; i < w.R; i++) w.col_fd[i] = -1;
+
+    int mr = w.r1 - w.r0, nc = w.c1 - w.c0, wmax = 0;
+    for (int t = 0; t < w.npanels; t++) {
+        if (w.bounds[t + 1] - w.bounds[t] > wmax) wmax = w.bounds[t + 1] - w.bounds[t];
+    }
+    w.A = malloc(((size_t)mr * nc + 1) * sizeof(double));
+    w.B = malloc(((size_t)mr * nc + 1) * sizeof(double));
+    w.Cblk = calloc((size_t)mr * nc + 1, sizeof(double));
+    for (int s = 0; s < 2; s++) {
+        w.pa[s] = malloc(((size_t)mr * wmax + 1) * sizeof(double));
+        w.pb[s] = malloc(((size_t)wmax * nc + 1) * sizeof(double));
+    }
+    if (!w.A || !w.B || !w.Cblk || !w.pa[0] || !w.pa[1] || !w.pb[0] || !w.pb[1]) {
+        perror("malloc");
+        goto out;
+    }
+
+    if (build_mesh(&w, listen_fd, roster) != 0) {
+        fprintf(stderr, "summa worker %d: could not connect to its grid peers\n", w.rank);
+        goto out;
+    }
+    short_msg_t ready = { SUMMA_MAGIC, MSG_READY, w.rank };
+    if (send_all(ctl, &ready, sizeof(ready)) != 0) goto out;
+
+    // My rows of A and B arrive interleaved, one row segment at a time
+    for (int i = 0; i < mr; i++) {
+        if (recv_all(ctl, w.A + (size_t)i * nc, (size_t)nc * sizeof(double)) != 0 ||
+            recv_all(ctl, w.B + (size_t)i * nc, (size_t)nc * sizeof(double)) != 0) {
+            fprintf(stderr, "summa worker %d: lost the coordinator during scatter\n", w.rank);
+            goto out;
+        }
+    }
+
+    short_msg_t start;
+    if (recv_msg(ctl, &start, sizeof(start), MSG_START) != 0) goto out;
+
+    done_msg_t done = { SUMMA_MAGIC, MSG_DONE, 0.0, 0.0, 0, w.npanels };
+    if (summa_compute(&w, &done.wait_us, &done.local_us) != 0) goto out;
+    done.bytes_sent = w.bytes_sent;
+    if (send_all(ctl, &done, sizeof(done)) != 0 ||
+        send_all(ctl, w.Cblk, (size_t)mr * nc * sizeof(double)) != 0) {
+        goto out;
+    }
+    rc = 0;
+
+out:
+    worker_free(&w);
+    free(roster);
+    close(ctl);
+    close(listen_fd);
+    return rc;
+}
+
+// ----------------------------------------------------------- coordinator side
+
+typedef struct {
+    int fd;
+    uint32_t addr;
+    uint32_t port;
+} member_t;
+
+// Stream A and B to the workers row by row; A row i, columns of block j, goes
+// to the worker at (block of i, j), followed by the same part of B row i
+static int scatter_operands(const summa_job_t *job, const member_t *members) {
+    int m = job->m;
+    double *row_a = malloc((size_t)m * sizeof(double));
+    double *row_b = malloc((size_t)m * sizeof(double));
+    matrix_stream_t sa, sb;
+    int from_files = job->a_path != NULL;
+    int opened = 0;
+    int rc = 0;
+    if (!row_a || !row_b) {
+        perror("malloc");
+        rc = -1;
+    } else if (from_files) {
+        if (matrix_stream_open(job->a_path, &sa) != 0) {
+            rc = -1;
+        } else if (matrix_stream_open(job->b_path, &sb) != 0) {
+            matrix_stream_close(&sa);
+            rc = -1;
+        } else if (sa.rows != (uint64_t)m || sa.cols != (uint64_t)m || sb.rows != (uint64_t)m ||
+                   sb.cols != (uint64_t)m) {
+            fprintf(stderr, "summa: operand files must both be %dx%d\n", m, m);
+            matrix_stream_close(&sa);
+            matrix_stream_close(&sb);
+            rc = -1;
+        } else {
+            opened = 1;
+        }
+    } else {
+        // Same fixed-seed sequence as matrix_operands_open
+        srand(12345);
+    }
+
+    for (int i = 0; i < m && rc == 0; i++) {
+        if (from_files) {
+            rc = matrix_stream_read_tile(&sa, (uint64_t)i, 0, 1, m, row_a, m) |
+                 matrix_stream_read_tile(&sb, (uint64_t)i, 0, 1, m, row_b, m);
+            if (rc != 0) break;
+        } else {
+            for (int j = 0; j < m; j++) {
+                row_a[j] = (double)(rand() % 100);
+                row_b[j] = (double)(rand() % 100);
+            }
+        }
+        int gi = block_of(m, job->grid_rows, i);
+        for (int gj = 0; gj < job->grid_cols; gj++) {
+            int c0 = block_start(m, job->grid_cols, gj), c1 = block_start(m, job->grid_cols, gj + 1);
+            int fd = members[gi * job->grid_cols + gj].fd;
+            if (send_all(fd, row_a + c0, (size_t)(c1 - c0) * sizeof(double)) != 0 ||
+                send_all(fd, row_b + c0, (size_t)(c1 - c0) * sizeof(double)) != 0) {
+                fprintf(stderr, "summa: lost worker %d during scatter\n", gi * job->grid_cols + gj);
+                rc = -1;
+                break;
+            }
+        }
+    }
+    if (opened) {
+        matrix_stream_close(&sa);
+        matrix_stream_close(&sb);
+    }
+    free(row_a);
+    free(row_b);
+    return rc;
+}
+
+// Receive every worker's C block row by row into the output file / buffer
+static int gather_result(const summa_job_t *job, const member_t *members) {
+    int m = job->m;
+    matrix_stream_t sc;
+    int to_file = job->out_path != NULL;
+    if (to_file && matrix_stream_create(job->out_path, (uint64_t)m, (uint64_t)m, &sc) != 0) return -1;
+    double *row = malloc((size_t)m * sizeof(double) + 1);
+    int rc = row ? 0 : -1;
+    for (int r = 0; r < job->grid_rows * job->grid_cols && rc == 0; r++) {
+        int gi = r / job->grid_cols, gj = r % job->grid_cols;
+        int r0 = block_start(m, job->grid_rows, gi), r1 = block_start(m, job->grid_rows, gi + 1);
+        int c0 = block_start(m, job->grid_cols, gj), c1 = block_start(m, job->grid_cols, gj + 1);
+        for (int i = r0; i < r1 && rc == 0; i++) {
+            if (recv_all(members[r].fd, row, (size_t)(c1 - c0) * sizeof(double)) != 0) {
+                fprintf(stderr, "summa: lost worker %d during gather\n", r);
+                rc = -1;
+                break;
+            }
+            if (to_file) rc = matrix_stream_write_tile(&sc, (uint64_t)i, (uint64_t)c0, 1, c1 - c0, row, c1 - c0);
+            if (job->c_small) memcpy(job->c_small + (size_t)i * m + c0, row, (size_t)(c1 - c0) * sizeof(double));
+        }
+    }
+    free(row);
+    if (to_file) matrix_stream_close(&sc);
+    return rc;
+}
+
+int summa_coordinate(const summa_job_t *job, int port, int (*ready)(void *arg, int port), void *arg,
+                     summa_stats_t *stats) {
+    int nworkers = job->grid_rows * job->grid_cols;
+    memset(stats, 0, sizeof(*stats));
+    if (job->m <= 0 || job->grid_rows <= 0 || job->grid_cols <= 0 ||
+        job->grid_rows > job->m || job->grid_cols > job->m) {
+        fprintf(stderr, "summa: need 1 <= grid rows, cols <= m\n");
+        return -1;
+    }
+
+    int bound;
+    int listen_fd = listen_on(port, &bound);
+    if (listen_fd < 0) return -1;
+    if (ready && ready(arg, bound) != 0) {
+        close(listen_fd);
+        return -1;
+    }
+
+    member_t *members = calloc((size_t)nworkers, sizeof(member_t));
+    roster_entry_t *roster = calloc((size_t)nworkers, sizeof(roster_entry_t));
+    int rc = members && roster ? 0 : -1;
+    int joined = 0;
+
+    // Ranks are given in the order the workers join. A connection that is not a
+    // worker (no valid HELLO in time) is dropped and the coordinator keeps waiting
+    while (joined < nworkers && rc == 0) {
+        struct sockaddr_in peer;
+        socklen_t len = sizeof(peer);
+        hello_msg_t hello;
+        int fd = accept(listen_fd, (struct sockaddr *)&peer, &len);
+        if (fd < 0) {
+            if (errno == EINTR || errno == ECONNABORTED) continue;
+            perror("accept");
+            rc = -1;
+            break;
+        }
+        struct timeval timeout = { SUMMA_HELLO_TIMEOUT_S, 0 };
+        setsockopt(fd, SOL_SOCKET, SO_RCVTIMEO, &timeout, sizeof(timeout));
+        if (recv_msg(fd, &hello, sizeof(hello), MSG_HELLO) != 0) {
+            char host[INET_ADDRSTRLEN];
+            inet_ntop(AF_INET, &peer.sin_addr, host, sizeof(host));
+            fprintf(stderr, "summa: ignoring connection from %s:%d without a worker HELLO\n", host,
+                    ntohs(peer.sin_port));
+            close(fd);
+            continue;
+        }
+        timeout.tv_sec = 0;
+        setsockopt(fd, SOL_SOCKET, SO_RCVTIMEO, &timeout, sizeof(timeout));
+        set_nodelay(fd);
+        members[joined] = (member_t){ fd, peer.sin_addr.s_addr, hello.data_port };
+        roster[joined] = (roster_entry_t){ peer.sin_addr.s_addr, hello.data_port };
+        joined++;
+    }
+    close(listen_fd);
+
+    for (int r = 0; r < nworkers && rc == 0; r++) {
+        assign_msg_t as = { SUMMA_MAGIC, MSG_ASSIGN, r, job->grid_rows, job->grid_cols, job->m,
+                            job->panel, job->cutoff };
+        if (send_all(members[r].fd, &as, sizeof(as)) != 0 ||
+            send_all(members[r].fd, roster, (size_t)nworkers * sizeof(roster_entry_t)) != 0) {
+            rc = -1;
+        }
+    }
+    for (int r = 0; r < nworkers && rc == 0; r++) {
+        short_msg_t ready_msg;
+        if (recv_msg(members[r].fd, &ready_msg, sizeof(ready_msg), MSG_READY) != 0) {
+            fprintf(stderr, "summa: worker %d failed to join the grid\n", r);
+            rc = -1;
+        }
+    }
+
+    double t0 = now_us();
+    if (rc == 0) rc = scatter_operands(job, members);
+    double t1 = now_us();
+
+    for (int r = 0; r < nworkers && rc == 0; r++) {
+        short_msg_t start = { SUMMA_MAGIC, MSG_START, r };
+        if (send_all(members[r].fd, &start, sizeof(start)) != 0) rc = -1;
+    }
+    for (int r = 0; r < nworkers && rc == 0; r++) {
+        done_msg_t done;
+        if (recv_msg(members[r].fd, &done, sizeof(done), MSG_DONE) != 0) {
+            fprintf(stderr, "summa: worker %d failed during the multiplication\n", r);
+            rc = -1;
+            break;
+        }
+        if (done.wait_us > stats->max_wait_us) stats->max_wait_us = done.wait_us;
+        if (done.local_us > stats->max_local_us) stats->max_local_us = done.local_us;
+        stats->bytes_exchanged += done.bytes_sent;
+        stats->panels = done.panels;
+    }
+    double t2 = now_us();
+    if (rc == 0) rc = gather_result(job, members);
+    double t3 = now_us();
+
+    stats->scatter_us = t1 - t0;
+    stats->compute_us = t2 - t1;
+    stats->gather_us = t3 - t2;
+
+    for (int r = 0; members && r < joined; r++) close(members[r].fd);
+    free(members);
+    free(roster);
+    return rc;
+}
@@ -0,0 +1,60 @@
+#ifndef SUMMA_H
+#define SUMMA_H
+
+#include <stddef.h>
+
+// Distributed C = A * B over TCP with SUMMA on an R x C process grid.
+//
+// One coordinator and R*C workers. Worker (i, j) owns block (i, j) of A, B and
+// C under the same row partition (R parts) and column partition (C parts) of
+// m. The inner dimension is cut into panels at every row- and column-block
+// boundary (and every --panel columns); for each panel the owning grid column
+// sends its A panel along the grid rows and the owning grid row sends its B
+// panel down the grid columns. Each worker then adds the panel product to its
+// C block with strassen_multiply_mnk. A per-worker I/O thread moves panel t+1
+// over non-blocking sockets while panel t is being multiplied.
+//
+// The coordinator streams A and B to the workers one row at a time (from
+// matrix files or the fixed-seed generator) and gathers C the same way, so it
+// never holds a whole matrix. Messages use the host byte order: every node
+// must share the same endianness.
+
+#define SUMMA_DEFAULT_PORT 5401
+
+typedef struct {
+    int m;                  // matrix size
+    int grid_rows, grid_cols;
+    int panel;              // max panel width; 0 = whole block boundaries only
+    int cutoff;             // Strassen cutoff for the workers; 0 = their default
+    const char *a_path;     // operand files, or NULL for the fixed-seed data
+    const char *b_path;
+    const char *out_path;   // C file, or NULL to discard C
+    double *c_small;        // if not NULL, m x m buffer that receives C (small m)
+} summa_job_t;
+
+typedef struct {
+    double scatter_us;      // streaming A and B to the workers
+    double compute_us;      // START -> last worker DONE
+    double gather_us;       // collecting C
+    double max_wait_us;     // longest time a worker's compute waited for a panel
+    double max_local_us;    // longest local panel-multiply time of any worker
+    size_t bytes_exchanged; // panel bytes sent between workers
+    int panels;
+} summa_stats_t;
+
+// Near-square factorisation of p into rows x cols (rows <= cols)
+void summa_grid_for(int p, int *rows, int *cols);
+
+// Coordinator: listen on port (0 picks a free one), wait for
+// grid_rows * grid_cols workers to join, then run the job. If ready is not
+// NULL it is called with the bound port once the socket is listening, before
+// the first accept (local mode forks its workers there); a nonzero return
+// aborts. Returns 0 on success.
+int summa_coordinate(const summa_job_t *job, int port, int (*ready)(void *arg, int port), void *arg,
+                     summa_stats_t *stats);
+
+// Worker: connect to the coordinator at host:port, take part in one job and
+// return. Returns 0 on success.
+int summa_work(const char *host, int port);
+
+#endif // SUMMA_H
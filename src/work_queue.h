@@ -0,0 +1,27 @@
+#ifndef WORK_QUEUE_H
+#define WORK_QUEUE_H
+
+#include <stddef.h>
+
+// Lock-free work counter shared between forked workers (place it in MAP_SHARED
+// memory). Items 0 .. total-1 are handed out in chunks with an atomic fetch-add,
+// so claiming work never blocks and costs one cache-line round-trip per chunk.
+typedef struct {
+    size_t next;  // next unclaimed item
+    char pad[64 - sizeof(size_t)];  // keep the counter on its own cache line
+} work_queue_t;
+
+static inline void work_queue_init(work_queue_t *q) {
+    __atomic_store_n(&q->next, 0, __ATOMIC_RELEASE);
+}
+
+// Claim up to `chunk` items out of `total`. Returns the number of items claimed
+// (0 when the queue is exhausted) and stores the first claimed index in *first.
+static inline size_t work_queue_claim(work_queue_t *q, size_t chunk, size_t total, size_t *first) {
+    size_t start = __atomic_fetch_add(&q->next, chunk, __ATOMIC_RELAXED);
+    if (start >= total) return 0;
+    *first = start;
+    return total - start < chunk ? total - start : chunk;
+}
+
+#endif // WORK_QUEUE_H
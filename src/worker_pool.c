@@ -0,0 +1,235 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include <time.h>
+#include <sys/mman.h>
+#include <sys/wait.h>
+#include <semaphore.h>
+#include <errno.h>
+#include "work_queue.h"
+#include "parallel_engines.h"
+#include "worker_pool.h"
+
+typedef struct {
+    const double *A;    // operands live in the arena, which every worker
+    const double *B;    // maps at the same address, so raw pointers are valid
+    double *C;
+    int m;
+    size_t chunk;       // rows per claim
+    work_queue_t queue; // row blocks of this job
+    int remaining;      // workers that have not finished with this job yet
+    sem_t done;         // posted by the last worker to finish
+    int waited;         // worker_pool_wait returned for this ticket (parent only)
+} pool_job_t;
+
+struct pool_shared {
+    pool_job_t jobs[POOL_RING_SLOTS];
+    size_t published;   // number of jobs made visible to workers
+    size_t retired;     // oldest ticket not yet waited; its slot and later ones are in use
+    int shutdown;       // set once by worker_pool_destroy
+    sem_t slots;        // free ring slots
+    sem_t wake[];       // one per worker: posted once per job and at shutdown
+};
+
+static void *shared_alloc(size_t bytes) {
+    void *ptr = mmap(NULL, bytes, PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
+    return ptr == MAP_FAILED ? NULL : ptr;
+}
+
+static void sem_wait_retry(sem_t *sem) {
+    while (sem_wait(sem) == -1 && errno == EINTR) {}
+}
+
+// Worker: sleep on its own wake semaphore, then join the next job in ring order
+static void worker_main(pool_shared_t *ctl, int worker) {
+    size_t seq = 0;
+    while (1) {
+        sem_wait_retry(&ctl->wake[worker]);
+        if (__atomic_load_n(&ctl->published, __ATOMIC_ACQUIRE) <= seq) {
+            // woken without a new job: only happens at shutdown
+            if (__atomic_load_n(&ctl->shutdown, __ATOMIC_ACQUIRE)) break;
+            continue;
+        }
+
+        pool_job_t *job = &ctl->jobs[seq % POOL_RING_SLOTS];
+        size_t first, count;
+        while ((count = work_queue_claim(&job->queue, job->chunk, (size_t)job->m, &first)) > 0) {
+            parallel_compute_block(job->A, job->B, job->C, job->m, (int)first, (int)count, 0, job->m);
+        }
+        if (__atomic_sub_fetch(&job->remaining, 1, __ATOMIC_ACQ_REL) == 0) {
+            sem_post(&job->done);
+        }
+        seq++;
+    }
+}
+
+worker_pool_t *worker_pool_create(int p, size_t arena_bytes, const placement_t *pin) {
+    if (p <= 0) return NULL;
+
+    worker_pool_t *pool = calloc(1, sizeof(worker_pool_t));
+    if (!pool) {
+        perror("calloc");
+        return NULL;
+    }
+    pool->p = p;
+    pool->ctl_bytes = sizeof(pool_shared_t) + (size_t)p * sizeof(sem_t);
+    pool->arena_count = arena_bytes / sizeof(double);
+    pool->pids = calloc((size_t)p, sizeof(pid_t));
+    pool->ctl = shared_alloc(pool->ctl_bytes);
+    pool->arena = pool->arena_count > 0 ? shared_alloc(pool->arena_count * sizeof(double)) : NULL;
+    if (!pool->pids || !pool->ctl || (pool->arena_count > 0 && !pool->arena)) {
+        perror("mmap");
+        fprintf(stderr, "Failed to allocate shared memory for worker pool\n");
+        worker_pool_destroy(pool);
+        return NULL;
+    }
+
+    pool_shared_t *ctl = pool->ctl;
+    if (sem_init(&ctl->slots, 1, POOL_RING_SLOTS) == -1) {
+        perror("sem_init");
+        worker_pool_destroy(pool);
+        return NULL;
+    }
+    for (int w = 0; w < p; w++) {
+        if (sem_init(&ctl->wake[w], 1, 0) == -1) {
+            perror("sem_init");
+            worker_pool_destroy(pool);
+            return NULL;
+        }
+    }
+
+    for (int w = 0; w < p; w++) {
+        pid_t pid = fork();
+        if (pid < 0) {
+            perror("fork");
+            fprintf(stderr, "Failed to create pool worker %d\n", w);
+            worker_pool_destroy(pool);
+            return NULL;
+        }
+        if (pid == 0) {
+            placement_pin_worker(pin, w);
+            worker_main(ctl, w);
+            _exit(0);
+        }
+        pool->pids[w] = pid;
+    }
+    return pool;
+}
+
+double *worker_pool_alloc(worker_pool_t *pool, size_t count) {
+    // keep every allocation on its own 64-byte boundary
+    size_t start = (pool->arena_used + 7) & ~(size_t)7;
+    if (start + count > pool->arena_count) return NULL;
+    pool->arena_used = start + count;
+    return pool->arena + start;
+}
+
+void worker_pool_reset(worker_pool_t *pool) {
+    pool->arena_used = 0;
+}
+
+static int in_arena(const worker_pool_t *pool, const double *ptr, size_t count) {
+    return ptr >= pool->arena && ptr + count <= pool->arena + pool->arena_count;
+}
+
+long worker_pool_submit(worker_pool_t *pool, const double *A, const double *B, double *C, int m, int chunk) {
+    size_t n = (size_t)m * m;
+    if (m <= 0 || !in_arena(pool, A, n) || !in_arena(pool, B, n) || !in_arena(pool, C, n)) {
+        fprintf(stderr, "worker_pool_submit: operands must be allocated with worker_pool_alloc\n");
+        return -1;
+    }
+    if (pool->broken) {
+        fprintf(stderr, "worker_pool_submit: pool lost a worker, recreate it\n");
+        return -1;
+    }
+    if (sem_trywait(&pool->ctl->slots) == -1) {
+        fprintf(stderr, "worker_pool_submit: %d jobs already in flight\n", POOL_RING_SLOTS);
+        return -1;
+    }
+
+    pool_shared_t *ctl = pool->ctl;
+    size_t ticket = ctl->published;
+    pool_job_t *job = &ctl->jobs[ticket % POOL_RING_SLOTS];
+    job->A = A;
+    job->B = B;
+    job->C = C;
+    job->m = m;
+    job->chunk = (size_t)(chunk > 0 ? chunk : parallel_row_default_chunk(m, pool->p));
+    work_queue_init(&job->queue);
+    job->remaining = pool->p;
+    job->waited = 0;
+    sem_init(&job->done, 1, 0);
+
+    __atomic_store_n(&ctl->published, ticket + 1, __ATOMIC_RELEASE);
+    for (int w = 0; w < pool->p; w++) sem_post(&ctl->wake[w]);
+    return (long)ticket;
+}
+
+// A dead worker would leave its jobs unfinished forever; report it instead
+static int workers_alive(worker_pool_t *pool) {
+    for (int w = 0; w < pool->p; w++) {
+        int status;
+        if (pool->pids[w] > 0 && waitpid(pool->pids[w], &status, WNOHANG) == pool->pids[w]) {
+            fprintf(stderr, "Pool worker %d (pid %d) exited unexpectedly\n", w, (int)pool->pids[w]);
+            pool->pids[w] = 0;
+            pool->broken = 1;
+            return 0;
+        }
+    }
+    return 1;
+}
+
+int worker_pool_wait(worker_pool_t *pool, long ticket) {
+    pool_shared_t *ctl = pool->ctl;
+    if (ticket < 0 || (size_t)ticket >= ctl->published || (size_t)ticket < ctl->retired) return -1;
+    pool_job_t *job = &ctl->jobs[(size_t)ticket % POOL_RING_SLOTS];
+    if (job->waited) return -1;
+
+    while (1) {
+        struct timespec deadline;
+        clock_gettime(CLOCK_REALTIME, &deadline);
+        deadline.tv_nsec += 100 * 1000 * 1000;
+        if (deadline.tv_nsec >= 1000000000L) {
+            deadline.tv_sec++;
+            deadline.tv_nsec -= 1000000000L;
+        }
+        if (sem_timedwait(&job->done, &deadline) == 0) break;
+        if (errno == ETIMEDOUT && (pool->broken || !workers_alive(pool))) return -1;
+    }
+    sem_destroy(&job->done);
+    job->waited = 1;
+
+    // Tickets may be waited out of order, but submit reuses slots in ticket
+    // order, so a slot is only freed once every earlier ticket was waited too
+    while (ctl->retired < ctl->published && ctl->jobs[ctl->retired % POOL_RING_SLOTS].waited) {
+        ctl->retired++;
+        sem_post(&ctl->slots);
+    }
+    return 0;
+}
+
+int worker_pool_multiply(worker_pool_t *pool, const double *A, const double *B, double *C, int m, int chunk) {
+    long ticket = worker_pool_submit(pool, A, B, C, m, chunk);
+    if (ticket < 0) return -1;
+    return worker_pool_wait(pool, ticket);
+}
+
+void worker_pool_destroy(worker_pool_t *pool) {
+    if (!pool) return;
+    if (pool->ctl && pool->pids) {
+        __atomic_store_n(&pool->ctl->shutdown, 1, __ATOMIC_RELEASE);
+        for (int w = 0; w < pool->p; w++) {
+            if (pool->pids[w] > 0) sem_post(&pool->ctl->wake[w]);
+        }
+        for (int w = 0; w < pool->p; w++) {
+            if (pool->pids[w] <= 0) continue;
+            while (waitpid(pool->pids[w], NULL, 0) == -1 && errno == EINTR) {}
+        }
+    }
+    if (pool->ctl) munmap(pool->ctl, pool->ctl_bytes);
+    if (pool->arena) munmap(pool->arena, pool->arena_count * sizeof(double));
+    free(pool->pids);
+    free(pool);
+}
@@ -0,0 +1,56 @@
+#ifndef WORKER_POOL_H
+#define WORKER_POOL_H
+
+#include <stddef.h>
+#include <sys/types.h>
+#include "placement.h"
+
+// Maximum number of jobs that can be submitted before one of them is waited on
+#define POOL_RING_SLOTS 16
+
+typedef struct pool_shared pool_shared_t;
+
+// A fixed set of forked workers that stay alive across multiplications.
+// Workers attach to the shared control block and matrix arena once, at
+// creation, then sleep until a job descriptor is published to the ring.
+typedef struct {
+    int p;                  // number of worker processes
+    pid_t *pids;
+    pool_shared_t *ctl;     // MAP_SHARED control block and job ring
+    size_t ctl_bytes;
+    double *arena;          // MAP_SHARED matrix storage visible to all workers
+    size_t arena_count;     // arena capacity in doubles
+    size_t arena_used;      // bump-allocator position in doubles
+    int broken;             // a worker died; no further jobs are accepted
+} worker_pool_t;
+
+// Start p workers sharing an arena of arena_bytes. Worker i is pinned by
+// placement_pin_worker(pin, i); pass NULL to leave them unpinned.
+// Returns NULL on failure.
+worker_pool_t *worker_pool_create(int p, size_t arena_bytes, const placement_t *pin);
+
+// Allocate count doubles from the shared arena (64-byte aligned).
+// Returns NULL when the arena is exhausted.
+double *worker_pool_alloc(worker_pool_t *pool, size_t count);
+
+// Release every arena allocation; no job may be in flight
+void worker_pool_reset(worker_pool_t *pool);
+
+// Queue C = A * B (m x m, all three inside the arena), split into blocks of
+// `chunk` rows (PARALLEL_GRAIN_AUTO picks one). Returns a ticket for
+// worker_pool_wait, or -1 if the operands are invalid or the ring is full.
+long worker_pool_submit(worker_pool_t *pool, const double *A, const double *B, double *C, int m, int chunk);
+
+// Block until the job identified by ticket has finished. Every ticket must be
+// waited exactly once, in any order; a ring slot becomes free again only when
+// its ticket and all earlier ones have been waited. Returns 0 on success, -1 on
+// failure (including a ticket that was already waited).
+int worker_pool_wait(worker_pool_t *pool, long ticket);
+
+// Submit and wait in one call
+int worker_pool_multiply(worker_pool_t *pool, const double *A, const double *B, double *C, int m, int chunk);
+
+// Stop the workers and release all shared memory
+void worker_pool_destroy(worker_pool_t *pool);
+
+#endif
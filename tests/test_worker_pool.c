@@ -0,0 +1,73 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include "../src/worker_pool.h"
+
+// Out-of-order waits on the worker pool ring (make check)
+//
+// Fill the ring, wait the last ticket first, then submit once more: the new job
+// must not land on the still unwaited ticket 0. Every product is checked
+// against a naive multiplication.
+
+#define M 24
+#define JOBS POOL_RING_SLOTS
+
+static int failures = 0;
+
+static void check(int ok, const char *what) {
+    if (!ok) {
+        fprintf(stderr, "FAIL: %s\n", what);
+        failures++;
+    }
+}
+
+static int product_ok(const double *A, const double *B, const double *C) {
+    for (int i = 0; i < M; i++) {
+        for (int j = 0; j < M; j++) {
+            double sum = 0.0;
+            for (int k = 0; k < M; k++) sum += A[i * M + k] * B[k * M + j];
+            if (C[i * M + j] != sum) return 0;
+        }
+    }
+    return 1;
+}
+
+int main(void) {
+    size_t n = (size_t)M * M;
+    worker_pool_t *pool = worker_pool_create(2, (2 * (JOBS + 1) + 1) * (n + 8) * sizeof(double), NULL);
+    if (!pool) return 1;
+
+    // One shared A, a distinct B and C per job
+    double *A = worker_pool_alloc(pool, n);
+    double *B[JOBS + 1], *C[JOBS + 1];
+    for (size_t i = 0; i < n; i++) A[i] = (double)(i % 7);
+    for (int t = 0; t <= JOBS; t++) {
+        B[t] = worker_pool_alloc(pool, n);
+        C[t] = worker_pool_alloc(pool, n);
+        for (size_t i = 0; i < n; i++) B[t][i] = (double)((i + t) % 5);
+    }
+
+    long tickets[JOBS + 1];
+    for (int t = 0; t < JOBS; t++) {
+        tickets[t] = worker_pool_submit(pool, A, B[t], C[t], M, 0);
+        check(tickets[t] == t, "submit fills the ring");
+    }
+    check(worker_pool_submit(pool, A, B[JOBS], C[JOBS], M, 0) == -1, "a full ring refuses a job");
+
+    check(worker_pool_wait(pool, tickets[JOBS - 1]) == 0, "wait the newest ticket first");
+    check(worker_pool_wait(pool, tickets[JOBS - 1]) == -1, "a ticket is waited only once");
+    check(worker_pool_submit(pool, A, B[JOBS], C[JOBS], M, 0) == -1,
+          "no slot is free while ticket 0 is unwaited");
+
+    check(worker_pool_wait(pool, tickets[0]) == 0, "wait ticket 0");
+    tickets[JOBS] = worker_pool_submit(pool, A, B[JOBS], C[JOBS], M, 0);
+    check(tickets[JOBS] == JOBS, "ticket 0's slot is reused once it was waited");
+
+    for (int t = 1; t < JOBS - 1; t++) check(worker_pool_wait(pool, tickets[t]) == 0, "wait the middle tickets");
+    if (tickets[JOBS] >= 0) check(worker_pool_wait(pool, tickets[JOBS]) == 0, "wait the reused slot");
+
+    for (int t = 0; t <= JOBS; t++) check(product_ok(A, B[t], C[t]), "every product is correct");
+
+    worker_pool_destroy(pool);
+    if (failures == 0) printf("test_worker_pool: OK\n");
+    return failures ? 1 : 0;
+}
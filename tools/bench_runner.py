@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Repeated-measurement benchmark runner for the matrix multiplication programs
+Chạy benchmark nhiều lần (warm-up, lặp, thứ tự ngẫu nhiên) và ghi kết quả JSON/CSV
+
+Every configuration (method, matrix size, process count) gets --warmup
+discarded runs followed by --reps measured runs. The measured runs of all
+configurations are shuffled together, so slow drift (thermal throttling,
+background load) spreads over every configuration instead of biasing the
+last ones. Each run calls the program with --json and reads its own timing
+of the multiplication, so process start-up and data generation are excluded.
+
+Output (--out results.json), schema "strassen-bench/1":
+    {
+      "schema": "strassen-bench/1",
+      "created": ISO-8601 time,
+      "machine": {cpu_model, logical_cpus, governor, kernel, memory_mb, hostname, compiler, git_commit},
+      "settings": {reps, warmup, seed, timeout_s, build_dir},
+      "results": [
+        {method, program, matrix_size, processes, runs_us: [...], failures,
+         median_us, mean_us, stdev_us, p95_us, min_us, max_us,
+         ci95_low_us, ci95_high_us,      # bootstrap 95% CI of the median
+         gflops, gbps}                   # at the median time
+      ]
+    }
+GFLOP/s counts the classical 2n^3 operations (an "effective" rate for Strassen);
+GB/s counts the minimum traffic of reading A and B and writing C (3 * n^2 * 8 bytes).
+--csv writes the same records without runs_us. generate_charts.py --bench loads
+the JSON directly; --db also appends every run to the SQLite results store
+(tools/results_store.py).
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+SCHEMA = 'strassen-bench/1'
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# method -> (program, takes a process count)
+METHODS = {
+    'sequential': ('sequentialMult', False),
+    'parallel_row': ('parallelRowMult', True),
+    'parallel_element': ('parallelElementMult', True),
+    'parallel_strassen': ('parallelStrassenMult', True),
+}
+
+CSV_FIELDS = ['method', 'program', 'matrix_size', 'processes', 'runs', 'failures',
+              'median_us', 'mean_us', 'stdev_us', 'p95_us', 'min_us', 'max_us',
+              'ci95_low_us', 'ci95_high_us', 'gflops', 'gbps']
+
+
+def int_list(text):
+    return [int(x) for x in text.split(',') if x.strip()]
+
+
+def read_first(path, default=None):
+    try:
+        return Path(path).read_text().strip().splitlines()[0]
+    except (OSError, IndexError):
+        return default
+
+
+def machine_fingerprint():
+    """Thông tin máy: CPU, số lõi, governor, kernel, bộ nhớ, compiler, commit"""
+    cpu_model = None
+    try:
+        for line in Path('/proc/cpuinfo').read_text().splitlines():
+            if line.startswith('model name'):
+                cpu_model = line.split(':', 1)[1].strip()
+                break
+    except OSError:
+        pass
+    memory_mb = None
+    try:
+        for line in Path('/proc/meminfo').read_text().splitlines():
+            if line.startswith('MemTotal:'):
+                memory_mb = int(line.split()[1]) // 1024
+                break
+    except OSError:
+        pass
+
+    def command_output(cmd):
+        try:
+            out = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT_DIR, timeout=10)
+            return out.stdout.strip().splitlines()[0] if out.returncode == 0 and out.stdout else None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    return {
+        'cpu_model': cpu_model or platform.processor() or None,
+        'logical_cpus': os.cpu_count(),
+        'available_cpus': len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else None,
+        'governor': read_first('/sys/devices/system/cpu/cpu0/cpufreq/scaling_governor'),
+        'kernel': platform.release(),
+        'memory_mb': memory_mb,
+        'hostname': socket.gethostname(),
+        'compiler': command_output(['gcc', '--version']),
+        'git_commit': command_output(['git', 'rev-parse', 'HEAD']),
+    }
+
+
+def percentile(sorted_values, q):
+    """Percentile with linear interpolation between closest ranks"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = (len(sorted_values) - 1) * q
+    lo = math.floor(pos)
+    hi = math.ceil(pos)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def bootstrap_median_ci(values, rng, resamples=2000, level=0.95):
+    """Khoảng tin cậy bootstrap cho trung vị (không giả định phân phối chuẩn)"""
+    if len(values) < 2:
+        return values[0], values[0]
+    medians = sorted(statistics.median(rng.choices(values, k=len(values))) for _ in range(resamples))
+    alpha = (1 - level) / 2
+    return percentile(medians, alpha), percentile(medians, 1 - alpha)
+
+
+def summarize(config, runs, failures, rng):
+    method, size, procs = config
+    record = {
+        'method': method,
+        'program': METHODS[method][0],
+        'matrix_size': size,
+        'processes': procs,
+        'runs_us': runs,
+        'failures': failures,
+    }
+    if not runs:
+        return record
+    ordered = sorted(runs)
+    median = statistics.median(ordered)
+    low, high = bootstrap_median_ci(ordered, rng)
+    seconds = median / 1e6 if median > 0 else float('nan')
+    record.update({
+        'median_us': median,
+        'mean_us': statistics.fmean(ordered),
+        'stdev_us': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        'p95_us': percentile(ordered, 0.95),
+        'min_us': ordered[0],
+        'max_us': ordered[-1],
+        'ci95_low_us': low,
+        'ci95_high_us': high,
+        'gflops': 2.0 * size ** 3 / seconds / 1e9,
+        'gbps': 3.0 * size * size * 8 / seconds / 1e9,
+    })
+    return record
+
+
+def run_once(build_dir, config, timeout):
+    """Chạy chương trình một lần với --json; trả về thời gian (µs) hoặc None nếu lỗi"""
+    method, size, procs = config
+    program, parallel = METHODS[method]
+    cmd = [str(build_dir / program), str(size)]
+    if parallel:
+        cmd.append(str(procs))
+    cmd.append('--json')
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        print(f'  timeout: {" ".join(cmd)}', file=sys.stderr)
+        return None
+    if out.returncode != 0:
+        print(f'  failed ({out.returncode}): {" ".join(cmd)}: {out.stderr.strip()}', file=sys.stderr)
+        return None
+    for line in out.stdout.splitlines():
+        line = line.strip()
+        if line.startswith('{'):
+            return float(json.loads(line)['time_us'])
+    print(f'  no JSON result from: {" ".join(cmd)}', file=sys.stderr)
+    return None
+
+
+def build_configs(methods, sizes, procs):
+    configs = []
+    for method in methods:
+        if METHODS[method][1]:
+            configs.extend((method, n, p) for n in sizes for p in procs)
+        else:
+            configs.extend((method, n, 1) for n in sizes)
+    return configs
+
+
+def write_csv(path, records):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for record in records:
+            row = dict(record)
+            row['runs'] = len(record['runs_us'])
+            writer.writerow(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Warm-up + repeated, randomised benchmark runs with statistics')
+    parser.add_argument('--methods', default='sequential,parallel_row,parallel_element',
+                        help=f'comma-separated subset of {",".join(METHODS)}')
+    parser.add_argument('--sizes', type=int_list, default=[256, 512, 1024], help='e.g. 256,512,1024')
+    parser.add_argument('--procs', type=int_list, default=[8, 32], help='process counts for parallel methods')
+    parser.add_argument('--reps', type=int, default=10, help='measured runs per configuration')
+    parser.add_argument('--warmup', type=int, default=2, help='discarded runs per configuration')
+    parser.add_argument('--seed', type=int, default=None, help='run-order / bootstrap seed')
+    parser.add_argument('--timeout', type=float, default=600, help='seconds per run')
+    parser.add_argument('--build-dir', type=Path, default=ROOT_DIR / 'compiled')
+    parser.add_argument('--out', type=Path, default=Path('bench_results.json'))
+    parser.add_argument('--csv', type=Path, default=None, help='also write a flat CSV')
+    parser.add_argument('--db', type=Path, default=None, help='also append the runs to a results store')
+    args = parser.parse_args()
+
+    methods = [m.strip() for m in args.methods.split(',') if m.strip()]
+    unknown = [m for m in methods if m not in METHODS]
+    if unknown or args.reps < 1 or args.warmup < 0:
+        parser.error(f'unknown method(s): {", ".join(unknown)}' if unknown else '--reps >= 1, --warmup >= 0')
+    for method in methods:
+        exe = args.build_dir / METHODS[method][0]
+        if not os.access(exe, os.X_OK):
+            parser.error(f'{exe} not found; run make first')
+
+    seed = args.seed if args.seed is not None else random.SystemRandom().randrange(2 ** 32)
+    rng = random.Random(seed)
+    configs = build_configs(methods, args.sizes, args.procs)
+
+    # Warm-ups per configuration first, then every measured run in random order
+    for config in rng.sample(configs, len(configs)):
+        for _ in range(args.warmup):
+            run_once(args.build_dir, config, args.timeout)
+    schedule = [config for config in configs for _ in range(args.reps)]
+    rng.shuffle(schedule)
+
+    runs = {config: [] for config in configs}
+    failures = {config: 0 for config in configs}
+    for i, config in enumerate(schedule, 1):
+        t = run_once(args.build_dir, config, args.timeout)
+        if t is None:
+            failures[config] += 1
+        else:
+            runs[config].append(t)
+        if i % 10 == 0 or i == len(schedule):
+            print(f'\r{i}/{len(schedule)} runs', end='', file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+
+    records = [summarize(config, runs[config], failures[config], rng) for config in configs]
+    document = {
+        'schema': SCHEMA,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': machine_fingerprint(),
+        'settings': {
+            'reps': args.reps,
+            'warmup': args.warmup,
+            'seed': seed,
+            'timeout_s': args.timeout,
+            'build_dir': str(args.build_dir),
+        },
+        'results': records,
+    }
+    args.out.write_text(json.dumps(document, indent=2) + '\n')
+    if args.csv:
+        write_csv(args.csv, records)
+    if args.db:
+        import results_store
+        db = results_store.connect(args.db)
+        results_store.ingest_json(db, args.out, document['machine'], document['machine']['git_commit'])
+        db.close()
+
+    print(f'{"method":<18} {"n":>6} {"p":>5} {"median us":>12} {"95% CI":>23} {"p95 us":>12} {"GFLOP/s":>8}')
+    for r in records:
+        if 'median_us' not in r:
+            print(f'{r["method"]:<18} {r["matrix_size"]:>6} {r["processes"]:>5}   all {r["failures"]} runs failed')
+            continue
+        ci = f'[{r["ci95_low_us"]:.0f}, {r["ci95_high_us"]:.0f}]'
+        print(f'{r["method"]:<18} {r["matrix_size"]:>6} {r["processes"]:>5} {r["median_us"]:>12.0f} '
+              f'{ci:>23} {r["p95_us"]:>12.0f} {r["gflops"]:>8.2f}')
+    print(f'Results written to {args.out}' + (f' and {args.csv}' if args.csv else ''))
+
+
+if __name__ == '__main__':
+    main()
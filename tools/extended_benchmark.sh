@@ -14,6 +14,8 @@ BUILD_DIR="$ROOT_DIR/compiled"
 LOG_DIR="$ROOT_DIR/reports/logs"
 TIMEOUT=600  # 10 phút timeout cho mỗi test
 MEMORY_LIMIT="8G"  # Giới hạn bộ nhớ
+OOC_SCRATCH_DIR="${OOC_SCRATCH_DIR:-$ROOT_DIR/reports/ooc_scratch}"  # File A/B/C cho chế độ out-of-core
+OOC_TIMEOUT="${OOC_TIMEOUT:-0}"  # 0 = không giới hạn (32768×32768 chạy nhiều giờ)
 
 # Tạo thư mục log nếu chưa có
 mkdir -p "$LOG_DIR"
@@ -29,6 +31,29 @@ check_memory() {
     return 0
 }
 
+# Hàm chạy oocMult: chỉ giữ một nửa bộ nhớ còn trống làm buffer tile, phần còn lại nằm trên đĩa
+run_ooc_test() {
+    local matrix_size=$1
+    local num_processes=$2
+    local phase=$3
+    local available_mb=$(free -m | awk 'NR==2{print $7}')
+    local budget_mb=$((available_mb / 2))
+
+    mkdir -p "$OOC_SCRATCH_DIR"
+    echo "    💾 OUT-OF-CORE: oocMult, n=$matrix_size, p=$num_processes (budget: ${budget_mb}MB, scratch: $OOC_SCRATCH_DIR)"
+    timeout $OOC_TIMEOUT "$BUILD_DIR/oocMult" "$matrix_size" "$num_processes" \
+        --mem-budget "${budget_mb}M" --scratch "$OOC_SCRATCH_DIR" 2>&1 | tee -a "$LOG_DIR/extended_${phase}.log"
+    local exit_code=${PIPESTATUS[0]}
+
+    if [ $exit_code -eq 124 ]; then
+        echo "    ⏰ TIMEOUT: Test exceeded ${OOC_TIMEOUT}s"
+    elif [ $exit_code -ne 0 ]; then
+        echo "    ❌ ERROR: Test failed with exit code $exit_code"
+    else
+        echo "    ✅ SUCCESS: Test completed"
+    fi
+}
+
 # Hàm chạy test với timeout và memory check
 run_test() {
     local matrix_size=$1
@@ -40,10 +65,19 @@ run_test() {
     local memory_needed=$((matrix_size * matrix_size * 8 / 1024 / 1024 * 3))  # 3 matrices
     
     echo "  Testing: $method, n=$matrix_size, p=$num_processes (Memory: ${memory_needed}MB)"
+
+    if [ "$method" = "oocMult" ]; then
+        run_ooc_test "$matrix_size" "$num_processes" "$phase"
+        return
+    fi
     
-    # Kiểm tra bộ nhớ
+    # Kiểm tra bộ nhớ; không đủ thì chuyển sang chế độ out-of-core
     if ! check_memory "$memory_needed"; then
-        echo "    ⏭️  SKIP: Insufficient memory"
+        if [ -x "$BUILD_DIR/oocMult" ]; then
+            run_ooc_test "$matrix_size" "$num_processes" "$phase"
+        else
+            echo "    ⏭️  SKIP: Insufficient memory"
+        fi
         return
     fi
     
@@ -135,6 +169,11 @@ run_phase "SCALABILITY" "1536 2048 2560 3072 3584 4096" "32 64 128 256 512 768 1
 # Phase 4: Limit Testing
 run_phase "LIMIT" "5120 6144 7168 8192" "64 128 256 512 768 1024 1500 2000" "parallelRowMult parallelElementMult"
 
+# Phase 5: Out-of-core Testing (ma trận lớn hơn RAM; cần ~3·n²·8 byte đĩa trống trong $OOC_SCRATCH_DIR)
+if [ "${RUN_OOC_PHASE:-0}" = "1" ]; then
+    run_phase "OUT_OF_CORE" "16384 32768" "64" "oocMult"
+fi
+
 echo ""
 echo "============================================================================="
 echo "🎉 ALL PHASES COMPLETED!"
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Single entry point for a matrix product, with a cost-model planner (--auto)
+Chọn engine, số tiến trình và độ hạt công việc từ mô hình chi phí của máy
+
+    ./tools/matmul.py --fit bench_results.json     # fit the model of this machine
+    ./tools/matmul.py 1024 --auto                  # plan, log the plan, run it
+    ./tools/matmul.py 1024 --auto --dry-run        # only show the plan
+    ./tools/matmul.py 1024 --engine row -p 8       # no planning
+
+The model is fitted by least squares from recorded results, either
+tools/bench_runner.py output (schema strassen-bench/1, median times) or the
+reports/visualization/data shapes (raw_data.json, extended_benchmark_data.json).
+Rows are weighted by 1/time so small and large sizes count alike.
+
+    sequential:      t = a * n^2.807 + b * n^2 + e
+    row / element:   t = a * n^3 / min(p, c) + b * n^2 + d * p + e
+
+c is the number of processes that still add speed (the cores the runs
+actually got); it is chosen by a grid search over the recorded process
+counts, the other coefficients by non-negative least squares. d * p is the
+fork / reap / page-fault cost each extra worker adds.
+
+The planner predicts every engine and process count (within the recorded
+range, 2 up to --max-procs) and picks the fastest. A single worker is the
+blocked kernel without parallelism, so it is planned as sequentialMult
+--algo blocked rather than one forked worker. Any such plan must beat the
+sequential (Strassen) prediction by --margin (default 10%); otherwise, and
+for sizes or process counts without parallel records, it runs sequentialMult.
+The model is kept per machine in ~/.strassen_cost_model.json
+(STRASSEN_COST_MODEL to move it), next to the Strassen cutoff profile.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT_DIR / 'reports' / 'visualization' / 'data'
+MODEL_SCHEMA = 'strassen-cost-model/1'
+STRASSEN_EXPONENT = math.log2(7)
+
+# engine -> (program, method name in the benchmark records)
+ENGINES = {
+    'sequential': ('sequentialMult', 'sequential'),
+    'row': ('parallelRowMult', 'parallel_row'),
+    'element': ('parallelElementMult', 'parallel_element'),
+}
+METHOD_ENGINE = {method: engine for engine, (_, method) in ENGINES.items()}
+
+# Times below this are mostly timer / start-up noise; used as the weight floor
+MIN_WEIGHT_US = 100.0
+# Smallest element-engine tile that still goes through the packed GEMM kernel
+# (BLOCK_GEMM_MIN in src/parallel_engines.c), rounded to the register tile
+MIN_TILE = 16
+MAX_TILE = 256
+
+
+def default_model_path():
+    env = os.environ.get('STRASSEN_COST_MODEL')
+    if env:
+        return Path(env)
+    return Path.home() / '.strassen_cost_model.json'
+
+
+# ---------------------------------------------------------------------------
+# Recorded results -> (engine, n, p, time_us)
+
+def load_records(path):
+    """Đọc kết quả benchmark (bench_runner hoặc raw_data/extended_benchmark_data)"""
+    with open(path) as f:
+        data = json.load(f)
+    records = []
+
+    def add(method, n, p, t):
+        engine = METHOD_ENGINE.get(method)
+        if engine and n and t is not None and float(t) > 0:
+            records.append((engine, int(n), int(p or 1), float(t)))
+
+    if isinstance(data, dict) and str(data.get('schema', '')).startswith('strassen-bench/'):
+        for row in data.get('results', []):
+            add(row.get('method'), row.get('matrix_size'), row.get('processes'), row.get('median_us'))
+    elif isinstance(data, dict):
+        # raw_data.json: {method: [{matrix_size, processes?, time_us}]}
+        for method, rows in data.items():
+            for row in rows if isinstance(rows, list) else []:
+                add(method, row.get('matrix_size'), row.get('processes'), row.get('time_us'))
+    elif isinstance(data, list):
+        # extended_benchmark_data.json / speedup_data.json
+        for row in data:
+            add(row.get('method'), row.get('matrix_size') or row.get('n'),
+                row.get('process_count') or row.get('processes'),
+                row.get('time_microseconds') or row.get('time_us'))
+    else:
+        raise ValueError(f'{path}: unrecognised benchmark data')
+    return records
+
+
+# ---------------------------------------------------------------------------
+# Least squares (small dense systems, no numpy needed)
+
+def solve(matrix, rhs):
+    """Gaussian elimination with partial pivoting; None if singular"""
+    size = len(rhs)
+    a = [row[:] + [rhs[i]] for i, row in enumerate(matrix)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(a[r][col]))
+        if abs(a[pivot][col]) < 1e-300:
+            return None
+        a[col], a[pivot] = a[pivot], a[col]
+        for r in range(col + 1, size):
+            factor = a[r][col] / a[col][col]
+            for c in range(col, size + 1):
+                a[r][c] -= factor * a[col][c]
+    x = [0.0] * size
+    for r in range(size - 1, -1, -1):
+        x[r] = (a[r][size] - sum(a[r][c] * x[c] for c in range(r + 1, size))) / a[r][r]
+    return x
+
+
+def nnls(rows, targets, weights):
+    """Weighted least squares, dropping features that come out negative
+    (trả về hệ số >= 0 và tổng bình phương sai số tương đối)"""
+    width = len(rows[0])
+    active = list(range(width))
+    while active:
+        # Columns are scaled to unit size so n^3 and 1 stay well conditioned
+        scale = [max(abs(r[j]) for r in rows) or 1.0 for j in active]
+        normal = [[0.0] * len(active) for _ in active]
+        rhs = [0.0] * len(active)
+        for row, t, w in zip(rows, targets, weights):
+            x = [row[j] / s for j, s in zip(active, scale)]
+            for i in range(len(active)):
+                rhs[i] += w * w * x[i] * t
+                for j in range(len(active)):
+                    normal[i][j] += w * w * x[i] * x[j]
+        sol = solve(normal, rhs)
+        if sol is None:
+            active.pop()
+            continue
+        sol = [v / s for v, s in zip(sol, scale)]
+        negative = [j for j, v in zip(active, sol) if v < 0]
+        if not negative:
+            coef = [0.0] * width
+            for j, v in zip(active, sol):
+                coef[j] = v
+            sse = sum((w * (sum(c * x for c, x in zip(coef, row)) - t)) ** 2
+                      for row, t, w in zip(rows, targets, weights))
+            return coef, sse
+        active.remove(negative[0])
+    return [0.0] * width, float('inf')
+
+
+# ---------------------------------------------------------------------------
+# Model
+
+def sequential_features(n):
+    return [n ** STRASSEN_EXPONENT, n * n, 1.0]
+
+
+def parallel_features(n, p, cores):
+    return [n ** 3 / min(p, cores), n * n, float(p), 1.0]
+
+
+def fit_engine(engine, points):
+    """Hệ số cho một engine từ các điểm (n, p, t)"""
+    targets = [t for _, _, t in points]
+    weights = [1.0 / max(t, MIN_WEIGHT_US) for t in targets]
+    sizes = sorted({n for n, _, _ in points})
+    procs = sorted({p for _, p, _ in points})
+    entry = {'points': len(points), 'sizes': [sizes[0], sizes[-1]], 'processes': [procs[0], procs[-1]]}
+    if engine == 'sequential':
+        coef, sse = nnls([sequential_features(n) for n, _, _ in points], targets, weights)
+        entry.update(coef=coef, cores=1)
+    else:
+        best = None
+        candidates = sorted({1, *procs, *(2 ** i for i in range(int(math.log2(max(procs))) + 1))})
+        for cores in candidates:
+            coef, sse = nnls([parallel_features(n, p, cores) for n, p, _ in points], targets, weights)
+            if best is None or sse < best[1] - 1e-12:
+                best = (coef, sse, cores)
+        coef, sse, cores = best
+        entry.update(coef=coef, cores=cores)
+    entry['rms_relative_error'] = math.sqrt(sse / len(points))
+    return entry
+
+
+def fit_model(paths):
+    points = {engine: [] for engine in ENGINES}
+    for path in paths:
+        for engine, n, p, t in load_records(path):
+            points[engine].append((n, 1 if engine == 'sequential' else p, t))
+    engines = {engine: fit_engine(engine, pts) for engine, pts in points.items() if len(pts) >= 3}
+    if 'sequential' not in engines:
+        raise ValueError('the model needs at least 3 sequential results')
+    return {
+        'schema': MODEL_SCHEMA,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': {'hostname': socket.gethostname(), 'logical_cpus': os.cpu_count(),
+                    'kernel': platform.release()},
+        'sources': [str(p) for p in paths],
+        'engines': engines,
+    }
+
+
+def predict(model, engine, n, p=1):
+    """Thời gian dự đoán (µs)"""
+    entry = model['engines'][engine]
+    if engine == 'sequential':
+        x = sequential_features(n)
+    else:
+        x = parallel_features(n, p, entry['cores'])
+    return sum(c * v for c, v in zip(entry['coef'], x))
+
+
+def load_model(path):
+    with open(path) as f:
+        model = json.load(f)
+    if not isinstance(model, dict) or model.get('schema') != MODEL_SCHEMA:
+        schema = model.get('schema') if isinstance(model, dict) else None
+        raise ValueError(f'{path}: not a cost model (schema={schema!r})')
+    if 'sequential' not in model.get('engines', {}):
+        raise ValueError(f'{path}: cost model has no sequential engine')
+    return model
+
+
+# ---------------------------------------------------------------------------
+# Planner
+
+def row_chunk(n, p):
+    # parallel_row_default_chunk: about 4 claims per worker
+    return max(1, n // (4 * p))
+
+
+def element_tile(n, p):
+    # At least ~4 tiles per worker, never below the GEMM block threshold
+    per_side = math.ceil(math.sqrt(4 * p))
+    tile = n // per_side // 8 * 8
+    return max(MIN_TILE, min(MAX_TILE, tile))
+
+
+def plan(model, n, max_procs, margin):
+    """Chọn engine, p và độ hạt; trả về dict kế hoạch kèm thời gian dự đoán"""
+    seq_us = predict(model, 'sequential', n)
+    best = {'engine': 'sequential', 'algo': None, 'processes': 1, 'grain': None, 'predicted_us': seq_us}
+    reason = 'no parallel model'
+    for engine in ('row', 'element'):
+        entry = model['engines'].get(engine)
+        if not entry:
+            continue
+        lo, hi = entry['sizes']
+        # Never extrapolate a parallel speedup far below the recorded sizes
+        if n < lo / 2:
+            reason = f'no parallel results near n={n}'
+            continue
+        # Only process counts inside the recorded range: below it c is not
+        # identified, above it the per-worker cost is a guess
+        p_lo, p_hi = entry['processes'][0], min(max_procs, entry['processes'][1])
+        if p_lo == 1:
+            # One forked worker is the blocked kernel without any parallelism:
+            # if that is what wins, run it in-process instead of forking
+            t = predict(model, engine, n, 1)
+            if t < best['predicted_us']:
+                best = {'engine': 'sequential', 'algo': 'blocked', 'processes': 1, 'grain': None,
+                        'predicted_us': t}
+            p_lo = 2
+        if p_lo > p_hi:
+            reason = f'no parallel results with 2 to {max_procs} processes'
+            continue
+        candidates = sorted({2 ** i for i in range(21) if p_lo <= 2 ** i <= p_hi} | {p_lo, p_hi})
+        for p in candidates:
+            t = predict(model, engine, n, p)
+            if t < best['predicted_us']:
+                grain = row_chunk(n, p) if engine == 'row' else element_tile(n, p)
+                best = {'engine': engine, 'algo': None, 'processes': p, 'grain': grain, 'predicted_us': t}
+    if best['engine'] != 'sequential' or best['algo']:
+        if best['predicted_us'] > seq_us * (1.0 - margin):
+            reason = (f'{plan_name(best)} predicted {best["predicted_us"] / 1e6:.3f} s, '
+                      f'not {margin:.0%} faster than sequential')
+            best = {'engine': 'sequential', 'algo': None, 'processes': 1, 'grain': None, 'predicted_us': seq_us}
+        else:
+            reason = f'{seq_us / best["predicted_us"]:.2f}x faster than sequential ({seq_us / 1e6:.3f} s)'
+    elif reason == 'no parallel model':
+        reason = 'no parallel model' if len(model['engines']) == 1 else 'parallel never predicted faster'
+    best['reason'] = reason
+    return best
+
+
+def plan_name(chosen):
+    if chosen['engine'] == 'sequential':
+        return f'sequential --algo {chosen["algo"]}' if chosen.get('algo') else 'sequential'
+    return f'{chosen["engine"]} p={chosen["processes"]}'
+
+
+def command_for(args, engine, p, grain, n, algo=None):
+    program = ENGINES[engine][0]
+    cmd = [str(args.build_dir / program), str(n)]
+    if algo:
+        cmd += ['--algo', algo]
+    if engine != 'sequential':
+        cmd.append(str(p))
+        if grain:
+            cmd += ['--chunk' if engine == 'row' else '--tile', str(grain)]
+    if args.json:
+        cmd.append('--json')
+    return cmd
+
+
+def describe(n, chosen):
+    text = f'matmul: plan for m={n}: {plan_name(chosen)}'
+    if chosen['engine'] != 'sequential':
+        text += f' {"chunk" if chosen["engine"] == "row" else "tile"}={chosen["grain"]}'
+    return text + f' (predicted {chosen["predicted_us"] / 1e6:.3f} s; {chosen["reason"]})'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('matrix_size', type=int, nargs='?')
+    parser.add_argument('--auto', action='store_true', help='choose engine, processes and granularity')
+    parser.add_argument('--engine', choices=list(ENGINES), default='sequential')
+    parser.add_argument('-p', '--processes', type=int, default=1)
+    parser.add_argument('--grain', type=int, default=0, help='--chunk (row) or --tile (element); 0 = default')
+    parser.add_argument('--model', type=Path, default=default_model_path())
+    parser.add_argument('--fit', type=Path, nargs='+', metavar='RESULTS',
+                        help='fit the model from benchmark results and save it to --model')
+    parser.add_argument('--max-procs', type=int, default=0,
+                        help='largest process count to consider (default: logical CPUs)')
+    parser.add_argument('--margin', type=float, default=0.10,
+                        help='required predicted gain of a parallel plan over sequential')
+    parser.add_argument('--dry-run', action='store_true', help='print the plan, do not run it')
+    parser.add_argument('--json', action='store_true', help='pass --json to the program')
+    parser.add_argument('--build-dir', type=Path, default=ROOT_DIR / 'compiled')
+    args = parser.parse_args()
+
+    if args.fit:
+        try:
+            model = fit_model(args.fit)
+        except ValueError as e:
+            parser.error(f'--fit: {e}')
+        args.model.write_text(json.dumps(model, indent=2) + '\n')
+        print(f'Cost model written to {args.model}', file=sys.stderr)
+        for engine, entry in model['engines'].items():
+            print(f'  {engine:<10} {entry["points"]:>4} points, n {entry["sizes"][0]}..{entry["sizes"][1]}, '
+                  f'cores={entry["cores"]}, rms relative error {entry["rms_relative_error"]:.1%}',
+                  file=sys.stderr)
+        if args.matrix_size is None:
+            return 0
+    if args.matrix_size is None or args.matrix_size <= 0:
+        parser.error('matrix_size must be positive')
+    n = args.matrix_size
+
+    if args.auto:
+        try:
+            model = load_model(args.model) if args.model.exists() else None
+        except ValueError as e:
+            parser.error(f'--model: {e}')
+        if model is None:
+            # No model for this machine yet: fall back to the data shipped with
+            # the reports (measured elsewhere, so only a rough guide)
+            sources = [p for p in (DATA_DIR / 'raw_data.json', DATA_DIR / 'extended_benchmark_data.json')
+                       if p.exists()]
+            print(f'matmul: no cost model at {args.model}; using {", ".join(p.name for p in sources)} '
+                  f'(run tools/bench_runner.py and --fit to model this machine)', file=sys.stderr)
+            try:
+                model = fit_model(sources)
+            except ValueError as e:
+                parser.error(f'no usable results in {DATA_DIR}: {e}')
+        max_procs = args.max_procs or os.cpu_count() or 1
+        chosen = plan(model, n, max_procs, args.margin)
+        print(describe(n, chosen), file=sys.stderr)
+        engine, p, grain, algo = chosen['engine'], chosen['processes'], chosen['grain'], chosen['algo']
+    else:
+        engine, p, grain, algo = args.engine, args.processes, args.grain, None
+        if engine != 'sequential' and p <= 0:
+            parser.error('-p must be positive')
+
+    cmd = command_for(args, engine, p, grain, n, algo)
+    if args.dry_run:
+        print(' '.join(cmd))
+        return 0
+    if not os.access(cmd[0], os.X_OK):
+        parser.error(f'{cmd[0]} not found; run make first')
+    sys.stdout.flush()
+    return subprocess.run(cmd).returncode
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Helper for the binary matrix file format (src/matrix_io.h)
+Tạo, xem và so sánh file ma trận nhị phân dùng với --a/--b/--out
+
+Layout: 64-byte header (magic "MTXF", version, dtype, rows, cols) followed by
+rows*cols row-major values (float64, or float32 for --precision fp32/mixed).
+"""
+
+import argparse
+import random
+import struct
+import sys
+from array import array
+
+MAGIC = b'MTXF'
+VERSION = 1
+DTYPE_F64 = 1
+DTYPE_F32 = 2
+TYPECODES = {DTYPE_F64: 'd', DTYPE_F32: 'f'}
+HEADER = struct.Struct('<4sIII QQ 32x')
+
+
+def write_matrix(path, rows, cols, values, dtype=DTYPE_F64):
+    """Ghi ma trận (danh sách/array row-major, float64 hoặc float32) ra file"""
+    data = array(TYPECODES[dtype], values)
+    if len(data) != rows * cols:
+        raise ValueError(f'expected {rows * cols} values, got {len(data)}')
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, dtype, 0, rows, cols))
+        data.tofile(f)
+
+
+def read_matrix(path):
+    """Đọc ma trận, trả về (rows, cols, array('d' hoặc 'f'))"""
+    with open(path, 'rb') as f:
+        magic, version, dtype, _, rows, cols = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path}: not a matrix file')
+        if dtype not in TYPECODES:
+            raise ValueError(f'{path}: unsupported dtype {dtype}')
+        data = array(TYPECODES[dtype])
+        data.fromfile(f, rows * cols)
+    return rows, cols, data
+
+
+def cmd_random(args):
+    rng = random.Random(args.seed)
+    values = (float(rng.randrange(100)) for _ in range(args.rows * args.cols))
+    dtype = DTYPE_F32 if args.dtype == 'f32' else DTYPE_F64
+    write_matrix(args.path, args.rows, args.cols, values, dtype)
+
+
+def cmd_show(args):
+    rows, cols, data = read_matrix(args.path)
+    kind = 'float32' if data.typecode == 'f' else 'float64'
+    print(f'{args.path}: {rows}x{cols} {kind}')
+    for i in range(min(rows, args.limit)):
+        row = data[i * cols:i * cols + min(cols, args.limit)]
+        print(' '.join(f'{v:8.1f}' for v in row))
+
+
+def cmd_compare(args):
+    r1, c1, x = read_matrix(args.first)
+    r2, c2, y = read_matrix(args.second)
+    if (r1, c1) != (r2, c2):
+        print(f'shape mismatch: {r1}x{c1} vs {r2}x{c2}')
+        return 1
+    max_diff = max((abs(a - b) for a, b in zip(x, y)), default=0.0)
+    print(f'max |difference| = {max_diff:g}')
+    return 0 if max_diff <= args.tol else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('random', help='write a random integer-valued matrix (0..99)')
+    p.add_argument('path')
+    p.add_argument('rows', type=int)
+    p.add_argument('cols', type=int)
+    p.add_argument('--seed', type=int, default=12345)
+    p.add_argument('--dtype', choices=['f64', 'f32'], default='f64')
+    p.set_defaults(func=cmd_random)
+
+    p = sub.add_parser('show', help='print the top-left corner of a matrix')
+    p.add_argument('path')
+    p.add_argument('--limit', type=int, default=8)
+    p.set_defaults(func=cmd_show)
+
+    p = sub.add_parser('compare', help='compare two matrices element-wise')
+    p.add_argument('first')
+    p.add_argument('second')
+    p.add_argument('--tol', type=float, default=1e-9)
+    p.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args) or 0)
+
+
+if __name__ == "__main__":
+    main()
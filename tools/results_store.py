@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Append-only benchmark results store (SQLite)
+Lưu mọi lần đo vào một CSDL SQLite, nạp log theo kiểu streaming và phát hiện hồi quy
+
+    ./tools/results_store.py ingest logs/strassen_comprehensive.log   # program output logs
+    ./tools/results_store.py ingest bench_results.json                # bench_runner documents
+    ./tools/results_store.py list
+    ./tools/results_store.py compare --base-commit 299b024 --new-commit HEAD
+    ./tools/results_store.py compare --base-machine nodeA --new-machine nodeB --engine sequential
+
+Every timing is one row of `results`, keyed by machine fingerprint, git commit,
+engine, variant (the label in "sequentialMult (blocked): ..."), m and p; rows
+are only ever added. Text logs are read line by line from the byte offset
+where the previous ingestion of the same file stopped (only complete lines
+are consumed), so a growing multi-phase log is parsed once. JSON documents
+are recognised by content hash and ingested once.
+
+Log lines (and the older raw_data / extended_benchmark_data JSON shapes)
+carry no machine or commit: they are attributed to this machine and the
+current HEAD, to --machine NAME with an unknown commit, or to --commit.
+Comparing commits without naming a machine only pairs results from the
+same machine.
+
+compare matches configurations present on both sides and runs a one-sided
+permutation test on the log times (exact when the split count is small);
+a configuration is flagged when the new side is slower by more than
+--min-change with p < --alpha. The exit status is 1 if anything regressed or
+if no configuration was measured on both sides. Runs without a variant label
+(bench_runner documents, --json lines of older builds) count as the program's default
+algorithm, so they match the "(Strassen)" text lines of older logs.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DB = ROOT_DIR / 'reports' / 'visualization' / 'data' / 'results.sqlite'
+
+# program -> engine name used by bench_runner and the charts
+PROGRAM_ENGINE = {
+    'sequentialMult': 'sequential',
+    'parallelRowMult': 'parallel_row',
+    'parallelElementMult': 'parallel_element',
+    'parallelStrassenMult': 'parallel_strassen',
+}
+
+# Variant of runs whose record has none (bench_runner documents, older --json
+# lines): the programs' default algorithm, as labelled in their text lines
+DEFAULT_VARIANT = {
+    'sequential': 'strassen',
+    'parallel_row': 'strassen',
+    'parallel_element': 'strassen',
+    'parallel_strassen': 'strassen',
+}
+
+# "<program> (<variant>): m=<m>, [p=<p>, ]time=<t> microseconds"
+RESULT_LINE = re.compile(rb'(\w+) \(([^)]*)\): m=(\d+), (?:p=(\d+), )?time=(\d+(?:\.\d+)?) microseconds')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS machines (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT UNIQUE NOT NULL,
+    hostname TEXT,
+    cpu_model TEXT,
+    logical_cpus INTEGER,
+    details TEXT
+);
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,             -- 'log' or 'json'
+    content_hash TEXT,              -- json: sha256 of the document
+    inode INTEGER,                  -- log: identity of the file being followed
+    offset INTEGER DEFAULT 0,       -- log: bytes consumed so far
+    machine_id INTEGER REFERENCES machines(id),
+    git_commit TEXT,
+    ingested TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER REFERENCES sources(id),
+    machine_id INTEGER NOT NULL REFERENCES machines(id),
+    git_commit TEXT,
+    engine TEXT NOT NULL,
+    variant TEXT,
+    m INTEGER NOT NULL,
+    p INTEGER NOT NULL,
+    time_us REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_key ON results (machine_id, git_commit, engine, m, p);
+CREATE INDEX IF NOT EXISTS results_config ON results (engine, m, p);
+CREATE UNIQUE INDEX IF NOT EXISTS sources_log ON sources (path) WHERE kind = 'log';
+CREATE UNIQUE INDEX IF NOT EXISTS sources_json ON sources (content_hash) WHERE kind = 'json';
+"""
+
+
+def connect(path):
+    """Mở (và tạo nếu cần) CSDL kết quả"""
+    db = sqlite3.connect(str(path))
+    db.executescript(SCHEMA)
+    return db
+
+
+def current_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                             cwd=ROOT_DIR, timeout=10)
+        return out.stdout.strip() or None if out.returncode == 0 else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def resolve_commit(name):
+    """Full hash for a ref / short hash, or name itself if git does not know it"""
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--verify', '--quiet', f'{name}^{{commit}}'],
+                             capture_output=True, text=True, cwd=ROOT_DIR, timeout=10)
+        if out.returncode == 0 and out.stdout.strip():
+            return out.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return name
+
+
+def fingerprint_of(machine):
+    """Định danh máy: băm các trường ổn định (CPU, số CPU, bộ nhớ, hostname)"""
+    key = {k: machine.get(k) for k in ('cpu_model', 'logical_cpus', 'memory_mb', 'hostname')}
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def machine_id(db, machine):
+    fp = machine.get('fingerprint') or fingerprint_of(machine)
+    row = db.execute('SELECT id FROM machines WHERE fingerprint = ?', (fp,)).fetchone()
+    if row:
+        return row[0]
+    cur = db.execute('INSERT INTO machines (fingerprint, hostname, cpu_model, logical_cpus, details) '
+                     'VALUES (?, ?, ?, ?, ?)',
+                     (fp, machine.get('hostname'), machine.get('cpu_model'), machine.get('logical_cpus'),
+                      json.dumps(machine, sort_keys=True)))
+    return cur.lastrowid
+
+
+def local_machine(name=None):
+    if name:
+        return {'hostname': name, 'fingerprint': hashlib.sha256(name.encode()).hexdigest()[:16]}
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from bench_runner import machine_fingerprint
+    return machine_fingerprint()
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+# ---------------------------------------------------------------------------
+# Ingestion
+
+def normalise_variant(engine, variant):
+    """Nhãn biến thể chữ thường; nhãn mặc định của engine khi bản ghi không có"""
+    return variant.lower() if variant else DEFAULT_VARIANT.get(engine)
+
+
+def parse_line(line):
+    """(engine, variant, m, p, time_us) của một dòng kết quả, hoặc None"""
+    stripped = line.strip()
+    if stripped.startswith(b'{'):
+        try:
+            obj = json.loads(stripped)
+        except ValueError:
+            return None
+        program = obj.get('program')
+        # --profile prints a second object per run that repeats time_us
+        if 'workers' in obj or 'summary' in obj:
+            return None
+        if program and 'matrix_size' in obj and 'time_us' in obj:
+            engine = PROGRAM_ENGINE.get(program, program)
+            return (engine, normalise_variant(engine, obj.get('variant')), int(obj['matrix_size']),
+                    int(obj.get('processes') or 1), float(obj['time_us']))
+        return None
+    match = RESULT_LINE.search(line)
+    if not match:
+        return None
+    program, variant, m, p, t = match.groups()
+    engine = PROGRAM_ENGINE.get(program.decode(), program.decode())
+    return (engine, normalise_variant(engine, variant.decode()), int(m), int(p) if p else 1, float(t))
+
+
+def ingest_log(db, path, machine, commit, chunk_lines=10000):
+    """Nạp log từ offset đã lưu; trả về số kết quả mới"""
+    path = Path(path).resolve()
+    st = path.stat()
+    row = db.execute("SELECT id, inode, offset FROM sources WHERE kind = 'log' AND path = ?",
+                     (str(path),)).fetchone()
+    mid = machine_id(db, machine)
+    if row is None:
+        cur = db.execute("INSERT INTO sources (path, kind, inode, offset, machine_id, git_commit, ingested) "
+                         "VALUES (?, 'log', ?, 0, ?, ?, ?)", (str(path), st.st_ino, mid, commit, now_iso()))
+        source_id, offset = cur.lastrowid, 0
+    else:
+        source_id, inode, offset = row
+        # A replaced or truncated file is read again from the start
+        if inode != st.st_ino or st.st_size < offset:
+            offset = 0
+
+    added = 0
+    batch = []
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break           # partial last line: leave it for the next run
+            offset += len(line)
+            parsed = parse_line(line)
+            # 0 us means below the timer resolution, not a measurement
+            if parsed and parsed[4] > 0:
+                batch.append((source_id, mid, commit, *parsed))
+            if len(batch) >= chunk_lines:
+                added += flush(db, batch, source_id, offset, st.st_ino)
+                batch = []
+    added += flush(db, batch, source_id, offset, st.st_ino)
+    return added
+
+
+def flush(db, batch, source_id, offset, inode):
+    # Results, the new offset and the file's inode are committed together, so an
+    # interrupted ingestion (even of a replaced file) resumes where the stored rows end
+    with db:
+        db.executemany('INSERT INTO results (source_id, machine_id, git_commit, engine, variant, m, p, time_us) '
+                       'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', batch)
+        db.execute('UPDATE sources SET offset = ?, inode = ?, ingested = ? WHERE id = ?',
+                   (offset, inode, now_iso(), source_id))
+    return len(batch)
+
+
+def json_rows(document, default_machine):
+    """(machine, commit, [(engine, variant, m, p, t)]) from a JSON document"""
+    if isinstance(document, dict) and str(document.get('schema', '')).startswith('strassen-bench/'):
+        machine = document.get('machine') or default_machine
+        rows = []
+        for r in document.get('results', []):
+            for t in r.get('runs_us', []):
+                if t > 0:
+                    rows.append((r['method'], normalise_variant(r['method'], r.get('variant')),
+                                 int(r['matrix_size']), int(r.get('processes') or 1), float(t)))
+        return machine, machine.get('git_commit'), rows
+    # raw_data.json ({method: [...]}) and extended_benchmark_data.json ([...])
+    records = []
+    if isinstance(document, dict):
+        for value in document.values():
+            if isinstance(value, list):
+                records.extend(value)
+    elif isinstance(document, list):
+        records = document
+    rows = []
+    for r in records:
+        m = r.get('matrix_size') or r.get('n')
+        t = r.get('time_microseconds') if r.get('time_microseconds') is not None else r.get('time_us')
+        if r.get('method') and m and t is not None and float(t) > 0:
+            p = 1 if r['method'] == 'sequential' else int(r.get('process_count') or r.get('processes') or 1)
+            rows.append((r['method'], normalise_variant(r['method'], None), int(m), p, float(t)))
+    return default_machine, None, rows
+
+
+def ingest_json(db, path, machine, commit):
+    data = Path(path).read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    if db.execute("SELECT 1 FROM sources WHERE kind = 'json' AND content_hash = ?", (digest,)).fetchone():
+        return 0
+    doc_machine, doc_commit, rows = json_rows(json.loads(data), machine)
+    commit = doc_commit or commit
+    mid = machine_id(db, doc_machine)
+    with db:
+        cur = db.execute("INSERT INTO sources (path, kind, content_hash, machine_id, git_commit, ingested) "
+                         "VALUES (?, 'json', ?, ?, ?, ?)", (str(Path(path).resolve()), digest, mid, commit, now_iso()))
+        db.executemany('INSERT INTO results (source_id, machine_id, git_commit, engine, variant, m, p, time_us) '
+                       'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', [(cur.lastrowid, mid, commit, *r) for r in rows])
+    return len(rows)
+
+
+def ingest(db, path, machine, commit):
+    with open(path, 'rb') as f:
+        head = f.read(64).lstrip()
+    # JSON documents; a log of --json lines starts with {"program" and is streamed
+    if path.endswith('.json') or (head[:1] in (b'{', b'[') and not head.startswith(b'{"program"')):
+        return ingest_json(db, path, machine, commit)
+    return ingest_log(db, path, machine, commit)
+
+
+# ---------------------------------------------------------------------------
+# Queries
+
+def select_machine(db, name):
+    """Máy theo hostname hoặc tiền tố fingerprint"""
+    rows = db.execute('SELECT id FROM machines WHERE hostname = ? OR fingerprint LIKE ?',
+                      (name, name + '%')).fetchall()
+    if len(rows) != 1:
+        raise SystemExit(f'machine {name!r} matches {len(rows)} machines; see `list`')
+    return rows[0][0]
+
+
+def samples(db, machine=None, commit=None, engine=None):
+    """{(host, engine, variant, m, p): [time_us]} for one side of a comparison; host
+    is '' when one machine is selected, so only like machines are ever matched"""
+    sql = ('SELECT CASE WHEN ? IS NULL THEN mc.hostname || \' \' || mc.fingerprint ELSE \'\' END, '
+           'engine, variant, m, p, time_us FROM results r JOIN machines mc ON mc.id = r.machine_id WHERE 1 = 1')
+    args = [machine]
+    if machine is not None:
+        sql += ' AND machine_id = ?'
+        args.append(machine)
+    if commit is not None:
+        sql += ' AND git_commit LIKE ?'
+        args.append(commit + '%')
+    if engine:
+        sql += ' AND engine = ?'
+        args.append(engine)
+    out = {}
+    for host, e, variant, m, p, t in db.execute(sql, args):
+        # rows stored before variants were normalised may have none
+        out.setdefault((host, e, normalise_variant(e, variant) or '', m, p), []).append(t)
+    return out
+
+
+def median_results(db, machine=None, commit=None):
+    """Trung vị theo cấu hình, dạng {'sequential': [(m, t)], 'parallel_row': {p: [(m, t)]}, ...}"""
+    results = {'sequential': [], 'parallel_row': {}, 'parallel_element': {}}
+    for (_, engine, _, m, p), times in sorted(samples(db, machine, commit).items()):
+        t = int(round(statistics.median(times)))
+        if engine == 'sequential':
+            results['sequential'].append((m, t))
+        elif engine in ('parallel_row', 'parallel_element'):
+            results[engine].setdefault(p, []).append((m, t))
+    # Several variants of one configuration: keep the fastest median
+    results['sequential'] = sorted(dict(sorted(results['sequential'], key=lambda x: -x[1])).items())
+    for engine in ('parallel_row', 'parallel_element'):
+        for p, points in results[engine].items():
+            results[engine][p] = sorted(dict(sorted(points, key=lambda x: -x[1])).items())
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+
+def permutation_pvalue(base, new, rng, max_exact=20000, resamples=20000):
+    """One-sided p-value that `new` is slower (mean log time) than `base`"""
+    logs = [math.log(max(t, 1e-9)) for t in base + new]
+    n_new = len(new)
+    observed = sum(logs[len(base):]) / n_new - sum(logs[:len(base)]) / len(base)
+    total = sum(logs)
+
+    def diff(new_sum):
+        return new_sum / n_new - (total - new_sum) / len(base)
+
+    if math.comb(len(logs), n_new) <= max_exact:
+        splits = [sum(logs[i] for i in idx) for idx in itertools.combinations(range(len(logs)), n_new)]
+    else:
+        splits = [sum(rng.sample(logs, n_new)) for _ in range(resamples)]
+    hits = sum(1 for s in splits if diff(s) >= observed - 1e-12)
+    return hits / len(splits)
+
+
+def compare(base, new, alpha, min_change, seed=1):
+    """Các dòng so sánh: (key, median cũ, median mới, tỉ lệ, p-value, trạng thái)"""
+    rng = random.Random(seed)
+    rows = []
+    for key in sorted(set(base) & set(new)):
+        b, n = base[key], new[key]
+        if statistics.median(b) <= 0:
+            continue
+        ratio = statistics.median(n) / statistics.median(b)
+        if len(b) < 2 or len(n) < 2:
+            rows.append((key, statistics.median(b), statistics.median(n), ratio, None, 'few samples'))
+            continue
+        p_slow = permutation_pvalue(b, n, rng)
+        p_fast = permutation_pvalue(n, b, rng)
+        if ratio > 1 + min_change and p_slow < alpha:
+            status = 'SLOWER'
+        elif ratio < 1 - min_change and p_fast < alpha:
+            status = 'faster'
+        else:
+            status = ''
+        rows.append((key, statistics.median(b), statistics.median(n), ratio,
+                     p_slow if ratio >= 1 else p_fast, status))
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Command line
+
+def cmd_ingest(db, args):
+    machine = local_machine(args.machine)
+    # Results from another machine are not from this checkout either
+    if args.commit:
+        commit = resolve_commit(args.commit)
+    else:
+        commit = None if args.machine else current_commit()
+    for path in args.paths:
+        added = ingest(db, path, machine, commit)
+        print(f'{path}: {added} new results')
+    return 0
+
+
+def cmd_list(db, args):
+    print(f'{"machine":<18} {"hostname":<20} {"commit":<12} {"results":>8} {"configs":>8}')
+    for fp, host, commit, count, configs in db.execute(
+            "SELECT m.fingerprint, m.hostname, r.git_commit, COUNT(*), COUNT(DISTINCT r.engine || r.m || '/' || r.p) "
+            'FROM results r JOIN machines m ON m.id = r.machine_id GROUP BY r.machine_id, r.git_commit '
+            'ORDER BY m.fingerprint, MIN(r.id)'):
+        print(f'{fp:<18} {str(host)[:20]:<20} {str(commit)[:12]:<12} {count:>8} {configs:>8}')
+    return 0
+
+
+def cmd_compare(db, args):
+    if not (args.base_commit or args.base_machine) or not (args.new_commit or args.new_machine):
+        raise SystemExit('compare needs --base-commit/--base-machine and --new-commit/--new-machine')
+    base_m = select_machine(db, args.base_machine) if args.base_machine else None
+    new_m = select_machine(db, args.new_machine) if args.new_machine else base_m
+    base_c = resolve_commit(args.base_commit) if args.base_commit else None
+    new_c = resolve_commit(args.new_commit) if args.new_commit else base_c
+    base = samples(db, base_m, base_c, args.engine)
+    new = samples(db, new_m, new_c, args.engine)
+    rows = compare(base, new, args.alpha, args.min_change)
+    if not rows:
+        # Nothing was compared, which must not pass as "no regression"
+        print(f'No configuration was measured on both sides ({len(base)} base, {len(new)} new)',
+              file=sys.stderr)
+        return 1
+
+    print(f'{"machine":<16} {"engine":<18} {"variant":<10} {"m":>6} {"p":>5} {"base us":>12} {"new us":>12} '
+          f'{"ratio":>7} {"p-value":>8}')
+    regressions = 0
+    for (host, engine, variant, m, p), b, n, ratio, pval, status in rows:
+        pv = f'{pval:.3f}' if pval is not None else '-'
+        host = host.split(' ')[0] if host else '-'
+        print(f'{host[:16]:<16} {engine:<18} {variant[:10]:<10} {m:>6} {p:>5} {b:>12.0f} {n:>12.0f} '
+              f'{ratio:>7.3f} {pv:>8}  {status}')
+        regressions += status == 'SLOWER'
+    print(f'{regressions} significant slowdown(s) (alpha={args.alpha}, min change {args.min_change:.0%})')
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', type=Path, default=Path(os.environ.get('STRASSEN_RESULTS_DB', DEFAULT_DB)))
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('ingest', help='add program logs or JSON result files')
+    p.add_argument('paths', nargs='+')
+    p.add_argument('--machine', help='attribute log lines to this machine name instead of this host')
+    p.add_argument('--commit', help='attribute log lines to this commit instead of HEAD')
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser('list', help='machines and commits in the store')
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser('compare', help='flag significant slowdowns between commits or machines')
+    p.add_argument('--base-commit')
+    p.add_argument('--new-commit')
+    p.add_argument('--base-machine', help='hostname or fingerprint prefix')
+    p.add_argument('--new-machine')
+    p.add_argument('--engine', help='only this engine (sequential, parallel_row, ...)')
+    p.add_argument('--alpha', type=float, default=0.05)
+    p.add_argument('--min-change', type=float, default=0.02, help='ignore changes below this fraction')
+    p.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    db = connect(args.db)
+    try:
+        return args.func(db, args)
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())